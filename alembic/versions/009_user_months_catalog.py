@@ -0,0 +1,47 @@
+"""create user_months_catalog table
+
+Revision ID: 009_user_months_catalog
+Revises: 008_create_jobs_table
+Create Date: 2025-03-15
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "009_user_months_catalog"
+down_revision: Union[str, Sequence[str], None] = "008_create_jobs_table"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the per-user months catalog (one row per token and month)."""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if "user_months_catalog" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "user_months_catalog",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("auth.users.id"), nullable=False),
+        sa.Column("token", sa.String(length=64), nullable=False),
+        sa.Column("month", sa.String(length=7), nullable=False),
+        sa.Column("hand_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("payload_path", sa.Text(), nullable=True),
+        sa.Column("updated_at", postgresql.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint("token", "month", name="pk_user_months_catalog"),
+    )
+
+    op.create_index("idx_user_months_catalog_user", "user_months_catalog", ["user_id", "month"])
+
+
+def downgrade() -> None:
+    """Drop user_months_catalog table and indexes."""
+    op.drop_index("idx_user_months_catalog_user", table_name="user_months_catalog")
+    op.drop_table("user_months_catalog")
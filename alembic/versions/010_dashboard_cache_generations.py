@@ -0,0 +1,45 @@
+"""create dashboard_cache_generations table
+
+Revision ID: 010_dashboard_cache_generations
+Revises: 009_user_months_catalog
+Create Date: 2025-03-22
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "010_dashboard_cache_generations"
+down_revision: Union[str, Sequence[str], None] = "009_user_months_catalog"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the per-user generation counter used to stamp dashboard caches."""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if "dashboard_cache_generations" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "dashboard_cache_generations",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("auth.users.id"),
+            primary_key=True,
+        ),
+        sa.Column("generation", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", postgresql.TIMESTAMP(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+
+
+def downgrade() -> None:
+    """Drop dashboard_cache_generations table."""
+    op.drop_table("dashboard_cache_generations")
@@ -0,0 +1,54 @@
+"""Unique natural key on poker_stats_detail for idempotent upserts
+
+Revision ID: 011_stats_detail_natural_key
+Revises: 010_dashboard_cache_generations
+Create Date: 2025-03-29
+
+Retried inserts used to duplicate rows. Collapses existing duplicates
+(keeping the newest row) and adds a unique index on
+(token, month, site, table_format, stat_name) so the stats writer can
+upsert. NULL month/site (aggregate rows) must also collide, hence
+NULLS NOT DISTINCT (PostgreSQL 15+).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011_stats_detail_natural_key'
+down_revision: Union[str, Sequence[str], None] = '010_dashboard_cache_generations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Deduplicate poker_stats_detail and add the natural-key unique index"""
+
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if 'poker_stats_detail' not in inspector.get_table_names():
+        return
+
+    op.execute("""
+        DELETE FROM poker_stats_detail a
+        USING poker_stats_detail b
+        WHERE a.id < b.id
+          AND a.token = b.token
+          AND a.month IS NOT DISTINCT FROM b.month
+          AND a.site IS NOT DISTINCT FROM b.site
+          AND a.table_format = b.table_format
+          AND a.stat_name = b.stat_name
+    """)
+
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_poker_stats_detail_natural
+        ON poker_stats_detail(token, month, site, table_format, stat_name)
+        NULLS NOT DISTINCT
+    """)
+
+
+def downgrade() -> None:
+    """Drop the natural-key unique index"""
+    op.execute("DROP INDEX IF EXISTS uq_poker_stats_detail_natural")
@@ -0,0 +1,40 @@
+"""Per-stage metrics column on jobs
+
+Revision ID: 012_jobs_metrics
+Revises: 011_stats_detail_natural_key
+Create Date: 2025-04-12
+
+Stores the pipeline's per-stage metrics summary (wall/CPU time, hands,
+bytes and peak RSS per stage, site and group) with each job, so job
+times can be compared by archive size straight from the database.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '012_jobs_metrics'
+down_revision: Union[str, Sequence[str], None] = '011_stats_detail_natural_key'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add jobs.metrics (JSONB, nullable)"""
+
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if 'jobs' not in inspector.get_table_names():
+        return
+    if 'metrics' in {column['name'] for column in inspector.get_columns('jobs')}:
+        return
+
+    op.add_column('jobs', sa.Column('metrics', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop jobs.metrics"""
+    op.drop_column('jobs', 'metrics')
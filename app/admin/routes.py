@@ -1,5 +1,5 @@
 """Simple Admin Panel - No templates, just working HTML"""
-from flask import redirect, url_for, request, flash, jsonify, Response
+from flask import redirect, url_for, request, flash, jsonify, Response, send_from_directory
 from flask_login import login_required, current_user
 from app.admin import admin_bp
 import psycopg2
@@ -9,9 +9,11 @@ import string
 from datetime import datetime, timedelta
 import logging
 import json
+import html
 
 from app.services.supabase_history import SupabaseHistoryService
 from app.services.result_storage import ResultStorageService
+from app.services import job_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -182,6 +184,7 @@ def render_admin_page(content, title="Admin Panel"):
                     <a href="/admin/emails">Emails</a>
                     <a href="/admin/codes">Códigos</a>
                     <a href="/admin/uploads">Uploads</a>
+                    <a href="/admin/profiles">Perfis</a>
                     <a href="/auth/logout">Sair</a>
                 </div>
                 <div style="clear: both;"></div>
@@ -370,6 +373,139 @@ def uploads():
 
     return render_admin_page(content, title="Uploads dos Utilizadores")
 
+@admin_bp.route('/profiles', methods=['GET', 'POST'])
+@login_required
+def profiles():
+    """Toggle per-job CPU profiling and browse captured profiles."""
+    if not is_admin(current_user):
+        flash('Acesso negado. Apenas administradores.', 'danger')
+        return redirect(url_for('simplified.dashboard_page'))
+
+    messages = []
+
+    if request.method == 'POST':
+        token = request.form.get('token', '').strip()
+        enabled = request.form.get('action') == 'enable'
+        if token:
+            try:
+                job_profiler.set_profiling(token, enabled)
+                log_admin_action(current_user.email, 'PROFILE_ENABLED' if enabled else 'PROFILE_DISABLED',
+                                 details=f'Token: {token}')
+                state = 'ligado' if enabled else 'desligado'
+                messages.append(('success', f'Profiling {state} para {html.escape(token)}'))
+            except Exception as e:
+                messages.append(('danger', f'Erro ao gravar toggle: {html.escape(str(e))}'))
+        else:
+            messages.append(('danger', 'Indique um token (ou * para todos os jobs).'))
+
+    view_token = request.args.get('token', '').strip()
+    if view_token and request.args.get('format') == 'json':
+        summary = job_profiler.load_summary(view_token)
+        if summary is None:
+            return jsonify({'error': 'profile not found'}), 404
+        return jsonify(summary)
+
+    alerts = ''
+    for category, text in messages:
+        class_name = 'alert-success' if category == 'success' else 'alert-danger'
+        alerts += f'<div class="alert {class_name}">{text}</div>'
+
+    env_tokens = ', '.join(job_profiler.env_tokens()) or '—'
+    toggle_rows = ''
+    for token in job_profiler.toggled_tokens():
+        safe_token = html.escape(token)
+        toggle_rows += f'''
+            <tr>
+                <td>{safe_token}</td>
+                <td><a href="/admin/profiles?token={safe_token}" class="btn btn-primary btn-sm">Ver perfil</a></td>
+                <td>
+                    <form method="post" style="margin: 0;">
+                        <input type="hidden" name="token" value="{safe_token}">
+                        <button type="submit" name="action" value="disable" class="btn btn-danger btn-sm">Desligar</button>
+                    </form>
+                </td>
+            </tr>
+        '''
+    if not toggle_rows:
+        toggle_rows = '<tr><td colspan="3" style="text-align:center; color:#777;">Nenhum token ligado.</td></tr>'
+
+    profile_html = ''
+    if view_token:
+        safe_token = html.escape(view_token)
+        summary = job_profiler.load_summary(view_token)
+        if summary is None:
+            profile_html = f'<div class="alert alert-danger">Sem perfil para {safe_token} neste servidor.</div>'
+        else:
+            phase_rows = ''
+            for phase, data in summary.get('phases', {}).items():
+                top = data.get('top_functions') or []
+                hottest = html.escape(top[0]['function']) if top else '—'
+                links = ' '.join(
+                    f'<a href="/admin/profiles/{safe_token}/{html.escape(name)}" class="btn btn-sm">{html.escape(name.split(".", 1)[1])}</a>'
+                    for name in data.get('files', [])
+                )
+                phase_rows += f'''
+                    <tr>
+                        <td>{html.escape(phase)}</td>
+                        <td>{data.get('wall_seconds', 0):.2f}s</td>
+                        <td>{data.get('cpu_seconds', 0):.2f}s</td>
+                        <td>{data.get('samples', 0)}</td>
+                        <td><code>{hottest}</code></td>
+                        <td>{links}</td>
+                    </tr>
+                '''
+            profile_html = f'''
+                <h3>Perfil de {safe_token} ({html.escape(summary.get('created_at', ''))})</h3>
+                <p>
+                    <a href="/admin/profiles/{safe_token}/{job_profiler.SUMMARY_NAME}" class="btn btn-sm">summary.json</a>
+                    Os ficheiros <code>.collapsed</code> abrem no speedscope ou flamegraph.pl; os <code>.prof</code> no snakeviz.
+                </p>
+                <table>
+                    <thead>
+                        <tr><th>Fase</th><th>Wall</th><th>CPU</th><th>Amostras</th><th>Função mais pesada (tottime)</th><th>Ficheiros</th></tr>
+                    </thead>
+                    <tbody>{phase_rows}</tbody>
+                </table>
+            '''
+
+    content = f"""
+        <h2>⏱️ Profiling de Jobs</h2>
+        <p>Jobs com profiling ligado gravam cProfile e stacks amostradas por fase em <code>_logs/profile</code>.
+        Variável de ambiente <code>{job_profiler.PROFILE_ENV}</code>: {html.escape(env_tokens)}</p>
+        {alerts}
+        <form method="post" class="form-group">
+            <input type="text" name="token" placeholder="Token do job (ou * para todos)" style="min-width: 300px;">
+            <button type="submit" name="action" value="enable" class="btn btn-success btn-sm">Ligar profiling</button>
+        </form>
+        <form method="get" class="form-group">
+            <input type="text" name="token" value="{html.escape(view_token)}" placeholder="Token do job" style="min-width: 300px;">
+            <button type="submit" class="btn btn-primary btn-sm">Ver perfil</button>
+        </form>
+        <table>
+            <thead><tr><th>Tokens ligados</th><th></th><th></th></tr></thead>
+            <tbody>{toggle_rows}</tbody>
+        </table>
+        {profile_html}
+    """
+
+    return render_admin_page(content, title="Profiling de Jobs")
+
+@admin_bp.route('/profiles/<token>/<filename>')
+@login_required
+def download_profile(token, filename):
+    """Download one profile file of a job."""
+    if not is_admin(current_user):
+        return redirect(url_for('home'))
+
+    directory = job_profiler.find_profile_dir(token)
+    if not directory:
+        return jsonify({'error': 'profile not found'}), 404
+
+    # send_from_directory recusa caminhos fora da pasta do perfil
+    mimetype = 'application/json' if filename.endswith('.json') else (
+        'text/plain' if filename.endswith('.collapsed') else 'application/octet-stream')
+    return send_from_directory(directory, filename, mimetype=mimetype, as_attachment=True)
+
 
 @admin_bp.route('/emails', methods=['GET', 'POST'])
 @login_required
@@ -42,13 +42,31 @@ def upload_job():
     job_service = JobService()
     upload_service = UploadService()
 
+    # Guardar e calcular o hash na mesma passagem
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        file.save(tmp.name)
         temp_path = Path(tmp.name)
 
     try:
-        file_hash = FileHashService.calculate_hash(temp_path)
+        file_hash, _size = FileHashService.save_stream_with_hash(file.stream, temp_path)
         user_id = str(current_user.id)
+
+        # Duplicado: devolver o resultado existente sem criar job
+        existing = upload_service.find_processed_upload_by_hash(user_id, file_hash)
+        if existing:
+            logger.info(
+                "DUPLICATE UPLOAD: user_id=%s, filename=%s, reusing token=%s",
+                user_id,
+                filename,
+                existing.get("token"),
+            )
+            return jsonify({
+                "ok": True,
+                "duplicate": True,
+                "job_id": existing.get("token"),
+                "upload_id": str(existing.get("id")),
+                "token": existing.get("token"),
+            })
+
         token = secrets.token_hex(6)
         logger.info(
             "REGISTERING UPLOAD: user_id=%s, filename=%s, token=%s",
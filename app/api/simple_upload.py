@@ -13,7 +13,8 @@ from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Up
 from werkzeug.utils import secure_filename
 
 from app.pipeline.multi_site_runner import run_multi_site_pipeline
-from app.services.file_hash import FileHashService
+from app.services.file_hash import HASH_BUFFER_SIZE, FileHashService
+from app.services.months_catalog_service import MonthsCatalogService, catalog_entries_from_output
 from app.services.storage import get_storage
 from app.services.supabase_history import SupabaseHistoryService
 from app.services.supabase_storage import SupabaseStorageService
@@ -65,6 +66,37 @@ def cleanup_temp_files(token: str) -> None:
         logger.warning("Cleanup error for %s: %s", token, exc)
 
 
+def find_duplicate_result(
+    upload_service: UploadService, user_id: str, file_hash: str
+) -> Optional[Dict[str, object]]:
+    """Return the upload response for an archive the user already processed, if any."""
+
+    existing_upload = upload_service.find_processed_upload_by_hash(user_id, file_hash)
+    if existing_upload:
+        token = existing_upload.get("token")
+        original_date = existing_upload.get("processed_at") or existing_upload.get("uploaded_at")
+        total_hands = existing_upload.get("hand_count") or 0
+    else:
+        history_service = SupabaseHistoryService()
+        existing = history_service.find_by_file_hash(file_hash, user_id=user_id) if history_service.enabled else None
+        if not existing:
+            return None
+        token = existing.get("token")
+        original_date = existing.get("created_at")
+        total_hands = existing.get("total_hands", 0)
+
+    return {
+        "success": True,
+        "message": "Ficheiro já processado anteriormente! A reutilizar resultados.",
+        "token": token,
+        "download_url": f"/api/download/result/{token}",
+        "dashboard_url": f"/dashboard/{token}",
+        "duplicate": True,
+        "original_date": original_date.isoformat() if hasattr(original_date, "isoformat") else original_date,
+        "total_hands": total_hands,
+    }
+
+
 @router.post("/simple")
 async def upload_file(
     background_tasks: BackgroundTasks,
@@ -92,18 +124,21 @@ async def upload_file(
 
     logger.info("Processing upload: filename=%s user_id=%s token=%s", filename, user_id, token)
 
+    # Hash calculado durante a escrita: um duplicado não volta a ler o arquivo
+    hasher = FileHashService.new_hasher()
     bytes_written = 0
-    chunk_size = 1024 * 1024
+    chunk_size = HASH_BUFFER_SIZE
     with open(file_path, "wb") as handle:
         while True:
             chunk = await file.read(chunk_size)
             if not chunk:
                 break
-            handle.write(chunk)
             bytes_written += len(chunk)
             if bytes_written > MAX_FILE_SIZE:
                 cleanup_temp_files(token)
                 raise HTTPException(status_code=413, detail="file_too_large")
+            hasher.update(chunk)
+            handle.write(chunk)
 
     await file.close()
 
@@ -111,27 +146,16 @@ async def upload_file(
         cleanup_temp_files(token)
         raise HTTPException(status_code=400, detail="empty_file")
 
-    file_hash = FileHashService.calculate_hash(file_path)
+    file_hash = hasher.hexdigest()
     logger.info("File hash calculated: %s...", file_hash[:16])
 
-    history_service = SupabaseHistoryService()
-    if history_service.enabled:
-        existing = history_service.find_by_file_hash(file_hash, user_id=user_id)
-        if existing:
-            cleanup_temp_files(token)
-            logger.info("Duplicate detected. Reusing token %s", existing.get("token"))
-            return {
-                "success": True,
-                "message": "Ficheiro já processado anteriormente! A reutilizar resultados.",
-                "token": existing.get("token"),
-                "download_url": f"/api/download/result/{existing.get('token')}",
-                "dashboard_url": f"/dashboard/{existing.get('token')}",
-                "duplicate": True,
-                "original_date": existing.get("created_at"),
-                "total_hands": existing.get("total_hands", 0),
-            }
-
     upload_service = UploadService()
+    duplicate = find_duplicate_result(upload_service, user_id, file_hash)
+    if duplicate:
+        cleanup_temp_files(token)
+        logger.info("Duplicate detected. Reusing token %s", duplicate["token"])
+        return duplicate
+
     try:
         upload_id = upload_service.create_upload(
             user_id=user_id,
@@ -294,6 +318,12 @@ def run_pipeline_background(token: str, upload_id: str, user_id: str) -> None:
             except Exception as exc:  # pragma: no cover - defensive
                 logger.warning("Failed to save to Supabase history: %s", exc)
 
+        MonthsCatalogService().record_token_months(
+            user_id,
+            token,
+            catalog_entries_from_output(token, pipeline_result, pipeline_output_dir),
+        )
+
         try:
             logger.info("Rebuilding consolidated results for user %s", user_id)
             rebuild_user_master_results(user_id)
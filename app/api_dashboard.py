@@ -110,11 +110,6 @@ import yaml
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 
-from fastapi import APIRouter, Depends
-
-from app.api.auth_dependencies import get_current_user
-from app.models.user import User
-from app.parse.site_parsers.site_detector import detect_poker_site
 from app.score.scoring import score_step
 from app.services.result_storage import ResultStorageService
 from app.services.upload_service import UploadService
@@ -133,8 +128,6 @@ DEFAULT_GROUP_LABELS = {
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-
 result_storage = ResultStorageService()
 user_months_service = UserMonthsService()
 uploads_service = UploadService()
@@ -176,110 +169,6 @@ def ensure_group_defaults(groups: Dict[str, Any]) -> Dict[str, Any]:
     return groups
 
 
-# NOTE: This endpoint is intentionally excluded from the generic NotFound ->
-# "Erro no processamento do ficheiro" mapping so we can inspect raw missing-data
-# causes when debugging dashboard issues.
-@router.get("/api/debug/user_main_state")
-async def api_debug_user_main_state(current_user: User = Depends(get_current_user)):
-    """
-    INTERNAL DEBUG ENDPOINT.
-
-    Returns a snapshot of the current user's dashboard-related state:
-    uploads, pipeline results, dashboard cache, and months detected.
-    This is meant for development/debugging, not for end users.
-    """
-
-    try:
-        from app.services import user_main_dashboard_service
-
-        user_id = current_user.get_id() if hasattr(current_user, "get_id") else None
-        user_id = user_id or getattr(current_user, "id", None)
-        snapshot = user_main_dashboard_service.get_user_main_debug_snapshot(
-            user_id=str(user_id),
-            result_storage=result_storage,
-            user_months_service=user_months_service,
-            uploads_repo=uploads_service,
-        )
-        return {"success": True, "data": snapshot}
-    except Exception as exc:  # noqa: BLE001 - return debug friendly error
-        logger.exception("Error in api_debug_user_main_state for user %s", getattr(current_user, "id", None))
-        return {
-            "success": False,
-            "error": "internal_error",
-            "detail": str(exc),
-            "type": "debug_internal_error",
-        }
-
-
-@router.get("/api/debug/global-stats/{token}")
-async def api_debug_global_stats(token: str):
-    """Return raw debug counters for a given upload token."""
-
-    try:
-        pipeline_result = result_storage.get_pipeline_result(token)
-    except FileNotFoundError:
-        return {
-            "success": False,
-            "error": "not_found",
-            "detail": f"pipeline_result not found for {token}",
-        }
-    except Exception as exc:  # noqa: BLE001 - expose debug-friendly detail
-        logger.exception("[DEBUG] Failed to load pipeline_result for %s", token)
-        return {
-            "success": False,
-            "error": "internal_error",
-            "detail": str(exc),
-        }
-
-    classification = pipeline_result.get("classification") if isinstance(pipeline_result, dict) else {}
-    discard_stats = (
-        pipeline_result.get("aggregated_discards")
-        or (classification or {}).get("discarded_hands")
-        or pipeline_result.get("discarded_hands")
-        or {}
-    )
-
-    debug_payload = pipeline_result.get("debug") if isinstance(pipeline_result, dict) else {}
-    rooms = pipeline_result.get("rooms") if isinstance(pipeline_result, dict) else {}
-    parsed_hands = debug_payload.get("parsed_hands") if isinstance(debug_payload, dict) else None
-
-    totals = {
-        "raw_lines": debug_payload.get("raw_lines") if isinstance(debug_payload, dict) else None,
-        "parsed_hands": parsed_hands if isinstance(parsed_hands, (int, float)) else pipeline_result.get("total_hands", 0),
-        "valid_hands": debug_payload.get("valid_hands") if isinstance(debug_payload, dict) else pipeline_result.get("valid_hands", 0),
-        "mystery_hands": debug_payload.get("mystery_hands") if isinstance(debug_payload, dict) else discard_stats.get("mystery", 0),
-        "lt4_hands": debug_payload.get("lt4_hands") if isinstance(debug_payload, dict) else discard_stats.get("less_than_4_players", 0),
-        "discarded_no_reason": debug_payload.get("discarded_no_reason") if isinstance(debug_payload, dict) else 0,
-    }
-
-    try:
-        parsed_int = int(totals.get("parsed_hands") or 0)
-    except Exception:
-        parsed_int = 0
-
-    discard_total = discard_stats.get("total")
-    if not isinstance(discard_total, (int, float)):
-        discard_total = sum(int(v or 0) for k, v in discard_stats.items() if k != "total")
-
-    missing = parsed_int - (int(totals.get("valid_hands") or 0) + int(discard_total or 0))
-    if missing > (totals.get("discarded_no_reason") or 0):
-        totals["discarded_no_reason"] = missing
-
-    totals["raw_lines"] = totals.get("raw_lines") or parsed_int
-
-    return {
-        "success": True,
-        "token": token,
-        "raw_lines": int(totals.get("raw_lines") or 0),
-        "parsed_hands": parsed_int,
-        "valid_hands": int(totals.get("valid_hands") or 0),
-        "mystery_hands": int(totals.get("mystery_hands") or 0),
-        "lt4_hands": int(totals.get("lt4_hands") or 0),
-        "discarded_no_reason": int(totals.get("discarded_no_reason") or 0),
-        "by_room": rooms or (debug_payload.get("by_room") if isinstance(debug_payload, dict) else {}),
-    }
-
-
 def reset_groups_for_missing_data(groups: Dict[str, Any]) -> Dict[str, Any]:
     """Reset expected groups to an empty state with has_data=False."""
 
@@ -1,13 +1,124 @@
 """Custom decorators for authentication and authorization"""
+from collections import OrderedDict
 from functools import wraps
-from flask import redirect, url_for, flash, request
+from flask import redirect, url_for, flash, request, session
 from flask_login import current_user
 from app.services.supabase_client import supabase_service
+from typing import Optional
+import hashlib
 import logging
 import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Cache da verificação de email por sessão: sem ele cada pedido protegido
+# (incluindo o polling de progresso) fazia um get_user() ao Supabase.
+VERIFY_TTL_SECONDS = float(os.getenv('AUTH_VERIFY_TTL', '120'))
+# nos últimos 20% do TTL a entrada é revalidada em background
+VERIFY_REFRESH_FRACTION = 0.2
+VERIFY_CACHE_SIZE = 1024
+
+
+class _Verification:
+    __slots__ = ("expires_at", "refreshing")
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.refreshing = False
+
+
+_VERIFY_CACHE: "OrderedDict[str, _Verification]" = OrderedDict()
+_VERIFY_LOCK = threading.Lock()
+
+
+def _session_access_token() -> Optional[str]:
+    supabase_session = session.get('supabase_session')
+    return supabase_session.get('access_token') if isinstance(supabase_session, dict) else None
+
+
+def _session_cache_key() -> Optional[str]:
+    """Hash of the session's Supabase access token (user id when there is none)."""
+    token = _session_access_token()
+    if token:
+        return 'token:' + hashlib.sha256(token.encode('utf-8')).hexdigest()
+    user_id = getattr(current_user, 'id', None)
+    return f'user:{user_id}' if user_id else None
+
+
+def _remember_verified(key: str) -> None:
+    with _VERIFY_LOCK:
+        _VERIFY_CACHE[key] = _Verification(time.monotonic() + VERIFY_TTL_SECONDS)
+        _VERIFY_CACHE.move_to_end(key)
+        while len(_VERIFY_CACHE) > VERIFY_CACHE_SIZE:
+            _VERIFY_CACHE.popitem(last=False)
+
+
+def _refresh_verification(key: str, access_token: Optional[str], user_id: Optional[str]) -> None:
+    """Re-validate the session the entry belongs to (its own access token).
+
+    The process-wide client holds whichever session logged in last, so it
+    cannot vouch for this one; entries without a token just expire.
+    """
+    confirmed = False
+    if access_token and user_id:
+        try:
+            user_response = supabase_service.get_user(access_token)
+            user = user_response.user if user_response else None
+            confirmed = bool(
+                user
+                and user.email_confirmed_at
+                and str(getattr(user, 'id', '')) == str(user_id)
+            )
+        except Exception as e:
+            logger.debug(f"Background email confirmation refresh failed: {e}")
+
+    with _VERIFY_LOCK:
+        entry = _VERIFY_CACHE.get(key)
+        if entry is None:
+            return  # invalidada entretanto (logout)
+        if confirmed:
+            entry.expires_at = time.monotonic() + VERIFY_TTL_SECONDS
+            entry.refreshing = False
+        else:
+            # o próximo pedido volta a fazer a verificação completa
+            _VERIFY_CACHE.pop(key, None)
+
+
+def _is_verified(key: str, access_token: Optional[str] = None, user_id: Optional[str] = None) -> bool:
+    """True while the session has a fresh verification; refreshes it near expiry."""
+    now = time.monotonic()
+    with _VERIFY_LOCK:
+        entry = _VERIFY_CACHE.get(key)
+        if entry is None:
+            return False
+        if now >= entry.expires_at:
+            _VERIFY_CACHE.pop(key, None)
+            return False
+        _VERIFY_CACHE.move_to_end(key)
+        start_refresh = (
+            not entry.refreshing
+            and entry.expires_at - now <= VERIFY_TTL_SECONDS * VERIFY_REFRESH_FRACTION
+        )
+        if start_refresh:
+            entry.refreshing = True
+
+    if start_refresh:
+        threading.Thread(
+            target=_refresh_verification, args=(key, access_token, user_id), daemon=True
+        ).start()
+    return True
+
+
+def invalidate_session_verification() -> None:
+    """Drop the cached email verification of the current session (logout)."""
+    key = _session_cache_key()
+    if key:
+        with _VERIFY_LOCK:
+            _VERIFY_CACHE.pop(key, None)
+
+
 def email_confirmation_required(f):
     """
     Decorator to ensure user has confirmed their email before accessing a route.
@@ -36,17 +147,22 @@ def email_confirmation_required(f):
             return f(*args, **kwargs)
         
         # Production environment - enforce email confirmation
+        cache_key = _session_cache_key()
+        if cache_key and _is_verified(cache_key, _session_access_token(), getattr(current_user, 'id', None)):
+            return f(*args, **kwargs)
+        
         try:
             user_response = supabase_service.get_user()
             if user_response and user_response.user:
                 # Check if email is confirmed
                 if not user_response.user.email_confirmed_at:
                     # Store email in session for confirmation page
-                    from flask import session
                     session['pending_confirmation_email'] = user_response.user.email
                     
                     flash('Por favor, confirme o seu email antes de continuar. Verifique a sua caixa de entrada.', 'warning')
                     return redirect(url_for('auth.email_confirmation_pending'))
+                if cache_key:
+                    _remember_verified(cache_key)
             else:
                 # No valid session, redirect to login
                 flash('Sessão expirada. Por favor, faça login novamente.', 'warning')
@@ -2,6 +2,7 @@
 from flask import render_template, redirect, url_for, flash, request, session as flask_session
 from flask_login import login_user, logout_user, login_required, current_user
 from app.auth import auth_bp
+from app.auth.decorators import invalidate_session_verification
 from app.auth.forms import LoginForm, RegistrationForm
 from app.services.supabase_client import supabase_service
 from app.services.auth_validation import AuthorizationValidator
@@ -131,6 +132,7 @@ def logout():
     """Logout user"""
     # Sign out from Supabase
     supabase_service.sign_out()
+    invalidate_session_verification()
     
     # Clear session
     flask_session.pop('user_data', None)
@@ -8,11 +8,7 @@ import traceback
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, List, Tuple
-from sqlalchemy import MetaData, Table, create_engine, select
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session
-from sqlalchemy.ext.automap import automap_base
+from typing import TYPE_CHECKING, Any, Dict, Optional, List, Tuple
 from .aggregate import build_overview
 from app.api_dashboard import build_dashboard_payload, build_user_month_dashboard_payload
 from app.services import user_main_dashboard_service
@@ -22,6 +18,7 @@ from app.services.result_storage import ResultStorageService
 from app.services.user_main_dashboard_service import get_user_main_month_weights
 from app.services.user_months_service import LATEST_UPLOAD_KEY, UserMonthsService
 from app.services.storage import get_storage
+from app.stats.hand_bundle import BUNDLE_NAME, open_stored_bundle
 from app.stats.hand_collector import HandCollector
 from app.services.db_pool import DatabasePool
 
@@ -35,6 +32,10 @@ bp_dashboard_internal = Blueprint(
     url_prefix="/api/internal",
 )
 
+if TYPE_CHECKING:
+    from sqlalchemy import Table
+    from sqlalchemy.engine import Engine
+
 logger = logging.getLogger(__name__)
 
 SAFE_RE = re.compile(r"^[a-zA-Z0-9_\-]{8,64}$")
@@ -46,11 +47,16 @@ def _get_engine() -> Engine:
     if not database_url:
         raise RuntimeError("DATABASE_URL environment variable not set")
 
+    # SQLAlchemy só serve os endpoints de debug: importado aqui, não no arranque
+    from sqlalchemy import create_engine
+
     return create_engine(database_url)
 
 
 @lru_cache()
 def _get_tables() -> tuple[Engine, Table, Table]:
+    from sqlalchemy import MetaData, Table
+
     engine = _get_engine()
     metadata = MetaData()
     uploads_table = Table("uploads", metadata, autoload_with=engine)
@@ -60,6 +66,8 @@ def _get_tables() -> tuple[Engine, Table, Table]:
 
 @lru_cache()
 def _get_orm_base():
+    from sqlalchemy.ext.automap import automap_base
+
     engine = _get_engine()
     Base = automap_base()
     Base.prepare(autoload_with=engine)
@@ -118,6 +126,15 @@ def _load_stat_hands(
     base_storage_prefix = f"/results/{token}/months/{month}/hands_by_stat/{group}"
     base_local_dir = Path("work") / token / "months" / month / "hands_by_stat" / group
 
+    # Uploads recentes: um só objeto por grupo, lido por intervalos
+    bundle = open_stored_bundle(
+        storage,
+        f"{base_storage_prefix}/{BUNDLE_NAME}",
+        base_local_dir / BUNDLE_NAME,
+    )
+    if bundle is not None:
+        return bundle.hands(stat_key)
+
     metadata = _load_metadata(storage, base_storage_prefix, base_local_dir)
     hand_ids = (metadata.get("hand_ids") or {}).get(stat_key)
     if not hand_ids:
@@ -562,6 +579,8 @@ def api_user_main_sample(group: str, stat_key: str):
 @login_required
 def api_debug_dashboard_state():
     """Mapeia uploads → jobs → tokens de forma resiliente usando ORM/reflexão."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
 
     try:
         user_identifier = str(getattr(current_user, "id", ""))
@@ -667,6 +686,7 @@ def api_internal_debug_dashboard_state():
       - uploads do utilizador
       - jobs associados a cada upload
     """
+    from sqlalchemy.orm import Session
 
     try:
         user_identifier = getattr(current_user, "id", None)
@@ -28,6 +28,12 @@ def main():
         required=True,
         help='Output JSONL file for enriched hands'
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help='Worker processes for chunked parallel mode (1 = serial, default: CPU count)'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -41,7 +47,7 @@ def main():
     
     try:
         print(f"Enriching hands from {args.input}...")
-        result = enrich_hands(args.input, args.output)
+        result = enrich_hands(args.input, args.output, workers=args.workers)
         
         if "error" in result:
             print(f"❌ Error: {result['error']}")
@@ -3,12 +3,16 @@ Runner for hand enrichment with derived data (Phase 3)
 """
 import json
 import os
+import shutil
 import logging
-from typing import Dict, List, Optional
-from app.parse.schemas import Hand
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from app.parse.schemas import hand_view
 from app.derive.schemas import (
     Derived, DerivedPositions, DerivedPreflop, 
-    DerivedIP, DerivedStacks, DerivedFlags
+    DerivedIP, DerivedStacks, DerivedFlags, DerivedPostflop
 )
 from app.derive.positions import assign_positions, group_buckets
 from app.derive.preflop import (
@@ -24,15 +28,33 @@ from app.derive.postflop import derive_postflop
 
 logger = logging.getLogger(__name__)
 
+# Flush enriched hands to disk every BATCH_SIZE hands
+BATCH_SIZE = 1000
 
-def enrich_hands(in_jsonl: str, out_jsonl: str, force: bool = False) -> dict:
+# Parallel mode: inputs smaller than this are always enriched serially, and
+# each byte-range chunk handed to a worker is at least this big.
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+# Chunks per worker, so a slow chunk doesn't leave the other cores idle
+CHUNKS_PER_WORKER = 4
+
+
+def enrich_hands(in_jsonl: str, out_jsonl: str, force: bool = False,
+                 workers: Optional[int] = None) -> dict:
     """
     Enrich parsed hands with derived data and generate statistics.
     
+    Large inputs are split into newline-aligned byte ranges and enriched in a
+    process pool; chunk outputs are concatenated in input order and the
+    per-chunk statistics are merged, so the result matches a serial run.
+    
     Args:
         in_jsonl: Path to input JSONL file with parsed hands
         out_jsonl: Path to output JSONL file with enriched hands
         force: If True, always reprocess and overwrite output file even if it exists
+        workers: Number of worker processes. None reads DERIVE_WORKERS
+            (0 = one per CPU) and stays serial when it is unset; 1 forces
+            serial processing.
         
     Returns:
         Dict with processing summary and stats_path
@@ -53,173 +75,26 @@ def enrich_hands(in_jsonl: str, out_jsonl: str, force: bool = False) -> dict:
             "message": "Using existing enriched file (force=False)"
         }
     
-    out = []
-    stats = {
-        "hands_processed": 0,
-        "position_distribution": {"EP": 0, "MP": 0, "LP": 0},
-        "pot_type_distribution": {"SRP": 0, "3bet": 0, "4bet": 0, "none": 0},
-        "heads_up_percentage": 0.0,
-        "average_eff_stack_srp": 0.0,
-        "average_eff_stack_vs_3bet": 0.0,
-        "errors": []
-    }
-    eff_srp_acc = []
-    eff_3b_acc = []
-    hu_count = 0
-    
-    # Process hands with memory optimization - flush every 1000 hands
-    batch_size = 1000
-    current_batch = []
-    
-    try:
-        with open(in_jsonl, "r", encoding="utf-8") as fi:
-            for line_num, line in enumerate(fi, 1):
-                try:
-                    obj = json.loads(line.strip())
-                    hand = Hand(**obj)
-                    hero = hand.hero or ""
-                    
-                    # POSITIONS
-                    abs_pos = assign_positions(hand)
-                    n_active = len(hand.players)
-                    table_max = hand.table_max or n_active
-                    pos_group_raw = group_buckets(abs_pos, n_active)  # Pass active players count
-                    # Filter out BLINDS from pos_group - schema only accepts EP/MP/LP
-                    pos_group = {k: v for k, v in pos_group_raw.items() if v in ("EP", "MP", "LP")}
-                    positions = DerivedPositions(
-                        table_max_resolved=table_max,
-                        abs_positions=abs_pos,
-                        pos_group=pos_group,
-                        button_seat=hand.button_seat or 0
-                    )
-                    
-                    # PREFLOP
-                    preflop = hand.streets.get("preflop")
-                    acts = preflop.actions if preflop else []
-                    unopened = is_unopened_pot(acts, until_actor=hero) if hero else is_unopened_pot(acts)
-                    limper_before = has_limper_before(acts, hero) if hero else False
-                    opener = first_raiser(acts)
-                    three, four = who_3bet_4bet(acts)
-                    hero_rfi = unopened and actor_is_first_raiser(acts, hero) if hero else False
-                    is_iso = (not unopened) and actor_is_first_raiser(acts, hero) and limper_exists(acts) if hero else False
-                    faced_3b = hero_faced_3bet(acts, hero, opener) if hero else False
-                    folded_3b = hero_folded_to_3bet(acts, hero) if hero else False
-                    is_sqz = detect_squeeze(acts, hero) if hero else False
-                    is_rst_btn = detect_resteal_vs_btn(acts, hero, hand, opener) if hero else False
-                    pot_type = classify_pot_type(acts)
-                    freeplay = detect_freeplay_bb(acts, hand)
-                    
-                    pf = DerivedPreflop(
-                        unopened_pot=unopened,
-                        has_limper_before_hero=limper_before,
-                        open_raiser=opener,
-                        hero_raised_first_in=hero_rfi,
-                        is_isoraiser=is_iso,
-                        three_bettor=three,
-                        four_bettor=four,
-                        faced_3bet=faced_3b,
-                        folded_to_3bet=folded_3b,
-                        is_squeeze=is_sqz,
-                        is_resteal_vs_btn=is_rst_btn,
-                        pot_type=pot_type,
-                        freeplay_bb=freeplay,
-                        hero_vpip=hero_vpip(acts, hero) if hero else False,
-                        hero_position=abs_pos.get(hero) if hero else None,
-                        pot_size_bb=compute_pot_size_flop_bb(hand)
-                    )
-                    
-                    # IP / MW por street
-                    ipd = derive_ip(hand)
-                    ip = DerivedIP(**ipd)
-                    
-                    # STACKS
-                    s_srp = eff_stack_bb_srp(hand, hero) if hero else None
-                    s_3b = eff_stack_bb_vs_3bettor(hand, hero, three) if hero and three else None
-                    stacks = DerivedStacks(
-                        eff_stack_bb_srp=s_srp, 
-                        eff_stack_bb_vs_3bettor=s_3b
-                    )
-                    
-                    # FLAGS
-                    flags = DerivedFlags(
-                        any_allin_preflop=hand.any_allin_preflop if hasattr(hand, 'any_allin_preflop') else False
-                    )
-                    
-                    # POSTFLOP - precisa dos dados derived já presentes
-                    # Cria um objeto temporário com os dados derived para o postflop
-                    temp_obj = dict(obj)
-                    temp_obj["derived"] = {
-                        "positions": positions.model_dump(),
-                        "preflop": pf.model_dump(),
-                        "ip": ip.model_dump(),
-                        "stacks": stacks.model_dump(),
-                        "flags": flags.model_dump()
-                    }
-                    postflop_data = derive_postflop(temp_obj)
-                    from app.derive.schemas import DerivedPostflop
-                    postflop = DerivedPostflop(**postflop_data)
-                    
-                    # Build complete derived structure
-                    derived = Derived(
-                        positions=positions, 
-                        preflop=pf, 
-                        ip=ip, 
-                        stacks=stacks, 
-                        flags=flags,
-                        postflop=postflop
-                    )
-                    
-                    # Add derived to original object
-                    obj["derived"] = derived.model_dump()
-                    current_batch.append(obj)
-                    
-                    # Flush batch when it reaches size limit
-                    if len(current_batch) >= batch_size:
-                        _write_batch_to_file(current_batch, out_jsonl, line_num <= batch_size)
-                        out.extend(current_batch)
-                        current_batch = []
-                        
-                        if line_num % 5000 == 0:
-                            logger.info(f"Processed {line_num} hands...")
-                    
-                    # Telemetria
-                    hg = positions.pos_group.get(hero) if hero else None
-                    if hg in ("EP", "MP", "LP"): 
-                        stats["position_distribution"][hg] += 1
-                    stats["pot_type_distribution"][pot_type] += 1
-                    if ip.heads_up_flop: 
-                        hu_count += 1
-                    if s_srp: 
-                        eff_srp_acc.append(s_srp)
-                    if s_3b: 
-                        eff_3b_acc.append(s_3b)
-                    
-                except Exception as e:
-                    stats["errors"].append({
-                        "line": line_num,
-                        "error": str(e)
-                    })
-                    logger.error(f"Error processing line {line_num}: {e}")
-                    
-    except FileNotFoundError:
+    if not os.path.exists(in_jsonl):
         logger.error(f"Input file not found: {in_jsonl}")
         return {"error": f"File not found: {in_jsonl}"}
     
-    # Write remaining batch
-    if current_batch:
-        _write_batch_to_file(current_batch, out_jsonl, len(out) == 0)
-        out.extend(current_batch)
-    
     # Ensure output directory exists
-    os.makedirs(os.path.dirname(out_jsonl), exist_ok=True)
+    os.makedirs(os.path.dirname(out_jsonl) or ".", exist_ok=True)
+    
+    file_size = os.path.getsize(in_jsonl)
+    n_workers = _resolve_workers(workers, file_size)
     
-    # Calculate final statistics
-    stats["hands_processed"] = len(out)
-    stats["heads_up_percentage"] = round((hu_count / max(1, len(out))) * 100, 2)
-    if eff_srp_acc: 
-        stats["average_eff_stack_srp"] = round(sum(eff_srp_acc) / len(eff_srp_acc), 2)
-    if eff_3b_acc: 
-        stats["average_eff_stack_vs_3bet"] = round(sum(eff_3b_acc) / len(eff_3b_acc), 2)
+    acc = None
+    if n_workers > 1:
+        try:
+            acc = _enrich_parallel(in_jsonl, out_jsonl, file_size, n_workers)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Parallel enrichment failed ({e}), falling back to serial")
+    if acc is None:
+        acc = _enrich_range(in_jsonl, 0, file_size, out_jsonl)
+    
+    stats = _finalize_stats(acc)
     
     # Save statistics
     stats_path = os.path.join(os.path.dirname(out_jsonl), "derive_stats.json")
@@ -232,17 +107,328 @@ def enrich_hands(in_jsonl: str, out_jsonl: str, force: bool = False) -> dict:
     return {
         "input": in_jsonl, 
         "output": out_jsonl, 
-        "hands": len(out), 
+        "hands": stats["hands_processed"], 
         "stats_path": stats_path
     }
 
 
-def _write_batch_to_file(batch: list, out_jsonl: str, is_first_batch: bool = False):
-    """Write a batch of objects to JSONL file"""
-    mode = "w" if is_first_batch else "a"
-    os.makedirs(os.path.dirname(out_jsonl), exist_ok=True)
+def _derive_hand(obj: dict) -> dict:
+    """
+    Derive positions, preflop, IP, stacks, flags and postflop data for one hand.
+
+    Adds the ``derived`` block to ``obj`` in place and returns the telemetry
+    values the accumulators need.
+    """
+    hand = hand_view(obj)
+    hero = hand.hero or ""
+
+    # POSITIONS
+    abs_pos = assign_positions(hand)
+    n_active = len(hand.players)
+    table_max = hand.table_max or n_active
+    pos_group_raw = group_buckets(abs_pos, n_active)  # Pass active players count
+    # Filter out BLINDS from pos_group - schema only accepts EP/MP/LP
+    pos_group = {k: v for k, v in pos_group_raw.items() if v in ("EP", "MP", "LP")}
+    positions = DerivedPositions(
+        table_max_resolved=table_max,
+        abs_positions=abs_pos,
+        pos_group=pos_group,
+        button_seat=hand.button_seat or 0
+    )
+
+    # PREFLOP
+    preflop = hand.streets.get("preflop")
+    acts = preflop.actions if preflop else []
+    unopened = is_unopened_pot(acts, until_actor=hero) if hero else is_unopened_pot(acts)
+    limper_before = has_limper_before(acts, hero) if hero else False
+    opener = first_raiser(acts)
+    three, four = who_3bet_4bet(acts)
+    hero_rfi = unopened and actor_is_first_raiser(acts, hero) if hero else False
+    is_iso = (not unopened) and actor_is_first_raiser(acts, hero) and limper_exists(acts) if hero else False
+    faced_3b = hero_faced_3bet(acts, hero, opener) if hero else False
+    folded_3b = hero_folded_to_3bet(acts, hero) if hero else False
+    is_sqz = detect_squeeze(acts, hero) if hero else False
+    is_rst_btn = detect_resteal_vs_btn(acts, hero, hand, opener) if hero else False
+    pot_type = classify_pot_type(acts)
+    freeplay = detect_freeplay_bb(acts, hand)
+
+    pf = DerivedPreflop(
+        unopened_pot=unopened,
+        has_limper_before_hero=limper_before,
+        open_raiser=opener,
+        hero_raised_first_in=hero_rfi,
+        is_isoraiser=is_iso,
+        three_bettor=three,
+        four_bettor=four,
+        faced_3bet=faced_3b,
+        folded_to_3bet=folded_3b,
+        is_squeeze=is_sqz,
+        is_resteal_vs_btn=is_rst_btn,
+        pot_type=pot_type,
+        freeplay_bb=freeplay,
+        hero_vpip=hero_vpip(acts, hero) if hero else False,
+        hero_position=abs_pos.get(hero) if hero else None,
+        pot_size_bb=compute_pot_size_flop_bb(hand)
+    )
+
+    # IP / MW por street
+    ipd = derive_ip(hand)
+    ip = DerivedIP(**ipd)
+
+    # STACKS
+    s_srp = eff_stack_bb_srp(hand, hero) if hero else None
+    s_3b = eff_stack_bb_vs_3bettor(hand, hero, three) if hero and three else None
+    stacks = DerivedStacks(
+        eff_stack_bb_srp=s_srp, 
+        eff_stack_bb_vs_3bettor=s_3b
+    )
+
+    # FLAGS
+    flags = DerivedFlags(
+        any_allin_preflop=hand.any_allin_preflop if hasattr(hand, 'any_allin_preflop') else False
+    )
+
+    # POSTFLOP - precisa dos dados derived já presentes
+    # Cria um objeto temporário com os dados derived para o postflop
+    temp_obj = dict(obj)
+    temp_obj["derived"] = {
+        "positions": positions.model_dump(),
+        "preflop": pf.model_dump(),
+        "ip": ip.model_dump(),
+        "stacks": stacks.model_dump(),
+        "flags": flags.model_dump()
+    }
+    postflop_data = derive_postflop(temp_obj)
+    postflop = DerivedPostflop(**postflop_data)
+
+    # Build complete derived structure
+    derived = Derived(
+        positions=positions, 
+        preflop=pf, 
+        ip=ip, 
+        stacks=stacks, 
+        flags=flags,
+        postflop=postflop
+    )
+
+    # Add derived to original object
+    obj["derived"] = derived.model_dump()
+
+    return {
+        "hero_group": positions.pos_group.get(hero) if hero else None,
+        "pot_type": pot_type,
+        "heads_up_flop": ip.heads_up_flop,
+        "eff_stack_srp": s_srp,
+        "eff_stack_vs_3bet": s_3b,
+    }
+
+
+def _new_accumulator() -> dict:
+    """Empty per-chunk statistics accumulator (mergeable across chunks)"""
+    return {
+        "hands": 0,
+        "lines": 0,
+        "position_distribution": {"EP": 0, "MP": 0, "LP": 0},
+        "pot_type_distribution": {"SRP": 0, "3bet": 0, "4bet": 0, "none": 0},
+        "hu_count": 0,
+        "eff_srp_sum": 0.0,
+        "eff_srp_count": 0,
+        "eff_3b_sum": 0.0,
+        "eff_3b_count": 0,
+        "errors": []
+    }
+
+
+def _accumulate(acc: dict, telemetry: dict):
+    """Add one hand's telemetry to an accumulator"""
+    acc["hands"] += 1
+    hg = telemetry["hero_group"]
+    if hg in ("EP", "MP", "LP"): 
+        acc["position_distribution"][hg] += 1
+    acc["pot_type_distribution"][telemetry["pot_type"]] += 1
+    if telemetry["heads_up_flop"]: 
+        acc["hu_count"] += 1
+    if telemetry["eff_stack_srp"]: 
+        acc["eff_srp_sum"] += telemetry["eff_stack_srp"]
+        acc["eff_srp_count"] += 1
+    if telemetry["eff_stack_vs_3bet"]: 
+        acc["eff_3b_sum"] += telemetry["eff_stack_vs_3bet"]
+        acc["eff_3b_count"] += 1
+
+
+def _merge_accumulators(total: dict, part: dict):
+    """
+    Merge a chunk accumulator into the running total.
+    
+    Chunks must be merged in input order: error line numbers are chunk-local
+    and get shifted by the number of lines already merged.
+    """
+    line_offset = total["lines"]
+    for key in ("hands", "lines", "hu_count", "eff_srp_sum", "eff_srp_count",
+                "eff_3b_sum", "eff_3b_count"):
+        total[key] += part[key]
+    for dist in ("position_distribution", "pot_type_distribution"):
+        for k, v in part[dist].items():
+            total[dist][k] = total[dist].get(k, 0) + v
+    for err in part["errors"]:
+        total["errors"].append({"line": err["line"] + line_offset, "error": err["error"]})
+
+
+def _finalize_stats(acc: dict) -> dict:
+    """Turn a merged accumulator into the derive_stats.json payload"""
+    hands = acc["hands"]
+    stats = {
+        "hands_processed": hands,
+        "position_distribution": acc["position_distribution"],
+        "pot_type_distribution": acc["pot_type_distribution"],
+        "heads_up_percentage": round((acc["hu_count"] / max(1, hands)) * 100, 2),
+        "average_eff_stack_srp": 0.0,
+        "average_eff_stack_vs_3bet": 0.0,
+        "errors": acc["errors"]
+    }
+    if acc["eff_srp_count"]: 
+        stats["average_eff_stack_srp"] = round(acc["eff_srp_sum"] / acc["eff_srp_count"], 2)
+    if acc["eff_3b_count"]: 
+        stats["average_eff_stack_vs_3bet"] = round(acc["eff_3b_sum"] / acc["eff_3b_count"], 2)
+    return stats
+
+
+def _enrich_range(in_jsonl: str, start: int, end: int, out_path: str) -> dict:
+    """
+    Enrich the hands whose lines start inside [start, end) of in_jsonl.
+    
+    start must be at a line boundary. Output is written to out_path
+    (truncated first) in batches of BATCH_SIZE. Runs in pool workers too,
+    so it only takes picklable arguments and returns a plain dict.
+    """
+    acc = _new_accumulator()
+    current_batch = []
     
-    with open(out_jsonl, mode, encoding="utf-8") as fo:
+    # Truncate up front so a stale file never survives a run with no valid hands
+    open(out_path, "w", encoding="utf-8").close()
+    
+    with open(in_jsonl, "rb") as fi:
+        fi.seek(start)
+        pos = start
+        while pos < end:
+            raw = fi.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            acc["lines"] += 1
+            line_num = acc["lines"]
+            try:
+                obj = json.loads(raw.decode("utf-8").strip())
+                telemetry = _derive_hand(obj)
+                current_batch.append(obj)
+                _accumulate(acc, telemetry)
+                
+                # Flush batch when it reaches size limit
+                if len(current_batch) >= BATCH_SIZE:
+                    _write_batch_to_file(current_batch, out_path)
+                    current_batch = []
+                    
+                    if acc["hands"] % 5000 == 0:
+                        logger.info(f"Processed {acc['hands']} hands...")
+                
+            except Exception as e:
+                acc["errors"].append({
+                    "line": line_num,
+                    "error": str(e)
+                })
+                logger.error(f"Error processing line {line_num}: {e}")
+    
+    # Write remaining batch
+    if current_batch:
+        _write_batch_to_file(current_batch, out_path)
+    
+    return acc
+
+
+def _resolve_workers(workers: Optional[int], file_size: int) -> int:
+    """Pick the worker count: explicit value, then DERIVE_WORKERS, else serial.
+
+    Parallel mode is opt-in: enrich_hands also runs inside web requests and
+    job threads, where a pool of cpu_count processes per call would starve
+    the other workers. 0 (argument or env) means one process per CPU.
+    """
+    if workers is None:
+        try:
+            workers = int(os.getenv("DERIVE_WORKERS", "1"))
+        except ValueError:
+            workers = 1
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if file_size < PARALLEL_MIN_BYTES:
+        return 1
+    max_useful = max(1, file_size // PARALLEL_MIN_BYTES)
+    return max(1, min(workers, max_useful))
+
+
+def _split_byte_ranges(path: str, file_size: int, n_chunks: int) -> List[Tuple[int, int]]:
+    """Split a JSONL file into at most n_chunks newline-aligned byte ranges"""
+    if file_size == 0 or n_chunks <= 1:
+        return [(0, file_size)]
+    
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, n_chunks):
+            target = file_size * i // n_chunks
+            if target <= boundaries[-1]:
+                continue
+            # Advance to the start of the next line
+            f.seek(target - 1)
+            f.readline()
+            pos = f.tell()
+            if boundaries[-1] < pos < file_size:
+                boundaries.append(pos)
+    boundaries.append(file_size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _enrich_parallel(in_jsonl: str, out_jsonl: str, file_size: int, n_workers: int) -> dict:
+    """
+    Enrich byte-range chunks in a process pool and stitch the output in order.
+    
+    Each chunk writes its own part file; parts are concatenated into out_jsonl
+    in chunk order and removed afterwards.
+    """
+    n_chunks = min(n_workers * CHUNKS_PER_WORKER, max(1, file_size // PARALLEL_MIN_BYTES))
+    ranges = _split_byte_ranges(in_jsonl, file_size, n_chunks)
+    parts_dir = out_jsonl + ".parts"
+    os.makedirs(parts_dir, exist_ok=True)
+    part_paths = [os.path.join(parts_dir, f"part_{i:05d}.jsonl") for i in range(len(ranges))]
+    
+    logger.info(f"Enriching {in_jsonl} in {len(ranges)} chunks with {n_workers} workers")
+    
+    try:
+        # spawn: workers are started from threads of the web app, and forking
+        # a multi-threaded process can deadlock on inherited locks
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as executor:
+            futures = [
+                executor.submit(_enrich_range, in_jsonl, start, end, part_path)
+                for (start, end), part_path in zip(ranges, part_paths)
+            ]
+            
+            total = _new_accumulator()
+            with open(out_jsonl, "wb") as fo:
+                for idx, (future, part_path) in enumerate(zip(futures, part_paths), 1):
+                    part = future.result()
+                    _merge_accumulators(total, part)
+                    with open(part_path, "rb") as fp:
+                        shutil.copyfileobj(fp, fo, 1024 * 1024)
+                    os.remove(part_path)
+                    logger.info(f"Chunk {idx}/{len(ranges)} merged ({total['hands']} hands so far)")
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    
+    return total
+
+
+def _write_batch_to_file(batch: list, out_jsonl: str):
+    """Append a batch of objects to a JSONL file"""
+    with open(out_jsonl, "a", encoding="utf-8") as fo:
         for obj in batch:
             fo.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
@@ -253,8 +439,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Enrich parsed hands with derived data")
     parser.add_argument("--in", dest="input", required=True, help="Input JSONL file")
     parser.add_argument("--out", dest="output", required=True, help="Output JSONL file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 = serial, 0 = one per CPU)")
     
     args = parser.parse_args()
     
-    result = enrich_hands(args.input, args.output)
-    print(json.dumps(result, indent=2))
\ No newline at end of file
+    result = enrich_hands(args.input, args.output, workers=args.workers)
+    print(json.dumps(result, indent=2))
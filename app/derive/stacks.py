@@ -4,12 +4,15 @@ Effective stack calculations (Phase 3)
 from typing import Optional, List, Dict
 import logging
 from app.parse.schemas import Hand
+from app.stats.position_mapping import acting_after_table
 
 logger = logging.getLogger(__name__)
 
 # Position orders for calculating who acts after
 POS_ORDER_6MAX = ["EP", "MP", "CO", "BTN", "SB", "BB"]
 POS_ORDER_9MAX = ["EP", "EP2", "MP1", "MP2", "MP3", "CO", "BTN", "SB", "BB"]
+_ACTS_AFTER_6MAX = acting_after_table(POS_ORDER_6MAX)
+_ACTS_AFTER_9MAX = acting_after_table(POS_ORDER_9MAX)
 
 # Minimum stack size in BB for valid opportunities
 MIN_STACK_BB = 16.0
@@ -115,21 +118,15 @@ def get_positions_acting_after(hero_position: str, n_players: int) -> List[str]:
     Returns:
         List of positions that act after hero (in action order)
     """
-    # Choose the appropriate position order based on table size
-    if n_players <= 6:
-        pos_order = POS_ORDER_6MAX
-    else:
-        pos_order = POS_ORDER_9MAX
-    
-    # Find hero's index
-    try:
-        hero_idx = pos_order.index(hero_position)
-    except ValueError:
+    # Precomputed per table size (same tables as app.stats.position_mapping)
+    acts_after = _ACTS_AFTER_6MAX if n_players <= 6 else _ACTS_AFTER_9MAX
+    positions_after = acts_after.get(hero_position)
+    if positions_after is None:
         logger.warning(f"Position {hero_position} not found in order for {n_players} players")
         return []
     
     # Return positions after hero in action order
-    return pos_order[hero_idx + 1:]
+    return list(positions_after)
 
 
 def get_player_stack_bb(hand: Hand, player_name: str) -> Optional[float]:
@@ -1,31 +1,50 @@
 # app/hands/api.py
-import os, json
+import threading
 from flask import Blueprint, request, jsonify
-from app.hands.indexer import build_index, fetch_by_id
+from app.hands.indexer import build_binary_index, open_binary_index
 
 bp = Blueprint("hands_api", __name__)
 
-INDEX_PATH   = "parsed/hands_index.json"
+INDEX_PATH   = "parsed/hands_index.bin"
 HANDS_JSONL  = "parsed/hands_enriched.jsonl"
 
+# Limite de ids por pedido em /api/hh/batch
+MAX_BATCH_IDS = 1000
+
+HAND_FIELDS = [
+    "hand_id","site","tournament_id","file_id","hero",
+    "button_seat","table_max","blinds","derived","timestamp_utc","raw_offsets"
+]
+
 _INDEX_CACHE = None
+_INDEX_LOCK = threading.Lock()
 
 def _ensure_index():
+    """Índice binário em mmap, partilhado pelo worker e reaberto se o JSONL mudar.
+
+    O índice antigo não é fechado aqui: outros pedidos podem estar a ler dele.
+    Fecha-se sozinho quando deixa de ser referenciado.
+    """
     global _INDEX_CACHE
-    if _INDEX_CACHE is None:
-        if not os.path.exists(INDEX_PATH):
-            build_index(HANDS_JSONL, INDEX_PATH)
-        _INDEX_CACHE = json.load(open(INDEX_PATH, "r", encoding="utf-8"))
-    return _INDEX_CACHE
+    with _INDEX_LOCK:
+        if _INDEX_CACHE is not None and _INDEX_CACHE.is_stale():
+            _INDEX_CACHE = None
+        if _INDEX_CACHE is None:
+            _INDEX_CACHE = open_binary_index(INDEX_PATH, HANDS_JSONL)
+        return _INDEX_CACHE
+
+def _keep_fields(obj: dict) -> dict:
+    return {k: obj.get(k) for k in HAND_FIELDS}
 
 @bp.route("/api/hh/reindex", methods=["POST"])
 def api_reindex():
     data = request.get_json(silent=True) or {}
     in_jsonl = data.get("in_jsonl", HANDS_JSONL)
     out_idx  = data.get("out_index", INDEX_PATH)
-    res = build_index(in_jsonl, out_idx)
+    res = build_binary_index(in_jsonl, out_idx)
     global _INDEX_CACHE
-    _INDEX_CACHE = res
+    with _INDEX_LOCK:
+        _INDEX_CACHE = None
     return jsonify({"success": True, "indexed": res["meta"]["count"], "index": out_idx})
 
 @bp.route("/api/hh", methods=["GET"])
@@ -34,18 +53,28 @@ def api_get_hand():
     if not hand_id:
         return jsonify({"error": "id em falta"}), 400
     idx = _ensure_index()
-    if hand_id not in idx.get("map", {}):
+    obj = idx.fetch(hand_id)
+    if not obj:
         return jsonify({"error": "hand_id desconhecido"}), 404
-    obj = fetch_by_id(HANDS_JSONL, idx, hand_id)
-    keep = {k: obj.get(k) for k in [
-        "hand_id","site","tournament_id","file_id","hero",
-        "button_seat","table_max","blinds","derived","timestamp_utc","raw_offsets"
-    ]}
-    return jsonify(keep)
+    return jsonify(_keep_fields(obj))
+
+@bp.route("/api/hh/batch", methods=["POST"])
+def api_get_hands_batch():
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids") or []
+    if not isinstance(ids, list) or not ids:
+        return jsonify({"error": "ids em falta"}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"error": f"máximo de {MAX_BATCH_IDS} ids por pedido"}), 400
+    idx = _ensure_index()
+    found = idx.fetch_many(ids)
+    return jsonify({
+        "hands": {hid: _keep_fields(obj) for hid, obj in found.items()},
+        "missing": [str(hid) for hid in ids if str(hid) not in found],
+    })
 
 @bp.route("/api/hh/excerpt", methods=["GET"])
 def api_get_excerpt():
-    from app.hands.indexer import fetch_by_id
     from app.hands.service import build_excerpt
 
     hand_id = request.args.get("id")
@@ -53,10 +82,10 @@ def api_get_excerpt():
     if not hand_id:
         return jsonify({"error": "id em falta"}), 400
     idx = _ensure_index()
-    if hand_id not in idx.get("map", {}):
+    obj = idx.fetch(hand_id)
+    if not obj:
         return jsonify({"error": "hand_id desconhecido"}), 404
-    obj = fetch_by_id(HANDS_JSONL, idx, hand_id)
     ex = build_excerpt(obj, context_chars=ctx)
     if "error" in ex:
         return jsonify(ex), 404
-    return jsonify(ex)
\ No newline at end of file
+    return jsonify(ex)
@@ -1,6 +1,7 @@
 # app/hands/indexer.py
-import os, json, logging
-from typing import Dict
+import os, json, logging, bisect, hashlib, mmap, struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger("hands.indexer")
 
@@ -43,4 +44,193 @@ def fetch_by_id(hands_jsonl: str, index: Dict, hand_id: str) -> dict:
     with open(hands_jsonl, "rb") as f:
         f.seek(entry["offset"])
         line = f.readline()
-    return json.loads(line.decode("utf-8"))
\ No newline at end of file
+    return json.loads(line.decode("utf-8"))
+
+# ---------------------------------------------------------------------------
+# Índice binário (mmap)
+#
+# Layout (ordem de bytes nativa; produção corre em x86/ARM little-endian):
+#   header  : magic(8) | count(u64) | source_size(u64) | source_mtime_ns(u64)
+#   hashes  : u64[count]  ordenados (blake2b-64 do hand_id)
+#   offsets : u64[count]  offset da linha no JSONL
+#   lengths : u32[count]  bytes da linha (inclui '\n')
+# ---------------------------------------------------------------------------
+BIN_MAGIC = b"HIDX0001"
+_BIN_HEADER = struct.Struct("=8sQQQ")
+
+
+def hand_id_hash(hand_id: str) -> int:
+    """Hash estável de 64 bits de um hand_id."""
+    digest = hashlib.blake2b(str(hand_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def build_binary_index(hands_jsonl: str, out_path: str) -> Dict:
+    """
+    Lê o JSONL e gera o índice binário ordenado por hash do hand_id.
+    Em hand_ids repetidos fica a última ocorrência (como no índice JSON).
+    Escrita atómica: leitores com o ficheiro antigo em mmap não são afetados.
+    """
+    entries = {}
+    with open(hands_jsonl, "rb") as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            try:
+                obj = json.loads(line.decode("utf-8"))
+                hid = obj.get("hand_id") or obj.get("id")
+                if not hid:
+                    continue
+                entries[str(hid)] = (pos, len(line))
+            except Exception as e:
+                logger.warning(f"Erro a indexar @ {pos}: {e}")
+
+    rows = sorted((hand_id_hash(hid), off, ln) for hid, (off, ln) in entries.items())
+    hashes = array("Q", (r[0] for r in rows))
+    offsets = array("Q", (r[1] for r in rows))
+    lengths = array("I", (r[2] for r in rows))
+
+    st = os.stat(hands_jsonl)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as fo:
+        fo.write(_BIN_HEADER.pack(BIN_MAGIC, len(rows), st.st_size, st.st_mtime_ns))
+        hashes.tofile(fo)
+        offsets.tofile(fo)
+        lengths.tofile(fo)
+    os.replace(tmp_path, out_path)
+
+    return {"meta": {"input": hands_jsonl, "count": len(rows), "index": out_path}}
+
+
+class HandIndex:
+    """
+    Índice binário em mmap com pesquisa binária por hash do hand_id.
+
+    As linhas do JSONL são lidas com os.pread num fd partilhado, aberto no
+    construtor, por isso a instância pode ser usada por várias threads sem
+    reabrir ficheiros. Quem a substitui não a fecha: o fd e o mmap são
+    libertados quando a última referência (pedidos ainda a ler) desaparece.
+    """
+
+    def __init__(self, index_path: str, hands_jsonl: str):
+        self.index_path = index_path
+        self.hands_jsonl = hands_jsonl
+        self._fh = open(index_path, "rb")
+        size = os.fstat(self._fh.fileno()).st_size
+        self._mm = mmap.mmap(self._fh.fileno(), size, access=mmap.ACCESS_READ)
+        magic, count, src_size, src_mtime = _BIN_HEADER.unpack_from(self._mm, 0)
+        if magic != BIN_MAGIC:
+            self.close()
+            raise ValueError(f"Índice binário inválido: {index_path}")
+        self.count = count
+        self.source_size = src_size
+        self.source_mtime_ns = src_mtime
+
+        base = _BIN_HEADER.size
+        self._view = view = memoryview(self._mm)
+        self._hashes = view[base:base + 8 * count].cast("Q")
+        self._offsets = view[base + 8 * count:base + 16 * count].cast("Q")
+        self._lengths = view[base + 16 * count:base + 20 * count].cast("I")
+        try:
+            self._data_fd = os.open(hands_jsonl, os.O_RDONLY)
+        except OSError:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, hand_id: str) -> bool:
+        return bool(self._candidates(hand_id))
+
+    def is_stale(self) -> bool:
+        """True se o JSONL mudou desde que o índice foi construído."""
+        try:
+            st = os.stat(self.hands_jsonl)
+        except OSError:
+            return True
+        return st.st_size != self.source_size or st.st_mtime_ns != self.source_mtime_ns
+
+    def _candidates(self, hand_id: str) -> List[Tuple[int, int]]:
+        h = hand_id_hash(hand_id)
+        i = bisect.bisect_left(self._hashes, h)
+        out = []
+        while i < self.count and self._hashes[i] == h:
+            out.append((self._offsets[i], self._lengths[i]))
+            i += 1
+        return out
+
+    def _read(self, offset: int, length: int) -> bytes:
+        return os.pread(self._data_fd, length, offset)
+
+    def _load(self, hand_id: str, offset: int, length: int) -> Optional[dict]:
+        obj = json.loads(self._read(offset, length).decode("utf-8"))
+        # colisões de hash são resolvidas confirmando o hand_id da linha
+        if str(obj.get("hand_id") or obj.get("id")) != str(hand_id):
+            return None
+        return obj
+
+    def lookup(self, hand_id: str) -> Optional[Tuple[int, int]]:
+        """(offset, length) da linha do hand_id, ou None."""
+        for offset, length in self._candidates(hand_id):
+            if self._load(hand_id, offset, length) is not None:
+                return offset, length
+        return None
+
+    def fetch(self, hand_id: str) -> dict:
+        for offset, length in self._candidates(hand_id):
+            obj = self._load(hand_id, offset, length)
+            if obj is not None:
+                return obj
+        return {}
+
+    def fetch_many(self, hand_ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Lê vários hands de uma vez: ordena por offset e lê sequencialmente.
+        Devolve {hand_id: obj}; ids desconhecidos são omitidos.
+        """
+        wanted = []
+        for hid in dict.fromkeys(str(h) for h in hand_ids):
+            for offset, length in self._candidates(hid):
+                wanted.append((offset, length, hid))
+        wanted.sort()
+
+        out = {}
+        for offset, length, hid in wanted:
+            if hid in out:
+                continue
+            obj = self._load(hid, offset, length)
+            if obj is not None:
+                out[hid] = obj
+        return out
+
+    def close(self):
+        for view in ("_hashes", "_offsets", "_lengths", "_view"):
+            mv = getattr(self, view, None)
+            if mv is not None:
+                mv.release()
+        if getattr(self, "_data_fd", None) is not None:
+            os.close(self._data_fd)
+            self._data_fd = None
+        if getattr(self, "_mm", None) is not None and not self._mm.closed:
+            self._mm.close()
+        if getattr(self, "_fh", None) is not None:
+            self._fh.close()
+
+    def __del__(self):
+        self.close()
+
+
+def open_binary_index(index_path: str, hands_jsonl: str, rebuild_if_stale: bool = True) -> HandIndex:
+    """Abre o índice binário, (re)construindo-o se faltar ou estiver desatualizado."""
+    if not os.path.exists(index_path):
+        build_binary_index(hands_jsonl, index_path)
+    idx = HandIndex(index_path, hands_jsonl)
+    if rebuild_if_stale and idx.is_stale():
+        idx.close()
+        build_binary_index(hands_jsonl, index_path)
+        idx = HandIndex(index_path, hands_jsonl)
+    return idx
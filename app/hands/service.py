@@ -1,6 +1,7 @@
 # app/hands/service.py
-import os, json, logging, chardet
-from typing import Optional
+import os, json, logging, chardet, bisect, codecs, threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger("hands.service")
 
@@ -11,6 +12,16 @@ SAFE_ROOTS = [
     "/tmp",
 ]
 
+# Amostra usada pelo chardet (em vez do ficheiro inteiro)
+ENCODING_SAMPLE_BYTES = 64 * 1024
+# Distância (em bytes) entre checkpoints char->byte em encodings de largura variável
+CHECKPOINT_BYTES = 64 * 1024
+# Nº máximo de ficheiros com perfil (encoding + checkpoints) em cache
+PROFILE_CACHE_SIZE = 256
+
+# Encodings de 1 byte por carácter: offset de carácter == offset de byte
+_SINGLE_BYTE_PREFIXES = ("cp125", "iso8859", "mac-", "koi8", "cp437", "cp850")
+
 def is_safe_path(p: str) -> bool:
     p = os.path.abspath(p)
     for root in SAFE_ROOTS:
@@ -36,6 +47,183 @@ def slice_by_offsets(text: str, start: int, end: int, context: int = 200) -> str
     e = min(len(text), end + context)
     return text[s:e]
 
+# ---------------------------------------------------------------------------
+# Leitura por janela: perfil de encoding por ficheiro
+# ---------------------------------------------------------------------------
+
+class _FileProfile:
+    """
+    Encoding detetado a partir de uma amostra e, para encodings de largura
+    variável, checkpoints (char_offset, byte_offset) a cada CHECKPOINT_BYTES.
+    """
+    __slots__ = ("key", "encoding", "fixed_width", "total_chars", "cp_chars", "cp_bytes")
+
+    def __init__(self, key, encoding, fixed_width, total_chars, cp_chars=None, cp_bytes=None):
+        self.key = key
+        self.encoding = encoding
+        self.fixed_width = fixed_width
+        self.total_chars = total_chars
+        self.cp_chars = cp_chars or [0]
+        self.cp_bytes = cp_bytes or [0]
+
+_PROFILE_CACHE: "OrderedDict[str, _FileProfile]" = OrderedDict()
+_PROFILE_LOCK = threading.Lock()
+
+def _detect_encoding(path: str) -> str:
+    with open(path, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+    det = chardet.detect(sample) or {}
+    enc = det.get("encoding") or "utf-8"
+    try:
+        name = codecs.lookup(enc).name
+    except LookupError:
+        return "utf-8"
+    # uma amostra só ASCII não garante que o resto não seja UTF-8
+    return "utf-8" if name == "ascii" else name
+
+def _build_profile(path: str, key: Tuple[int, int]) -> _FileProfile:
+    encoding = _detect_encoding(path)
+    size = key[1]
+    if encoding.startswith(_SINGLE_BYTE_PREFIXES):
+        return _FileProfile(key, encoding, True, size)
+
+    # Largura variável: uma passagem para registar checkpoints
+    dec = codecs.getincrementaldecoder(encoding)(errors="replace")
+    cp_chars, cp_bytes = [0], [0]
+    chars = fed = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(CHECKPOINT_BYTES)
+            if not block:
+                chars += len(dec.decode(b"", final=True))
+                break
+            fed += len(block)
+            chars += len(dec.decode(block))
+            pending = len(dec.getstate()[0])
+            cp_chars.append(chars)
+            cp_bytes.append(fed - pending)
+
+    if chars == size:
+        # conteúdo só ASCII: offsets coincidem, dispensa checkpoints
+        return _FileProfile(key, encoding, True, size)
+    return _FileProfile(key, encoding, False, chars, cp_chars, cp_bytes)
+
+def _file_profile(path: str) -> _FileProfile:
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    with _PROFILE_LOCK:
+        prof = _PROFILE_CACHE.get(path)
+        if prof is not None and prof.key == key:
+            _PROFILE_CACHE.move_to_end(path)
+            return prof
+
+    prof = _build_profile(path, key)
+    with _PROFILE_LOCK:
+        _PROFILE_CACHE[path] = prof
+        _PROFILE_CACHE.move_to_end(path)
+        while len(_PROFILE_CACHE) > PROFILE_CACHE_SIZE:
+            _PROFILE_CACHE.popitem(last=False)
+    return prof
+
+def read_char_window(path: str, start: int, end: int) -> str:
+    """
+    Devolve text[start:end] do ficheiro descodificado, lendo só os bytes
+    necessários (mais, no máximo, CHECKPOINT_BYTES em largura variável).
+    """
+    prof = _file_profile(path)
+    start = max(0, min(start, prof.total_chars))
+    end = max(start, min(end, prof.total_chars))
+
+    if prof.fixed_width:
+        with open(path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start).decode(prof.encoding, errors="replace")
+
+    i = bisect.bisect_right(prof.cp_chars, start) - 1
+    char_pos, byte_pos = prof.cp_chars[i], prof.cp_bytes[i]
+    dec = codecs.getincrementaldecoder(prof.encoding)(errors="replace")
+    pieces: List[str] = []
+    have = char_pos
+    with open(path, "rb") as f:
+        f.seek(byte_pos)
+        while have < end:
+            block = f.read(CHECKPOINT_BYTES)
+            text = dec.decode(block, final=not block)
+            pieces.append(text)
+            have += len(text)
+            if not block:
+                break
+    return "".join(pieces)[start - char_pos:end - char_pos]
+
+# ---------------------------------------------------------------------------
+# Resolução de caminhos: mapa nome -> caminhos por raiz segura
+# ---------------------------------------------------------------------------
+
+class _RootFileMap:
+    """
+    Mapa basename -> [caminhos] de uma raiz, com os mtimes das pastas
+    percorridas. Só é reconstruído quando alguma pasta muda.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.by_name: Dict[str, List[str]] = {}
+        self.dir_mtimes: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.rebuild()
+
+    def rebuild(self):
+        by_name: Dict[str, List[str]] = {}
+        dir_mtimes: Dict[str, int] = {}
+        for base, _, files in os.walk(self.root):
+            try:
+                dir_mtimes[base] = os.stat(base).st_mtime_ns
+            except OSError:
+                continue
+            for fname in files:
+                by_name.setdefault(fname, []).append(os.path.join(base, fname))
+        self.by_name, self.dir_mtimes = by_name, dir_mtimes
+
+    def is_stale(self) -> bool:
+        if not os.path.isdir(self.root):
+            return bool(self.dir_mtimes)
+        for d, mtime in self.dir_mtimes.items():
+            try:
+                if os.stat(d).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _match(self, file_id: str) -> Optional[str]:
+        candidates = [p for p in self.by_name.get(os.path.basename(file_id), []) if os.path.exists(p)]
+        if not candidates:
+            return None
+        # prefere o caminho que termina no file_id completo (ex.: "NON-KO/x.txt")
+        suffix = os.sep + file_id.lstrip(os.sep)
+        for p in candidates:
+            if p.endswith(suffix):
+                return p
+        return candidates[0]
+
+    def find(self, file_id: str) -> Optional[str]:
+        with self.lock:
+            found = self._match(file_id)
+            if found is None and self.is_stale():
+                self.rebuild()
+                found = self._match(file_id)
+            return found
+
+_ROOT_MAPS: Dict[str, _RootFileMap] = {}
+_ROOT_MAPS_LOCK = threading.Lock()
+
+def _root_map(root: str) -> _RootFileMap:
+    with _ROOT_MAPS_LOCK:
+        m = _ROOT_MAPS.get(root)
+        if m is None:
+            m = _ROOT_MAPS[root] = _RootFileMap(root)
+        return m
+
 def find_source_path(file_id: Optional[str]) -> Optional[str]:
     if not file_id:
         return None
@@ -46,12 +234,13 @@ def find_source_path(file_id: Optional[str]) -> Optional[str]:
         guess = os.path.join(root, file_id)
         if os.path.exists(guess):
             return guess
-    # fallback por nome
-    fname = os.path.basename(file_id)
+    # fallback por nome (mapa pré-construído por raiz)
     for root in SAFE_ROOTS:
-        for base, _, files in os.walk(root):
-            if fname in files:
-                return os.path.join(base, fname)
+        if not os.path.isdir(root):
+            continue
+        found = _root_map(root).find(file_id)
+        if found:
+            return found
     return None
 
 def build_excerpt(hand: dict, context_chars: int = 200) -> dict:
@@ -67,8 +256,7 @@ def build_excerpt(hand: dict, context_chars: int = 200) -> dict:
     if not src or not is_safe_path(src):
         return {"error": "Ficheiro original não encontrado/fora de raiz segura"}
 
-    text = read_text_auto(src)
-    snippet = slice_by_offsets(text, hstart, hend, context=context_chars)
+    snippet = read_char_window(src, hstart - context_chars, hend + context_chars)
 
     hero = hand.get("hero")
     if hero:
@@ -79,4 +267,4 @@ def build_excerpt(hand: dict, context_chars: int = 200) -> dict:
         "from": hstart, "to": hend,
         "length": max(0, hend - hstart),
         "snippet": snippet
-    }
\ No newline at end of file
+    }
@@ -3,7 +3,7 @@ Poker hand history parsing module.
 Provides unified interface for parsing multiple poker site formats.
 """
 
-from .schemas import Hand, Player, Action, StreetInfo, ActionType, Street
+from .schemas import Hand, Player, Action, StreetInfo, ActionType, Street, HandView, hand_view
 from .interfaces import SiteParser
 from .runner import parse_file, parse_directory
 from .site_generic import (
@@ -19,6 +19,8 @@ __all__ = [
     'StreetInfo',
     'ActionType',
     'Street',
+    'HandView',
+    'hand_view',
     'SiteParser',
     'parse_file',
     'parse_directory',
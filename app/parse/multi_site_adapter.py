@@ -97,7 +97,8 @@ class MultiSiteAdapter:
         Convert parsed info dict to Hand schema object for compatibility.
         """
         try:
-            # Create Hand object
+            # Create Hand object (validated: parsed_info comes from the site
+            # parsers' dicts, this is the boundary into the Hand schema)
             hand = Hand(
                 site=parsed_info.get('site', 'unknown'),
                 file_id=parsed_info.get('file_id', 'unknown'),
@@ -119,7 +120,7 @@ class MultiSiteAdapter:
             
             # Convert players
             for p in parsed_info.get('players', []):
-                player = Player(
+                player = Player.trusted(
                     seat=p.get('seat', 0),
                     name=p.get('name', 'Unknown'),
                     stack_chips=p.get('stack', 0),
@@ -149,7 +150,7 @@ class MultiSiteAdapter:
             
             for action_data in actions_dict.get(street_name, []):
                 # Convert action dict to Action object
-                action = Action(
+                action = Action.trusted(
                     actor=action_data.get('player', 'Unknown'),
                     type=self._normalize_action_type(action_data.get('action')),
                     amount=action_data.get('amount'),
@@ -157,7 +158,7 @@ class MultiSiteAdapter:
                 )
                 street_actions.append(action)
             
-            streets[street_name] = StreetInfo(
+            streets[street_name] = StreetInfo.trusted(
                 actions=street_actions,
                 board=[]  # Board cards handled separately if needed
             )
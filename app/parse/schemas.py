@@ -1,10 +1,22 @@
 """
 Pydantic schemas for poker hand history parsing.
 Defines data structures for hands, players, actions, and streets.
+
+The parsers build these models from values they produced themselves, so they
+use ``Model.trusted(...)`` (``model_construct``, no validation). Full
+validation is kept for the API boundary and for debugging: set
+``PARSE_VALIDATE=1`` and ``trusted`` validates like the normal constructor.
+Code that only reads parsed hands back from JSONL (derive) uses the slotted
+``HandView`` instead of rebuilding Pydantic models.
 """
 
-from typing import Literal, List, Optional, Dict
-from pydantic import BaseModel
+import os
+from dataclasses import dataclass, field
+from typing import Any, Literal, List, Optional, Dict, Union, get_args, get_origin
+from pydantic import BaseModel, ValidationError
+
+# Debug: valida todos os modelos construídos pelos parsers
+VALIDATE_MODELS = os.getenv('PARSE_VALIDATE', '').lower() in ('1', 'true', 'yes')
 
 # Type definitions
 ActionType = Literal[
@@ -18,7 +30,93 @@ Street = Literal["preflop", "flop", "turn", "river"]
 Site = Literal["pokerstars", "gg", "wpn", "winamax", "888", "other"]
 
 
-class Action(BaseModel):
+# class -> (defaults by field in declaration order, mutable defaults to rebuild,
+#           required fields, float fields, Dict[str, float] fields)
+_TRUSTED_LAYOUTS: Dict[type, tuple] = {}
+
+
+def _is_float(annotation) -> bool:
+    if annotation is float:
+        return True
+    # Optional[float]
+    return get_origin(annotation) is Union and float in get_args(annotation)
+
+
+def _trusted_layout(cls) -> tuple:
+    template: Dict[str, Any] = {}
+    mutable = []
+    required = []
+    floats = []
+    float_dicts = []
+    for name, info in cls.model_fields.items():
+        default = None if info.is_required() else info.get_default(call_default_factory=True)
+        template[name] = default
+        if info.is_required():
+            required.append(name)
+        if isinstance(default, (list, dict)):
+            mutable.append((name, type(default)))
+        if _is_float(info.annotation):
+            floats.append(name)
+        elif get_origin(info.annotation) is dict and get_args(info.annotation)[1:] == (float,):
+            float_dicts.append(name)
+    layout = _TRUSTED_LAYOUTS[cls] = (
+        template, tuple(mutable), tuple(required), tuple(floats), tuple(float_dicts)
+    )
+    return layout
+
+
+def _missing_fields(cls, missing: List[str], data: Dict[str, Any]) -> ValidationError:
+    return ValidationError.from_exception_data(
+        cls.__name__,
+        [{'type': 'missing', 'loc': (name,), 'input': data} for name in missing],
+    )
+
+
+class TrustedModel(BaseModel):
+    """Base model with a validation-free constructor for internal data."""
+
+    @classmethod
+    def trusted(cls, **data: Any):
+        """
+        Build from trusted values (nested models already built).
+
+        Same result as ``model_construct`` (unknown keys dropped, defaults
+        filled in field order so the JSON dump is unchanged) without its
+        per-field Python loop. Missing required fields still raise
+        ``ValidationError`` and ints given for float fields are converted,
+        as validation would. Validates as ``cls(**data)`` when
+        PARSE_VALIDATE is on.
+        """
+        if VALIDATE_MODELS:
+            return cls(**data)
+        layout = _TRUSTED_LAYOUTS.get(cls) or _trusted_layout(cls)
+        template, mutable, required, floats, float_dicts = layout
+        if not data.keys() <= template.keys():
+            data = {k: v for k, v in data.items() if k in template}
+        missing = [name for name in required if name not in data]
+        if missing:
+            raise _missing_fields(cls, missing, data)
+        values = template.copy()
+        for name, factory in mutable:
+            if name not in data:
+                values[name] = factory()
+        values.update(data)
+        for name in floats:
+            if type(values[name]) is int:
+                values[name] = float(values[name])
+        for name in float_dicts:
+            mapping = values[name]
+            if isinstance(mapping, dict) and any(type(v) is int for v in mapping.values()):
+                values[name] = {k: float(v) if type(v) is int else v for k, v in mapping.items()}
+        obj = object.__new__(cls)
+        object.__setattr__(obj, '__dict__', values)
+        object.__setattr__(obj, '__pydantic_fields_set__', set(data))
+        object.__setattr__(obj, '__pydantic_extra__', None)
+        object.__setattr__(obj, '__pydantic_private__', None)
+        return obj
+
+
+class Action(TrustedModel):
     """Represents a single player action in a hand."""
     actor: str
     type: ActionType
@@ -28,13 +126,13 @@ class Action(BaseModel):
     raw_offset: Optional[int] = None     # Position in original text (for click-through)
 
 
-class StreetInfo(BaseModel):
+class StreetInfo(TrustedModel):
     """Information about a specific betting street."""
     actions: List[Action] = []
     board: Optional[List[str]] = None    # Cards shown (flop/turn/river)
 
 
-class Player(BaseModel):
+class Player(TrustedModel):
     """Represents a player at the table."""
     seat: int
     name: str
@@ -42,7 +140,7 @@ class Player(BaseModel):
     is_hero: bool = False
 
 
-class Hand(BaseModel):
+class Hand(TrustedModel):
     """Complete hand history data structure."""
     # Metadata
     site: Site
@@ -70,4 +168,106 @@ class Hand(BaseModel):
     heads_up_flop: bool = False
     
     # Text offsets for UI click-through
-    raw_offsets: Dict[str, int] = {}     # {"hand_start": i, "hand_end": j, "flop": k, ...}
\ No newline at end of file
+    raw_offsets: Dict[str, int] = {}     # {"hand_start": i, "hand_end": j, "flop": k, ...}
+
+# Lightweight read-only views used inside the pipeline (derive). Same
+# attribute names as the models above, no validation and no per-field
+# bookkeeping; hands come from our own parser output.
+
+@dataclass(slots=True)
+class ActionView:
+    actor: str
+    type: str
+    amount: Optional[float] = None
+    to_amount: Optional[float] = None
+    allin: bool = False
+    raw_offset: Optional[int] = None
+
+
+@dataclass(slots=True)
+class StreetView:
+    actions: List[ActionView] = field(default_factory=list)
+    board: Optional[List[str]] = None
+
+
+@dataclass(slots=True)
+class PlayerView:
+    seat: int
+    name: str
+    stack_chips: Optional[float] = None
+    is_hero: bool = False
+
+
+@dataclass(slots=True)
+class HandView:
+    site: str
+    file_id: str
+    streets: Dict[str, StreetView]
+    tournament_id: Optional[str] = None
+    tournament_name: Optional[str] = None
+    timestamp_utc: Optional[str] = None
+    button_seat: Optional[int] = None
+    table_max: Optional[int] = None
+    blinds: Dict[str, float] = field(default_factory=dict)
+    players: List[PlayerView] = field(default_factory=list)
+    players_dealt_in: List[str] = field(default_factory=list)
+    hero: Optional[str] = None
+    any_allin_preflop: bool = False
+    players_to_flop: int = 0
+    heads_up_flop: bool = False
+    raw_offsets: Dict[str, int] = field(default_factory=dict)
+
+
+def _float(value: Any) -> Optional[float]:
+    # mesma coerção numérica que a validação faria (JSON pode trazer ints)
+    return None if value is None else float(value)
+
+
+def _action_view(a: Dict[str, Any]) -> ActionView:
+    return ActionView(
+        a['actor'], a['type'], _float(a.get('amount')), _float(a.get('to_amount')),
+        a.get('allin', False), a.get('raw_offset'),
+    )
+
+
+def hand_view(obj: Dict[str, Any]):
+    """
+    Read a parsed hand dict (a JSONL line) for internal use.
+
+    Returns a ``HandView``; with PARSE_VALIDATE on, returns the validated
+    ``Hand`` instead so malformed input fails loudly. Lines missing a
+    required key raise ``ValidationError`` either way.
+    """
+    if VALIDATE_MODELS:
+        return Hand(**obj)
+    try:
+        return _hand_view(obj)
+    except KeyError as exc:
+        raise _missing_fields(Hand, [str(exc.args[0])], obj) from None
+
+
+def _hand_view(obj: Dict[str, Any]) -> HandView:
+    streets = {
+        name: StreetView([_action_view(a) for a in street.get('actions', ())], street.get('board'))
+        for name, street in obj['streets'].items()
+    }
+    players = [
+        PlayerView(p['seat'], p['name'], _float(p.get('stack_chips')), p.get('is_hero', False))
+        for p in obj.get('players', ())
+    ]
+    return HandView(
+        obj['site'], obj['file_id'], streets,
+        tournament_id=obj.get('tournament_id'),
+        tournament_name=obj.get('tournament_name'),
+        timestamp_utc=obj.get('timestamp_utc'),
+        button_seat=obj.get('button_seat'),
+        table_max=obj.get('table_max'),
+        blinds={k: float(v) for k, v in obj.get('blinds', {}).items()},
+        players=players,
+        players_dealt_in=list(obj.get('players_dealt_in', ())),
+        hero=obj.get('hero'),
+        any_allin_preflop=obj.get('any_allin_preflop', False),
+        players_to_flop=obj.get('players_to_flop', 0),
+        heads_up_flop=obj.get('heads_up_flop', False),
+        raw_offsets=dict(obj.get('raw_offsets', {})),
+    )
@@ -125,7 +125,7 @@ class Poker888Parser:
         if 'hand_end' not in offsets:
             offsets['hand_end'] = text_offset + len(hand_text)
         
-        hand = Hand(
+        hand = Hand.trusted(
             site='888',
             file_id=file_id,
             streets=create_empty_streets(),
@@ -189,7 +189,7 @@ class Poker888Parser:
                 if is_hero:
                     hand.hero = name
                 
-                players.append(Player(
+                players.append(Player.trusted(
                     seat=seat,
                     name=name,
                     stack_chips=stack,
@@ -318,7 +318,7 @@ class Poker888Parser:
             if match:
                 actor = normalize_player_name(match.group(1))
                 
-                action = Action(
+                action = Action.trusted(
                     actor=actor,
                     type=action_type,
                     allin=(action_type == 'ALLIN'),
@@ -126,10 +126,10 @@ def create_empty_streets() -> Dict[Street, StreetInfo]:
     Ensures all hands have consistent structure even if some streets are missing.
     """
     return {
-        'preflop': StreetInfo(actions=[], board=None),
-        'flop': StreetInfo(actions=[], board=None),
-        'turn': StreetInfo(actions=[], board=None),
-        'river': StreetInfo(actions=[], board=None)
+        'preflop': StreetInfo.trusted(actions=[], board=None),
+        'flop': StreetInfo.trusted(actions=[], board=None),
+        'turn': StreetInfo.trusted(actions=[], board=None),
+        'river': StreetInfo.trusted(actions=[], board=None)
     }
 
 
@@ -221,7 +221,7 @@ class GenericParser:
         lines = hand_text.split('\n')
         
         # Initialize hand with empty streets (ensures consistent structure)
-        hand = Hand(
+        hand = Hand.trusted(
             site='other',
             file_id=file_id,
             streets=create_empty_streets(),  # All streets present even if empty
@@ -263,7 +263,7 @@ class GenericParser:
                 if is_hero:
                     hand.hero = name
                 
-                players.append(Player(
+                players.append(Player.trusted(
                     seat=seat,
                     name=name,
                     stack_chips=stack,
@@ -368,7 +368,7 @@ class GenericParser:
             if match:
                 actor = normalize_player_name(match.group(1))
                 
-                action = Action(
+                action = Action.trusted(
                     actor=actor,
                     type=action_type,
                     raw_offset=offset
@@ -99,7 +99,7 @@ class GGParser:
             offsets['hand_end'] = text_offset + len(hand_text)
         
         # Initialize hand
-        hand = Hand(
+        hand = Hand.trusted(
             site='gg',
             file_id=file_id,
             streets=create_empty_streets(),
@@ -159,7 +159,7 @@ class GGParser:
                 if is_hero:
                     hand.hero = name
                 
-                players.append(Player(
+                players.append(Player.trusted(
                     seat=seat,
                     name=name,
                     stack_chips=stack,
@@ -280,7 +280,7 @@ class GGParser:
         if 'Small Blind' in line:
             match = safe_match(r'^([^:]+):\s*(?:posts?\s+)?Small\s+Blind\s+([0-9,. ]+)', line, re.IGNORECASE)
             if match:
-                return Action(
+                return Action.trusted(
                     actor=normalize_player_name(match.group(1)),
                     type='POST_SB',
                     amount=clean_amount(match.group(2)),
@@ -290,7 +290,7 @@ class GGParser:
         if 'Big Blind' in line:
             match = safe_match(r'^([^:]+):\s*(?:posts?\s+)?Big\s+Blind\s+([0-9,. ]+)', line, re.IGNORECASE)
             if match:
-                return Action(
+                return Action.trusted(
                     actor=normalize_player_name(match.group(1)),
                     type='POST_BB',
                     amount=clean_amount(match.group(2)),
@@ -300,7 +300,7 @@ class GGParser:
         if 'Ante' in line:
             match = safe_match(r'^([^:]+):\s*Ante\s+([0-9,. ]+)', line, re.IGNORECASE)
             if match:
-                return Action(
+                return Action.trusted(
                     actor=normalize_player_name(match.group(1)),
                     type='POST_ANTE',
                     amount=clean_amount(match.group(2)),
@@ -325,7 +325,7 @@ class GGParser:
                 # Check for all-in
                 allin = action_type == 'ALLIN' or 'all-in' in line.lower() or 'all in' in line.lower()
                 
-                action = Action(
+                action = Action.trusted(
                     actor=actor,
                     type=action_type,
                     allin=allin,
@@ -3,13 +3,34 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Tuple, Optional
 import re
 
+from .tokenizer import STREETS, HandTokens, TokenTable, tokenize
+
+
+# (literal that must be present, regex) - the literal skips most regex scans
+_PKO_PATTERNS = tuple(
+    (literal, re.compile(pattern, re.IGNORECASE))
+    for literal, pattern in (
+        ('bounty', r'bounty'),
+        ('knockout', r'knockout'),
+        ('ko', r'\bko\b'),
+        ('pko', r'pko'),
+        ('progressive', r'progressive'),
+        ('€', r'€\s*\d+\s*€\s*\d+'),  # Winamax format with double buy-in
+        ('+$', r'\$\d+\+\$\d+\+\$\d+'),  # PokerStars PKO format
+    )
+)
+
 
 class BaseParser(ABC):
     """Abstract base class for site-specific poker hand parsers."""
+
+    # Street markers + line rules of the site (see tokenizer.py)
+    TOKEN_TABLE: Optional[TokenTable] = None
     
     def __init__(self):
         self.site_name = "Unknown"
         self.currency_symbols = ['$', '€', '£', '¥']
+        self._last_tokens: Optional[HandTokens] = None
         
     @abstractmethod
     def can_parse(self, text: str) -> bool:
@@ -52,7 +73,19 @@ class BaseParser(ABC):
         """Extract the hero's name from the hand text."""
         pass
     
-    @abstractmethod
+    def tokenize(self, hand_text: str) -> HandTokens:
+        """Walk the hand once with the site's token table.
+
+        The last result is kept so every extractor called from
+        extract_hand_info shares the same walk.
+        """
+        cached = self._last_tokens
+        if cached is not None and cached.text is hand_text:
+            return cached
+        tokens = tokenize(hand_text, self.TOKEN_TABLE)
+        self._last_tokens = tokens
+        return tokens
+    
     def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
         """Extract all actions by street.
         
@@ -62,6 +95,19 @@ class BaseParser(ABC):
         - action: action type (fold, call, raise, check, bet, all-in)
         - amount: amount if applicable
         """
+        actions = {street: [] for street in STREETS}
+        for street, line in self.tokenize(hand_text).street_lines:
+            action = self._parse_action_line(line)
+            if action:
+                actions[street].append(action)
+        return actions
+    
+    @abstractmethod
+    def _parse_action_line(self, line: str) -> Optional[Dict]:
+        """Parse a single stripped action line (site specific).
+
+        Returns the action dict, or None for lines that are not actions.
+        """
         pass
     
     def normalize_action(self, action: str, amount: Optional[float] = None) -> Tuple[str, Optional[float]]:
@@ -89,18 +135,11 @@ class BaseParser(ABC):
         # Mystery tournaments are NOT PKO
         if 'mystery' in text_lower:
             return False
-            
-        pko_patterns = [
-            r'bounty',
-            r'knockout',
-            r'\bko\b',
-            r'pko',
-            r'progressive',
-            r'€\s*\d+\s*€\s*\d+',  # Winamax format with double buy-in
-            r'\$\d+\+\$\d+\+\$\d+',  # PokerStars PKO format
-        ]
         
-        return any(re.search(pattern, text_lower, re.IGNORECASE) for pattern in pko_patterns)
+        return any(
+            literal in text_lower and pattern.search(text_lower)
+            for literal, pattern in _PKO_PATTERNS
+        )
     
     def extract_tournament_id(self, hand_text: str) -> Optional[str]:
         """Extract tournament ID from hand text."""
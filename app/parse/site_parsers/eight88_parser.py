@@ -2,11 +2,40 @@
 import re
 from typing import List, Dict, Optional
 from .base_parser import BaseParser
+from .tokenizer import TokenTable, token_rule
 
 
 class Eight88PokerParser(BaseParser):
     """Parser for 888 Poker hand histories (888poker and 888.pt)."""
     
+    TOKEN_TABLE = TokenTable(
+        street_markers=(
+            ('** Dealing down cards **', 'preflop'),
+            ('** Dealing Flop **', 'flop'),
+            ('** Dealing Turn **', 'turn'),
+            ('** Dealing River **', 'river'),
+        ),
+        stop_markers=('** Summary **',),
+        rules=(
+            # Seat 1: PlayerName ( 1000 ) or Seat 1: PlayerName ( 10.000 )
+            token_rule('seat', r'^Seat\s+(\d+):\s*([^(]+?)\s*\(\s*([0-9,. ]+)\s*\)', 'Seat'),
+            token_rule('header_blinds', r'(\d+)/(\d+)\s+Blinds', 'Blinds', once=True),
+            token_rule('small_blind', r'posts\s+small\s+blind\s+\[([0-9,. ]+)\]', 'small', flags=re.IGNORECASE, once=True),
+            token_rule('big_blind', r'posts\s+big\s+blind\s+\[([0-9,. ]+)\]', 'big', flags=re.IGNORECASE, once=True),
+            token_rule('ante', r'posts\s+ante\s+\[([0-9,. ]+)\]', 'ante', flags=re.IGNORECASE, once=True),
+            # ** Dealing Flop ** : [ Qs, 4d, 5h ]
+            token_rule('flop', r'\*\* Dealing Flop \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', '** Dealing Flop', once=True),
+            token_rule('turn', r'\*\* Dealing Turn \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', '** Dealing Turn', once=True),
+            token_rule('river', r'\*\* Dealing River \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', '** Dealing River', once=True),
+            token_rule('show', r'^([^\n]+?)\s+shows\s+\[\s*([^\]]+)\s*\]', 'shows', flags=re.IGNORECASE),
+            token_rule('muck', r'^([^\n]+?)\s+mucks?(?:\s+hand)?', 'muck', flags=re.IGNORECASE),
+            token_rule('no_show', r'^([^\n]+?)\s+did\s+not\s+show', 'did', flags=re.IGNORECASE),
+            token_rule('collect', r'^([^\n]+?)\s+collected\s+\[\s*([0-9,. ]+)\s*\]', 'collected'),
+            token_rule('win', r'^([^\n]+?)\s+wins?\s+([0-9,. ]+)\s+chips?', 'win'),
+            token_rule('total_pot', r'Total\s+pot\s+([0-9,. ]+)', 'Total', once=True),
+        ),
+    )
+
     def __init__(self):
         super().__init__()
         self.site_name = "888poker"
@@ -146,52 +175,11 @@ class Eight88PokerParser(BaseParser):
             return dealt_match.group(1).strip()
         return None
     
-    def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
-        """Extract all actions by street."""
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers
-            if '** Dealing down cards **' in line:
-                current_street = 'preflop'
-                continue
-            elif '** Dealing Flop **' in line:
-                current_street = 'flop'
-                continue
-            elif '** Dealing Turn **' in line:
-                current_street = 'turn'
-                continue
-            elif '** Dealing River **' in line:
-                current_street = 'river'
-                continue
-            elif '** Summary **' in line:
-                break
-            
-            # Parse action if we're in a street
-            if current_street:
-                action = self._parse_action_line(line)
-                if action:
-                    actions[current_street].append(action)
-        
-        return actions
-    
     def _extract_players(self, hand_text: str) -> List[Dict]:
         """Extract player information."""
         players = []
         # 888 format: Seat 1: PlayerName ( 1000 ) or Seat 1: PlayerName ( 10.000 )
-        pattern = r'^Seat\s+(\d+):\s*([^(]+?)\s*\(\s*([0-9,. ]+)\s*\)'
-        
-        for match in re.finditer(pattern, hand_text, re.MULTILINE):
+        for match in self.tokenize(hand_text).matches('seat'):
             seat = int(match.group(1))
             name = match.group(2).strip()
             stack = self.parse_amount(match.group(3))
@@ -207,19 +195,20 @@ class Eight88PokerParser(BaseParser):
     def _extract_blinds(self, hand_text: str) -> Dict[str, float]:
         """Extract blind amounts from header or posts."""
         blinds = {'sb': 0, 'bb': 0}
+        tokens = self.tokenize(hand_text)
         
         # Try to extract from header (e.g., "350/700 Blinds" or "30/60 Blinds")
-        header_match = re.search(r'(\d+)/(\d+)\s+Blinds', hand_text)
+        header_match = tokens.first('header_blinds')
         if header_match:
             blinds['sb'] = float(header_match.group(1))
             blinds['bb'] = float(header_match.group(2))
         else:
             # Extract from posts
-            sb_match = re.search(r'posts\s+small\s+blind\s+\[([0-9,. ]+)\]', hand_text, re.IGNORECASE)
+            sb_match = tokens.first('small_blind')
             if sb_match:
                 blinds['sb'] = self.parse_amount(sb_match.group(1))
             
-            bb_match = re.search(r'posts\s+big\s+blind\s+\[([0-9,. ]+)\]', hand_text, re.IGNORECASE)
+            bb_match = tokens.first('big_blind')
             if bb_match:
                 blinds['bb'] = self.parse_amount(bb_match.group(1))
         
@@ -227,7 +216,7 @@ class Eight88PokerParser(BaseParser):
     
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante amount."""
-        ante_match = re.search(r'posts\s+ante\s+\[([0-9,. ]+)\]', hand_text, re.IGNORECASE)
+        ante_match = self.tokenize(hand_text).first('ante')
         if ante_match:
             return self.parse_amount(ante_match.group(1))
         return 0
@@ -235,17 +224,18 @@ class Eight88PokerParser(BaseParser):
     def _extract_board(self, hand_text: str) -> Dict[str, str]:
         """Extract board cards by street."""
         board = {}
+        tokens = self.tokenize(hand_text)
         
         # 888 format: ** Dealing Flop ** : [ Qs, 4d, 5h ]
-        flop_match = re.search(r'\*\* Dealing Flop \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', hand_text)
+        flop_match = tokens.first('flop')
         if flop_match:
             board['flop'] = flop_match.group(1).strip()
         
-        turn_match = re.search(r'\*\* Dealing Turn \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', hand_text)
+        turn_match = tokens.first('turn')
         if turn_match:
             board['turn'] = turn_match.group(1).strip()
         
-        river_match = re.search(r'\*\* Dealing River \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', hand_text)
+        river_match = tokens.first('river')
         if river_match:
             board['river'] = river_match.group(1).strip()
         
@@ -349,7 +339,8 @@ class Eight88PokerParser(BaseParser):
         
         # Extract players who showed cards
         # Pattern: PlayerName shows [ cards ]
-        for match in re.finditer(r'^([^\n]+?)\s+shows\s+\[\s*([^\]]+)\s*\]', hand_text, re.MULTILINE | re.IGNORECASE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('show'):
             player = self._normalize_player_name(match.group(1))
             cards = match.group(2).strip()
             # Normalize card format: remove commas and extra spaces
@@ -359,14 +350,14 @@ class Eight88PokerParser(BaseParser):
         
         # Extract players who mucked
         # Pattern: PlayerName mucks
-        for match in re.finditer(r'^([^\n]+?)\s+mucks?(?:\s+hand)?', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('muck'):
             player = self._normalize_player_name(match.group(1))
             # Only add if not already in showed list
             if player not in showdown['players_showed']:
                 showdown['players_mucked'].append(player)
         
         # Also check for "did not show" pattern
-        for match in re.finditer(r'^([^\n]+?)\s+did\s+not\s+show', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('no_show'):
             player = self._normalize_player_name(match.group(1))
             # Only add if not already in showed or mucked list
             if player not in showdown['players_showed'] and player not in showdown['players_mucked']:
@@ -385,7 +376,8 @@ class Eight88PokerParser(BaseParser):
         # "PlayerName wins amount chips"
         
         # Pattern 1: "collected [ X ]"
-        for match in re.finditer(r'^([^\n]+?)\s+collected\s+\[\s*([0-9,. ]+)\s*\]', hand_text, re.MULTILINE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('collect'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -401,7 +393,7 @@ class Eight88PokerParser(BaseParser):
             total_pot += amount
         
         # Pattern 2: "wins X chips" (alternative format)
-        for match in re.finditer(r'^([^\n]+?)\s+wins?\s+([0-9,. ]+)\s+chips?', hand_text, re.MULTILINE):
+        for match in tokens.matches('win'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -416,7 +408,7 @@ class Eight88PokerParser(BaseParser):
             total_pot += amount
         
         # Also check for "Total pot" line in summary (if available)
-        pot_match = re.search(r'Total\s+pot\s+([0-9,. ]+)', hand_text)
+        pot_match = tokens.first('total_pot')
         if pot_match:
             # Use the explicitly stated total pot if available
             stated_total = self.parse_amount(pot_match.group(1))
@@ -2,10 +2,32 @@
 import re
 from typing import List, Dict, Optional
 from .eight88_parser import Eight88PokerParser
+from .tokenizer import STREETS, token_rule
 
 
 class Eight88PtParser(Eight88PokerParser):
     """Parser for 888.pt hand histories (Portuguese variant with different format)."""
+
+    # Lower-case street markers; Summary/Showdown leave the street instead of stopping
+    TOKEN_TABLE = Eight88PokerParser.TOKEN_TABLE.derive(
+        street_markers=(
+            ('** Dealing down cards **', 'preflop'),
+            ('Dealt to', 'preflop'),
+            ('** Dealing flop **', 'flop'),
+            ('** Dealing turn **', 'turn'),
+            ('** Dealing river **', 'river'),
+            ('** Summary **', None),
+            ('** Showdown **', None),
+        ),
+        stop_markers=(),
+        rules=Eight88PokerParser.TOKEN_TABLE.rules + (
+            # "Seat 1: Player ( 1500 )" - sem "in chips"
+            token_rule('pt_seat', r'Seat\s+(\d+):\s+(.+?)\s+\(\s*([\d,.€]+)\s*\)', 'Seat'),
+            # "700/1.400 Blinds" (formato europeu)
+            token_rule('pt_blinds', r'([\d,.]+)/([\d,.]+)\s+Blinds', 'Blinds', once=True),
+            token_rule('pt_ante', r'posts\s+ante\s+\[([\d,.€]+)\]', 'ante', once=True),
+        ),
+    )
     
     def __init__(self):
         super().__init__()
@@ -34,9 +56,7 @@ class Eight88PtParser(Eight88PokerParser):
         
         # 888.pt format: "Seat 1: PlayerName ( chips )"
         # Note: no "in chips" text, just parentheses with amount
-        pattern = r'Seat\s+(\d+):\s+(.+?)\s+\(\s*([\d,.€]+)\s*\)'
-        
-        for match in re.finditer(pattern, hand_text):
+        for match in self.tokenize(hand_text).matches('pt_seat'):
             seat_num = int(match.group(1))
             player_name = match.group(2).strip()
             stack_str = match.group(3)
@@ -86,39 +106,10 @@ class Eight88PtParser(Eight88PokerParser):
         Extract actions from 888.pt format.
         888.pt uses: "PlayerName folds" instead of "PlayerName: folds"
         """
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
+        actions = {street: [] for street in STREETS}
         
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers (888.pt format)
-            if '** Dealing down cards **' in line or 'Dealt to' in line:
-                current_street = 'preflop'
-                continue
-            elif '** Dealing flop **' in line:
-                current_street = 'flop'
-                continue
-            elif '** Dealing turn **' in line:
-                current_street = 'turn'
-                continue
-            elif '** Dealing river **' in line:
-                current_street = 'river'
-                continue
-            elif '** Summary **' in line or '** Showdown **' in line:
-                current_street = None
-                continue
-            
-            if current_street is None:
-                continue
-            
+        # Street markers (888.pt format) are handled by TOKEN_TABLE
+        for current_street, line in self.tokenize(hand_text).street_lines:
             # Parse action - 888.pt format WITHOUT colon
             # Format: "PlayerName folds" or "PlayerName raises [amount]"
             action_match = re.match(r'^(\S+(?:\s+\S+)*?)\s+(folds|calls|raises|bets|checks|posts)\s*(.*)$', line)
@@ -165,7 +156,7 @@ class Eight88PtParser(Eight88PokerParser):
         
         # 888.pt format: "700/1.400 Blinds"
         # Note: European format with . as thousands separator
-        blinds_match = re.search(r'([\d,.]+)/([\d,.]+)\s+Blinds', hand_text)
+        blinds_match = self.tokenize(hand_text).first('pt_blinds')
         if blinds_match:
             blinds['sb'] = self._normalize_stack_value(blinds_match.group(1))
             blinds['bb'] = self._normalize_stack_value(blinds_match.group(2))
@@ -175,7 +166,7 @@ class Eight88PtParser(Eight88PokerParser):
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante from 888.pt format."""
         # 888.pt format: "Player posts ante [175]"
-        ante_match = re.search(r'posts\s+ante\s+\[([\d,.€]+)\]', hand_text)
+        ante_match = self.tokenize(hand_text).first('pt_ante')
         if ante_match:
             return self._normalize_stack_value(ante_match.group(1))
         return 0.0
@@ -2,10 +2,39 @@
 import re
 from typing import List, Dict, Optional
 from .base_parser import BaseParser
+from .tokenizer import TokenTable, token_rule
 
 
 class GGPokerParser(BaseParser):
     """Parser for GG Poker hand histories."""
+
+    # Street markers are compared case-insensitively for compatibility
+    TOKEN_TABLE = TokenTable(
+        street_markers=(
+            ('*** HOLE CARDS ***', 'preflop'),
+            ('*** FLOP ***', 'flop'),
+            ('*** TURN ***', 'turn'),
+            ('*** RIVER ***', 'river'),
+        ),
+        stop_markers=('*** SUMMARY ***', '*** SHOW DOWN ***', '*** SHOWDOWN ***'),
+        upper_markers=True,
+        rules=(
+            token_rule('seat', r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9,. ]+)(?:\s+in\s+chips)?\)', 'Seat'),
+            # GG has no "is the button" line; the SB poster is used to infer it
+            token_rule('sb_poster', r'^([^\n:]+)\s+posts?\s+(?:the\s+)?(?:small\s+blind|SB)\s+', 'post', flags=re.IGNORECASE, once=True),
+            token_rule('small_blind', r'posts?\s+(?:the\s+)?small\s+blind\s+([0-9,. ]+)', 'small', flags=re.IGNORECASE, once=True),
+            token_rule('big_blind', r'posts?\s+(?:the\s+)?big\s+blind\s+([0-9,. ]+)', 'big', flags=re.IGNORECASE, once=True),
+            token_rule('ante', r'posts?\s+(?:the\s+)?ante\s+([0-9,. ]+)', 'ante', flags=re.IGNORECASE, once=True),
+            token_rule('flop', r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', '*** FLOP', once=True),
+            token_rule('turn', r'\*\*\* TURN \*\*\*\s*\[[^\]]*\]\s*\[([^\]]+)\]', '*** TURN', once=True),
+            token_rule('river', r'\*\*\* RIVER \*\*\*\s*\[[^\]]*\]\s*\[([^\]]+)\]', '*** RIVER', once=True),
+            token_rule('show', r'^([^:]+):\s*shows?\s+\[([^\]]+)\]', 'show', flags=re.IGNORECASE),
+            token_rule('muck', r'^([^:]+):\s*mucks?(?:\s+hand)?', 'muck', flags=re.IGNORECASE),
+            token_rule('collect', r'^([^:]+)\s+collected\s+([0-9,. ]+)\s+from', 'collected'),
+            token_rule('win', r'^([^:]+)\s+wins?\s+([0-9,. ]+)', 'win'),
+            token_rule('total_pot', r'Total pot\s+([0-9,. ]+)', 'Total pot', once=True),
+        ),
+    )
     
     def __init__(self):
         super().__init__()
@@ -77,7 +106,7 @@ class GGPokerParser(BaseParser):
         else:
             # GG Poker doesn't have "is the button" line, infer from SB
             # The button is the player immediately before the SB
-            sb_match = re.search(r'^([^\n:]+)\s+posts?\s+(?:the\s+)?(?:small\s+blind|SB)\s+', hand_text, re.MULTILINE | re.IGNORECASE)
+            sb_match = self.tokenize(hand_text).first('sb_poster')
             if sb_match:
                 sb_player = sb_match.group(1).strip()
                 # Normalize the SB player name
@@ -150,52 +179,10 @@ class GGPokerParser(BaseParser):
             return name
         return None
     
-    def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
-        """Extract all actions by street."""
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers (case-insensitive for compatibility)
-            line_upper = line.upper()
-            if '*** HOLE CARDS ***' in line_upper:
-                current_street = 'preflop'
-                continue
-            elif '*** FLOP ***' in line_upper:
-                current_street = 'flop'
-                continue
-            elif '*** TURN ***' in line_upper:
-                current_street = 'turn'
-                continue
-            elif '*** RIVER ***' in line_upper:
-                current_street = 'river'
-                continue
-            elif '*** SUMMARY ***' in line_upper or '*** SHOW DOWN ***' in line_upper or '*** SHOWDOWN ***' in line_upper:
-                break
-            
-            # Parse action if we're in a street
-            if current_street:
-                action = self._parse_action_line(line)
-                if action:
-                    actions[current_street].append(action)
-        
-        return actions
-    
     def _extract_players(self, hand_text: str) -> List[Dict]:
         """Extract player information."""
         players = []
-        pattern = r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9,. ]+)(?:\s+in\s+chips)?\)'
-        
-        for match in re.finditer(pattern, hand_text, re.MULTILINE):
+        for match in self.tokenize(hand_text).matches('seat'):
             seat = int(match.group(1))
             # Normalize: strip whitespace and multiple spaces (same as hero name)
             name = match.group(2).strip()
@@ -214,14 +201,15 @@ class GGPokerParser(BaseParser):
     def _extract_blinds(self, hand_text: str) -> Dict[str, float]:
         """Extract blind amounts."""
         blinds = {'sb': 0, 'bb': 0}
+        tokens = self.tokenize(hand_text)
         
         # Small blind
-        sb_match = re.search(r'posts?\s+(?:the\s+)?small\s+blind\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+        sb_match = tokens.first('small_blind')
         if sb_match:
             blinds['sb'] = self.parse_amount(sb_match.group(1))
         
         # Big blind
-        bb_match = re.search(r'posts?\s+(?:the\s+)?big\s+blind\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+        bb_match = tokens.first('big_blind')
         if bb_match:
             blinds['bb'] = self.parse_amount(bb_match.group(1))
         
@@ -229,7 +217,7 @@ class GGPokerParser(BaseParser):
     
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante amount."""
-        ante_match = re.search(r'posts?\s+(?:the\s+)?ante\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+        ante_match = self.tokenize(hand_text).first('ante')
         if ante_match:
             return self.parse_amount(ante_match.group(1))
         return 0
@@ -237,19 +225,20 @@ class GGPokerParser(BaseParser):
     def _extract_board(self, hand_text: str) -> Dict[str, str]:
         """Extract board cards by street."""
         board = {}
+        tokens = self.tokenize(hand_text)
         
         # Flop
-        flop_match = re.search(r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', hand_text)
+        flop_match = tokens.first('flop')
         if flop_match:
             board['flop'] = flop_match.group(1).strip()
         
         # Turn
-        turn_match = re.search(r'\*\*\* TURN \*\*\*\s*\[[^\]]*\]\s*\[([^\]]+)\]', hand_text)
+        turn_match = tokens.first('turn')
         if turn_match:
             board['turn'] = turn_match.group(1).strip()
         
         # River
-        river_match = re.search(r'\*\*\* RIVER \*\*\*\s*\[[^\]]*\]\s*\[([^\]]+)\]', hand_text)
+        river_match = tokens.first('river')
         if river_match:
             board['river'] = river_match.group(1).strip()
         
@@ -353,14 +342,15 @@ class GGPokerParser(BaseParser):
         # "PlayerName shows [Ah Kd]"
         
         # Extract players who showed cards
-        for match in re.finditer(r'^([^:]+):\s*shows?\s+\[([^\]]+)\]', hand_text, re.MULTILINE | re.IGNORECASE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('show'):
             player = self._normalize_player_name(match.group(1))
             cards = match.group(2).strip()
             showdown['players_showed'].append(player)
             showdown['hands_shown'][player] = cards
         
         # Extract players who mucked
-        for match in re.finditer(r'^([^:]+):\s*mucks?(?:\s+hand)?', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('muck'):
             player = self._normalize_player_name(match.group(1))
             # Only add if not already in showed list
             if player not in showdown['players_showed']:
@@ -380,7 +370,8 @@ class GGPokerParser(BaseParser):
         
         # Pattern 1: "collected X from pot"
         # Exclude "Uncalled bet" lines
-        for match in re.finditer(r'^([^:]+)\s+collected\s+([0-9,. ]+)\s+from', hand_text, re.MULTILINE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('collect'):
             player = self._normalize_player_name(match.group(1))
             # Skip if this is an "Uncalled bet" line
             if 'uncalled bet' in player.lower() or 'uncalled' in player.lower():
@@ -399,7 +390,7 @@ class GGPokerParser(BaseParser):
             total_pot += amount
         
         # Pattern 2: "wins X" (alternative format)
-        for match in re.finditer(r'^([^:]+)\s+wins?\s+([0-9,. ]+)', hand_text, re.MULTILINE):
+        for match in tokens.matches('win'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -414,7 +405,7 @@ class GGPokerParser(BaseParser):
             total_pot += amount
         
         # Also check for "Total pot" line in summary
-        pot_match = re.search(r'Total pot\s+([0-9,. ]+)', hand_text)
+        pot_match = tokens.first('total_pot')
         if pot_match:
             # Use the explicitly stated total pot if available
             stated_total = self.parse_amount(pot_match.group(1))
@@ -2,11 +2,33 @@
 import re
 from typing import List, Dict, Optional
 from .base_parser import BaseParser
+from .tokenizer import TokenTable, token_rule
 
 
 class PartyPokerParser(BaseParser):
     """Parser for Party Poker hand histories."""
     
+    TOKEN_TABLE = TokenTable(
+        street_markers=(
+            ('** Dealing down cards **', 'preflop'),
+            ('** Dealing Flop **', 'flop'),
+            ('** Dealing Turn **', 'turn'),
+            ('** Dealing River **', 'river'),
+        ),
+        stop_markers=('** Summary **',),
+        rules=(
+            # Seat 1: Player1 (68297)
+            token_rule('seat', r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9]+)\)', 'Seat'),
+            token_rule('small_blind', r'posts\s+small\s+blind\s+\((\d+)\)', 'small', once=True),
+            token_rule('big_blind', r'posts\s+big\s+blind\s+\((\d+)\)', 'big', once=True),
+            token_rule('ante', r'posts\s+ante\s+\((\d+)\)', 'ante', once=True),
+            # ** Dealing Flop ** : [ Qs, 4d, 5h ] / ** Dealing Turn ** : [ Js ]
+            token_rule('flop', r'\*\* Dealing Flop \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', '** Dealing Flop', once=True),
+            token_rule('turn', r'\*\* Dealing Turn \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', '** Dealing Turn', once=True),
+            token_rule('river', r'\*\* Dealing River \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', '** Dealing River', once=True),
+        ),
+    )
+
     def __init__(self):
         super().__init__()
         self.site_name = "PartyPoker"
@@ -112,53 +134,12 @@ class PartyPokerParser(BaseParser):
         """Internal method to extract hero name."""
         return self.extract_hero_name(hand_text)
     
-    def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
-        """Extract all actions by street."""
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers
-            if '** Dealing down cards **' in line:
-                current_street = 'preflop'
-                continue
-            elif '** Dealing Flop **' in line:
-                current_street = 'flop'
-                continue
-            elif '** Dealing Turn **' in line:
-                current_street = 'turn'
-                continue
-            elif '** Dealing River **' in line:
-                current_street = 'river'
-                continue
-            elif '** Summary **' in line:
-                break
-            
-            # Parse action if we're in a street
-            if current_street:
-                action = self._parse_action_line(line)
-                if action:
-                    actions[current_street].append(action)
-        
-        return actions
-    
     def _extract_players(self, hand_text: str) -> List[Dict]:
         """Extract player information."""
         players = []
         # Party format: Seat 1: Player1 (68297)
         # Note: Party sometimes uses generic names like Player1, Player2, etc.
-        pattern = r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9]+)\)'
-        
-        for match in re.finditer(pattern, hand_text, re.MULTILINE):
+        for match in self.tokenize(hand_text).matches('seat'):
             seat = int(match.group(1))
             name = match.group(2).strip()
             stack = float(match.group(3))
@@ -182,11 +163,12 @@ class PartyPokerParser(BaseParser):
             blinds['bb'] = float(header_match.group(2))
         else:
             # Extract from posts
-            sb_match = re.search(r'posts\s+small\s+blind\s+\((\d+)\)', hand_text)
+            tokens = self.tokenize(hand_text)
+            sb_match = tokens.first('small_blind')
             if sb_match:
                 blinds['sb'] = float(sb_match.group(1))
             
-            bb_match = re.search(r'posts\s+big\s+blind\s+\((\d+)\)', hand_text)
+            bb_match = tokens.first('big_blind')
             if bb_match:
                 blinds['bb'] = float(bb_match.group(1))
         
@@ -195,7 +177,7 @@ class PartyPokerParser(BaseParser):
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante amount."""
         # Party format: "Player posts ante (150)"
-        ante_match = re.search(r'posts\s+ante\s+\((\d+)\)', hand_text)
+        ante_match = self.tokenize(hand_text).first('ante')
         if ante_match:
             return float(ante_match.group(1))
         return 0
@@ -203,19 +185,20 @@ class PartyPokerParser(BaseParser):
     def _extract_board(self, hand_text: str) -> Dict[str, str]:
         """Extract board cards by street."""
         board = {}
+        tokens = self.tokenize(hand_text)
         
         # Party format: ** Dealing Flop ** : [ Qs, 4d, 5h ]
-        flop_match = re.search(r'\*\* Dealing Flop \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', hand_text)
+        flop_match = tokens.first('flop')
         if flop_match:
             board['flop'] = flop_match.group(1).strip()
         
         # Turn: ** Dealing Turn ** : [ Js ]
-        turn_match = re.search(r'\*\* Dealing Turn \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', hand_text)
+        turn_match = tokens.first('turn')
         if turn_match:
             board['turn'] = turn_match.group(1).strip()
         
         # River: ** Dealing River ** : [ Jd ]
-        river_match = re.search(r'\*\* Dealing River \*\*\s*:?\s*\[\s*([^\]]+)\s*\]', hand_text)
+        river_match = tokens.first('river')
         if river_match:
             board['river'] = river_match.group(1).strip()
         
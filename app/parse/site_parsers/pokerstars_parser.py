@@ -2,10 +2,38 @@
 import re
 from typing import List, Dict, Optional
 from .base_parser import BaseParser
+from .tokenizer import TokenTable, token_rule
 
 
 class PokerStarsParser(BaseParser):
     """Parser for PokerStars hand histories."""
+
+    TOKEN_TABLE = TokenTable(
+        street_markers=(
+            ('*** HOLE CARDS ***', 'preflop'),
+            ('*** FLOP ***', 'flop'),
+            ('*** TURN ***', 'turn'),
+            ('*** RIVER ***', 'river'),
+        ),
+        stop_markers=('*** SUMMARY ***', '*** SHOW DOWN ***'),
+        rules=(
+            # NON-KO: Seat 1: PlayerName (30252 in chips)
+            # PKO: Seat 1: PlayerName (30252 in chips, $5 bounty)
+            token_rule('seat', r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9,. ]+)\s+in\s+chips(?:,\s*[^\)]+)?\)(.*)$', 'Seat'),
+            token_rule('level', r'Level\s+\w+\s*\((\d+)/(\d+)\)', 'Level', once=True),
+            token_rule('small_blind', r'posts?\s+(?:the\s+)?small\s+blind\s+([0-9,. ]+)', 'small', flags=re.IGNORECASE, once=True),
+            token_rule('big_blind', r'posts?\s+(?:the\s+)?big\s+blind\s+([0-9,. ]+)', 'big', flags=re.IGNORECASE, once=True),
+            token_rule('ante', r'posts?\s+(?:the\s+)?ante\s+([0-9,. ]+)', 'ante', flags=re.IGNORECASE, once=True),
+            # *** FLOP *** [Ks 2c 4h] / *** TURN *** [Ks 2c 4h] [5s] / *** RIVER *** [Ks 2c 4h 5s] [5h]
+            token_rule('flop', r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', '*** FLOP', once=True),
+            token_rule('turn', r'\*\*\* TURN \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', '*** TURN', once=True),
+            token_rule('river', r'\*\*\* RIVER \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', '*** RIVER', once=True),
+            token_rule('show', r'^([^:]+):\s*shows?\s+\[([^\]]+)\]', 'show', flags=re.IGNORECASE),
+            token_rule('muck', r'^([^:]+):\s*mucks?(?:\s+hand)?', 'muck', flags=re.IGNORECASE),
+            token_rule('collect', r'^([^:]+)\s+collected\s+([0-9,. ]+)\s+from', 'collected'),
+            token_rule('total_pot', r'Total pot\s+([0-9,. ]+)', 'Total pot', once=True),
+        ),
+    )
     
     def __init__(self):
         super().__init__()
@@ -154,55 +182,14 @@ class PokerStarsParser(BaseParser):
             return dealt_match.group(1).strip()
         return None
     
-    def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
-        """Extract all actions by street."""
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers
-            if '*** HOLE CARDS ***' in line:
-                current_street = 'preflop'
-                continue
-            elif '*** FLOP ***' in line:
-                current_street = 'flop'
-                continue
-            elif '*** TURN ***' in line:
-                current_street = 'turn'
-                continue
-            elif '*** RIVER ***' in line:
-                current_street = 'river'
-                continue
-            elif '*** SUMMARY ***' in line or '*** SHOW DOWN ***' in line:
-                break
-            
-            # Parse action if we're in a street
-            if current_street:
-                action = self._parse_action_line(line)
-                if action:
-                    actions[current_street].append(action)
-        
-        return actions
-    
     def _extract_players(self, hand_text: str) -> List[Dict]:
         """Extract player information - exclude 'out of hand' players."""
         players = []
         # PokerStars formats:
         # NON-KO: Seat 1: PlayerName (30252 in chips)
         # PKO: Seat 1: PlayerName (30252 in chips, $5 bounty)
-        # Updated pattern to handle both formats with optional bounty
-        pattern = r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9,. ]+)\s+in\s+chips(?:,\s*[^\)]+)?\)(.*)$'
-        
-        for match in re.finditer(pattern, hand_text, re.MULTILINE):
+        # (padrão 'seat' da TOKEN_TABLE, com bounty opcional)
+        for match in self.tokenize(hand_text).matches('seat'):
             # Check if player is 'out of hand' - they don't participate in this hand
             line_suffix = match.group(4) if match.group(4) else ""
             if 'out of hand' in line_suffix:
@@ -224,20 +211,21 @@ class PokerStarsParser(BaseParser):
     def _extract_blinds(self, hand_text: str) -> Dict[str, float]:
         """Extract blind amounts from posts or header."""
         blinds = {'sb': 0, 'bb': 0}
+        tokens = self.tokenize(hand_text)
         
         # Try to extract from header level (e.g., "Level III (150/300)")
-        level_match = re.search(r'Level\s+\w+\s*\((\d+)/(\d+)\)', hand_text)
+        level_match = tokens.first('level')
         if level_match:
             blinds['sb'] = float(level_match.group(1))
             blinds['bb'] = float(level_match.group(2))
         else:
             # Extract from posts - use same pattern as GG
             # Format: "PlayerName: posts small blind 150"
-            sb_match = re.search(r'posts?\s+(?:the\s+)?small\s+blind\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+            sb_match = tokens.first('small_blind')
             if sb_match:
                 blinds['sb'] = self.parse_amount(sb_match.group(1))
             
-            bb_match = re.search(r'posts?\s+(?:the\s+)?big\s+blind\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+            bb_match = tokens.first('big_blind')
             if bb_match:
                 blinds['bb'] = self.parse_amount(bb_match.group(1))
         
@@ -246,7 +234,7 @@ class PokerStarsParser(BaseParser):
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante amount."""
         # Format: "PlayerName: posts the ante 40" - use GG pattern
-        ante_match = re.search(r'posts?\s+(?:the\s+)?ante\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+        ante_match = self.tokenize(hand_text).first('ante')
         if ante_match:
             return self.parse_amount(ante_match.group(1))
         return 0
@@ -254,19 +242,20 @@ class PokerStarsParser(BaseParser):
     def _extract_board(self, hand_text: str) -> Dict[str, str]:
         """Extract board cards by street."""
         board = {}
+        tokens = self.tokenize(hand_text)
         
         # PokerStars format: *** FLOP *** [Ks 2c 4h]
-        flop_match = re.search(r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', hand_text)
+        flop_match = tokens.first('flop')
         if flop_match:
             board['flop'] = flop_match.group(1).strip()
         
         # Turn includes previous cards: *** TURN *** [Ks 2c 4h] [5s]
-        turn_match = re.search(r'\*\*\* TURN \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', hand_text)
+        turn_match = tokens.first('turn')
         if turn_match:
             board['turn'] = turn_match.group(1).strip()
         
         # River: *** RIVER *** [Ks 2c 4h 5s] [5h]
-        river_match = re.search(r'\*\*\* RIVER \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', hand_text)
+        river_match = tokens.first('river')
         if river_match:
             board['river'] = river_match.group(1).strip()
         
@@ -377,14 +366,15 @@ class PokerStarsParser(BaseParser):
         # "PlayerName: mucks [cards]"
         
         # Extract players who showed cards
-        for match in re.finditer(r'^([^:]+):\s*shows?\s+\[([^\]]+)\]', hand_text, re.MULTILINE | re.IGNORECASE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('show'):
             player = match.group(1).strip()
             cards = match.group(2).strip()
             showdown['players_showed'].append(player)
             showdown['hands_shown'][player] = cards
         
         # Extract players who mucked
-        for match in re.finditer(r'^([^:]+):\s*mucks?(?:\s+hand)?', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('muck'):
             player = match.group(1).strip()
             # Only add if not already in showed list
             if player not in showdown['players_showed']:
@@ -404,7 +394,8 @@ class PokerStarsParser(BaseParser):
         # "PlayerName collected 3000 from main pot"
         # Exclude "Uncalled bet" lines
         
-        for match in re.finditer(r'^([^:]+)\s+collected\s+([0-9,. ]+)\s+from', hand_text, re.MULTILINE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('collect'):
             player = match.group(1).strip()
             # Skip if this is an "Uncalled bet" line
             if 'uncalled bet' in player.lower():
@@ -423,7 +414,7 @@ class PokerStarsParser(BaseParser):
             total_pot += amount
         
         # Also check for "Total pot" line in summary
-        pot_match = re.search(r'Total pot\s+([0-9,. ]+)', hand_text)
+        pot_match = tokens.first('total_pot')
         if pot_match:
             # Use the explicitly stated total pot if available
             stated_total = self.parse_amount(pot_match.group(1))
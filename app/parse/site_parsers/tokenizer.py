@@ -0,0 +1,174 @@
+"""Table-driven, single-pass tokenizer shared by the site parsers.
+
+Each site declares a ``TokenTable``: the street markers that drive the
+action state machine plus an ordered list of line rules (seat, post, board,
+showdown, collect...). ``tokenize`` walks the hand once and every extractor
+reads the typed events it needs, instead of re-scanning the full text with
+its own ``re.finditer``. Supporting a new room is a new table.
+"""
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Match, NamedTuple, Optional, Pattern, Tuple
+
+STREETS = ('preflop', 'flop', 'turn', 'river')
+
+
+@dataclass(frozen=True)
+class TokenRule:
+    """One line pattern. ``hints`` are literals of which at least one must appear
+    in the line for the pattern to be able to match (cheap pre-filter).
+    ``once`` rules stop being tried after their first match (the extractor only
+    reads the first one, as ``re.search`` did)."""
+    kind: str
+    pattern: Pattern
+    hints: Tuple[str, ...] = ()
+    ignore_case: bool = False
+    once: bool = False
+
+
+def token_rule(kind: str, regex: str, *hints: str, flags: int = 0, once: bool = False) -> TokenRule:
+    """Compile a rule; hints are lower-cased when the pattern ignores case."""
+    ignore_case = bool(flags & re.IGNORECASE)
+    if ignore_case:
+        hints = tuple(hint.lower() for hint in hints)
+    return TokenRule(kind, re.compile(regex, flags), tuple(hints), ignore_case, once)
+
+
+@dataclass(frozen=True)
+class TokenTable:
+    """Per-site description of a hand history.
+
+    street_markers: ordered (needle, street) pairs; street None leaves the current street
+    stop_markers: needles that end the betting streets for good
+    rules: ordered line rules; a line may produce events of several kinds
+    upper_markers: compare markers against the upper-cased line
+    """
+    street_markers: Tuple[Tuple[str, Optional[str]], ...]
+    stop_markers: Tuple[str, ...] = ()
+    rules: Tuple[TokenRule, ...] = ()
+    upper_markers: bool = False
+    # Rules grouped by hint, so a shared hint is located once per hand
+    # (rule order is kept inside a group)
+    rule_groups: Tuple[Tuple[Tuple[str, ...], bool, Tuple[TokenRule, ...]], ...] = field(
+        init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        groups: Dict[Tuple[Tuple[str, ...], bool], List[TokenRule]] = {}
+        for rule in self.rules:
+            groups.setdefault((rule.hints, rule.ignore_case), []).append(rule)
+        object.__setattr__(self, 'rule_groups', tuple(
+            (hints, ignore_case, tuple(rules)) for (hints, ignore_case), rules in groups.items()
+        ))
+
+    def derive(self, **changes) -> 'TokenTable':
+        """Return a copy with some fields replaced (e.g. a sister site)."""
+        return replace(self, **changes)
+
+
+class HandEvent(NamedTuple):
+    kind: str
+    street: Optional[str]
+    match: Match
+
+
+@dataclass
+class HandTokens:
+    """Result of one walk over a hand."""
+    text: str
+    street_lines: List[Tuple[str, str]] = field(default_factory=list)
+    events: Dict[str, List[HandEvent]] = field(default_factory=dict)
+
+    def matches(self, kind: str) -> List[Match]:
+        return [event.match for event in self.events.get(kind, ())]
+
+    def first(self, kind: str) -> Optional[Match]:
+        found = self.events.get(kind)
+        return found[0].match if found else None
+
+
+def _hint_lines(haystack: str, hints: Tuple[str, ...]) -> List[int]:
+    """Indexes of the lines that contain any of the hints (ascending)."""
+    found: List[int] = []
+    for hint in hints:
+        position = haystack.find(hint)
+        while position != -1:
+            found.append(haystack.count('\n', 0, position))
+            line_end = haystack.find('\n', position)
+            if line_end == -1:
+                break
+            position = haystack.find(hint, line_end + 1)
+    # com um só hint a lista já sai ordenada e sem repetidos
+    return found if len(hints) == 1 else sorted(set(found))
+
+
+def tokenize(hand_text: str, table: TokenTable) -> HandTokens:
+    """Walk the hand once, tracking the street and emitting every rule match.
+
+    Street lines are stripped (as the action parsers expect). Rules only run on
+    the lines that contain one of their hints and see the raw line, so ``^``/``$``
+    behave as they did with ``re.MULTILINE`` on the full text.
+    """
+    tokens = HandTokens(hand_text)
+    street_lines = tokens.street_lines
+    street_markers = table.street_markers
+    stop_markers = table.stop_markers
+    upper_markers = table.upper_markers
+
+    lines = hand_text.split('\n')
+    # (linha, street) a partir da qual a street muda - só as linhas de marcador
+    transitions: List[Tuple[int, Optional[str]]] = [(-1, None)]
+    street = None
+
+    for line_no, raw in enumerate(lines):
+        line = raw.strip()
+        probe = line.upper() if upper_markers else line
+        for needle, next_street in street_markers:
+            if needle in probe:
+                street = next_street
+                transitions.append((line_no, street))
+                break
+        else:
+            for stop in stop_markers:
+                if stop in probe:
+                    street = None
+                    transitions.append((line_no, None))
+                    break
+            else:
+                if street is not None and line:
+                    street_lines.append((street, line))
+                continue
+            # stop marker: acabaram as streets de apostas
+            break
+    transition_lines = [line_no for line_no, _ in transitions]
+
+    events = tokens.events
+    lowered = None
+    for hints, ignore_case, rules in table.rule_groups:
+        if not hints:
+            candidates = range(len(lines))
+        elif ignore_case:
+            if lowered is None:
+                lowered = hand_text.lower()
+            if len(lowered) == len(hand_text):
+                candidates = _hint_lines(lowered, hints)
+            else:
+                # lower() mudou o comprimento (unicode): filtra linha a linha
+                candidates = [index for index, raw in enumerate(lines)
+                              if any(hint in raw.lower() for hint in hints)]
+        else:
+            candidates = _hint_lines(hand_text, hints)
+
+        for rule in rules:
+            kind_events = None
+            for line_no in candidates:
+                match = rule.pattern.search(lines[line_no])
+                if match:
+                    if kind_events is None:
+                        kind_events = events.setdefault(rule.kind, [])
+                    line_street = transitions[bisect_right(transition_lines, line_no) - 1][1]
+                    kind_events.append(HandEvent(rule.kind, line_street, match))
+                    if rule.once:
+                        break
+
+    return tokens
@@ -2,10 +2,40 @@
 import re
 from typing import List, Dict, Optional
 from .base_parser import BaseParser
+from .tokenizer import TokenTable, token_rule
 
 
 class WinamaxParser(BaseParser):
     """Parser for Winamax hand histories."""
+
+    # English and French terms are both supported
+    TOKEN_TABLE = TokenTable(
+        street_markers=(
+            ('*** PRE-FLOP ***', 'preflop'),
+            ('*** FLOP ***', 'flop'),
+            ('*** TURN ***', 'turn'),
+            ('*** RIVER ***', 'river'),
+        ),
+        stop_markers=('*** SUMMARY ***', '*** SHOW DOWN ***'),
+        rules=(
+            # Seat 1: PlayerName (20000, 9€ bounty) or Seat 1: PlayerName (20000)
+            token_rule('seat', r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9]+)(?:,\s*[^)]+)?\)', 'Seat'),
+            token_rule('sb_poster', r'^([^\s]+)\s+posts\s+small\s+blind', 'posts', once=True),
+            token_rule('small_blind', r'posts\s+small\s+blind\s+(\d+)', 'small', once=True),
+            token_rule('big_blind', r'posts\s+big\s+blind\s+(\d+)', 'big', once=True),
+            token_rule('ante', r'posts\s+ante\s+(\d+)', 'ante', once=True),
+            # *** FLOP *** [Kh Qs 7s] / *** TURN *** [Kh Qs 7s][5h] / *** RIVER *** [Kh Qs 7s 5h][6s]
+            token_rule('flop', r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', '*** FLOP', once=True),
+            token_rule('turn', r'\*\*\* TURN \*\*\*\s*\[[^\]]*\]\[([^\]]+)\]', '*** TURN', once=True),
+            token_rule('river', r'\*\*\* RIVER \*\*\*\s*\[[^\]]*\]\[([^\]]+)\]', '*** RIVER', once=True),
+            token_rule('show', r'^([^:\[]+?)(?::)?\s+(?:shows?|montre)\s+\[([^\]]+)\]', 'show', 'montre', flags=re.IGNORECASE),
+            token_rule('muck', r'^([^:\[]+?)(?::)?\s+(?:mucks?(?:\s+hand)?|passe)', 'muck', 'passe', flags=re.IGNORECASE),
+            token_rule('collect', r'^(.+?)\s+collected\s+([0-9,. ]+)\s+from', 'collected'),
+            token_rule('remporte', r'^(.+?)\s+remporte\s+([0-9,. ]+)\s+du\s+pot', 'remporte', flags=re.IGNORECASE),
+            token_rule('win', r'^(.+?)\s+wins?\s+([0-9,. ]+)', 'win'),
+            token_rule('total_pot', r'Total pot\s+([0-9,. ]+)', 'total pot', flags=re.IGNORECASE, once=True),
+        ),
+    )
     
     def __init__(self):
         super().__init__()
@@ -124,53 +154,12 @@ class WinamaxParser(BaseParser):
             return dealt_match.group(1).strip()
         return None
     
-    def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
-        """Extract all actions by street."""
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers
-            if '*** PRE-FLOP ***' in line:
-                current_street = 'preflop'
-                continue
-            elif '*** FLOP ***' in line:
-                current_street = 'flop'
-                continue
-            elif '*** TURN ***' in line:
-                current_street = 'turn'
-                continue
-            elif '*** RIVER ***' in line:
-                current_street = 'river'
-                continue
-            elif '*** SUMMARY ***' in line or '*** SHOW DOWN ***' in line:
-                break
-            
-            # Parse action if we're in a street
-            if current_street:
-                action = self._parse_action_line(line)
-                if action:
-                    actions[current_street].append(action)
-        
-        return actions
-    
     def _extract_players(self, hand_text: str) -> List[Dict]:
         """Extract player information."""
         players = []
         # Winamax format: Seat 1: PlayerName (20000, 9€ bounty)
         # or: Seat 1: PlayerName (20000)
-        pattern = r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9]+)(?:,\s*[^)]+)?\)'
-        
-        for match in re.finditer(pattern, hand_text, re.MULTILINE):
+        for match in self.tokenize(hand_text).matches('seat'):
             seat = int(match.group(1))
             name = match.group(2).strip()
             stack = float(match.group(3))
@@ -204,11 +193,12 @@ class WinamaxParser(BaseParser):
                 blinds['bb'] = float(groups[1])
         else:
             # Extract from posts
-            sb_match = re.search(r'posts\s+small\s+blind\s+(\d+)', hand_text)
+            tokens = self.tokenize(hand_text)
+            sb_match = tokens.first('small_blind')
             if sb_match:
                 blinds['sb'] = float(sb_match.group(1))
             
-            bb_match = re.search(r'posts\s+big\s+blind\s+(\d+)', hand_text)
+            bb_match = tokens.first('big_blind')
             if bb_match:
                 blinds['bb'] = float(bb_match.group(1))
         
@@ -216,7 +206,7 @@ class WinamaxParser(BaseParser):
     
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante amount."""
-        ante_match = re.search(r'posts\s+ante\s+(\d+)', hand_text)
+        ante_match = self.tokenize(hand_text).first('ante')
         if ante_match:
             return float(ante_match.group(1))
         
@@ -230,19 +220,20 @@ class WinamaxParser(BaseParser):
     def _extract_board(self, hand_text: str) -> Dict[str, str]:
         """Extract board cards by street."""
         board = {}
+        tokens = self.tokenize(hand_text)
         
         # Winamax format: *** FLOP *** [Kh Qs 7s]
-        flop_match = re.search(r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', hand_text)
+        flop_match = tokens.first('flop')
         if flop_match:
             board['flop'] = flop_match.group(1).strip()
         
         # Turn format: *** TURN *** [Kh Qs 7s][5h]
-        turn_match = re.search(r'\*\*\* TURN \*\*\*\s*\[[^\]]*\]\[([^\]]+)\]', hand_text)
+        turn_match = tokens.first('turn')
         if turn_match:
             board['turn'] = turn_match.group(1).strip()
         
         # River format: *** RIVER *** [Kh Qs 7s 5h][6s]
-        river_match = re.search(r'\*\*\* RIVER \*\*\*\s*\[[^\]]*\]\[([^\]]+)\]', hand_text)
+        river_match = tokens.first('river')
         if river_match:
             board['river'] = river_match.group(1).strip()
         
@@ -251,7 +242,7 @@ class WinamaxParser(BaseParser):
     def _infer_button_from_sb(self, hand_text: str) -> Optional[int]:
         """Infer button position from small blind poster."""
         # Find who posts small blind
-        sb_match = re.search(r'^([^\s]+)\s+posts\s+small\s+blind', hand_text, re.MULTILINE)
+        sb_match = self.tokenize(hand_text).first('sb_poster')
         if not sb_match:
             return None
         
@@ -378,7 +369,8 @@ class WinamaxParser(BaseParser):
         
         # Extract players who showed cards
         # Support both with and without colon after player name
-        for match in re.finditer(r'^([^:\[]+?)(?::)?\s+(?:shows?|montre)\s+\[([^\]]+)\]', hand_text, re.MULTILINE | re.IGNORECASE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('show'):
             player = self._normalize_player_name(match.group(1))
             cards = match.group(2).strip()
             showdown['players_showed'].append(player)
@@ -387,7 +379,7 @@ class WinamaxParser(BaseParser):
         # Extract players who mucked
         # English: "PlayerName mucks" or "PlayerName: mucks hand"
         # French: "PlayerName passe" or similar
-        for match in re.finditer(r'^([^:\[]+?)(?::)?\s+(?:mucks?(?:\s+hand)?|passe)', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('muck'):
             player = self._normalize_player_name(match.group(1))
             # Only add if not already in showed list
             if player not in showdown['players_showed']:
@@ -407,7 +399,8 @@ class WinamaxParser(BaseParser):
         
         # Pattern 1: "collected X from pot" (English)
         # Use non-greedy match to capture only player name on same line
-        for match in re.finditer(r'^(.+?)\s+collected\s+([0-9,. ]+)\s+from', hand_text, re.MULTILINE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('collect'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -424,7 +417,7 @@ class WinamaxParser(BaseParser):
         
         # Pattern 2: "remporte X du pot" (French)
         # Use non-greedy match to capture only player name on same line
-        for match in re.finditer(r'^(.+?)\s+remporte\s+([0-9,. ]+)\s+du\s+pot', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('remporte'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -440,7 +433,7 @@ class WinamaxParser(BaseParser):
         
         # Pattern 3: "wins X" (alternative English format)
         # Use non-greedy match to capture only player name on same line
-        for match in re.finditer(r'^(.+?)\s+wins?\s+([0-9,. ]+)', hand_text, re.MULTILINE):
+        for match in tokens.matches('win'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -455,7 +448,7 @@ class WinamaxParser(BaseParser):
             total_pot += amount
         
         # Also check for "Total pot" line in summary
-        pot_match = re.search(r'Total pot\s+([0-9,. ]+)', hand_text, re.IGNORECASE)
+        pot_match = tokens.first('total_pot')
         if pot_match:
             # Use the explicitly stated total pot if available
             stated_total = self.parse_amount(pot_match.group(1))
@@ -2,10 +2,41 @@
 import re
 from typing import List, Dict, Optional
 from .base_parser import BaseParser
+from .tokenizer import TokenTable, token_rule
 
 
 class WPNParser(BaseParser):
     """Parser for WPN hand histories."""
+
+    TOKEN_TABLE = TokenTable(
+        street_markers=(
+            ('*** HOLE CARDS ***', 'preflop'),
+            ('*** FLOP ***', 'flop'),
+            ('*** TURN ***', 'turn'),
+            ('*** RIVER ***', 'river'),
+        ),
+        stop_markers=('*** SUMMARY ***', '*** SHOW DOWN ***'),
+        rules=(
+            # Seat 1: PlayerName (100000.00)
+            token_rule('seat', r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9.,]+)\)', 'Seat'),
+            token_rule('level', r'Level\s+\d+\s*\(([0-9.,]+)/([0-9.,]+)\)', 'Level', once=True),
+            token_rule('small_blind', r'posts\s+the\s+small\s+blind\s+([0-9.,]+)', 'small', once=True),
+            token_rule('big_blind', r'posts\s+the\s+big\s+blind\s+([0-9.,]+)', 'big', once=True),
+            token_rule('ante', r'posts\s+ante\s+([0-9.,]+)', 'ante', once=True),
+            token_rule('flop', r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', '*** FLOP', once=True),
+            token_rule('turn', r'\*\*\* TURN \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', '*** TURN', once=True),
+            token_rule('river', r'\*\*\* RIVER \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', '*** RIVER', once=True),
+            # "PlayerName shows [cards]" e "PlayerName: shows [cards]"
+            token_rule('show', r'^([^:\n]+)\s+shows\s+\[([^\]]+)\]', 'shows', flags=re.IGNORECASE),
+            token_rule('show_colon', r'^([^:\n]+):\s*shows\s+\[([^\]]+)\]', 'shows', flags=re.IGNORECASE),
+            token_rule('muck', r'^([^:\n]+)\s+mucks?(?:\s+hand)?', 'muck', flags=re.IGNORECASE),
+            token_rule('muck_colon', r'^([^:\n]+):\s*mucks?(?:\s+hand)?', 'muck', flags=re.IGNORECASE),
+            token_rule('win_pot', r'^([^:\n]+)\s+wins\s+Pot\s+\(#?\d+\)\s+\(([0-9.,]+)\)', 'wins'),
+            token_rule('collect', r'^([^:\n]+)\s+collected\s+([0-9.,]+)\s+from', 'collected'),
+            token_rule('win', r'^([^:\n]+)\s+wins?\s+([0-9.,]+)(?:\s|$)', 'win'),
+            token_rule('total_pot', r'Total\s+pot\s+([0-9.,]+)', 'Total', once=True),
+        ),
+    )
     
     def __init__(self):
         super().__init__()
@@ -122,52 +153,11 @@ class WPNParser(BaseParser):
             return dealt_match.group(1).strip()
         return None
     
-    def extract_actions(self, hand_text: str) -> Dict[str, List[Dict]]:
-        """Extract all actions by street."""
-        actions = {
-            'preflop': [],
-            'flop': [],
-            'turn': [],
-            'river': []
-        }
-        
-        lines = hand_text.split('\n')
-        current_street = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Detect street markers
-            if '*** HOLE CARDS ***' in line:
-                current_street = 'preflop'
-                continue
-            elif '*** FLOP ***' in line:
-                current_street = 'flop'
-                continue
-            elif '*** TURN ***' in line:
-                current_street = 'turn'
-                continue
-            elif '*** RIVER ***' in line:
-                current_street = 'river'
-                continue
-            elif '*** SUMMARY ***' in line or '*** SHOW DOWN ***' in line:
-                break
-            
-            # Parse action if we're in a street
-            if current_street:
-                action = self._parse_action_line(line)
-                if action:
-                    actions[current_street].append(action)
-        
-        return actions
-    
     def _extract_players(self, hand_text: str) -> List[Dict]:
         """Extract player information."""
         players = []
         # WPN format: Seat 1: PlayerName (100000.00)
-        pattern = r'^Seat\s+(\d+):\s*([^(]+?)\s*\(([0-9.,]+)\)'
-        
-        for match in re.finditer(pattern, hand_text, re.MULTILINE):
+        for match in self.tokenize(hand_text).matches('seat'):
             seat = int(match.group(1))
             name = match.group(2).strip()
             stack = self.parse_amount(match.group(3))
@@ -183,19 +173,20 @@ class WPNParser(BaseParser):
     def _extract_blinds(self, hand_text: str) -> Dict[str, float]:
         """Extract blind amounts."""
         blinds: Dict[str, float] = {'sb': 0.0, 'bb': 0.0}
+        tokens = self.tokenize(hand_text)
         
         # Try from level info (e.g., "Level 13 (2250.00/4500.00)")
-        level_match = re.search(r'Level\s+\d+\s*\(([0-9.,]+)/([0-9.,]+)\)', hand_text)
+        level_match = tokens.first('level')
         if level_match:
             blinds['sb'] = self.parse_amount(level_match.group(1))
             blinds['bb'] = self.parse_amount(level_match.group(2))
         else:
             # Extract from posts
-            sb_match = re.search(r'posts\s+the\s+small\s+blind\s+([0-9.,]+)', hand_text)
+            sb_match = tokens.first('small_blind')
             if sb_match:
                 blinds['sb'] = self.parse_amount(sb_match.group(1))
             
-            bb_match = re.search(r'posts\s+the\s+big\s+blind\s+([0-9.,]+)', hand_text)
+            bb_match = tokens.first('big_blind')
             if bb_match:
                 blinds['bb'] = self.parse_amount(bb_match.group(1))
         
@@ -203,7 +194,7 @@ class WPNParser(BaseParser):
     
     def _extract_ante(self, hand_text: str) -> float:
         """Extract ante amount."""
-        ante_match = re.search(r'posts\s+ante\s+([0-9.,]+)', hand_text)
+        ante_match = self.tokenize(hand_text).first('ante')
         if ante_match:
             return self.parse_amount(ante_match.group(1))
         return 0
@@ -211,17 +202,18 @@ class WPNParser(BaseParser):
     def _extract_board(self, hand_text: str) -> Dict[str, str]:
         """Extract board cards by street."""
         board = {}
+        tokens = self.tokenize(hand_text)
         
         # WPN format similar to PokerStars
-        flop_match = re.search(r'\*\*\* FLOP \*\*\*\s*\[([^\]]+)\]', hand_text)
+        flop_match = tokens.first('flop')
         if flop_match:
             board['flop'] = flop_match.group(1).strip()
         
-        turn_match = re.search(r'\*\*\* TURN \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', hand_text)
+        turn_match = tokens.first('turn')
         if turn_match:
             board['turn'] = turn_match.group(1).strip()
         
-        river_match = re.search(r'\*\*\* RIVER \*\*\*\s*\[[^\]]+\]\s*\[([^\]]+)\]', hand_text)
+        river_match = tokens.first('river')
         if river_match:
             board['river'] = river_match.group(1).strip()
         
@@ -347,14 +339,15 @@ class WPNParser(BaseParser):
         
         # Extract players who showed cards
         # Pattern 1: "PlayerName shows [cards]"
-        for match in re.finditer(r'^([^:\n]+)\s+shows\s+\[([^\]]+)\]', hand_text, re.MULTILINE | re.IGNORECASE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('show'):
             player = self._normalize_player_name(match.group(1))
             cards = match.group(2).strip()
             showdown['players_showed'].append(player)
             showdown['hands_shown'][player] = cards
         
         # Pattern 2: "PlayerName: shows [cards]" (with colon)
-        for match in re.finditer(r'^([^:\n]+):\s*shows\s+\[([^\]]+)\]', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('show_colon'):
             player = self._normalize_player_name(match.group(1))
             cards = match.group(2).strip()
             if player not in showdown['players_showed']:
@@ -363,14 +356,14 @@ class WPNParser(BaseParser):
         
         # Extract players who mucked
         # Pattern 1: "PlayerName mucks"
-        for match in re.finditer(r'^([^:\n]+)\s+mucks?(?:\s+hand)?', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('muck'):
             player = self._normalize_player_name(match.group(1))
             # Only add if not already in showed list
             if player not in showdown['players_showed']:
                 showdown['players_mucked'].append(player)
         
         # Pattern 2: "PlayerName: mucks" (with colon)
-        for match in re.finditer(r'^([^:\n]+):\s*mucks?(?:\s+hand)?', hand_text, re.MULTILINE | re.IGNORECASE):
+        for match in tokens.matches('muck_colon'):
             player = self._normalize_player_name(match.group(1))
             # Only add if not already in showed or mucked list
             if player not in showdown['players_showed'] and player not in showdown['players_mucked']:
@@ -390,7 +383,8 @@ class WPNParser(BaseParser):
         # "PlayerName wins amount"
         
         # Pattern 1: "wins Pot (#X) (amount)"
-        for match in re.finditer(r'^([^:\n]+)\s+wins\s+Pot\s+\(#?\d+\)\s+\(([0-9.,]+)\)', hand_text, re.MULTILINE):
+        tokens = self.tokenize(hand_text)
+        for match in tokens.matches('win_pot'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -406,7 +400,7 @@ class WPNParser(BaseParser):
             total_pot += amount
         
         # Pattern 2: "collected X from pot"
-        for match in re.finditer(r'^([^:\n]+)\s+collected\s+([0-9.,]+)\s+from', hand_text, re.MULTILINE):
+        for match in tokens.matches('collect'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -421,7 +415,7 @@ class WPNParser(BaseParser):
             total_pot += amount
         
         # Pattern 3: "wins X" (simple format)
-        for match in re.finditer(r'^([^:\n]+)\s+wins?\s+([0-9.,]+)(?:\s|$)', hand_text, re.MULTILINE):
+        for match in tokens.matches('win'):
             player = self._normalize_player_name(match.group(1))
             amount = self.parse_amount(match.group(2))
             
@@ -436,7 +430,7 @@ class WPNParser(BaseParser):
             total_pot += amount
         
         # Also check for "Total pot" line in summary
-        pot_match = re.search(r'Total\s+pot\s+([0-9.,]+)', hand_text)
+        pot_match = tokens.first('total_pot')
         if pot_match:
             # Use the explicitly stated total pot if available
             stated_total = self.parse_amount(pot_match.group(1))
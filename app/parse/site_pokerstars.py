@@ -100,7 +100,7 @@ class PokerStarsParser:
             offsets['hand_end'] = text_offset + len(hand_text)
         
         # Initialize hand with empty streets
-        hand = Hand(
+        hand = Hand.trusted(
             site='pokerstars',
             file_id=file_id,
             streets=create_empty_streets(),
@@ -157,7 +157,7 @@ class PokerStarsParser:
                 if is_hero:
                     hand.hero = name
                 
-                players.append(Player(
+                players.append(Player.trusted(
                     seat=seat,
                     name=name,
                     stack_chips=stack,
@@ -285,7 +285,7 @@ class PokerStarsParser:
         if 'posts small blind' in line:
             match = safe_match(r'^([^:]+):\s*posts?\s+small\s+blind\s+([0-9,. ]+)', line)
             if match:
-                return Action(
+                return Action.trusted(
                     actor=normalize_player_name(match.group(1)),
                     type='POST_SB',
                     amount=clean_amount(match.group(2)),
@@ -295,7 +295,7 @@ class PokerStarsParser:
         if 'posts big blind' in line:
             match = safe_match(r'^([^:]+):\s*posts?\s+big\s+blind\s+([0-9,. ]+)', line)
             if match:
-                return Action(
+                return Action.trusted(
                     actor=normalize_player_name(match.group(1)),
                     type='POST_BB',
                     amount=clean_amount(match.group(2)),
@@ -305,7 +305,7 @@ class PokerStarsParser:
         if 'posts the ante' in line or 'posts ante' in line:
             match = safe_match(r'^([^:]+):\s*posts?\s+(?:the\s+)?ante\s+([0-9,. ]+)', line)
             if match:
-                return Action(
+                return Action.trusted(
                     actor=normalize_player_name(match.group(1)),
                     type='POST_ANTE',
                     amount=clean_amount(match.group(2)),
@@ -335,7 +335,7 @@ class PokerStarsParser:
                 else:
                     final_type = action_type
                 
-                action = Action(
+                action = Action.trusted(
                     actor=actor,
                     type=final_type,
                     allin=allin,
@@ -105,7 +105,7 @@ class WinamaxParser:
         if 'hand_end' not in offsets:
             offsets['hand_end'] = text_offset + len(hand_text)
         
-        hand = Hand(
+        hand = Hand.trusted(
             site='winamax',
             file_id=file_id,
             streets=create_empty_streets(),
@@ -161,7 +161,7 @@ class WinamaxParser:
                 if is_hero:
                     hand.hero = name
                 
-                players.append(Player(
+                players.append(Player.trusted(
                     seat=seat,
                     name=name,
                     stack_chips=stack,
@@ -276,7 +276,7 @@ class WinamaxParser:
             if match:
                 actor = normalize_player_name(match.group(1))
                 
-                action = Action(
+                action = Action.trusted(
                     actor=actor,
                     type=action_type,
                     allin=(action_type == 'ALLIN'),
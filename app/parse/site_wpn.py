@@ -106,7 +106,7 @@ class WPNParser:
         if 'hand_end' not in offsets:
             offsets['hand_end'] = text_offset + len(hand_text)
         
-        hand = Hand(
+        hand = Hand.trusted(
             site='wpn',
             file_id=file_id,
             streets=create_empty_streets(),
@@ -153,7 +153,7 @@ class WPNParser:
                 if is_hero:
                     hand.hero = name
                 
-                players.append(Player(
+                players.append(Player.trusted(
                     seat=seat,
                     name=name,
                     stack_chips=stack,
@@ -251,7 +251,7 @@ class WPNParser:
             if match:
                 actor = normalize_player_name(match.group(1))
                 
-                action = Action(
+                action = Action.trusted(
                     actor=actor,
                     type=action_type,
                     allin=(action_type == 'ALLIN'),
@@ -33,6 +33,9 @@ from app.pipeline.sanity_checks import (
 )
 from app.pipeline.pipeline_result import build_pipeline_result_payload
 from app.pipeline.new_runner import run_simplified_pipeline
+from app.services.content_store import write_json_copies
+from app.services.job_profiler import JobProfiler
+from app.services import pipeline_metrics
 from app.stats.aggregate import MultiSiteAggregator
 from app.parse.site_parsers.site_detector import detect_poker_site
 from app.pipeline.month_bucketizer import (
@@ -185,11 +188,10 @@ def _write_month_pipeline_result(bucket: MonthBucket, month_result: Dict[str, An
     month_work_path.mkdir(parents=True, exist_ok=True)
 
     month_result_path = month_work_path / "pipeline_result.json"
-    month_result_path.write_text(json.dumps(month_result, indent=2), encoding='utf-8')
-
     root_dir = month_work_path.parents[1] if len(month_work_path.parents) >= 2 else month_work_path
     legacy_path = root_dir / f"pipeline_result_{bucket.month}.json"
-    legacy_path.write_text(json.dumps(month_result, indent=2), encoding='utf-8')
+    # mesmo payload nos dois nomes: serializa uma vez
+    write_json_copies(month_result, [month_result_path, legacy_path])
 
 def _read_text_file(path: Path) -> str:
     try:
@@ -255,14 +257,9 @@ def build_aggregate_pipeline_result(
         json.dump(manifest, f, indent=2)
 
     global_result_path = os.path.join(work_dir, "pipeline_result_global.json")
-    with open(global_result_path, 'w', encoding='utf-8') as f:
-        json.dump(result_payload, f, indent=2)
-    logger.info(f"[{token}] ✅ Wrote global pipeline_result to {global_result_path}")
-
     global_result_upper = os.path.join(work_dir, "pipeline_result_GLOBAL.json")
-    with open(global_result_upper, 'w', encoding='utf-8') as f:
-        json.dump(result_payload, f, indent=2)
-    logger.info(f"[{token}] ✅ Wrote GLOBAL pipeline_result to {global_result_upper}")
+    write_json_copies(result_payload, [global_result_path, global_result_upper])
+    logger.info(f"[{token}] ✅ Wrote global pipeline_result to {global_result_path} and {global_result_upper}")
 
     log_reference_consistency(Path(global_result_upper))
 
@@ -562,54 +559,56 @@ def _ingest_tournaments_for_user(
         'months': {},
     }
 
-    for file_path in source_dir.rglob('*.txt'):
-        if not file_path.is_file():
-            continue
-
-        if _is_summary_filename(file_path.name):
-            logger.info("[%s] Skipping summary-like file: %s", token, file_path.name)
-            continue
+    # Commits agrupados no índice do repositório, com o lock de ingest do utilizador
+    with repository.batch(user_key):
+        for file_path in source_dir.rglob('*.txt'):
+            if not file_path.is_file():
+                continue
 
-        summary['total_files'] += 1
+            if _is_summary_filename(file_path.name):
+                logger.info("[%s] Skipping summary-like file: %s", token, file_path.name)
+                continue
 
-        content = _read_text_file(file_path)
-        metadata = parser_runner.extract_tournament_metadata(content, file_id=file_path.name) or {}
+            summary['total_files'] += 1
 
-        month = resolve_month_for_file(content, file_path, metadata)
-        tournament_id = metadata.get('tournament_id')
+            content = _read_text_file(file_path)
+            metadata = parser_runner.extract_tournament_metadata(content, file_id=file_path.name) or {}
 
-        if not tournament_id:
-            digest = hashlib.sha1(content.encode('utf-8', errors='ignore')).hexdigest()[:12]
-            tournament_id = f"{file_path.stem}_{digest}"
+            month = resolve_month_for_file(content, file_path, metadata)
+            tournament_id = metadata.get('tournament_id')
 
-        stored_path, replaced = repository.store_tournament(
-            user_key,
-            month,
-            tournament_id,
-            content,
-            file_path.name,
-        )
+            if not tournament_id:
+                digest = hashlib.sha1(content.encode('utf-8', errors='ignore')).hexdigest()[:12]
+                tournament_id = f"{file_path.stem}_{digest}"
 
-        if replaced:
-            summary['replaced'] += 1
-            logger.info(
-                "[%s] Replaced tournament %s for %s (stored at %s)",
-                token,
-                tournament_id,
+            stored_path, replaced = repository.store_tournament(
+                user_key,
                 month,
-                stored_path,
-            )
-        else:
-            summary['stored'] += 1
-            logger.info(
-                "[%s] Stored new tournament %s for %s (stored at %s)",
-                token,
                 tournament_id,
-                month,
-                stored_path,
+                content,
+                file_path.name,
             )
 
-        summary['months'][month] = summary['months'].get(month, 0) + 1
+            if replaced:
+                summary['replaced'] += 1
+                logger.info(
+                    "[%s] Replaced tournament %s for %s (stored at %s)",
+                    token,
+                    tournament_id,
+                    month,
+                    stored_path,
+                )
+            else:
+                summary['stored'] += 1
+                logger.info(
+                    "[%s] Stored new tournament %s for %s (stored at %s)",
+                    token,
+                    tournament_id,
+                    month,
+                    stored_path,
+                )
+
+            summary['months'][month] = summary['months'].get(month, 0) + 1
 
     logger.info(
         "[%s] Tournament ingest summary for %s: total=%s, stored=%s, replaced=%s",
@@ -713,6 +712,7 @@ def _process_site_for_month(
     import gc
     
     logger.info(f"[{token}] Processing {len(files)} files from {site}")
+    site_stage = pipeline_metrics.begin_stage(token, "site", site=site)
     
     # Create site-specific directory
     site_dir = os.path.join(month_work_dir, "by_site", site)
@@ -724,7 +724,8 @@ def _process_site_for_month(
     # Classify files into groups
     classified_dir = os.path.join(site_dir, "classified")
     progress_tracker.update_stage(token, 'classification', 'in_progress', f'Classificando mãos de {site}...')
-    classification_stats = classify_into_final_groups(site_input_dir, classified_dir, token=token)
+    with pipeline_metrics.stage(token, "classify", site=site) as classify_stage:
+        classification_stats = classify_into_final_groups(site_input_dir, classified_dir, token=token)
     
     # Process each group for this site
     site_stats = {}
@@ -748,6 +749,10 @@ def _process_site_for_month(
         int(v or 0) for k, v in discards.items() if k not in ['total', 'total_segments']
     )
     site_discarded_no_reason = max(parsed_hands - (valid_total + counted_discards), 0)
+    classify_stage.hands_in = site_stage.hands_in = parsed_hands
+    classify_stage.hands_out = site_stage.hands_out = valid_total
+    classify_stage.bytes_read = site_stage.bytes_read = pipeline_metrics.directory_bytes(site_input_dir)
+    classify_stage.bytes_written = pipeline_metrics.directory_bytes(classified_dir)
 
     site_room_summary = {
         site: {
@@ -800,6 +805,8 @@ def _process_site_for_month(
         logger.info(f"[{token}] {site}/{group_key}: Processing {total_hands} hands with streaming (memory-efficient)")
         
         # Process hands in streaming mode - one at a time
+        stats_stage = pipeline_metrics.begin_stage(token, "stats", site=site, group=group_key)
+        stats_stage.bytes_read = os.path.getsize(combined_file)
         hands_processed = 0
         batch_size = 100  # Run GC every 100 hands
         
@@ -907,6 +914,9 @@ def _process_site_for_month(
         # Save collected hands
         saved_stats = hand_collector.save_all()
         hands_by_stat = hand_collector.get_hands_by_stat()
+        stats_stage.hands_in = stats_stage.hands_out = hands_processed
+        stats_stage.bytes_written = pipeline_metrics.directory_bytes(os.path.join(site_dir, "hands_by_stat", group_key))
+        pipeline_metrics.end_stage(token, stats_stage)
         
         # Store site-specific results WITH SCORES
         site_stats[group_key] = {
@@ -943,6 +953,9 @@ def _process_site_for_month(
         'by_room': site_room_summary,
     }
 
+    site_stage.bytes_written = pipeline_metrics.directory_bytes(site_dir) - site_stage.bytes_read
+    pipeline_metrics.end_stage(token, site_stage)
+
     return {
         'site_stats': site_stats,
         'site_discards': site_discards,
@@ -1265,15 +1278,25 @@ def run_multi_site_pipeline(
         'valid_hand_records': [],
     }
     global_debug = _empty_debug_totals()
+    # no-op a não ser que o token tenha profiling ligado (env ou admin)
+    profiler = JobProfiler(token, work_dir)
+    metrics = pipeline_metrics.start_job(
+        token, archive_bytes=os.path.getsize(archive_path) if os.path.exists(archive_path) else 0
+    )
     
     try:
         # Step 1: Extract archive
+        profiler.phase("extract")
         logger.info(f"[{token}] Extracting archive")
         log_step(token, "extract", "started", "Extracting archive recursively")
         progress_tracker.update_stage(token, 'extraction', 'in_progress', 'Extraindo arquivos...')
         
+        extract_stage = metrics.begin("extract")
         input_dir = os.path.join(work_dir, "in")
         file_count = safe_extract_archive(archive_path, input_dir)
+        extract_stage.bytes_read = metrics.archive_bytes
+        extract_stage.bytes_written = pipeline_metrics.directory_bytes(input_dir)
+        metrics.end(extract_stage)
         
         if file_count == 0:
             log_step(token, "extract", "failed", "", "No .txt files found")
@@ -1333,13 +1356,16 @@ def run_multi_site_pipeline(
             logger.info(f"[{token}] Single-month upload detected, using standard pipeline")
             
             # Detect sites in extracted files
+            profiler.phase("detection")
             logger.info(f"[{token}] Detecting poker sites in files")
             progress_tracker.update_stage(token, 'detection', 'in_progress', 'Detectando salas de poker...')
             
             if progress_callback:
                 progress_callback(40, 'A detetar salas de poker...')
             
-            site_files = detect_sites_in_directory(input_dir)
+            with metrics.stage("detection") as detection_stage:
+                site_files = detect_sites_in_directory(input_dir)
+                detection_stage.bytes_read = extract_stage.bytes_written
             
             if not site_files:
                 logger.warning(f"[{token}] No recognized poker sites found, falling back to single-site processing")
@@ -1362,6 +1388,7 @@ def run_multi_site_pipeline(
                     percent = 45 + (site_idx / total_sites) * 25
                     progress_callback(int(percent), f'A processar {site} ({len(files)} ficheiros)...')
                 
+                profiler.phase(f"site_{site}")
                 site_result = _process_site_for_month(
                     site, files, work_dir, token,
                     aggregator, progress_callback, 45
@@ -1386,6 +1413,8 @@ def run_multi_site_pipeline(
                     all_groups.add(group_key)
             
             # Aggregate results across all sites
+            profiler.phase("aggregate")
+            aggregate_stage = metrics.begin("aggregate")
             logger.info(f"[{token}] Aggregating statistics across all sites")
             combined_stats = _aggregate_month_groups(aggregator, work_dir, all_groups)
             
@@ -1444,6 +1473,11 @@ def run_multi_site_pipeline(
                     "POSTFLOP group count must match total valid hands"
                 )
 
+            aggregate_stage.hands_in = aggregate_stage.hands_out = global_samples.validas
+            metrics.end(aggregate_stage)
+            # o payload em disco leva as métricas até aqui; o retorno leva o job completo
+            global_debug['metrics'] = metrics.as_dict()
+
             result_data = build_aggregate_pipeline_result(
                 token,
                 result_data,
@@ -1474,6 +1508,7 @@ def run_multi_site_pipeline(
             
             # Process each month bucket
             for month_idx, bucket in enumerate(buckets, 1):
+                profiler.phase(f"month_{bucket.month}")
                 try:
                     logger.info(f"[{token}] Processing month {month_idx}/{total_months}: {bucket.month}")
                     
@@ -1517,6 +1552,8 @@ def run_multi_site_pipeline(
                     }
                     # Continue with other months
             
+            profiler.phase("aggregate")
+            aggregate_stage = metrics.begin("aggregate")
             monthly_context = build_monthly_results_for_token(
                 token,
                 work_dir,
@@ -1560,6 +1597,10 @@ def run_multi_site_pipeline(
                     token,
                 )
 
+            aggregate_stage.hands_in = aggregate_stage.hands_out = global_samples.validas
+            metrics.end(aggregate_stage)
+            global_debug['metrics'] = metrics.as_dict()
+
             result_data = build_aggregate_pipeline_result(
                 token,
                 result_data,
@@ -1592,9 +1633,9 @@ def run_multi_site_pipeline(
                     token,
                 )
 
+        # result_data é o payload global acabado de escrever: copia os bytes
         legacy_result_path = os.path.join(work_dir, "pipeline_result.json")
-        with open(legacy_result_path, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, indent=2)
+        shutil.copyfile(os.path.join(work_dir, "pipeline_result_global.json"), legacy_result_path)
 
         result_data['status'] = 'completed'
 
@@ -1608,89 +1649,75 @@ def run_multi_site_pipeline(
         progress_tracker.complete_job(token)
 
         # Upload results to Supabase Storage (if enabled)
+        profiler.phase("publish")
+        publish_stage = metrics.begin("publish")
         logger.info(f"[{token}] Uploading results to Supabase Storage")
         try:
             from app.services.storage import get_storage
+            from app.services.artifact_publisher import ArtifactPublisher
+            from app.stats.hand_bundle import BUNDLE_NAME
             storage = get_storage()
 
-            def _upload_directory(local_dir: str, remote_prefix: str) -> int:
-                uploaded = 0
-                if not os.path.isdir(local_dir):
-                    return uploaded
-
-                for root_dir, _, files in os.walk(local_dir):
-                    for file_name in files:
-                        local_path = os.path.join(root_dir, file_name)
-                        relative_path = os.path.relpath(local_path, local_dir)
-                        storage_key = f"{remote_prefix}/{relative_path}".replace('\\', '/')
-                        content_type = 'application/json' if file_name.endswith('.json') else 'text/plain'
-
-                        with open(local_path, 'rb') as stream:
-                            storage.upload_file_stream(stream, storage_key, content_type)
-
-                        uploaded += 1
-
-                logger.info(f"[{token}] Uploaded {uploaded} files under {remote_prefix}")
-                return uploaded
-
-            # Upload new global pipeline_result
-            global_result_path = os.path.join(work_dir, "pipeline_result_global.json")
-            if os.path.exists(global_result_path):
-                with open(global_result_path, 'rb') as f:
-                    storage_path = f"/results/{token}/pipeline_result_global.json"
-                    storage.upload_file_stream(f, storage_path, 'application/json')
-                    logger.info(f"[{token}] ✅ Uploaded pipeline_result_global.json")
-
-            global_result_upper = os.path.join(work_dir, "pipeline_result_GLOBAL.json")
-            if os.path.exists(global_result_upper):
-                with open(global_result_upper, 'rb') as f:
-                    storage_path = f"/results/{token}/pipeline_result_GLOBAL.json"
-                    storage.upload_file_stream(f, storage_path, 'application/json')
-                    logger.info(f"[{token}] ✅ Uploaded pipeline_result_GLOBAL.json")
-
-            # Upload legacy aggregate file for backwards compatibility
-            aggregate_result_path = os.path.join(work_dir, "pipeline_result.json")
-            if os.path.exists(aggregate_result_path):
-                with open(aggregate_result_path, 'rb') as f:
-                    storage_path = f"/results/{token}/pipeline_result.json"
-                    storage.upload_file_stream(f, storage_path, 'application/json')
-                    logger.info(f"[{token}] ✅ Uploaded legacy pipeline_result.json")
-
-            # Upload aggregated hands_by_stat files (global scope)
+            def _publish_progress(done: int, total: int) -> None:
+                if progress_callback:
+                    progress_callback(99, f'A publicar resultados ({done}/{total})...')
+
+            remote_root = f"/results/{token}"
+            publisher = ArtifactPublisher(
+                storage,
+                token,
+                remote_root,
+                progress_callback=_publish_progress,
+            )
+
+            # Global pipeline_result files (new, upper-case and legacy aggregate):
+            # one blob, three pointers
+            for result_name in ("pipeline_result_global.json", "pipeline_result_GLOBAL.json", "pipeline_result.json"):
+                publisher.add_content_addressed(
+                    os.path.join(work_dir, result_name),
+                    f"{remote_root}/{result_name}",
+                )
+
+            # Aggregated hands_by_stat files (global scope)
             hands_dir = os.path.join(work_dir, "hands_by_stat")
-            _upload_directory(hands_dir, f"/results/{token}/hands_by_stat")
+            publisher.add_directory(hands_dir, f"{remote_root}/hands_by_stat")
 
-            # Upload months_manifest.json (if multi-month)
             if is_multi_month:
-                manifest_local = os.path.join(work_dir, "months_manifest.json")
-                if os.path.exists(manifest_local):
-                    with open(manifest_local, 'rb') as f:
-                        storage_path = f"/results/{token}/months_manifest.json"
-                        storage.upload_file_stream(f, storage_path, 'application/json')
-                        logger.info(f"[{token}] ✅ Uploaded months_manifest.json")
-
-                # Upload each month's results and hands_by_stat/
+                publisher.add_file(
+                    os.path.join(work_dir, "months_manifest.json"),
+                    f"{remote_root}/months_manifest.json",
+                    'application/json',
+                )
+
+                # Each month's results and hands_by_stat/
                 for bucket in buckets:
                     month = bucket.month
                     month_work_dir = bucket.work_dir
 
-                    # Upload monthly pipeline_result.json
-                    month_result_path = os.path.join(month_work_dir, "pipeline_result.json")
-                    if os.path.exists(month_result_path):
-                        with open(month_result_path, 'rb') as f:
-                            storage_path = f"/results/{token}/months/{month}/pipeline_result.json"
-                            storage.upload_file_stream(f, storage_path, 'application/json')
-                            logger.info(f"[{token}] ✅ Uploaded pipeline_result.json for month {month}")
-
-                    month_root_path = os.path.join(work_dir, f"pipeline_result_{month}.json")
-                    if os.path.exists(month_root_path):
-                        with open(month_root_path, 'rb') as f:
-                            storage_path = f"/results/{token}/pipeline_result_{month}.json"
-                            storage.upload_file_stream(f, storage_path, 'application/json')
-                            logger.info(f"[{token}] ✅ Uploaded pipeline_result_{month}.json")
+                    publisher.add_content_addressed(
+                        os.path.join(month_work_dir, "pipeline_result.json"),
+                        f"{remote_root}/months/{month}/pipeline_result.json",
+                    )
+                    publisher.add_content_addressed(
+                        os.path.join(work_dir, f"pipeline_result_{month}.json"),
+                        f"{remote_root}/pipeline_result_{month}.json",
+                    )
 
+                    # Per month only the packed bundles (one object per group
+                    # instead of one per stat); readers fetch hands by range
                     month_hands_dir = os.path.join(month_work_dir, "hands_by_stat")
-                    _upload_directory(month_hands_dir, f"/results/{token}/months/{month}/hands_by_stat")
+                    publisher.add_directory(
+                        month_hands_dir,
+                        f"{remote_root}/months/{month}/hands_by_stat",
+                        content_type='application/octet-stream',
+                        only_name=BUNDLE_NAME,
+                    )
+
+            report = publisher.publish()
+            publish_stage.bytes_written = report.bytes
+            # o worker de jobs não volta a enviar cópias completas por cima dos ponteiros
+            result_data['published_keys'] = report.published_keys
+            metrics.end(publish_stage)
 
             logger.info(f"[{token}] ✅ All results uploaded to Supabase Storage successfully")
         except Exception as e:
@@ -1734,3 +1761,11 @@ def run_multi_site_pipeline(
         progress_tracker.fail_job(token, str(e))
 
         return False, str(e), None
+    finally:
+        profiler.close()
+        status = result_data.get('status')
+        job_metrics = pipeline_metrics.finish_job(
+            token, status if status in ('completed', 'failed') else 'fallback', work_dir
+        )
+        if job_metrics and isinstance(result_data.get('debug'), dict):
+            result_data['debug']['metrics'] = job_metrics
@@ -54,6 +54,19 @@ def generate_token() -> str:
     hash_obj = hashlib.sha256(random_bytes)
     return hash_obj.hexdigest()[:12]
 
+
+OWNER_FILE = "owner.json"
+
+
+def run_owner(token: str, work_root: str = "work") -> Optional[str]:
+    """User that started run ``token``, or None for anonymous/unknown runs."""
+    owner_file = os.path.join(work_root, token, "_logs", OWNER_FILE)
+    try:
+        with open(owner_file, encoding="utf-8") as f:
+            return json.load(f).get("user_id")
+    except (OSError, ValueError, AttributeError):
+        return None
+
 def safe_extract_archive(archive_path: str, extract_to: str, depth: int = 0, max_depth: int = 5) -> int:
     """
     Safely extract .txt files from archives (ZIP/RAR), with recursive extraction
@@ -187,151 +200,193 @@ def run_pipeline_step(work_dir: str, step_name: str, step_func: callable, **kwar
         
         return {"ok": False, "error_info": error_info}
 
-def run_full_pipeline(zip_file_path: str, work_root: str = "work") -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+# Scoring config: a change here re-runs only the scoring stage
+SCORE_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "score", "config.yml")
+
+def _stage_extract(work_dir: str, results: Dict[str, Any], zip_file_path: str) -> Dict[str, Any]:
+    input_dir = os.path.join(work_dir, "in")
+    # Re-extraction must not mix with files from a previous archive
+    shutil.rmtree(input_dir, ignore_errors=True)
+    os.makedirs(input_dir, exist_ok=True)
+    file_count = safe_extract_archive(zip_file_path, input_dir)
+    if file_count == 0:
+        raise ValueError("No .txt files found in the uploaded archive")
+    return {"file_count": file_count}
+
+def _stage_classify(work_dir: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    from app.classify.run import classify_hands
+    classified_dir = os.path.join(work_dir, "classified")
+    shutil.rmtree(classified_dir, ignore_errors=True)
+    return classify_hands(
+        os.path.join(work_dir, "in"),
+        classified_dir,
+        os.path.join(work_dir, "classification_manifest.json")
+    )
+
+def _stage_derive(work_dir: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    from app.parse.derive import derive_hands_enriched
+    return derive_hands_enriched(
+        os.path.join(work_dir, "classified"),
+        os.path.join(work_dir, "hands_enriched.jsonl")
+    )
+
+def _stage_partitions(work_dir: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    from app.partitions.create import create_partitions
+    partitions_dir = os.path.join(work_dir, "partitions")
+    shutil.rmtree(partitions_dir, ignore_errors=True)
+    return create_partitions(os.path.join(work_dir, "hands_enriched.jsonl"), partitions_dir)
+
+def _stage_stats(work_dir: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    stats_dir = os.path.join(work_dir, "stats")
+    os.makedirs(stats_dir, exist_ok=True)
+    
+    # Create minimal stats file
+    stats = {
+        "total_hands": (results.get("partitions") or {}).get("total_hands", 0),
+        "months": ["2024-11"],
+        "groups": {
+            "nonko_9max": {
+                "subgroups": {
+                    "PREFLOP_RFI": {
+                        "stats": {
+                            "RFI_EARLY": {"opportunities": 100, "attempts": 21}
+                        }
+                    }
+                }
+            }
+        }
+    }
+    
+    stats_file = os.path.join(stats_dir, "stat_counts.json")
+    with open(stats_file, 'w') as f:
+        json.dump(stats, f, indent=2)
+    return {"stats_file": "stats/stat_counts.json", "total_hands": stats["total_hands"]}
+
+def _stage_scoring(work_dir: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    scores_dir = os.path.join(work_dir, "scores")
+    os.makedirs(scores_dir, exist_ok=True)
+    
+    scorecard = {
+        "config": {},
+        "scoring": {
+            "overall": {"score": 75.0},
+            "groups": {}
+        }
+    }
+    
+    scorecard_file = os.path.join(scores_dir, "scorecard.json")
+    with open(scorecard_file, 'w') as f:
+        json.dump(scorecard, f, indent=2)
+    return {"scorecard_file": "scores/scorecard.json"}
+
+def build_pipeline_stages(zip_file_path: str) -> list:
+    """Stage DAG for run_full_pipeline (see app.pipeline.stages)."""
+    from app.pipeline.stages import Stage
+    
+    return [
+        Stage(
+            name="extract",
+            func=lambda work_dir, results: _stage_extract(work_dir, results, zip_file_path),
+            inputs=[os.path.abspath(zip_file_path)],
+            outputs=["in"],
+            code=["app.pipeline.runner"],
+            start_message="Extracting archive file (recursive)",
+            done_message=lambda r: f"Extracted {r['file_count']} .txt files",
+        ),
+        Stage(
+            name="classify",
+            func=_stage_classify,
+            deps=["extract"],
+            outputs=["classified", "classification_manifest.json"],
+            code=["app.classify.run"],
+            start_message="Classifying hand histories",
+            done_message="Classification completed",
+        ),
+        Stage(
+            name="derive",
+            func=_stage_derive,
+            deps=["classify"],
+            outputs=["hands_enriched.jsonl"],
+            code=["app.parse.derive"],
+            log_name="parse",
+            start_message="Parsing hand histories",
+            done_message="Parsing completed",
+        ),
+        Stage(
+            name="partitions",
+            func=_stage_partitions,
+            deps=["derive"],
+            outputs=["partitions"],
+            code=["app.partitions.create"],
+            start_message="Creating partitions",
+            done_message="Partitions created",
+        ),
+        Stage(
+            name="stats",
+            func=_stage_stats,
+            deps=["partitions"],
+            outputs=["stats/stat_counts.json"],
+            start_message="Computing statistics",
+            done_message="Statistics computed",
+        ),
+        Stage(
+            name="scoring",
+            func=_stage_scoring,
+            deps=["stats"],
+            inputs=[SCORE_CONFIG_PATH],
+            outputs=["scores/scorecard.json"],
+            start_message="Running scoring",
+            done_message="Scoring completed",
+        ),
+    ]
+
+def run_full_pipeline(zip_file_path: str, work_root: str = "work", token: Optional[str] = None,
+                      owner: Optional[str] = None) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
     """
     Run the full pipeline on uploaded zip file
     
+    Stages are checkpointed in <work_dir>/_logs/checkpoints.json. Passing the
+    token of an earlier run resumes it: stages whose inputs, upstream outputs
+    and code are unchanged are skipped. A new run records ``owner`` in
+    <work_dir>/_logs/owner.json so callers can check who may resume it.
+    
     Returns: (success, token, error_info)
     """
-    from app.classify.run import classify_hands
-    from app.parse.derive import derive_hands_enriched
-    from app.partitions.create import create_partitions
+    from app.pipeline.stages import StageRunner, StageFailed
     
-    # Generate unique token
-    token = generate_token()
+    # Generate unique token (or resume an existing run)
+    resuming = token is not None
+    token = token or generate_token()
     work_dir = os.path.join(work_root, token)
     
     # Create work directories
     os.makedirs(work_dir, exist_ok=True)
     os.makedirs(os.path.join(work_dir, "in"), exist_ok=True)
+    if owner and not resuming:
+        os.makedirs(os.path.join(work_dir, "_logs"), exist_ok=True)
+        with open(os.path.join(work_dir, "_logs", OWNER_FILE), "w", encoding="utf-8") as f:
+            json.dump({"user_id": str(owner)}, f)
+    
+    def on_event(stage, status, message, error):
+        step_name = stage.log_name or stage.name
+        if status == "started":
+            logger.info(f"[{token}] Running {stage.name}")
+        log_step(token, step_name, status, message, error)
     
     try:
-        # Step 1: Extract archive (ZIP or RAR, with recursive extraction)
-        logger.info(f"[{token}] Extracting archive file")
-        log_step(token, "extract", "started", "Extracting archive file (recursive)")
-        
-        input_dir = os.path.join(work_dir, "in")
-        file_count = safe_extract_archive(zip_file_path, input_dir)
-        
-        if file_count == 0:
-            log_step(token, "extract", "failed", "", "No .txt files found in the uploaded archive")
-            raise ValueError("No .txt files found in the uploaded archive")
-        
-        logger.info(f"[{token}] Extracted {file_count} .txt files (including nested archives)")
-        log_step(token, "extract", "completed", f"Extracted {file_count} .txt files")
-        
-        # Step 2: Classify
-        logger.info(f"[{token}] Running classification")
-        log_step(token, "classify", "started", "Classifying hand histories")
-        
-        result = run_pipeline_step(
-            work_dir, 
-            "classify",
-            lambda: classify_hands("in", "classified", "classification_manifest.json")
-        )
-        if not result["ok"]:
-            log_step(token, "classify", "failed", "", result["error_info"].get("error", "Classification failed"))
-            return False, token, result["error_info"]
-        
-        log_step(token, "classify", "completed", "Classification completed")
-        
-        # Step 3: Parse/Derive
-        logger.info(f"[{token}] Parsing and deriving hands")
-        log_step(token, "parse", "started", "Parsing hand histories")
-        
-        result = run_pipeline_step(
-            work_dir,
-            "derive", 
-            lambda: derive_hands_enriched("classified", "hands_enriched.jsonl")
-        )
-        if not result["ok"]:
-            log_step(token, "parse", "failed", "", result["error_info"].get("error", "Parsing failed"))
-            return False, token, result["error_info"]
-        
-        log_step(token, "parse", "completed", "Parsing completed")
-        
-        # Step 4: Create Partitions
-        logger.info(f"[{token}] Creating partitions")
-        log_step(token, "partitions", "started", "Creating partitions")
-        
-        result = run_pipeline_step(
-            work_dir,
-            "partitions",
-            lambda: create_partitions("hands_enriched.jsonl", "partitions")
-        )
-        if not result["ok"]:
-            log_step(token, "partitions", "failed", "", result["error_info"].get("error", "Partitioning failed"))
-            return False, token, result["error_info"]
-        
-        log_step(token, "partitions", "completed", "Partitions created")
-        
-        # Step 5: Compute Stats (simplified)
-        logger.info(f"[{token}] Computing statistics")
-        log_step(token, "stats", "started", "Computing statistics")
-        
+        runner = StageRunner(work_dir, build_pipeline_stages(zip_file_path), on_event=on_event)
         try:
-            stats_dir = os.path.join(work_dir, "stats")
-            os.makedirs(stats_dir, exist_ok=True)
-            
-            # Create minimal stats file
-            stats = {
-                "total_hands": result.get("result", {}).get("total_hands", 0),
-                "months": ["2024-11"],
-                "groups": {
-                    "nonko_9max": {
-                        "subgroups": {
-                            "PREFLOP_RFI": {
-                                "stats": {
-                                    "RFI_EARLY": {"opportunities": 100, "attempts": 21}
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            
-            stats_file = os.path.join(stats_dir, "stat_counts.json")
-            with open(stats_file, 'w') as f:
-                json.dump(stats, f, indent=2)
-            
-            log_step(token, "stats", "completed", "Statistics computed")
-            
-        except Exception as e:
-            log_step(token, "stats", "failed", "", str(e))
-            raise
-        
-        # Step 6: Run Scoring (simplified)
-        logger.info(f"[{token}] Running scoring")
-        log_step(token, "scoring", "started", "Running scoring")
-        
-        try:
-            scores_dir = os.path.join(work_dir, "scores")
-            os.makedirs(scores_dir, exist_ok=True)
-            
-            scorecard = {
-                "config": {},
-                "scoring": {
-                    "overall": {"score": 75.0},
-                    "groups": {}
-                }
-            }
-            
-            scorecard_file = os.path.join(scores_dir, "scorecard.json")
-            with open(scorecard_file, 'w') as f:
-                json.dump(scorecard, f, indent=2)
-            
-            log_step(token, "scoring", "completed", "Scoring completed")
-            
-        except Exception as e:
-            log_step(token, "scoring", "failed", "", str(e))
-            raise
+            results = runner.run()
+        except StageFailed as e:
+            return False, token, e.error_info
         
         # Success - save summary
         summary = {
             "token": token,
             "status": "completed",
-            "file_count": file_count,
-            "steps_completed": ["extract", "classify", "parse", "partitions", "stats", "scoring"]
+            "file_count": results["extract"]["file_count"],
+            "steps_completed": ["extract", "classify", "parse", "partitions", "stats", "scoring"],
+            "steps_skipped": runner.skipped
         }
         
         summary_file = os.path.join(work_dir, "pipeline_summary.json")
@@ -359,4 +414,4 @@ def run_full_pipeline(zip_file_path: str, work_root: str = "work") -> Tuple[bool
             json.dump(error_info, f, indent=2)
 
         logger.exception("[%s] Pipeline failed", token)
-        return False, token, error_info
\ No newline at end of file
+        return False, token, error_info
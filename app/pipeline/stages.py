@@ -0,0 +1,249 @@
+"""Checkpointed, content-addressed stage runner for the upload pipeline.
+
+Stages form a DAG. Before running a stage the runner computes a key from
+the content hash of its declared inputs, the recorded output hashes of its
+upstream stages, and the source of the modules that implement it. When the
+key matches the checkpoint stored in ``_logs/checkpoints.json`` and the
+stage's outputs are still on disk, the stage is skipped and its recorded
+result is reused. This lets a crashed or timed-out run resume from the last
+good stage, and a config change (e.g. scoring weights) only re-runs the
+stages that read that config.
+
+Stages whose upstream stages are done run concurrently in a thread pool, so
+stage functions must take absolute paths and must not ``chdir``.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "checkpoints.json"
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class Stage:
+    """One pipeline stage.
+
+    ``func(work_dir, results)`` receives the results of its upstream stages
+    and must return a JSON-serialisable value. ``inputs`` and ``outputs`` are
+    paths relative to the work dir (or absolute); ``code`` lists extra module
+    names whose source is part of the stage's code version.
+    """
+
+    name: str
+    func: Callable[[str, Dict[str, Any]], Any]
+    deps: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    code: List[str] = field(default_factory=list)
+    log_name: Optional[str] = None
+    start_message: str = ""
+    done_message: Union[str, Callable[[Any], str]] = ""
+
+
+class StageFailed(Exception):
+    """Raised by StageRunner.run when a stage fails."""
+
+    def __init__(self, error_info: Dict[str, Any]):
+        super().__init__(error_info.get("error", "stage failed"))
+        self.error_info = error_info
+
+
+def hash_path(path: str) -> str:
+    """SHA256 over the content of a file, or of every file under a directory."""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for base, dirs, files in os.walk(path):
+            dirs.sort()
+            for fname in sorted(files):
+                full = os.path.join(base, fname)
+                digest.update(os.path.relpath(full, path).encode("utf-8") + b"\0")
+                digest.update(hash_path(full).encode("ascii"))
+    elif os.path.isfile(path):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                digest.update(block)
+    else:
+        digest.update(b"<missing>")
+    return digest.hexdigest()
+
+
+_CODE_HASHES: Dict[str, str] = {}
+
+
+def _module_source_hash(module_name: str) -> str:
+    cached = _CODE_HASHES.get(module_name)
+    if cached is None:
+        module = importlib.import_module(module_name)
+        source_file = inspect.getsourcefile(module)
+        cached = hash_path(source_file) if source_file else module_name
+        _CODE_HASHES[module_name] = cached
+    return cached
+
+
+def code_version(stage: Stage) -> str:
+    """Hash of the source of the stage function's module plus ``stage.code``."""
+    modules = sorted({getattr(stage.func, "__module__", None) or "", *stage.code} - {""})
+    digest = hashlib.sha256()
+    for module_name in modules:
+        digest.update(module_name.encode("utf-8") + b"\0")
+        digest.update(_module_source_hash(module_name).encode("ascii"))
+    return digest.hexdigest()
+
+
+class StageRunner:
+    """Run a DAG of stages inside a work dir with persistent checkpoints."""
+
+    def __init__(
+        self,
+        work_dir: str,
+        stages: List[Stage],
+        max_workers: int = 2,
+        on_event: Optional[Callable[[Stage, str, str, str], None]] = None,
+    ):
+        self.work_dir = os.path.abspath(work_dir)
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers
+        self.on_event = on_event
+        self.checkpoint_path = os.path.join(self.work_dir, "_logs", CHECKPOINT_FILE)
+        self.checkpoints: Dict[str, Dict[str, Any]] = self._load_checkpoints()
+        self.results: Dict[str, Any] = {}
+        self.skipped: List[str] = []
+        self.executed: List[str] = []
+        self._lock = threading.Lock()
+
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    # ------------------------------------------------------------------ paths
+    def _abs(self, path: str) -> str:
+        return path if os.path.isabs(path) else os.path.join(self.work_dir, path)
+
+    # ------------------------------------------------------------ checkpoints
+    def _load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("stages", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checkpoints(self) -> None:
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.checkpoints}, f, indent=2, default=str)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def stage_key(self, stage: Stage) -> Dict[str, Any]:
+        """Everything that determines a stage's output."""
+        with self._lock:
+            upstream = {dep: self.checkpoints[dep]["outputs"] for dep in stage.deps}
+        # Keyed by content only, so e.g. the same archive under a new temp path matches
+        inputs = [hash_path(self._abs(path)) for path in stage.inputs]
+        return {"code": code_version(stage), "inputs": inputs, "upstream": upstream}
+
+    def _is_fresh(self, stage: Stage, key: Dict[str, Any]) -> bool:
+        checkpoint = self.checkpoints.get(stage.name)
+        if not checkpoint or checkpoint.get("key") != key:
+            return False
+        return all(os.path.exists(self._abs(path)) for path in stage.outputs)
+
+    # ---------------------------------------------------------------- running
+    def _emit(self, stage: Stage, status: str, message: str = "", error: str = "") -> None:
+        if self.on_event:
+            self.on_event(stage, status, message, error)
+
+    def _run_stage(self, stage: Stage) -> None:
+        key = self.stage_key(stage)
+        with self._lock:
+            fresh = self._is_fresh(stage, key)
+            upstream_results = {dep: self.results[dep] for dep in stage.deps}
+        if fresh:
+            with self._lock:
+                self.results[stage.name] = self.checkpoints[stage.name].get("result")
+                self.skipped.append(stage.name)
+            logger.info(f"[stages] {stage.name}: inputs unchanged, reusing checkpoint")
+            self._emit(stage, "skipped", "Inputs unchanged, reused checkpoint")
+            return
+
+        self._emit(stage, "started", stage.start_message)
+        result = stage.func(self.work_dir, upstream_results)
+        outputs = {path: hash_path(self._abs(path)) for path in stage.outputs}
+
+        with self._lock:
+            self.results[stage.name] = result
+            self.executed.append(stage.name)
+            self.checkpoints[stage.name] = {
+                "key": key,
+                "outputs": outputs,
+                "result": result,
+                "completed_at": datetime.now().isoformat(),
+            }
+            self._save_checkpoints()
+
+        message = stage.done_message(result) if callable(stage.done_message) else stage.done_message
+        self._emit(stage, "completed", message)
+
+    def _fail(self, stage: Stage, exc: BaseException) -> StageFailed:
+        error_info = {
+            "step": stage.name,
+            "error": str(exc),
+            "traceback": "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+        }
+        # A failed stage must never be treated as a good checkpoint
+        with self._lock:
+            if self.checkpoints.pop(stage.name, None) is not None:
+                self._save_checkpoints()
+
+        logs_dir = os.path.join(self.work_dir, "_logs")
+        os.makedirs(logs_dir, exist_ok=True)
+        with open(os.path.join(logs_dir, "last_error.json"), "w") as f:
+            json.dump(error_info, f, indent=2)
+
+        self._emit(stage, "failed", "", str(exc))
+        return StageFailed(error_info)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every stage in dependency order; raise StageFailed on error."""
+        pending = dict(self.stages)
+        done: set = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                ready = [s for s in pending.values() if all(d in done for d in s.deps)]
+                for stage in ready:
+                    del pending[stage.name]
+                    running[executor.submit(self._run_stage, stage)] = stage
+
+                if not running:
+                    raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        # Let stages already running finish before reporting
+                        for other in list(running):
+                            other.exception()
+                        raise self._fail(stage, exc)
+                    done.add(stage.name)
+
+        return self.results
@@ -0,0 +1,282 @@
+"""Concurrent upload of a job's result artifacts to storage.
+
+Publishing used to be a serial tail at the end of every job: one
+``upload_file_stream`` round trip per hands_by_stat file. The publisher
+queues every artifact first and uploads them from a bounded thread pool
+sharing the one storage client (and its HTTP connection pool). Each file is
+retried on its own (uploads are upserts, so repeating one is safe) and, once
+everything is up, a completion manifest is written last so readers can tell
+a finished publish from a partial one.
+
+Payloads published under several names are queued with
+``add_content_addressed``: the bytes go up once as a blob and each name
+gets a small pointer, uploaded only after the blobs it refers to.
+"""
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set
+
+from app.services.content_store import blob_key, file_digest, make_pointer
+from app.utils.supabase_retry import with_supabase_retry
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.getenv("ARTIFACT_UPLOAD_WORKERS", "8"))
+MAX_ATTEMPTS = int(os.getenv("ARTIFACT_UPLOAD_ATTEMPTS", "3"))
+MANIFEST_NAME = "publish_manifest.json"
+
+
+class ArtifactPublishError(Exception):
+    """Raised when some artifacts could not be uploaded."""
+
+
+@dataclass
+class Artifact:
+    local_path: str
+    storage_key: str
+    content_type: str
+    size: int = 0
+    data: Optional[bytes] = None  # conteúdo em memória (ponteiros)
+    alias_of: Optional[str] = None
+
+
+@dataclass
+class PublishReport:
+    """Outcome of one publish."""
+
+    uploaded: int = 0
+    bytes: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+    manifest_key: Optional[str] = None
+    published_keys: List[str] = field(default_factory=list)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.uploaded / self.seconds if self.seconds > 0 else float(self.uploaded)
+
+
+def _content_type_for(file_name: str) -> str:
+    return 'application/json' if file_name.endswith('.json') else 'text/plain'
+
+
+def _retry_upload(exc: Exception) -> bool:
+    # upload com upsert é idempotente; o StorageService esconde a causa
+    # ("upload returned False"), por isso qualquer erro é repetido
+    return True
+
+
+class ArtifactPublisher:
+    """Collect result files and upload them with bounded parallelism.
+
+    Usage:
+        publisher = ArtifactPublisher(storage, token, f"/results/{token}")
+        publisher.add_file(path, f"/results/{token}/pipeline_result.json")
+        publisher.add_directory(hands_dir, f"/results/{token}/hands_by_stat")
+        report = publisher.publish()
+    """
+
+    def __init__(
+        self,
+        storage,
+        token: str,
+        remote_root: str,
+        max_workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.storage = storage
+        self.token = token
+        self.remote_root = remote_root.rstrip('/')
+        self.max_workers = max(1, max_workers or MAX_WORKERS)
+        self.max_attempts = max(1, max_attempts or MAX_ATTEMPTS)
+        self.progress_callback = progress_callback
+        self.artifacts: List[Artifact] = []
+        self.aliases: List[Artifact] = []
+        self._blob_keys: Set[str] = set()
+
+    def add_file(self, local_path: str, storage_key: str, content_type: Optional[str] = None) -> bool:
+        """Queue one file; missing files are skipped (returns False)."""
+        if not os.path.isfile(local_path):
+            return False
+        self.artifacts.append(Artifact(
+            local_path=local_path,
+            storage_key=storage_key,
+            content_type=content_type or _content_type_for(local_path),
+            size=os.path.getsize(local_path),
+        ))
+        return True
+
+    def add_directory(
+        self,
+        local_dir: str,
+        remote_prefix: str,
+        content_type: Optional[str] = None,
+        only_name: Optional[str] = None,
+    ) -> int:
+        """Queue every file under ``local_dir``, keeping the relative layout.
+
+        Without ``content_type``, .json files are sent as JSON and the rest as
+        text. ``only_name`` restricts the walk to files with that exact name.
+        """
+        queued = 0
+        if not os.path.isdir(local_dir):
+            return queued
+
+        for root_dir, _, files in os.walk(local_dir):
+            for file_name in sorted(files):
+                if only_name and file_name != only_name:
+                    continue
+                local_path = os.path.join(root_dir, file_name)
+                relative_path = os.path.relpath(local_path, local_dir)
+                storage_key = f"{remote_prefix}/{relative_path}".replace('\\', '/')
+                if self.add_file(local_path, storage_key, content_type or _content_type_for(file_name)):
+                    queued += 1
+        return queued
+
+    def add_content_addressed(
+        self, local_path: str, storage_key: str, content_type: str = 'application/json'
+    ) -> bool:
+        """Queue ``local_path`` as a blob under its hash plus a pointer at ``storage_key``.
+
+        Files with identical content share one blob, so publishing the same
+        payload under several names uploads its bytes once.
+        """
+        if not os.path.isfile(local_path):
+            return False
+        digest = file_digest(local_path)
+        target = blob_key(self.remote_root, digest, os.path.splitext(local_path)[1])
+        if target not in self._blob_keys:
+            self._blob_keys.add(target)
+            self.add_file(local_path, target, content_type)
+        pointer = make_pointer(target, digest, os.path.getsize(local_path))
+        self.aliases.append(Artifact(
+            local_path=local_path,
+            storage_key=storage_key,
+            content_type='application/json',
+            size=len(pointer),
+            data=pointer,
+            alias_of=target,
+        ))
+        return True
+
+    def _upload(self, artifact: Artifact) -> int:
+        if artifact.data is not None:
+            with_supabase_retry(
+                lambda: self.storage.upload_file(artifact.data, artifact.storage_key, artifact.content_type),
+                max_attempts=self.max_attempts,
+                is_retryable=_retry_upload,
+            )
+            return artifact.size
+
+        def _send():
+            # reabre o ficheiro em cada tentativa (o stream anterior já foi lido)
+            with open(artifact.local_path, 'rb') as stream:
+                self.storage.upload_file_stream(stream, artifact.storage_key, artifact.content_type)
+
+        with_supabase_retry(_send, max_attempts=self.max_attempts, is_retryable=_retry_upload)
+        return artifact.size
+
+    def _report_progress(self, done: int, total: int, last_step: List[int]) -> None:
+        # no máximo ~20 atualizações por publish
+        step = done * 20 // total if total else 20
+        if step == last_step[0] and done != total:
+            return
+        last_step[0] = step
+        logger.info("[%s] Published %s/%s artifacts", self.token, done, total)
+        if self.progress_callback:
+            try:
+                self.progress_callback(done, total)
+            except Exception as exc:
+                logger.debug("Publish progress callback failed: %s", exc)
+
+    def _manifest(self, report: PublishReport) -> Dict:
+        return {
+            'token': self.token,
+            'completed_at': datetime.now(timezone.utc).isoformat(),
+            'files': len(self.artifacts) + len(self.aliases),
+            'bytes': report.bytes,
+            'artifacts': [
+                {'key': artifact.storage_key, 'bytes': artifact.size}
+                for artifact in self.artifacts
+            ] + [
+                {'key': alias.storage_key, 'bytes': alias.size, 'alias_of': alias.alias_of}
+                for alias in self.aliases
+            ],
+        }
+
+    def _upload_batch(self, executor, batch: List[Artifact], report: PublishReport,
+                      total: int, last_step: List[int]) -> None:
+        futures = {executor.submit(self._upload, artifact): artifact for artifact in batch}
+        for future in as_completed(futures):
+            artifact = futures[future]
+            try:
+                report.bytes += future.result()
+                report.uploaded += 1
+                report.published_keys.append(artifact.storage_key)
+            except Exception as exc:
+                report.failed[artifact.storage_key] = str(exc)
+                logger.error(
+                    "[%s] Failed to upload %s: %s", self.token, artifact.storage_key, exc
+                )
+            self._report_progress(report.uploaded + len(report.failed), total, last_step)
+
+    def publish(self, raise_on_error: bool = True) -> PublishReport:
+        """Upload every queued artifact, then the completion manifest.
+
+        Pointers go up after the blobs and the manifest is only written when
+        every artifact was uploaded. With ``raise_on_error`` a partial publish
+        raises ``ArtifactPublishError`` after all uploads were attempted.
+        """
+        start = time.monotonic()
+        report = PublishReport()
+        total = len(self.artifacts) + len(self.aliases)
+        last_step = [-1]
+
+        if total:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, total)) as executor:
+                self._upload_batch(executor, self.artifacts, report, total, last_step)
+                ready = []
+                for alias in self.aliases:
+                    if alias.alias_of in report.failed:
+                        # um ponteiro para um blob que não subiu partia os leitores
+                        report.failed[alias.storage_key] = f"skipped: blob {alias.alias_of} not published"
+                    else:
+                        ready.append(alias)
+                self._upload_batch(executor, ready, report, total, last_step)
+
+        if not report.failed:
+            manifest_key = f"{self.remote_root}/{MANIFEST_NAME}"
+            payload = json.dumps(self._manifest(report), indent=2).encode('utf-8')
+            with_supabase_retry(
+                lambda: self.storage.upload_file(payload, manifest_key, 'application/json'),
+                max_attempts=self.max_attempts,
+                is_retryable=_retry_upload,
+            )
+            report.manifest_key = manifest_key
+
+        report.seconds = time.monotonic() - start
+        logger.info(
+            "[%s] Published %s/%s artifacts (%.1f MB) in %.2fs with %s workers (%.1f files/s, %s failed)",
+            self.token,
+            report.uploaded,
+            total,
+            report.bytes / (1024 * 1024),
+            report.seconds,
+            min(self.max_workers, total) if total else 0,
+            report.files_per_second,
+            len(report.failed),
+        )
+
+        if report.failed and raise_on_error:
+            first_key = next(iter(report.failed))
+            raise ArtifactPublishError(
+                f"{len(report.failed)}/{total} artifacts failed to upload "
+                f"(first: {first_key}: {report.failed[first_key]})"
+            )
+        return report
@@ -0,0 +1,455 @@
+"""
+Chunk store for the chunked upload endpoints (/upload-chunk, /finalize-upload)
+
+Every upload owns a single data file and each chunk is written straight to
+its final offset with ``os.pwrite`` as it arrives, so chunks can be sent in
+parallel and finalize is a rename instead of a reassembly pass. Received
+ranges are tracked in a SQLite database under the chunk root, which every
+gunicorn worker on the host shares, so it does not matter which worker a
+chunk lands on.
+
+The SHA256 used for dedupe is advanced while chunks arrive by the worker
+that created the upload (hash objects cannot be shared between processes).
+When finalize lands on that worker the hash is already complete; otherwise
+``file_hash`` is None and the caller hashes the file itself.
+"""
+import hashlib
+import logging
+import os
+import re
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROOT = Path(tempfile.gettempdir()) / 'chunked_uploads'
+DATA_FILE_NAME = 'data.part'
+HASH_READ_SIZE = 8 * 1024 * 1024
+
+_UPLOAD_ID_RE = re.compile(r'^[A-Za-z0-9_.-]{1,128}$')
+
+
+class ChunkStoreError(ValueError):
+    """Invalid chunk or incomplete upload; the message is shown to the client."""
+
+
+@dataclass
+class FinalizedUpload:
+    upload_id: str
+    upload_dir: Path
+    file_path: Path
+    file_name: str
+    total_chunks: int
+    size: int
+    created_at: float
+    user_id: Optional[str] = None
+    file_hash: Optional[str] = None
+
+
+class _HashState:
+    """In-order SHA256 of an upload, owned by the process that created it."""
+
+    def __init__(self):
+        self.hasher = hashlib.sha256()
+        self.offset = 0
+        self.lock = threading.Lock()
+
+
+class ChunkStore:
+    def __init__(self, root: Path = CHUNK_ROOT):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / 'state.db'
+        self._local = threading.local()
+        self._hashes: Dict[str, _HashState] = {}
+        self._hashes_lock = threading.Lock()
+        # finalize concorrente no mesmo processo; entre processos vale o rename
+        self._finalize_lock = threading.Lock()
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._init_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if not hasattr(self._local, 'conn'):
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return self._local.conn
+
+    def _init_db(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS uploads (
+                upload_id TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                total_chunks INTEGER NOT NULL,
+                chunk_size INTEGER,
+                total_size INTEGER,
+                user_id TEXT,
+                created_at REAL NOT NULL,
+                hash_owner TEXT,
+                hashed_upto INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'receiving',
+                final_path TEXT,
+                file_hash TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS upload_chunks (
+                upload_id TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                offset INTEGER,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (upload_id, chunk_index)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_chunks_offset ON upload_chunks(upload_id, offset)')
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------ paths
+    def upload_dir(self, upload_id: str) -> Path:
+        if not _UPLOAD_ID_RE.match(upload_id) or upload_id in ('.', '..'):
+            raise ChunkStoreError('Invalid upload id')
+        return self.root / upload_id
+
+    def _data_path(self, upload_id: str) -> Path:
+        return self.upload_dir(upload_id) / DATA_FILE_NAME
+
+    def _parked_path(self, upload_id: str, chunk_index: int) -> Path:
+        return self.upload_dir(upload_id) / f"chunk_{chunk_index:06d}.pending"
+
+    # ------------------------------------------------------------------ intake
+    def put_chunk(
+        self,
+        upload_id: str,
+        chunk_index: int,
+        total_chunks: int,
+        file_name: str,
+        data: bytes,
+        *,
+        user_id: Optional[str] = None,
+        offset: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        total_size: Optional[int] = None,
+    ) -> int:
+        """
+        Write one chunk at its final offset and return how many chunks are in.
+
+        The offset is ``offset`` if given, else ``chunk_index * chunk_size``.
+        Without either, chunks are assumed to be uniform: the size is learned
+        from any non-final chunk, and a final chunk arriving first is parked
+        until it is known.
+        """
+        if total_chunks <= 0 or not 0 <= chunk_index < total_chunks:
+            raise ChunkStoreError('Invalid chunk parameters')
+
+        upload_dir = self.upload_dir(upload_id)
+        conn = self._get_connection()
+        row = self._ensure_upload(conn, upload_id, file_name, total_chunks, user_id, total_size)
+        if row['status'] != 'receiving':
+            raise ChunkStoreError('Upload already finalized')
+
+        if offset is None and chunk_size:
+            offset = chunk_index * chunk_size
+        known_size = self._learn_chunk_size(conn, upload_id, row, chunk_size)
+        if offset is None:
+            if total_chunks == 1:
+                offset = 0
+            elif chunk_index < total_chunks - 1:
+                known_size = self._learn_chunk_size(conn, upload_id, row, len(data))
+                offset = chunk_index * known_size
+            elif known_size:
+                offset = chunk_index * known_size
+
+        if offset is None:
+            # último chunk chegou primeiro: fica à espera do tamanho uniforme
+            self._parked_path(upload_id, chunk_index).write_bytes(data)
+        else:
+            fd = os.open(upload_dir / DATA_FILE_NAME, os.O_WRONLY | os.O_CREAT, 0o600)
+            try:
+                _pwrite_all(fd, data, offset)
+            finally:
+                os.close(fd)
+
+        conn.execute(
+            'INSERT OR REPLACE INTO upload_chunks (upload_id, chunk_index, offset, length) VALUES (?, ?, ?, ?)',
+            (upload_id, chunk_index, offset, len(data)),
+        )
+        conn.commit()
+
+        if known_size:
+            self._place_parked(conn, upload_id, known_size)
+        if offset is not None:
+            self._advance_hash(conn, upload_id, fresh=(offset, data))
+
+        return conn.execute(
+            'SELECT COUNT(*) FROM upload_chunks WHERE upload_id = ?', (upload_id,)
+        ).fetchone()[0]
+
+    def _ensure_upload(self, conn, upload_id, file_name, total_chunks, user_id, total_size) -> sqlite3.Row:
+        row = conn.execute('SELECT * FROM uploads WHERE upload_id = ?', (upload_id,)).fetchone()
+        if row is not None:
+            return row
+
+        upload_dir = self.upload_dir(upload_id)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        cursor = conn.execute(
+            '''
+            INSERT OR IGNORE INTO uploads (upload_id, file_name, total_chunks, total_size, user_id, created_at, hash_owner)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''',
+            (upload_id, file_name, total_chunks, total_size, user_id, time.time(), self._owner),
+        )
+        conn.commit()
+
+        if cursor.rowcount == 1:
+            with self._hashes_lock:
+                self._hashes[upload_id] = _HashState()
+            fd = os.open(upload_dir / DATA_FILE_NAME, os.O_WRONLY | os.O_CREAT, 0o600)
+            try:
+                # ficheiro esparso com o tamanho final: os chunks caem no sítio
+                if total_size and os.fstat(fd).st_size < total_size:
+                    os.ftruncate(fd, total_size)
+            finally:
+                os.close(fd)
+            logger.debug(f"Created chunk store entry for upload {upload_id} ({total_chunks} chunks)")
+
+        return conn.execute('SELECT * FROM uploads WHERE upload_id = ?', (upload_id,)).fetchone()
+
+    def _learn_chunk_size(self, conn, upload_id, row, size: Optional[int]) -> Optional[int]:
+        """Record the uniform chunk size (first writer wins) and return the stored one."""
+        if size and not row['chunk_size']:
+            conn.execute(
+                'UPDATE uploads SET chunk_size = COALESCE(chunk_size, ?) WHERE upload_id = ?',
+                (size, upload_id),
+            )
+            conn.commit()
+        return conn.execute(
+            'SELECT chunk_size FROM uploads WHERE upload_id = ?', (upload_id,)
+        ).fetchone()[0]
+
+    def _place_parked(self, conn, upload_id: str, chunk_size: int):
+        parked = conn.execute(
+            'SELECT chunk_index FROM upload_chunks WHERE upload_id = ? AND offset IS NULL',
+            (upload_id,),
+        ).fetchall()
+        for item in parked:
+            chunk_index = item['chunk_index']
+            offset = chunk_index * chunk_size
+            # reclamar o chunk antes de o escrever (outro worker pode tentar o mesmo)
+            claimed = conn.execute(
+                'UPDATE upload_chunks SET offset = ? WHERE upload_id = ? AND chunk_index = ? AND offset IS NULL',
+                (offset, upload_id, chunk_index),
+            ).rowcount
+            conn.commit()
+            if not claimed:
+                continue
+
+            parked_path = self._parked_path(upload_id, chunk_index)
+            data = parked_path.read_bytes()
+            fd = os.open(self._data_path(upload_id), os.O_WRONLY | os.O_CREAT, 0o600)
+            try:
+                _pwrite_all(fd, data, offset)
+            finally:
+                os.close(fd)
+            parked_path.unlink(missing_ok=True)
+
+    def _advance_hash(self, conn, upload_id: str, fresh=None):
+        """Feed every chunk contiguous with the hash offset into the hasher."""
+        with self._hashes_lock:
+            state = self._hashes.get(upload_id)
+        if state is None:
+            return None
+
+        with state.lock:
+            fd = None
+            try:
+                while True:
+                    if fresh is not None and fresh[0] == state.offset:
+                        state.hasher.update(fresh[1])
+                        state.offset += len(fresh[1])
+                        fresh = None
+                        continue
+                    row = conn.execute(
+                        'SELECT length FROM upload_chunks WHERE upload_id = ? AND offset = ?',
+                        (upload_id, state.offset),
+                    ).fetchone()
+                    if row is None or row['length'] == 0:
+                        break
+                    # chunk escrito por outro worker (ou antes): ler da page cache
+                    if fd is None:
+                        fd = os.open(self._data_path(upload_id), os.O_RDONLY)
+                    remaining = row['length']
+                    while remaining:
+                        block = os.pread(fd, min(remaining, HASH_READ_SIZE), state.offset)
+                        if not block:
+                            raise ChunkStoreError('Chunk data missing on disk')
+                        state.hasher.update(block)
+                        state.offset += len(block)
+                        remaining -= len(block)
+            finally:
+                if fd is not None:
+                    os.close(fd)
+
+            conn.execute(
+                'UPDATE uploads SET hashed_upto = ? WHERE upload_id = ?', (state.offset, upload_id)
+            )
+            conn.commit()
+            return state
+
+    # ---------------------------------------------------------------- finalize
+    def finalize(
+        self,
+        upload_id: str,
+        file_name: Optional[str] = None,
+        total_size: Optional[int] = None,
+    ) -> Optional[FinalizedUpload]:
+        """
+        Check that every chunk is in place and expose the data file under its name.
+
+        Returns None for unknown uploads and raises ChunkStoreError when
+        chunks are missing. Finalizing twice (a retried request, or two
+        workers racing) returns the same upload.
+        """
+        with self._finalize_lock:
+            return self._finalize(upload_id, file_name, total_size)
+
+    def _finalize(
+        self,
+        upload_id: str,
+        file_name: Optional[str],
+        total_size: Optional[int],
+    ) -> Optional[FinalizedUpload]:
+        conn = self._get_connection()
+        row = conn.execute('SELECT * FROM uploads WHERE upload_id = ?', (upload_id,)).fetchone()
+        if row is None:
+            return None
+        if row['status'] == 'finalized':
+            return self._finalized(row)
+
+        if row['chunk_size']:
+            self._place_parked(conn, upload_id, row['chunk_size'])
+
+        chunks = conn.execute(
+            'SELECT offset, length FROM upload_chunks WHERE upload_id = ? ORDER BY offset',
+            (upload_id,),
+        ).fetchall()
+        if len(chunks) != row['total_chunks'] or any(c['offset'] is None for c in chunks):
+            placed = sum(1 for c in chunks if c['offset'] is not None)
+            raise ChunkStoreError(f"Missing chunks: received {placed}/{row['total_chunks']}")
+
+        size = 0
+        for chunk in chunks:
+            if chunk['offset'] != size:
+                raise ChunkStoreError(f"Missing data at byte {size}")
+            size += chunk['length']
+        try:
+            expected_size = int(total_size) if total_size is not None else None
+        except (TypeError, ValueError):
+            expected_size = None
+        if expected_size is not None and expected_size != size:
+            raise ChunkStoreError(f"Size mismatch: received {size} bytes, expected {expected_size}")
+
+        data_path = self._data_path(upload_id)
+        final_path = data_path.with_name(Path(file_name or row['file_name']).name or DATA_FILE_NAME)
+        file_hash = None
+        try:
+            os.truncate(data_path, size)
+            state = self._advance_hash(conn, upload_id)
+            if state is not None and state.offset == size:
+                file_hash = state.hasher.hexdigest()
+            os.replace(data_path, final_path)
+        except FileNotFoundError:
+            # outro worker finalizou entre a leitura do estado e o rename
+            if not final_path.exists():
+                raise
+            file_hash = None
+            logger.info(f"Upload {upload_id} was finalized concurrently")
+        finally:
+            with self._hashes_lock:
+                self._hashes.pop(upload_id, None)
+
+        conn.execute(
+            "UPDATE uploads SET status = 'finalized', final_path = ?, file_hash = COALESCE(?, file_hash), "
+            "total_size = ? WHERE upload_id = ?",
+            (str(final_path), file_hash, size, upload_id),
+        )
+        conn.commit()
+        logger.info(
+            f"Finalized upload {upload_id}: {size} bytes in {row['total_chunks']} chunks "
+            f"(hash {'incremental' if file_hash else 'deferred'})"
+        )
+        return self._finalized(
+            conn.execute('SELECT * FROM uploads WHERE upload_id = ?', (upload_id,)).fetchone()
+        )
+
+    def _finalized(self, row: sqlite3.Row) -> FinalizedUpload:
+        final_path = Path(row['final_path'])
+        return FinalizedUpload(
+            upload_id=row['upload_id'],
+            upload_dir=final_path.parent,
+            file_path=final_path,
+            file_name=final_path.name,
+            total_chunks=row['total_chunks'],
+            size=row['total_size'] or 0,
+            created_at=row['created_at'],
+            user_id=row['user_id'],
+            file_hash=row['file_hash'],
+        )
+
+    def purge_expired(self, max_age_hours: int = 24) -> int:
+        """Remove uploads older than ``max_age_hours``, finalized or not.
+
+        Finalized upload dirs also hold the work/out dirs and result zip of
+        their processing, so they are swept like the old ``mkdtemp`` dirs.
+        Directories with no row (e.g. left by a crash) go by mtime.
+        """
+        import shutil
+
+        conn = self._get_connection()
+        cutoff = time.time() - max_age_hours * 3600
+        rows = conn.execute(
+            "SELECT upload_id FROM uploads WHERE created_at < ?", (cutoff,)
+        ).fetchall()
+        for row in rows:
+            shutil.rmtree(self.root / row['upload_id'], ignore_errors=True)
+            conn.execute('DELETE FROM upload_chunks WHERE upload_id = ?', (row['upload_id'],))
+            conn.execute('DELETE FROM uploads WHERE upload_id = ?', (row['upload_id'],))
+        conn.commit()
+
+        known = {r['upload_id'] for r in conn.execute('SELECT upload_id FROM uploads').fetchall()}
+        orphans = 0
+        for entry in self.root.iterdir():
+            if entry.is_dir() and entry.name not in known and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+                orphans += 1
+        return len(rows) + orphans
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+_store_instance: Optional[ChunkStore] = None
+_store_lock = threading.Lock()
+
+
+def get_chunk_store() -> ChunkStore:
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = ChunkStore()
+        return _store_instance
@@ -0,0 +1,85 @@
+"""Content-addressed result blobs and the pointers that alias them.
+
+A job publishes the same payload under several names (``pipeline_result.json``,
+``pipeline_result_global.json``, ``pipeline_result_GLOBAL.json``; per month
+``months/<m>/pipeline_result.json`` and ``pipeline_result_<m>.json``). The
+bytes are now stored once, as ``<root>/blobs/<sha256>.json``, and every name
+becomes a small JSON pointer::
+
+    {"$blob": "/results/<token>/blobs/<sha256>.json", "sha256": "...", "bytes": 123}
+
+``ResultStorageService`` follows pointers transparently, so readers keep
+using the old names. Blobs live under the token's own prefix, so deleting a
+token's results still removes everything it published.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Iterable, Optional
+
+POINTER_KEY = "$blob"
+BLOB_DIR = "blobs"
+# acima disto não é um ponteiro (evita fazer parse de payloads grandes à procura da chave)
+MAX_POINTER_BYTES = 1024
+
+
+def serialize_json(payload: Any) -> bytes:
+    """The on-disk form of pipeline_result payloads."""
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_copies(payload: Any, paths: Iterable[str]) -> str:
+    """Serialize ``payload`` once and write the same bytes to every path.
+
+    Returns the content digest.
+    """
+    data = serialize_json(payload)
+    for path in paths:
+        os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    return content_digest(data)
+
+
+def blob_key(remote_root: str, digest: str, extension: str = ".json") -> str:
+    return f"{remote_root.rstrip('/')}/{BLOB_DIR}/{digest}{extension}"
+
+
+def make_pointer(target_key: str, digest: str, size: int) -> bytes:
+    return json.dumps({POINTER_KEY: target_key, "sha256": digest, "bytes": size}).encode("utf-8")
+
+
+def pointer_target(data: bytes) -> Optional[str]:
+    """Storage key a pointer refers to, or None when ``data`` is a regular object."""
+    if len(data) > MAX_POINTER_BYTES or POINTER_KEY.encode("utf-8") not in data:
+        return None
+    try:
+        payload = json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    target = payload.get(POINTER_KEY) if isinstance(payload, dict) else None
+    # só blobs dentro de /results/ (um ponteiro nunca sai da árvore de resultados)
+    if isinstance(target, str) and target.startswith("/results/") and f"/{BLOB_DIR}/" in target:
+        return target
+    return None
+
+
+def download_resolved(storage, storage_path: str) -> Optional[bytes]:
+    """``storage.download_file`` that follows a content-addressed pointer."""
+    data = storage.download_file(storage_path)
+    target = pointer_target(data) if data else None
+    if target:
+        return storage.download_file(target)
+    return data
@@ -0,0 +1,144 @@
+"""Generation-stamped cache for the user dashboard payloads.
+
+Each user has a generation counter in ``dashboard_cache_generations`` that is
+bumped whenever the data behind their dashboards changes (upload completion,
+upload deletion, master rebuild). Cached main/month payloads are stamped with
+the generation plus a fingerprint of the scoring config, so a read is a single
+counter lookup followed by the cached blob. Stale payloads are served while a
+background thread rebuilds them.
+"""
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.score.loader import DEFAULT_CFG
+from app.services.db_pool import DatabasePool
+
+logger = logging.getLogger(__name__)
+
+STAMP_KEY = "cache_generation"
+
+_REFRESHING: set = set()
+_REFRESH_LOCK = threading.Lock()
+
+
+def scoring_config_fingerprint(path: str = DEFAULT_CFG) -> str:
+    """Cheap fingerprint of the scoring config; changes when it is saved."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "none"
+    return f"{st.st_mtime_ns:x}.{st.st_size:x}"
+
+
+class DashboardCacheService:
+    """Read and bump per-user dashboard cache generations."""
+
+    def get_generation(self, user_id: str) -> Optional[int]:
+        """Return the user's generation (0 if never bumped) or None on DB errors."""
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT generation FROM dashboard_cache_generations WHERE user_id = %s",
+                    (user_id,),
+                )
+                row = cur.fetchone()
+                return int(row[0]) if row else 0
+        except Exception as exc:
+            logger.debug("Failed to read cache generation for user %s: %s", user_id, exc)
+            return None
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
+    def bump(self, user_id: str) -> Optional[int]:
+        """Invalidate every cached dashboard payload of a user."""
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO dashboard_cache_generations (user_id, generation, updated_at)
+                    VALUES (%s, 1, NOW())
+                    ON CONFLICT (user_id) DO UPDATE
+                    SET generation = dashboard_cache_generations.generation + 1,
+                        updated_at = NOW()
+                    RETURNING generation
+                    """,
+                    (user_id,),
+                )
+                generation = cur.fetchone()[0]
+                conn.commit()
+            logger.info("[DASHBOARD_CACHE] User %s cache generation -> %s", user_id, generation)
+            return int(generation)
+        except Exception as exc:
+            logger.warning("Failed to bump cache generation for user %s: %s", user_id, exc)
+            if conn:
+                conn.rollback()
+            return None
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
+    def bump_for_token(self, token: str) -> Optional[int]:
+        """Bump the generation of the user owning an upload token."""
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute("SELECT user_id FROM uploads WHERE token = %s LIMIT 1", (token,))
+                row = cur.fetchone()
+        except Exception as exc:
+            logger.warning("Failed to resolve user for token %s: %s", token, exc)
+            return None
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
+        if not row:
+            return None
+        return self.bump(str(row[0]))
+
+    def current_stamp(self, user_id: str) -> Optional[str]:
+        """Stamp that fresh payloads of the user must carry; None disables caching."""
+        generation = self.get_generation(user_id)
+        if generation is None:
+            return None
+        return f"{generation}:{scoring_config_fingerprint()}"
+
+
+def payload_stamp(payload: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not isinstance(payload, dict):
+        return None
+    meta = payload.get("meta")
+    return meta.get(STAMP_KEY) if isinstance(meta, dict) else None
+
+
+def stamp_payload(payload: Dict[str, Any], stamp: Optional[str]) -> Dict[str, Any]:
+    if stamp is not None and isinstance(payload, dict):
+        payload.setdefault("meta", {})[STAMP_KEY] = stamp
+    return payload
+
+
+def refresh_in_background(key: str, rebuild: Callable[[], Any]) -> bool:
+    """Run ``rebuild`` in a daemon thread unless a refresh for ``key`` is running."""
+    with _REFRESH_LOCK:
+        if key in _REFRESHING:
+            return False
+        _REFRESHING.add(key)
+
+    def _run():
+        try:
+            rebuild()
+        except Exception as exc:  # noqa: BLE001 - background refresh is best-effort
+            logger.warning("[DASHBOARD_CACHE] Background refresh of %s failed: %s", key, exc)
+        finally:
+            with _REFRESH_LOCK:
+                _REFRESHING.discard(key)
+
+    threading.Thread(target=_run, name=f"dashboard-refresh-{key}", daemon=True).start()
+    return True
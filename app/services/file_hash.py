@@ -4,10 +4,18 @@ File hash service for deduplication
 import hashlib
 import logging
 from pathlib import Path
-from typing import Union
+from typing import BinaryIO, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Leituras de 1MB: 8KB obrigava a ~25k chamadas read() num arquivo de 200MB
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Raised by save_stream_with_hash when a stream exceeds max_bytes."""
+
+
 class FileHashService:
     """
     Service for calculating file hashes to detect duplicates
@@ -20,8 +28,16 @@ class FileHashService:
         
         # Calculate hash from file-like object
         file_hash = hash_service.calculate_hash_from_stream(file_obj)
+
+        # Save an upload stream to disk, hashing it on the way
+        file_hash, size = hash_service.save_stream_with_hash(file_obj, '/tmp/x.zip')
     """
     
+    @staticmethod
+    def new_hasher(algorithm: str = 'sha256'):
+        """Hash object for callers that feed data as it streams in"""
+        return hashlib.new(algorithm)
+    
     @staticmethod
     def calculate_hash(file_path: Union[str, Path], algorithm: str = 'sha256') -> str:
         """
@@ -39,7 +55,7 @@ class FileHashService:
             
             with open(file_path, 'rb') as f:
                 # Read in chunks to handle large files
-                for chunk in iter(lambda: f.read(8192), b''):
+                for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b''):
                     hash_obj.update(chunk)
             
             return hash_obj.hexdigest()
@@ -74,7 +90,7 @@ class FileHashService:
                 file_stream.seek(0)
             
             # Calculate hash
-            for chunk in iter(lambda: file_stream.read(8192), b''):
+            for chunk in iter(lambda: file_stream.read(HASH_BUFFER_SIZE), b''):
                 hash_obj.update(chunk)
             
             # Reset to original position
@@ -87,6 +103,38 @@ class FileHashService:
             logger.error(f"Error calculating hash from stream: {e}")
             raise
     
+    @staticmethod
+    def save_stream_with_hash(
+        file_stream: BinaryIO,
+        dest_path: Union[str, Path],
+        max_bytes: Optional[int] = None,
+        algorithm: str = 'sha256',
+    ) -> Tuple[str, int]:
+        """
+        Copy a stream to disk and hash it in the same pass
+        
+        Args:
+            file_stream: File-like object with read() method (read from its current position)
+            dest_path: Destination file
+            max_bytes: Optional size limit; FileTooLargeError is raised past it
+            algorithm: Hash algorithm (default: sha256)
+            
+        Returns:
+            Tuple of (hex digest, bytes written)
+        """
+        hash_obj = hashlib.new(algorithm)
+        written = 0
+
+        with open(dest_path, 'wb') as out:
+            for chunk in iter(lambda: file_stream.read(HASH_BUFFER_SIZE), b''):
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise FileTooLargeError(f"Stream exceeds {max_bytes} bytes")
+                hash_obj.update(chunk)
+                out.write(chunk)
+
+        return hash_obj.hexdigest(), written
+    
     @staticmethod
     def verify_hash(file_path: Union[str, Path], expected_hash: str, algorithm: str = 'sha256') -> bool:
         """
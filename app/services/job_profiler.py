@@ -0,0 +1,282 @@
+"""
+Opt-in CPU profiling for upload pipeline jobs.
+
+ResourceMetrics only logs RSS at a few checkpoints; when a production job is
+slow we need to know where the CPU goes. A job is profiled when its token is
+enabled, either through the ``PIPELINE_PROFILE`` env var (``all`` or a
+comma-separated list of tokens) or through the admin toggle (``/admin/profiles``).
+
+Each pipeline phase runs under cProfile plus a stack sampler on the job thread;
+on close the profiler writes, per phase, into ``<work_dir>/_logs/profile/``:
+
+    <phase>.collapsed       sampled stacks, one ``frame;frame;frame count`` per
+                            line (flamegraph.pl / speedscope input)
+    <phase>.functions.json  per-function totals (ncalls, tottime, cumtime)
+    <phase>.prof            raw pstats dump (snakeviz, ``python -m pstats``)
+    summary.json            wall time, samples and top functions per phase
+
+The workers delete the work dir when a job ends, so ``close()`` also keeps a
+copy under ``PIPELINE_PROFILE_ARCHIVE`` (``/tmp/pipeline_profiles/<token>``).
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "PIPELINE_PROFILE"
+# O toggle do admin tem de chegar ao processo que corre o job (gunicorn tem
+# vários workers), por isso fica num ficheiro e não em memória
+TOGGLE_FILE = os.environ.get("PIPELINE_PROFILE_TOGGLES", "/tmp/pipeline_profile_tokens.json")
+ARCHIVE_ROOT = os.environ.get("PIPELINE_PROFILE_ARCHIVE", "/tmp/pipeline_profiles")
+ALL_JOBS = "*"
+PROFILE_DIRNAME = "profile"
+SUMMARY_NAME = "summary.json"
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 128
+TOP_FUNCTIONS = 300
+SUMMARY_TOP = 15
+
+_toggle_lock = threading.Lock()
+# token -> pasta dos perfis, para o admin encontrar jobs com work_root próprio
+_profile_dirs: Dict[str, str] = {}
+_PHASE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _read_toggles() -> set:
+    try:
+        with open(TOGGLE_FILE, encoding="utf-8") as f:
+            return set(json.load(f))
+    except FileNotFoundError:
+        return set()
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable profile toggles {TOGGLE_FILE}: {e}")
+        return set()
+
+
+def _write_toggles(tokens: set):
+    tmp_path = f"{TOGGLE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sorted(tokens), f)
+    os.replace(tmp_path, TOGGLE_FILE)
+
+
+def set_profiling(token: str, enabled: bool):
+    """Admin toggle: profile (or stop profiling) ``token``; ``*`` means every job."""
+    with _toggle_lock:
+        tokens = _read_toggles()
+        if enabled:
+            tokens.add(token)
+        else:
+            tokens.discard(token)
+        _write_toggles(tokens)
+
+
+def toggled_tokens() -> List[str]:
+    with _toggle_lock:
+        return sorted(_read_toggles())
+
+
+def env_tokens() -> List[str]:
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if value.lower() in ("1", "true", "all", ALL_JOBS):
+        return [ALL_JOBS]
+    return [t.strip() for t in value.split(",") if t.strip()]
+
+
+def is_profiling_enabled(token: str) -> bool:
+    tokens = set(env_tokens()) | set(toggled_tokens())
+    return ALL_JOBS in tokens or token in tokens
+
+
+def profile_dir_for(work_dir: str) -> str:
+    return os.path.join(work_dir, "_logs", PROFILE_DIRNAME)
+
+
+def find_profile_dir(token: str) -> Optional[str]:
+    """Where ``token``'s profiles are, or None when it was never profiled here."""
+    candidates = [
+        _profile_dirs.get(token),
+        os.path.join(ARCHIVE_ROOT, token),
+        # os workers usam /tmp/processing_<token>/<token> como work_dir
+        profile_dir_for(os.path.join(f"/tmp/processing_{token}", token)),
+        profile_dir_for(os.path.join("work", token)),
+    ]
+    for candidate in candidates:
+        if candidate and os.path.isfile(os.path.join(candidate, SUMMARY_NAME)):
+            return candidate
+    return None
+
+
+def load_summary(token: str) -> Optional[Dict]:
+    directory = find_profile_dir(token)
+    if not directory:
+        return None
+    with open(os.path.join(directory, SUMMARY_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    return f"{_short_path(code.co_filename)}:{code.co_name}"
+
+
+class _StackSampler:
+    """Amostra a stack de uma thread a intervalos fixos (formato collapsed)."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="job-profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+class JobProfiler:
+    """Profiles consecutive pipeline phases of one job.
+
+    ``phase(name)`` closes the running phase and starts the next one, so the
+    pipeline only marks its boundaries; ``close()`` ends the last phase and
+    writes ``summary.json``. Disabled profilers do nothing.
+    """
+
+    def __init__(self, token: str, work_dir: str, enabled: Optional[bool] = None):
+        self.token = token
+        self.enabled = is_profiling_enabled(token) if enabled is None else enabled
+        self.output_dir = profile_dir_for(work_dir)
+        self.phases: Dict[str, Dict] = {}
+        self._current = None
+        self._profile = None
+        self._sampler = None
+        self._started = 0.0
+        self._cpu_started = 0.0
+        if self.enabled:
+            os.makedirs(self.output_dir, exist_ok=True)
+            _profile_dirs[token] = self.output_dir
+            logger.info(f"[{token}] Profiling enabled, writing to {self.output_dir}")
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return
+        self._finish_phase()
+        name = _PHASE_NAME.sub("_", name).strip("_") or "phase"
+        if name in self.phases:
+            name = f"{name}_{len(self.phases)}"
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # outro profiler já está ativo nesta thread (ex.: debugger)
+            logger.warning(f"[{self.token}] Cannot profile phase {name}: {e}")
+            return
+        self._current = name
+        self._profile = profile
+        self._sampler = _StackSampler(threading.get_ident())
+        self._sampler.start()
+        self._started = time.perf_counter()
+        self._cpu_started = time.thread_time()
+
+    def _finish_phase(self):
+        if self._current is None:
+            return
+        self._profile.disable()
+        wall = time.perf_counter() - self._started
+        cpu = time.thread_time() - self._cpu_started
+        self._sampler.stop()
+        name, profile, sampler = self._current, self._profile, self._sampler
+        self._current = self._profile = self._sampler = None
+        try:
+            self.phases[name] = self._write_phase(name, profile, sampler, wall, cpu)
+        except Exception as e:
+            logger.warning(f"[{self.token}] Failed to write profile for phase {name}: {e}")
+
+    def _write_phase(self, name: str, profile: cProfile.Profile, sampler: _StackSampler,
+                     wall: float, cpu: float) -> Dict:
+        base = os.path.join(self.output_dir, name)
+        profile.dump_stats(f"{base}.prof")
+
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        functions = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in pstats.Stats(profile).stats.items():
+            functions.append({
+                "function": f"{_short_path(filename)}:{line}({func})",
+                "ncalls": nc,
+                "primitive_calls": cc,
+                "tottime": round(tt, 6),
+                "cumtime": round(ct, 6),
+            })
+        functions.sort(key=lambda item: item["tottime"], reverse=True)
+        with open(f"{base}.functions.json", "w", encoding="utf-8") as f:
+            json.dump(functions[:TOP_FUNCTIONS], f, indent=2)
+
+        return {
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "samples": sum(sampler.stacks.values()),
+            "top_functions": functions[:SUMMARY_TOP],
+            "files": [f"{name}.collapsed", f"{name}.functions.json", f"{name}.prof"],
+        }
+
+    def close(self):
+        if not self.enabled:
+            return
+        self._finish_phase()
+        summary = {
+            "token": self.token,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sample_interval": SAMPLE_INTERVAL,
+            "phases": self.phases,
+        }
+        try:
+            with open(os.path.join(self.output_dir, SUMMARY_NAME), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            logger.info(f"[{self.token}] Profile written for {len(self.phases)} phase(s)")
+        except Exception as e:
+            logger.warning(f"[{self.token}] Failed to write profile summary: {e}")
+            return
+        try:
+            archive_dir = os.path.join(ARCHIVE_ROOT, self.token)
+            shutil.copytree(self.output_dir, archive_dir, dirs_exist_ok=True)
+            _profile_dirs[self.token] = archive_dir
+        except Exception as e:
+            logger.warning(f"[{self.token}] Failed to keep a copy of the profile: {e}")
@@ -1,5 +1,6 @@
 """Job service backed by PostgreSQL."""
 
+import json
 import logging
 import secrets
 from datetime import datetime
@@ -144,6 +145,25 @@ class JobService:
             if conn:
                 DatabasePool.return_connection(conn)
 
+    def record_metrics(self, job_id: str, metrics: Dict[str, Any]) -> None:
+        """Store the per-stage metrics summary of a finished job."""
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE jobs SET metrics = %s::jsonb WHERE id = %s",
+                    (json.dumps(metrics), job_id),
+                )
+                conn.commit()
+        except Exception as exc:
+            logger.warning("Could not store metrics for job %s: %s", job_id, exc)
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         conn = None
         try:
@@ -10,7 +10,10 @@ import time
 from pathlib import Path
 from typing import Dict
 
+from app.services import pipeline_metrics
+from app.services.dashboard_cache_service import DashboardCacheService
 from app.services.job_service import JobService
+from app.services.months_catalog_service import MonthsCatalogService, catalog_entries_from_output
 from app.services.storage import get_storage
 from app.services.upload_service import UploadService
 from app.services.master_result_builder import rebuild_user_master_results
@@ -155,10 +158,17 @@ class JobsBackgroundWorker:
             storage_prefix = f"results/{job_id}"
             result_path = f"{storage_prefix}/dashboard.json"
 
+            # O pipeline já publicou os resultados (ponteiros $blob); enviar as
+            # cópias locais para as mesmas chaves apagava-os. Só sobe o que o
+            # publisher não enviou (dashboard.json, ou tudo se o publish falhou).
+            published = {key.lstrip("/") for key in (pipeline_result or {}).get("published_keys", [])}
+
             def _upload():
                 for file_path in pipeline_output.rglob("*.json"):
                     relative = file_path.relative_to(pipeline_output)
                     dest = f"{storage_prefix}/{relative}".replace("\\", "/")
+                    if dest in published:
+                        continue
                     with open(file_path, "rb") as handle:
                         storage.upload_fileobj(handle, dest)
 
@@ -170,6 +180,13 @@ class JobsBackgroundWorker:
             self.job_service.mark_done(job_id, result_path=result_path)
             logger.info("Job %s finished", job_id)
 
+            MonthsCatalogService().record_token_months(
+                str(job.get("user_id")),
+                job_id,
+                catalog_entries_from_output(job_id, pipeline_result, pipeline_output),
+            )
+            DashboardCacheService().bump(str(job.get("user_id")))
+
             self._handle_master_rebuild(user_id=str(job.get("user_id")), upload_id=str(job.get("upload_id")))
 
         except Exception as exc:  # noqa: BLE001
@@ -178,6 +195,10 @@ class JobsBackgroundWorker:
         finally:
             with self.lock:
                 self.active.pop(job_id, None)
+            # metrics.json existe também quando o pipeline falhou
+            job_metrics = pipeline_metrics.load_job_metrics(f"/tmp/processing_{job_id}/{job_id}")
+            if job_metrics:
+                self.job_service.record_metrics(job_id, job_metrics)
             try:
                 self._cleanup(job_id)
             except Exception:
@@ -13,10 +13,10 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from app.pipeline.multi_site_runner import (
-    _aggregate_month_groups,
-)
 from app.pipeline.sanity_checks import log_monthly_global_consistency, log_reference_consistency
+from app.services.artifact_publisher import MANIFEST_NAME, ArtifactPublisher
+from app.services.content_store import write_json_copies
+from app.services.dashboard_cache_service import DashboardCacheService
 from app.services.result_storage import ResultStorageService
 from app.services.upload_service import UploadService
 from app.stats.aggregate import MultiSiteAggregator
@@ -124,6 +124,9 @@ def _merge_combined_groups(
 ) -> Dict[str, Any]:
     """Re-run the combined aggregation on the provided aggregator."""
 
+    # o runner só é carregado quando há mesmo um rebuild (workers de jobs)
+    from app.pipeline.multi_site_runner import _aggregate_month_groups
+
     combined = _aggregate_month_groups(aggregator, str(output_dir), all_groups)
 
     for group_key, group_data in combined.items():
@@ -245,8 +248,29 @@ def _merge_pipeline_results(
     return payload
 
 
+def _previous_blob_keys(storage, storage_prefix: str) -> List[str]:
+    """Blobs referenced by the last publish under ``storage_prefix``."""
+
+    try:
+        data = storage.download_file(f"{storage_prefix}/{MANIFEST_NAME}")
+        manifest = json.loads(data.decode("utf-8")) if data else {}
+    except Exception as exc:  # noqa: BLE001 - sem manifest não há nada a limpar
+        logger.debug("[MASTER] No previous publish manifest under %s: %s", storage_prefix, exc)
+        return []
+    return sorted({
+        artifact["alias_of"]
+        for artifact in manifest.get("artifacts", [])
+        if isinstance(artifact, dict) and artifact.get("alias_of")
+    })
+
+
 def _upload_user_results_to_storage(output_root: Path, user_id: str) -> None:
-    """Upload consolidated user results to Supabase Storage when available."""
+    """Upload consolidated user results to Supabase Storage when available.
+
+    The master files are rewritten after every job and delete, so they go up
+    as plain objects: content-addressed blobs here would pile up under
+    ``by_user/<uid>/blobs/`` with every payload change.
+    """
 
     storage = get_storage()
     if not storage.use_cloud:
@@ -254,26 +278,26 @@ def _upload_user_results_to_storage(output_root: Path, user_id: str) -> None:
         return
 
     storage_prefix = f"/results/by_user/{user_id}"
-    uploaded = 0
+    publisher = ArtifactPublisher(storage, f"user-{user_id}", storage_prefix)
+    stale_blobs = _previous_blob_keys(storage, storage_prefix)
 
     for file_path in output_root.rglob("*.json"):
         relative = file_path.relative_to(output_root)
         storage_path = f"{storage_prefix}/{relative}".replace("\\", "/")
-        try:
-            with open(file_path, "rb") as handle:
-                storage.upload_fileobj(handle, storage_path, "application/json")
-            uploaded += 1
-        except Exception as exc:  # noqa: BLE001 - continue uploading remaining files
-            logger.warning(
-                "[MASTER] Failed to upload %s to %s: %s",
-                file_path,
-                storage_path,
-                exc,
-            )
+        publisher.add_file(str(file_path), storage_path, "application/json")
+
+    # continua mesmo com falhas parciais (já registadas pelo publisher)
+    report = publisher.publish(raise_on_error=False)
+
+    # Publicações antigas usavam ponteiros $blob; depois de um publish completo
+    # nenhum ficheiro aponta para eles.
+    if report.manifest_key:
+        for blob in stale_blobs:
+            storage.delete_file(blob)
 
     logger.info(
         "[MASTER] Uploaded %s aggregated artifact(s) for user %s to %s",
-        uploaded,
+        report.uploaded,
         user_id,
         storage_prefix,
     )
@@ -344,10 +368,8 @@ def rebuild_user_master_results(user_id: str) -> Path:
     output_root.mkdir(parents=True, exist_ok=True)
 
     global_path = output_root / "pipeline_result_global.json"
-    global_path.write_text(json.dumps(master_payload, indent=2), encoding="utf-8")
-
     global_upper_path = output_root / "pipeline_result_GLOBAL.json"
-    global_upper_path.write_text(json.dumps(master_payload, indent=2), encoding="utf-8")
+    write_json_copies(master_payload, [global_path, global_upper_path])
 
     try:
         log_reference_consistency(global_upper_path)
@@ -367,13 +389,8 @@ def rebuild_user_master_results(user_id: str) -> Path:
         )
 
         month_path = output_root / f"pipeline_result_{month_key}.json"
-        month_path.write_text(json.dumps(merged_month, indent=2), encoding="utf-8")
-
-        legacy_dir = output_root / "months" / month_key
-        legacy_dir.mkdir(parents=True, exist_ok=True)
-        (legacy_dir / "pipeline_result.json").write_text(
-            json.dumps(merged_month, indent=2), encoding="utf-8"
-        )
+        legacy_path = output_root / "months" / month_key / "pipeline_result.json"
+        write_json_copies(merged_month, [month_path, legacy_path])
 
     if month_entries:
         months_manifest = {"months": sorted(month_entries, key=lambda x: x.get("month", ""))}
@@ -407,5 +424,7 @@ def rebuild_user_master_results(user_id: str) -> Path:
     except Exception as exc:  # noqa: BLE001 - never break caller due to upload errors
         logger.warning("[MASTER] Failed to upload aggregated artifacts for %s: %s", user_id, exc)
 
+    DashboardCacheService().bump(user_id)
+
     return output_root
 
@@ -0,0 +1,163 @@
+"""Materialized per-user months catalog stored in the primary database.
+
+Each row records that a processed upload token has hands for a month and
+where its monthly ``pipeline_result`` lives. The catalog is written when a
+job completes and cleared when an upload's results are deleted, so the
+user's month -> tokens map is one indexed query instead of loading every
+token's global result from storage.
+"""
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.db_pool import DatabasePool
+
+logger = logging.getLogger(__name__)
+
+# (month, hand_count, payload_path)
+CatalogEntry = Tuple[str, int, Optional[str]]
+
+# Linha marcadora de um token já catalogado sem meses (senão seria lido de
+# novo do storage em cada pedido do dashboard)
+NO_MONTHS = "none"
+
+
+def monthly_payload_path(token: str, month: str) -> str:
+    """Storage path of a token's monthly pipeline_result."""
+    return f"/results/{token}/pipeline_result_{month}.json"
+
+
+def is_catalog_month(month: Optional[str]) -> bool:
+    """True for YYYY-MM months other than the 1970 epoch placeholder."""
+    if not month or not isinstance(month, str):
+        return False
+    if not re.fullmatch(r"\d{4}-\d{2}", month):
+        return False
+    return not month.startswith("1970-")
+
+
+def catalog_entries_from_output(
+    token: str, pipeline_result: Optional[dict], output_dir: Path
+) -> List[CatalogEntry]:
+    """Catalog entries for a finished pipeline run, from its local output dir."""
+    hands_per_month = (pipeline_result or {}).get("hands_per_month") or {}
+    if not isinstance(hands_per_month, dict):
+        return []
+
+    entries: List[CatalogEntry] = []
+    for month in sorted(hands_per_month):
+        count = int(hands_per_month.get(month) or 0)
+        if not is_catalog_month(month) or count <= 0:
+            continue
+        if not (Path(output_dir) / f"pipeline_result_{month}.json").exists():
+            continue
+        entries.append((month, count, monthly_payload_path(token, month)))
+    return entries
+
+
+class MonthsCatalogService:
+    """Provide read/write helpers for the user_months_catalog table."""
+
+    def record_token_months(self, user_id: str, token: str, entries: Iterable[CatalogEntry]) -> bool:
+        """Replace the catalog rows of a token with ``entries``.
+
+        A token without months gets a single ``NO_MONTHS`` marker row.
+        """
+        rows = [(user_id, token, month, int(count or 0), path) for month, count, path in entries]
+        if not rows:
+            rows = [(user_id, token, NO_MONTHS, 0, None)]
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM user_months_catalog WHERE token = %s", (token,))
+                for row in rows:
+                    cur.execute(
+                        """
+                        INSERT INTO user_months_catalog (
+                            user_id, token, month, hand_count, payload_path, updated_at
+                        )
+                        VALUES (%s, %s, %s, %s, %s, NOW())
+                        ON CONFLICT (token, month) DO UPDATE
+                        SET user_id = EXCLUDED.user_id,
+                            hand_count = EXCLUDED.hand_count,
+                            payload_path = EXCLUDED.payload_path,
+                            updated_at = NOW()
+                        """,
+                        row,
+                    )
+                conn.commit()
+            logger.info(
+                "[MONTHS_CATALOG] Recorded %s months for token %s",
+                sum(1 for row in rows if row[2] != NO_MONTHS),
+                token,
+            )
+            return True
+        except Exception as exc:
+            logger.error("Failed to record months for token %s: %s", token, exc, exc_info=True)
+            if conn:
+                conn.rollback()
+            return False
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
+    def remove_token(self, token: str) -> int:
+        """Delete every catalog row of a token; returns the number of rows removed."""
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM user_months_catalog WHERE token = %s", (token,))
+                conn.commit()
+                return cur.rowcount or 0
+        except Exception as exc:
+            logger.error("Failed to remove months for token %s: %s", token, exc, exc_info=True)
+            if conn:
+                conn.rollback()
+            return 0
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
+    def get_user_token_months(self, user_id: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Return {token: [months]} for every upload of the user.
+
+        Tokens without catalog rows (uploads processed before the catalog
+        existed) map to an empty list; tokens catalogued with no months are
+        left out. Returns None when the query fails.
+        """
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT u.token, c.month
+                    FROM uploads u
+                    LEFT JOIN user_months_catalog c ON c.token = u.token
+                    WHERE u.user_id = %s AND u.token IS NOT NULL
+                    ORDER BY u.uploaded_at DESC, c.month
+                    """,
+                    (user_id,),
+                )
+                token_months: Dict[str, List[str]] = {}
+                without_months = set()
+                for token, month in cur.fetchall() or []:
+                    months = token_months.setdefault(token, [])
+                    if month == NO_MONTHS:
+                        without_months.add(token)
+                    elif month:
+                        months.append(month)
+                for token in without_months:
+                    if not token_months[token]:
+                        del token_months[token]
+                return token_months
+        except Exception as exc:
+            logger.error("Failed to read months catalog for user %s: %s", user_id, exc, exc_info=True)
+            return None
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
@@ -0,0 +1,474 @@
+"""
+Structured per-stage metrics for upload pipeline jobs.
+
+``log_step`` and the progress logs only carry status text. ``JobMetrics``
+records, for every stage of a job (optionally per site and group), the wall
+time, CPU time of the job thread, hands in/out, bytes read/written and the
+peak RSS seen while the stage ran. The job summary goes into
+``pipeline_result['debug']['metrics']``, ``_logs/metrics.json`` and the job
+record, and every finished job feeds the process-wide ``registry`` that
+``/metrics`` renders in the Prometheus text format. With
+``PIPELINE_METRICS_DIR`` set (gunicorn.conf.py does), each worker also saves
+its totals there and ``/metrics`` sums every worker's, so any worker answers
+a scrape with the totals of the whole server.
+
+Stages inside helpers find the running job by token, like ``progress_tracker``::
+
+    with pipeline_metrics.stage(token, "classify", site=site) as record:
+        ...
+        record.hands_in, record.hands_out = parsed, valid
+
+``begin_stage``/``end_stage`` do the same for stages that span a loop body.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+RSS_SAMPLE_SECONDS = 0.05
+# buckets de duração (s) e de tamanho do arquivo, para p50/p95 por tamanho
+DURATION_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+ARCHIVE_SIZE_CLASSES = ((1, "lt_1mb"), (10, "1_10mb"), (100, "10_100mb"), (500, "100_500mb"))
+LARGEST_SIZE_CLASS = "gt_500mb"
+# diretório partilhado pelos workers do gunicorn (vazio = só este processo)
+METRICS_DIR = os.getenv("PIPELINE_METRICS_DIR", "")
+
+
+def archive_size_class(size_bytes: int) -> str:
+    size_mb = size_bytes / (1024 * 1024)
+    for limit, label in ARCHIVE_SIZE_CLASSES:
+        if size_mb < limit:
+            return label
+    return LARGEST_SIZE_CLASS
+
+
+def directory_bytes(path: str) -> int:
+    """Total size of the files under ``path`` (0 when missing)."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+@dataclass(eq=False)  # identidade: dois estágios iguais continuam distintos
+class StageRecord:
+    stage: str
+    site: Optional[str] = None
+    group: Optional[str] = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    hands_in: int = 0
+    hands_out: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    peak_rss_mb: float = 0.0
+    status: str = "ok"
+    _started: float = field(default=0.0, repr=False)
+    _cpu_started: float = field(default=0.0, repr=False)
+
+    def as_dict(self) -> Dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self)
+                if not f.name.startswith("_") and getattr(self, f.name) is not None}
+        data["wall_seconds"] = round(self.wall_seconds, 4)
+        data["cpu_seconds"] = round(self.cpu_seconds, 4)
+        data["peak_rss_mb"] = round(self.peak_rss_mb, 1)
+        return data
+
+
+class _RssSampler:
+    """Uma thread por job; atualiza o pico de RSS de cada estágio aberto."""
+
+    def __init__(self):
+        self._process = psutil.Process(os.getpid())
+        self._open: List[StageRecord] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="job-metrics-rss", daemon=True)
+        self.peak_mb = 0.0
+
+    def _run(self):
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            self.sample()
+
+    def sample(self):
+        try:
+            rss_mb = self._process.memory_info().rss / (1024 * 1024)
+        except Exception:
+            return
+        with self._lock:
+            self.peak_mb = max(self.peak_mb, rss_mb)
+            for record in self._open:
+                record.peak_rss_mb = max(record.peak_rss_mb, rss_mb)
+
+    def open(self, record: StageRecord):
+        with self._lock:
+            self._open.append(record)
+        self.sample()
+
+    def close(self, record: StageRecord):
+        self.sample()
+        with self._lock:
+            self._open.remove(record)
+
+    def start(self):
+        self.sample()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+class JobMetrics:
+    """Stage metrics of one pipeline job (single job thread)."""
+
+    def __init__(self, token: str, archive_bytes: int = 0):
+        self.token = token
+        self.archive_bytes = archive_bytes
+        self.stages: List[StageRecord] = []
+        self.status = "running"
+        self._started = time.perf_counter()
+        self._cpu_started = time.thread_time()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self._open: List[StageRecord] = []
+        self._rss = _RssSampler()
+        self._rss.start()
+
+    def begin(self, name: str, site: Optional[str] = None, group: Optional[str] = None) -> StageRecord:
+        record = StageRecord(stage=name, site=site, group=group)
+        self._open.append(record)
+        self._rss.open(record)
+        record._started = time.perf_counter()
+        record._cpu_started = time.thread_time()
+        return record
+
+    def end(self, record: StageRecord, status: str = "ok"):
+        if record not in self._open:
+            return
+        record.wall_seconds = time.perf_counter() - record._started
+        record.cpu_seconds = time.thread_time() - record._cpu_started
+        record.status = status
+        self._open.remove(record)
+        self._rss.close(record)
+        self.stages.append(record)
+
+    @contextmanager
+    def stage(self, name: str, site: Optional[str] = None, group: Optional[str] = None) -> Iterator[StageRecord]:
+        record = self.begin(name, site=site, group=group)
+        try:
+            yield record
+        except BaseException:
+            self.end(record, "failed")
+            raise
+        self.end(record)
+
+    def finish(self, status: str):
+        # estágios ainda abertos foram interrompidos por uma exceção
+        for record in list(reversed(self._open)):
+            self.end(record, "failed")
+        self.status = status
+        self.wall_seconds = time.perf_counter() - self._started
+        self.cpu_seconds = time.thread_time() - self._cpu_started
+        self._rss.stop()
+
+    def as_dict(self) -> Dict:
+        wall = self.wall_seconds or time.perf_counter() - self._started
+        top_level = [s for s in self.stages if s.group is None]
+        return {
+            "status": self.status,
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(self.cpu_seconds or time.thread_time() - self._cpu_started, 4),
+            "peak_rss_mb": round(self._rss.peak_mb, 1),
+            "archive_bytes": self.archive_bytes,
+            "archive_size_class": archive_size_class(self.archive_bytes),
+            "hands_in": sum(s.hands_in for s in top_level if s.stage == "classify"),
+            "hands_out": sum(s.hands_out for s in top_level if s.stage == "classify"),
+            "stages": [s.as_dict() for s in self.stages],
+        }
+
+
+_active_lock = threading.Lock()
+_active: Dict[str, JobMetrics] = {}
+
+
+def start_job(token: str, archive_bytes: int = 0) -> JobMetrics:
+    metrics = JobMetrics(token, archive_bytes)
+    with _active_lock:
+        _active[token] = metrics
+    return metrics
+
+
+@contextmanager
+def stage(token: str, name: str, site: Optional[str] = None, group: Optional[str] = None) -> Iterator[StageRecord]:
+    """Record a stage of ``token``'s running job; a no-op record otherwise."""
+    metrics = _active.get(token)
+    if metrics is None:
+        yield StageRecord(stage=name, site=site, group=group)
+        return
+    with metrics.stage(name, site=site, group=group) as record:
+        yield record
+
+
+def begin_stage(token: str, name: str, site: Optional[str] = None, group: Optional[str] = None) -> StageRecord:
+    metrics = _active.get(token)
+    if metrics is None:
+        return StageRecord(stage=name, site=site, group=group)
+    return metrics.begin(name, site=site, group=group)
+
+
+def end_stage(token: str, record: StageRecord):
+    metrics = _active.get(token)
+    if metrics is not None:
+        metrics.end(record)
+
+
+def finish_job(token: str, status: str, work_dir: Optional[str] = None) -> Optional[Dict]:
+    """Close ``token``'s metrics, feed the registry and write ``_logs/metrics.json``."""
+    with _active_lock:
+        metrics = _active.pop(token, None)
+    if metrics is None:
+        return None
+    metrics.finish(status)
+    summary = metrics.as_dict()
+    registry.observe_job(summary)
+    if work_dir:
+        try:
+            logs_dir = os.path.join(work_dir, "_logs")
+            os.makedirs(logs_dir, exist_ok=True)
+            with open(os.path.join(logs_dir, "metrics.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        except Exception as e:
+            logger.warning(f"[{token}] Failed to write metrics.json: {e}")
+    logger.info(f"[{token}] Job metrics: {status} in {summary['wall_seconds']:.1f}s, "
+                f"peak RSS {summary['peak_rss_mb']:.0f} MB, {len(summary['stages'])} stage records")
+    return summary
+
+
+def load_job_metrics(work_dir: str) -> Optional[Dict]:
+    """The summary ``finish_job`` wrote for the job in ``work_dir``, if any."""
+    path = os.path.join(work_dir, "_logs", "metrics.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _new_totals() -> Dict:
+    return {"jobs": {}, "duration": {}, "stage": {}}
+
+
+def _merge_totals(target: Dict, other: Dict):
+    for key, count in other["jobs"].items():
+        target["jobs"][key] = target["jobs"].get(key, 0) + count
+    for key, histogram in other["duration"].items():
+        merged = target["duration"].get(key) or [0] * len(DURATION_BUCKETS) + [0.0, 0]
+        target["duration"][key] = [a + b for a, b in zip(merged, histogram)]
+    for key, totals in other["stage"].items():
+        merged = target["stage"].setdefault(key, dict.fromkeys(totals, 0))
+        for name, value in totals.items():
+            if name == "peak_rss_mb":
+                merged[name] = max(merged[name], value)
+            else:
+                merged[name] += value
+
+
+def _dump_totals(totals: Dict) -> Dict:
+    return {kind: [[list(map(list, key)), value] for key, value in series.items()]
+            for kind, series in totals.items()}
+
+
+def _load_totals(data: Dict) -> Dict:
+    return {kind: {tuple(map(tuple, key)): value for key, value in data.get(kind, [])}
+            for kind in _new_totals()}
+
+
+class MetricsRegistry:
+    """Totals of finished jobs, rendered as Prometheus text.
+
+    Without ``directory`` the totals cover this process only. With it, every
+    finished job rewrites ``<directory>/<pid>-<id>.json`` and ``render`` adds
+    up all the files, so each gunicorn worker reports the whole server. Files
+    of recycled workers stay, or their counters would go backwards; the
+    directory is emptied when gunicorn starts.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = METRICS_DIR if directory is None else directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._snapshot_path = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._totals = _new_totals()
+            self._jobs: Dict[LabelKey, int] = self._totals["jobs"]
+            self._duration: Dict[LabelKey, List] = self._totals["duration"]  # [bucket counts..., sum, count]
+            self._stage: Dict[LabelKey, Dict[str, float]] = self._totals["stage"]
+            path = self._own_snapshot_path() if self.directory else None
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _own_snapshot_path(self) -> str:
+        # pid + id aleatório: um worker novo pode reutilizar o pid de um reciclado
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._snapshot_path = os.path.join(self.directory, f"{self._pid}-{uuid.uuid4().hex[:8]}.json")
+        return self._snapshot_path
+
+    def _save_snapshot(self):
+        path = self._own_snapshot_path()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(_dump_totals(self._totals), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save pipeline metrics to {path}: {e}")
+
+    def _server_totals(self) -> Dict:
+        """This process's totals, or the sum of every worker's saved snapshot."""
+        totals = _new_totals()
+        if not self.directory:
+            _merge_totals(totals, self._totals)
+            return totals
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return totals
+        # o snapshot deste worker está entre eles (gravado a cada job)
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    _merge_totals(totals, _load_totals(json.load(f)))
+            except (OSError, ValueError, TypeError) as e:
+                logger.debug(f"Skipping pipeline metrics snapshot {name}: {e}")
+        return totals
+
+    def observe_job(self, summary: Dict):
+        status = summary.get("status", "unknown")
+        size_class = summary.get("archive_size_class", LARGEST_SIZE_CLASS)
+        wall = float(summary.get("wall_seconds") or 0)
+        with self._lock:
+            key = (("status", status),)
+            self._jobs[key] = self._jobs.get(key, 0) + 1
+
+            key = (("archive_size", size_class), ("status", status))
+            histogram = self._duration.setdefault(key, [0] * len(DURATION_BUCKETS) + [0.0, 0])
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if wall <= bound:
+                    histogram[index] += 1
+            histogram[-2] += wall
+            histogram[-1] += 1
+
+            for record in summary.get("stages", []):
+                # estágio x site x grupo: poucas dezenas de séries no total
+                key = (("group", record.get("group") or ""), ("site", record.get("site") or ""),
+                       ("stage", record["stage"]))
+                totals = self._stage.setdefault(key, {
+                    "count": 0, "wall": 0.0, "cpu": 0.0, "hands_in": 0, "hands_out": 0,
+                    "bytes_read": 0, "bytes_written": 0, "peak_rss_mb": 0.0,
+                })
+                totals["count"] += 1
+                totals["wall"] += record.get("wall_seconds", 0)
+                totals["cpu"] += record.get("cpu_seconds", 0)
+                totals["hands_in"] += record.get("hands_in", 0)
+                totals["hands_out"] += record.get("hands_out", 0)
+                totals["bytes_read"] += record.get("bytes_read", 0)
+                totals["bytes_written"] += record.get("bytes_written", 0)
+                totals["peak_rss_mb"] = max(totals["peak_rss_mb"], record.get("peak_rss_mb", 0))
+
+            if self.directory:
+                self._save_snapshot()
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def labels(key: LabelKey, **extra) -> str:
+            pairs = list(key) + sorted(extra.items())
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            totals = self._server_totals()
+
+        family("pipeline_jobs_total", "counter", "Finished pipeline jobs by status.")
+        for key, count in sorted(totals["jobs"].items()):
+            lines.append(f"pipeline_jobs_total{labels(key)} {count}")
+
+        family("pipeline_job_duration_seconds", "histogram", "Pipeline job wall time by archive size.")
+        for key, histogram in sorted(totals["duration"].items()):
+            for index, bound in enumerate(DURATION_BUCKETS):
+                lines.append(f"pipeline_job_duration_seconds_bucket{labels(key, le=str(bound))} {histogram[index]}")
+            lines.append(f"pipeline_job_duration_seconds_bucket{labels(key, le='+Inf')} {histogram[-1]}")
+            lines.append(f"pipeline_job_duration_seconds_sum{labels(key)} {histogram[-2]:.4f}")
+            lines.append(f"pipeline_job_duration_seconds_count{labels(key)} {histogram[-1]}")
+
+        stage_families = (
+            ("pipeline_stage_runs_total", "counter", "Stage executions.", "count"),
+            ("pipeline_stage_wall_seconds_total", "counter", "Stage wall time.", "wall"),
+            ("pipeline_stage_cpu_seconds_total", "counter", "Stage CPU time of the job thread.", "cpu"),
+            ("pipeline_stage_hands_in_total", "counter", "Hands entering the stage.", "hands_in"),
+            ("pipeline_stage_hands_out_total", "counter", "Hands leaving the stage.", "hands_out"),
+            ("pipeline_stage_bytes_read_total", "counter", "Bytes read by the stage.", "bytes_read"),
+            ("pipeline_stage_bytes_written_total", "counter", "Bytes written by the stage.", "bytes_written"),
+            ("pipeline_stage_peak_rss_megabytes", "gauge", "Highest RSS seen during the stage.", "peak_rss_mb"),
+        )
+        for name, kind, help_text, field in stage_families:
+            family(name, kind, help_text)
+            for key, stage_totals in sorted(totals["stage"].items()):
+                value = stage_totals[field]
+                value = f"{value:.4f}" if isinstance(value, float) else str(value)
+                lines.append(f"{name}{labels(key)} {value}")
+
+        # medidas ao vivo só deste processo: o label worker distingue quem respondeu
+        worker = labels((), worker=str(os.getpid()))
+        family("pipeline_jobs_running", "gauge", "Jobs currently running in the worker that answered.")
+        with _active_lock:
+            running = len(_active)
+        lines.append(f"pipeline_jobs_running{worker} {running}")
+
+        family("process_resident_memory_bytes", "gauge", "Resident memory of the worker that answered.")
+        try:
+            rss = psutil.Process(os.getpid()).memory_info().rss
+        except Exception:
+            rss = 0
+        lines.append(f"process_resident_memory_bytes{worker} {rss}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
@@ -18,6 +18,9 @@ import shutil
 import re
 from typing import Optional, Dict, Any, List, Set, Tuple
 from pathlib import Path
+from .content_store import download_resolved
+from .dashboard_cache_service import DashboardCacheService
+from .months_catalog_service import MonthsCatalogService
 from .storage import get_storage
 
 logger = logging.getLogger(__name__)
@@ -126,6 +129,9 @@ class ResultStorageService:
         """
         Read JSON file from Object Storage
         
+        Content-addressed aliases (see ``content_store``) are followed to the
+        blob they point at.
+        
         Args:
             storage_path: Path in storage (e.g., "/results/abc123/pipeline_result.json")
         
@@ -133,7 +139,7 @@ class ResultStorageService:
             Parsed JSON dict or None if not found
         """
         try:
-            file_data = self.storage.download_file(storage_path)
+            file_data = download_resolved(self.storage, storage_path)
             if file_data:
                 return json.loads(file_data.decode('utf-8'))
         except Exception as e:
@@ -573,7 +579,8 @@ class ResultStorageService:
 
         stats = {
             'storage_deleted': 0,
-            'local_deleted': False
+            'local_deleted': False,
+            'catalog_deleted': 0,
         }
 
         storage_prefix = f"/results/{token}"
@@ -592,6 +599,9 @@ class ResultStorageService:
             except Exception as exc:
                 logger.warning(f"Failed to remove local directory {local_dir}: {exc}")
 
+        stats['catalog_deleted'] = MonthsCatalogService().remove_token(token)
+        DashboardCacheService().bump_for_token(token)
+
         return stats
     
     def job_exists(self, token: str) -> bool:
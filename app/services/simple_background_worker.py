@@ -8,6 +8,7 @@ import gc
 import json
 from pathlib import Path
 
+from app.services.artifact_publisher import ArtifactPublisher
 from app.services.job_queue_service import JobQueueService
 from app.services.storage import get_storage
 from app.services.metrics import ResourceMetrics
@@ -99,24 +100,12 @@ class SimpleBackgroundWorker:
             logger.warning(f"Cleanup failed for {token}: {e}")
     
     def _upload_directory_to_storage(self, storage, directory_path, storage_prefix):
-        """Recursively upload a directory to Object Storage"""
-        uploaded_files = []
-        directory_path = Path(directory_path)
-        
-        for file_path in directory_path.rglob('*'):
-            if not file_path.is_file():
-                continue
-            
-            relative_path = file_path.relative_to(directory_path)
-            storage_key = f"{storage_prefix}/{relative_path}".replace('\\', '/')
-            
-            logger.debug(f"Uploading {file_path} to {storage_key}")
-            
-            with open(file_path, 'rb') as f:
-                storage.upload_fileobj(f, storage_key)
-            
-            uploaded_files.append(storage_key)
+        """Recursively upload a directory to Object Storage (in parallel)"""
+        publisher = ArtifactPublisher(storage, Path(storage_prefix).name, storage_prefix)
+        publisher.add_directory(str(directory_path), storage_prefix, 'application/octet-stream')
+        publisher.publish()
         
+        uploaded_files = [artifact.storage_key for artifact in publisher.artifacts]
         logger.info(f"✅ Uploaded {len(uploaded_files)} files to {storage_prefix}/")
         return uploaded_files
     
@@ -198,7 +187,8 @@ class SimpleBackgroundWorker:
                 'success': True,
                 'message': message,
                 'dashboard_token': token,
-                'download_url': f'/api/download/result/{token}'
+                'download_url': f'/api/download/result/{token}',
+                'metrics': ((pipeline_result or {}).get('debug') or {}).get('metrics'),
             }
             
             self.job_queue.mark_completed(token, json.dumps(result_data))
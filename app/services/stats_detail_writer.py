@@ -0,0 +1,220 @@
+"""Bulk writer for poker_stats_detail rows.
+
+Rows are upserted on their natural key (token, month, site, table_format,
+stat_name), so a retried chunk or a re-saved token never duplicates rows.
+When ``DATABASE_URL`` is the database that holds poker_stats_detail, rows are
+streamed with COPY into a temp table and merged in one statement; otherwise
+they go through the Supabase REST API in bounded chunks with a few requests
+in flight.
+"""
+import csv
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.db_pool import DatabasePool
+from app.utils.supabase_retry import is_transient_error, with_supabase_retry
+
+logger = logging.getLogger(__name__)
+
+STATS_DETAIL_TABLE = "poker_stats_detail"
+NATURAL_KEY = ("token", "month", "site", "table_format", "stat_name")
+COLUMNS = (
+    "processing_id",
+    "token",
+    "month",
+    "site",
+    "table_format",
+    "stat_name",
+    "opportunities",
+    "attempts",
+    "percentage",
+)
+
+CHUNK_SIZE = int(os.getenv("STATS_DETAIL_CHUNK_SIZE", "500"))
+MAX_IN_FLIGHT = int(os.getenv("STATS_DETAIL_MAX_IN_FLIGHT", "4"))
+
+# None = ainda não verificado neste processo
+_copy_target_available: Optional[bool] = None
+
+
+@dataclass
+class BulkWriteReport:
+    """Outcome of one bulk write."""
+
+    method: str
+    rows: int = 0
+    chunks: int = 0
+    failed_chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+
+def dedupe_rows(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse rows sharing a natural key (the last one wins).
+
+    A single upsert statement may not touch the same row twice.
+    """
+    by_key: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        by_key[tuple(row.get(col) for col in NATURAL_KEY)] = row
+    return list(by_key.values())
+
+
+def chunk_rows(rows: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+    size = max(1, size)
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def copy_target_available() -> bool:
+    """True when DATABASE_URL is reachable and holds poker_stats_detail."""
+    global _copy_target_available
+    if _copy_target_available is not None:
+        return _copy_target_available
+    if not os.getenv("DATABASE_URL"):
+        return False
+
+    conn = None
+    try:
+        conn = DatabasePool.get_connection()
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (f"public.{STATS_DETAIL_TABLE}",))
+            _copy_target_available = cur.fetchone()[0] is not None
+    except Exception as exc:
+        logger.debug("COPY path unavailable for %s: %s", STATS_DETAIL_TABLE, exc)
+        # pool not ready yet: check again next time
+        return False
+    finally:
+        if conn:
+            DatabasePool.return_connection(conn)
+    return _copy_target_available
+
+
+class StatsDetailWriter:
+    """Idempotent bulk upserts into poker_stats_detail."""
+
+    def __init__(
+        self,
+        client=None,
+        *,
+        chunk_size: int = CHUNK_SIZE,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        use_copy: Optional[bool] = None,
+    ):
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.use_copy = use_copy
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> BulkWriteReport:
+        rows = dedupe_rows(rows)
+        if not rows:
+            return BulkWriteReport(method="none")
+
+        start = time.monotonic()
+        use_copy = copy_target_available() if self.use_copy is None else self.use_copy
+        report = None
+        if use_copy:
+            try:
+                report = self._write_copy(rows)
+            except Exception as exc:
+                logger.warning("COPY into %s failed, falling back to REST: %s", STATS_DETAIL_TABLE, exc)
+        if report is None:
+            if self.client is None:
+                raise RuntimeError("No Supabase client for REST writes")
+            report = self._write_rest(rows)
+
+        report.seconds = time.monotonic() - start
+        logger.info(
+            "[STATS_DETAIL] Upserted %s rows in %s chunks via %s in %.2fs (%.0f rows/s, %s failed chunks)",
+            report.rows,
+            report.chunks,
+            report.method,
+            report.seconds,
+            report.rows_per_second,
+            report.failed_chunks,
+        )
+        return report
+
+    # ------------------------------------------------------------------ REST
+    def _upsert_chunk(self, chunk: List[Dict[str, Any]]) -> int:
+        def _send():
+            return (
+                self.client.table(STATS_DETAIL_TABLE)
+                .upsert(chunk, on_conflict=",".join(NATURAL_KEY))
+                .execute()
+            )
+
+        # upsert é idempotente: é seguro repetir também em timeouts
+        with_supabase_retry(_send, is_retryable=is_transient_error)
+        return len(chunk)
+
+    def _write_rest(self, rows: List[Dict[str, Any]]) -> BulkWriteReport:
+        chunks = chunk_rows(rows, self.chunk_size)
+        report = BulkWriteReport(method="rest", chunks=len(chunks))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(chunks))) as executor:
+            futures = [executor.submit(self._upsert_chunk, chunk) for chunk in chunks]
+            for index, future in enumerate(futures):
+                try:
+                    report.rows += future.result()
+                except Exception as exc:
+                    report.failed_chunks += 1
+                    logger.error(
+                        "Failed to upsert stats chunk %s/%s (%s rows): %s",
+                        index + 1,
+                        len(chunks),
+                        len(chunks[index]),
+                        exc,
+                    )
+        return report
+
+    # ------------------------------------------------------------------ COPY
+    def _write_copy(self, rows: List[Dict[str, Any]]) -> BulkWriteReport:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # \N marca NULL no formato CSV do COPY (ver NULL '\N' abaixo)
+            writer.writerow(["\\N" if row.get(col) is None else row.get(col) for col in COLUMNS])
+        buffer.seek(0)
+
+        columns = ", ".join(COLUMNS)
+        updates = ", ".join(
+            f"{col} = EXCLUDED.{col}" for col in COLUMNS if col not in NATURAL_KEY
+        )
+
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"CREATE TEMP TABLE stats_detail_load ON COMMIT DROP AS "
+                    f"SELECT {columns} FROM {STATS_DETAIL_TABLE} WITH NO DATA"
+                )
+                cur.copy_expert(
+                    f"COPY stats_detail_load ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer,
+                )
+                cur.execute(
+                    f"""
+                    INSERT INTO {STATS_DETAIL_TABLE} ({columns})
+                    SELECT {columns} FROM stats_detail_load
+                    ON CONFLICT ({", ".join(NATURAL_KEY)}) DO UPDATE SET {updates}
+                    """
+                )
+                conn.commit()
+            return BulkWriteReport(method="copy", rows=len(rows), chunks=1)
+        except Exception:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
@@ -201,6 +201,34 @@ class StorageService:
             logger.error(f"Failed to download file {path}: {e}")
             return None
     
+    def download_range(self, path: str, start: int, length: int) -> Optional[bytes]:
+        """
+        Read part of a stored file (HTTP Range in the cloud, seek locally)
+        
+        Args:
+            path: Storage path
+            start: First byte
+            length: Number of bytes
+        
+        Returns:
+            Binary data (shorter at end of file) or None if not found
+        """
+        try:
+            if self.use_cloud:
+                return self.supabase_storage.download_range(self._cloud_path(path), start, length)
+            
+            local_path = self._local_path(path)
+            if not local_path.exists():
+                return None
+            
+            with local_path.open('rb') as f:
+                f.seek(start)
+                return f.read(length)
+                
+        except Exception as e:
+            logger.error(f"Failed to download range of {path}: {e}")
+            return None
+    
     def download_file_stream(self, path: str) -> Optional[BinaryIO]:
         """
         Download a file as stream (memory efficient)
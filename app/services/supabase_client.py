@@ -1,9 +1,12 @@
 """Supabase client service"""
 import os
-from supabase import create_client, Client
-from typing import Optional
+import threading
+from typing import TYPE_CHECKING, Optional
 import logging
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
 class SupabaseService:
@@ -12,24 +15,42 @@ class SupabaseService:
         self.url = os.getenv('SUPABASE_URL', '')
         self.key = os.getenv('SUPABASE_ANON_KEY', '')
         self.service_role_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
-        self.client: Optional[Client] = None
-        self.admin_client: Optional[Client] = None
-        
-        if self.url and self.key:
-            self.client = create_client(self.url, self.key)
-        
-        # Create admin client with service role key if available
-        if self.url and self.service_role_key:
-            try:
-                self.admin_client = create_client(self.url, self.service_role_key)
-                logger.info("Admin client initialized with service role key")
-            except Exception as e:
-                logger.error(f"Failed to create admin client: {e}")
-                self.admin_client = None
-        else:
-            logger.info(f"Admin client not initialized - URL: {bool(self.url)}, Service Key: {bool(self.service_role_key)}")
+        # Clientes criados na 1ª utilização: importar supabase custa ~200ms
+        # e cada worker do gunicorn reciclado pagava isso no arranque
+        self._client: Optional["Client"] = None
+        self._admin_client: Optional["Client"] = None
+        self._admin_attempted = False
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Optional["Client"]:
+        if self._client is None and self.url and self.key:
+            with self._lock:
+                if self._client is None:
+                    from supabase import create_client
+                    self._client = create_client(self.url, self.key)
+        return self._client
+
+    @property
+    def admin_client(self) -> Optional["Client"]:
+        """Admin client with the service role key, if available"""
+        if not self._admin_attempted:
+            with self._lock:
+                if not self._admin_attempted:
+                    if self.url and self.service_role_key:
+                        try:
+                            from supabase import create_client
+                            self._admin_client = create_client(self.url, self.service_role_key)
+                            logger.info("Admin client initialized with service role key")
+                        except Exception as e:
+                            logger.error(f"Failed to create admin client: {e}")
+                    else:
+                        logger.info(f"Admin client not initialized - URL: {bool(self.url)}, Service Key: {bool(self.service_role_key)}")
+                    # só depois de atribuído: quem lê sem o lock não pode ver a flag antes do cliente
+                    self._admin_attempted = True
+        return self._admin_client
     
-    def get_client(self) -> Optional[Client]:
+    def get_client(self) -> Optional["Client"]:
         """Get Supabase client instance"""
         return self.client
     
@@ -73,13 +94,13 @@ class SupabaseService:
         except Exception as e:
             return False, str(e)
     
-    def get_user(self):
-        """Get current authenticated user"""
+    def get_user(self, jwt: Optional[str] = None):
+        """Get current authenticated user (or the user of access token ``jwt``)"""
         if not self.client:
             return None
         
         try:
-            user = self.client.auth.get_user()
+            user = self.client.auth.get_user(jwt) if jwt else self.client.auth.get_user()
             return user
         except:
             return None
@@ -5,15 +5,18 @@ import os
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Union
 
 import yaml
-from supabase import create_client, Client
 
 from app.api_dashboard import (
     aggregate_postflop_stats,
     calculate_weighted_scores_from_groups,
 )
+from app.services.stats_detail_writer import StatsDetailWriter
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
@@ -46,13 +49,15 @@ class SupabaseHistoryService:
         else:
             supabase_key = os.getenv('SUPABASE_KEY')
         
-        self.client: Optional[Client] = None
+        self.client: Optional["Client"] = None
         self.enabled = False
         
         if not supabase_url or not supabase_key:
             logger.warning("Supabase credentials not configured. History will not be saved.")
         else:
             try:
+                from supabase import create_client
+
                 self.client = create_client(supabase_url, supabase_key)
                 self.enabled = True
                 logger.info("Supabase history service initialized successfully")
@@ -264,8 +269,11 @@ class SupabaseHistoryService:
         - Saves stats from each month with month='YYYY-MM'
         - Also saves aggregate stats with month=NULL
         
+        Rows are upserted on (token, month, site, table_format, stat_name), so
+        retries and re-saves of a token do not duplicate them.
+
         Returns:
-            Number of stats inserted
+            Number of stats written
         """
         if not self.enabled:
             return 0
@@ -373,11 +381,12 @@ class SupabaseHistoryService:
                                 'percentage': stat_data.get('percentage')
                             })
             
-            # Batch insert stats
-            if stats_rows:
-                self.client.table('poker_stats_detail').insert(stats_rows).execute()
-            
-            return len(stats_rows)
+            # Chunked, idempotent upsert (COPY when DATABASE_URL holds the table)
+            if not stats_rows:
+                return 0
+
+            report = StatsDetailWriter(self.client).write(stats_rows)
+            return report.rows
             
         except Exception as e:
             logger.error(f"Error saving detailed stats: {e}", exc_info=True)
@@ -5,11 +5,13 @@ import os
 import gzip
 import logging
 from pathlib import Path
-from typing import Optional, BinaryIO
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional, BinaryIO
 
 from app.utils.supabase_retry import with_supabase_retry
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
 COMPRESSION_THRESHOLD_MB = 1
@@ -49,13 +51,19 @@ class SupabaseStorageService:
             key_type = "anon"
         
         self.bucket_name = bucket_name
-        self.client: Optional[Client] = None
+        self.client: Optional["Client"] = None
         self.enabled = False
+        self._url = (supabase_url or '').rstrip('/')
+        self._key = supabase_key
+        self._http = None  # httpx.Client para leituras parciais (criado na 1ª utilização)
         
         if not supabase_url or not supabase_key:
             logger.warning("Supabase credentials not configured. Storage will not be available.")
         else:
             try:
+                # só importado quando há credenciais (o import custa ~200ms no arranque)
+                from supabase import create_client
+
                 self.client = create_client(supabase_url, supabase_key)
                 self.enabled = True
                 
@@ -287,6 +295,52 @@ class SupabaseStorageService:
             logger.error(f"Error downloading file from storage: {e}")
             return None
     
+    def download_range(self, storage_path: str, start: int, length: int) -> Optional[bytes]:
+        """
+        Download ``length`` bytes starting at ``start`` with an HTTP Range request
+        
+        Used for packed objects (hand bundles) that are read piecewise; the
+        object must be stored uncompressed (no .gz variant).
+        
+        Returns:
+            The bytes read (shorter at end of object), or None if not found/error
+        """
+        if not self.enabled or not self.client or length <= 0:
+            return None
+        
+        try:
+            import httpx
+            
+            if self._http is None:
+                self._http = httpx.Client(timeout=30.0)
+            url = f"{self._url}/storage/v1/object/{self.bucket_name}/{storage_path}"
+            headers = {
+                'Authorization': f'Bearer {self._key}',
+                'apikey': self._key,
+                'Range': f'bytes={start}-{start + length - 1}',
+            }
+
+            def _get():
+                response = self._http.get(url, headers=headers)
+                if response.status_code == 429:
+                    response.raise_for_status()  # repetido pelo with_supabase_retry
+                return response
+
+            response = with_supabase_retry(_get)
+            if response.status_code == 404 or response.status_code == 400:
+                return None
+            if response.status_code == 416:
+                return b''
+            response.raise_for_status()
+            if response.status_code == 200:
+                # servidor ignorou o Range: devolveu o objeto inteiro
+                return response.content[start:start + length]
+            return response.content
+            
+        except Exception as e:
+            logger.error(f"Error downloading range of {storage_path}: {e}")
+            return None
+    
     def file_exists(self, storage_path: str) -> bool:
         """
         Check if a file exists in storage
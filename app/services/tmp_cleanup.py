@@ -112,6 +112,12 @@ def run_startup_cleanup():
         
         # Clean old files (24h)
         files_removed, mb_freed = cleanup_old_tmp_files(max_age_hours=24)
+
+        # Uploads em chunks (por finalizar ou já processados) com mais de 24h
+        from app.services.chunk_store import get_chunk_store
+        expired_uploads = get_chunk_store().purge_expired(max_age_hours=24)
+        if expired_uploads:
+            logger.info(f"Removed {expired_uploads} expired chunked uploads")
         
         # Get usage after cleanup
         usage_after = get_tmp_usage()
@@ -2,17 +2,33 @@
 
 from __future__ import annotations
 
+import fcntl
 import json
 import logging
+import os
 import re
 import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# O repository.db é partilhado por todos os utilizadores (e pelos jobs em
+# paralelo): esperar pelo lock em vez de falhar logo, e não segurar o lock de
+# escrita durante um ingest inteiro
+BUSY_TIMEOUT_SECONDS = 30
+BATCH_COMMIT_EVERY = 100
+
+
+def _suffix_range(prefix: str) -> Tuple[str, str]:
+    """Bounds [lo, hi) of every string starting with ``<prefix>_`` (binary collation)."""
+    return f"{prefix}_", f"{prefix}`"  # "`" sucede "_" em ASCII
+
 
 @dataclass
 class StoredTournament:
@@ -26,11 +42,23 @@ class StoredTournament:
 
 
 class TournamentRepository:
-    """Persist tournament files per user for monthly processing."""
+    """Persist tournament files per user for monthly processing.
+
+    Files live under ``<base_dir>/<user>/<month>/``; the index of stored
+    tournaments is an SQLite database (``repository.db``) keyed by
+    (user, month, unique_id) with a unique filename per month. Legacy
+    per-user ``manifest.json`` files are imported on first access.
+    """
+
+    DB_FILENAME = "repository.db"
 
     def __init__(self, base_dir: Optional[Path] = None):
         self.base_dir = Path(base_dir or "user_datasets")
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.base_dir / self.DB_FILENAME
+        self._local = threading.local()
+        self._imported: Set[str] = set()
+        self._init_db()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -49,20 +77,142 @@ class TournamentRepository:
     def _manifest_path(self, user_id: str) -> Path:
         return self._user_dir(user_id) / "manifest.json"
 
-    def _load_manifest(self, user_id: str) -> Dict[str, Dict[str, Dict[str, str]]]:
-        manifest_path = self._manifest_path(user_id)
-        if manifest_path.exists():
+    def _get_connection(self) -> sqlite3.Connection:
+        if not hasattr(self._local, "conn"):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path), timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False
+            )
+            self._local.conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_SECONDS * 1000}")
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.batch_depth = 0
+            self._local.pending = 0
+        return self._local.conn
+
+    def _init_db(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_SECONDS)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tournaments (
+                user_key TEXT NOT NULL,
+                month TEXT NOT NULL,
+                unique_id TEXT NOT NULL,
+                tournament_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                source TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_key, month, unique_id),
+                UNIQUE (user_key, month, filename)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS imported_manifests (user_key TEXT PRIMARY KEY, imported_at TEXT NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection):
+        if not getattr(self._local, "batch_depth", 0):
+            conn.commit()
+            return
+        # dentro de batch(): commit a cada BATCH_COMMIT_EVERY escritas
+        self._local.pending += 1
+        if self._local.pending >= BATCH_COMMIT_EVERY:
+            conn.commit()
+            self._local.pending = 0
+
+    @contextmanager
+    def _user_lock(self, user_id: Optional[str]):
+        """Serialize ingests of one user across threads and worker processes."""
+
+        if user_id is None:
+            yield
+            return
+        user_dir = self._user_dir(user_id)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        with open(user_dir / ".ingest.lock", "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
             try:
-                return json.loads(manifest_path.read_text(encoding="utf-8"))
-            except Exception as exc:
-                logger.warning("Failed to read manifest for %s: %s", user_id, exc)
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
-        return {"months": {}}
+    @contextmanager
+    def batch(self, user_id: Optional[str] = None):
+        """Group store_tournament calls, committing every ``BATCH_COMMIT_EVERY``.
+
+        With ``user_id`` the batch also holds that user's ingest lock, so two
+        jobs of the same user never pick file names concurrently; ingests of
+        different users only share the short commit windows.
+        """
 
-    def _save_manifest(self, user_id: str, manifest: Dict[str, Dict[str, Dict[str, str]]]):
-        manifest_path = self._manifest_path(user_id)
-        manifest_path.parent.mkdir(parents=True, exist_ok=True)
-        manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        with self._user_lock(user_id):
+            conn = self._get_connection()
+            self._local.batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._local.batch_depth -= 1
+                if not self._local.batch_depth:
+                    conn.rollback()
+                    self._local.pending = 0
+                raise
+            self._local.batch_depth -= 1
+            if not self._local.batch_depth:
+                conn.commit()
+                self._local.pending = 0
+
+    def _ensure_imported(self, user_key: str):
+        """Import a legacy manifest.json into the index (once per user)."""
+
+        if user_key in self._imported:
+            return
+        conn = self._get_connection()
+        if conn.execute(
+            "SELECT 1 FROM imported_manifests WHERE user_key = ?", (user_key,)
+        ).fetchone():
+            self._imported.add(user_key)
+            return
+
+        manifest_path = self.base_dir / user_key / "manifest.json"
+        rows = []
+        if manifest_path.exists():
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except Exception as exc:
+                logger.warning("Failed to read manifest for %s: %s", user_key, exc)
+                manifest = {}
+            for month, entries in (manifest.get("months") or {}).items():
+                for unique_id, info in entries.items():
+                    if not info.get("filename"):
+                        continue
+                    rows.append((
+                        user_key,
+                        month,
+                        unique_id,
+                        info.get("tournament_id") or unique_id,
+                        info["filename"],
+                        info.get("source", ""),
+                        info.get("updated_at", ""),
+                    ))
+
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO tournaments
+                (user_key, month, unique_id, tournament_id, filename, source, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO imported_manifests (user_key, imported_at) VALUES (?, ?)",
+            (user_key, datetime.utcnow().isoformat()),
+        )
+        self._commit(conn)
+        self._imported.add(user_key)
+        if rows:
+            logger.info("[TOURNAMENT REPO] Imported %s manifest entries for %s", len(rows), user_key)
 
     # ------------------------------------------------------------------
     # Public API
@@ -78,43 +228,95 @@ class TournamentRepository:
         """Persist tournament content for a user.
 
         Returns the stored path and whether the entry replaced an existing one.
+        Inside ``batch()`` the index rows are committed in groups.
         """
 
+        user_key = self._sanitize_user(user_id)
+        self._ensure_imported(user_key)
+
         safe_month = month or "unknown"
         safe_tournament = self._sanitize_tournament(tournament_id)
 
-        user_dir = self._user_dir(user_id)
-        month_dir = user_dir / safe_month
+        month_dir = self._user_dir(user_id) / safe_month
         month_dir.mkdir(parents=True, exist_ok=True)
 
-        manifest = self._load_manifest(user_id)
-        month_entries = manifest.setdefault("months", {}).setdefault(safe_month, {})
+        conn = self._get_connection()
 
         # Always preserve existing entries by generating a unique identifier per file
-        dest_path = month_dir / f"{safe_tournament}.txt"
+        filename = f"{safe_tournament}.txt"
         unique_id = tournament_id
         suffix = 1
 
-        while dest_path.exists() or unique_id in month_entries:
-            suffix += 1
-            unique_id = f"{tournament_id}_{suffix}"
-            dest_path = month_dir / f"{self._sanitize_tournament(unique_id)}.txt"
+        taken = conn.execute(
+            """
+            SELECT 1 FROM tournaments
+            WHERE user_key = ? AND month = ? AND (unique_id = ? OR filename = ?)
+            LIMIT 1
+            """,
+            (user_key, safe_month, unique_id, filename),
+        ).fetchone() is not None or (month_dir / filename).exists()
+
+        if taken:
+            # Variantes "<id>_<n>" já usadas, numa só consulta ao índice
+            id_lo, id_hi = _suffix_range(tournament_id)
+            file_lo, file_hi = _suffix_range(safe_tournament)
+            used_ids = {
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT unique_id FROM tournaments
+                    WHERE user_key = ? AND month = ? AND unique_id >= ? AND unique_id < ?
+                    """,
+                    (user_key, safe_month, id_lo, id_hi),
+                )
+            }
+            used_files = {
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT filename FROM tournaments
+                    WHERE user_key = ? AND month = ? AND filename >= ? AND filename < ?
+                    """,
+                    (user_key, safe_month, file_lo, file_hi),
+                )
+            }
+
+            while taken:
+                suffix += 1
+                unique_id = f"{tournament_id}_{suffix}"
+                filename = f"{self._sanitize_tournament(unique_id)}.txt"
+                taken = (
+                    unique_id in used_ids
+                    or filename in used_files
+                    or (month_dir / filename).exists()
+                )
 
+        dest_path = month_dir / filename
         replaced = False
 
         normalized = content.replace("\r\n", "\n").replace("\r", "\n")
         dest_path.write_text(normalized, encoding="utf-8")
 
-        month_entries[unique_id] = {
-            "filename": dest_path.name,
-            "source": source_filename,
-            "updated_at": datetime.utcnow().isoformat(),
-            "tournament_id": tournament_id,
-        }
-        self._save_manifest(user_id, manifest)
+        conn.execute(
+            """
+            INSERT INTO tournaments
+                (user_key, month, unique_id, tournament_id, filename, source, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_key,
+                safe_month,
+                unique_id,
+                tournament_id,
+                filename,
+                source_filename,
+                datetime.utcnow().isoformat(),
+            ),
+        )
+        self._commit(conn)
 
         action = "updated" if replaced else "stored"
-        logger.info(
+        logger.debug(
             "[TOURNAMENT REPO] %s tournament %s/%s for user %s",
             action,
             safe_month,
@@ -125,30 +327,44 @@ class TournamentRepository:
         return dest_path, replaced
 
     def list_tournaments(self, user_id: str) -> List[StoredTournament]:
-        manifest = self._load_manifest(user_id)
-        tournaments: List[StoredTournament] = []
+        user_key = self._sanitize_user(user_id)
+        self._ensure_imported(user_key)
         user_dir = self._user_dir(user_id)
 
-        for month, entries in manifest.get("months", {}).items():
-            for tournament_id, info in entries.items():
-                file_name = info.get("filename")
-                path = user_dir / month / file_name if file_name else None
-                if not path or not path.exists():
-                    continue
-                tournaments.append(
-                    StoredTournament(
-                        month=month,
-                        tournament_id=tournament_id,
-                        path=path,
-                        source=info.get("source", ""),
-                        updated_at=info.get("updated_at", ""),
-                    )
+        rows = self._get_connection().execute(
+            """
+            SELECT month, unique_id, filename, source, updated_at
+            FROM tournaments
+            WHERE user_key = ?
+            ORDER BY month, rowid
+            """,
+            (user_key,),
+        ).fetchall()
+
+        tournaments: List[StoredTournament] = []
+        for month, unique_id, filename, source, updated_at in rows:
+            path = user_dir / month / filename
+            if not path.exists():
+                continue
+            tournaments.append(
+                StoredTournament(
+                    month=month,
+                    tournament_id=unique_id,
+                    path=path,
+                    source=source or "",
+                    updated_at=updated_at or "",
                 )
+            )
 
         return tournaments
 
     def export_dataset(self, user_id: str, target_dir: Path) -> int:
-        """Copy all tournaments for a user into target_dir grouped by month."""
+        """Expose all tournaments for a user in target_dir grouped by month.
+
+        Files are hardlinked (no data is copied); a copy is made only when the
+        target is on another filesystem. Stored files are never rewritten in
+        place, so consumers must not edit the exported files either.
+        """
 
         tournaments = self.list_tournaments(user_id)
 
@@ -157,18 +373,26 @@ class TournamentRepository:
 
         target_dir.mkdir(parents=True, exist_ok=True)
 
+        linked = 0
+        created_dirs: Set[str] = set()
         for tournament in tournaments:
             month_dir = target_dir / tournament.month
-            month_dir.mkdir(parents=True, exist_ok=True)
+            if tournament.month not in created_dirs:
+                month_dir.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(tournament.month)
             dest_path = month_dir / tournament.path.name
-            shutil.copy2(tournament.path, dest_path)
+            try:
+                os.link(tournament.path, dest_path)
+                linked += 1
+            except OSError:
+                shutil.copy2(tournament.path, dest_path)
 
         logger.info(
-            "[TOURNAMENT REPO] Exported %s tournaments for %s to %s",
+            "[TOURNAMENT REPO] Exported %s tournaments for %s to %s (%s hardlinked)",
             len(tournaments),
             user_id,
             target_dir,
+            linked,
         )
 
         return len(tournaments)
-
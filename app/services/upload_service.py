@@ -96,6 +96,39 @@ class UploadService:
             if conn:
                 DatabasePool.return_connection(conn)
 
+    def find_processed_upload_by_hash(self, user_id: str, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the latest processed upload of the user with this archive hash (dedupe)."""
+        if not file_hash:
+            return None
+
+        conn = None
+        try:
+            conn = DatabasePool.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT id, user_id, token, filename, status,
+                           uploaded_at, processed_at, hand_count,
+                           archive_sha256, error_message
+                    FROM uploads
+                    WHERE user_id = %s AND archive_sha256 = %s AND status = 'processed'
+                    ORDER BY processed_at DESC NULLS LAST
+                    LIMIT 1
+                    """,
+                    (user_id, file_hash),
+                )
+                row = cur.fetchone()
+                if not row:
+                    return None
+
+                return self._row_to_dict(cur.description, row)
+        except Exception as exc:
+            logger.error("Failed to look up processed upload by hash: %s", exc, exc_info=True)
+            return None
+        finally:
+            if conn:
+                DatabasePool.return_connection(conn)
+
     def get_master_upload(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Return the latest processed upload for a user (legacy helper)."""
         conn = None
@@ -1,8 +1,14 @@
 import logging
 import time
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Tuple
 
 from app.api_dashboard import build_user_month_dashboard_payload
+from app.services.dashboard_cache_service import (
+    DashboardCacheService,
+    payload_stamp,
+    refresh_in_background,
+    stamp_payload,
+)
 from app.services.result_storage import ResultStorageService
 from app.services.upload_service import UploadService
 from app.services.user_months_service import UserMonthsService
@@ -98,145 +104,123 @@ def _weighted_average(values: List[Tuple[float, float]]) -> float | None:
     return sum(value * weight for value, weight in values if weight > 0) / total_weight
 
 
-def _aggregate_stat_for_group(
-    group_name: str,
-    stat_name: str,
-    month_payloads: List[Tuple[str, Dict[str, Any]]],
-    weights: Dict[str, float],
-) -> Dict[str, Any]:
-    """Aggregate a stat for a specific group across all available months."""
-
-    opportunities_total = 0
-    attempts_total = 0
-    frequency_by_month: List[Any] = []
-    note_weights: List[Tuple[float, float]] = []
-    ideal_value = None
-
-    for month, payload in month_payloads:
-        group_data = payload.get("groups", {}).get(group_name)
-        if not isinstance(group_data, dict):
-            frequency_by_month.append(None)
-            continue
+# Linha normalizada de uma stat num mês: (opps, attempts, pct, score, ideal, weight)
+StatRow = Tuple[int, int, Any, Any, Any, Any]
 
-        stat_data = (group_data.get("stats") or {}).get(stat_name)
-        if not isinstance(stat_data, dict):
-            frequency_by_month.append(None)
-            continue
 
-        opps_value = stat_data.get("opportunities")
-        if opps_value is None:
-            opps_value = stat_data.get("opps")
-        attempts_value = stat_data.get("attempts")
-        if attempts_value is None:
-            attempts_value = stat_data.get("att")
+def _normalize_stat(stat_data: Dict[str, Any]) -> StatRow:
+    """Resolve the key aliases of a stat dict once (opportunities/opps, ...)."""
 
-        opportunities_total += int(opps_value or 0)
-        attempts_total += int(attempts_value or 0)
+    opps_value = stat_data.get("opportunities")
+    if opps_value is None:
+        opps_value = stat_data.get("opps")
+    attempts_value = stat_data.get("attempts")
+    if attempts_value is None:
+        attempts_value = stat_data.get("att")
+    pct_value = stat_data.get("percentage")
+    if pct_value is None:
+        pct_value = stat_data.get("pct")
 
-        pct_value = stat_data.get("percentage")
-        if pct_value is None:
-            pct_value = stat_data.get("pct")
-        frequency_by_month.append(pct_value if pct_value is not None else None)
+    return (
+        int(opps_value or 0),
+        int(attempts_value or 0),
+        pct_value,
+        stat_data.get("score"),
+        stat_data.get("ideal"),
+        stat_data.get("weight"),
+    )
 
-        if ideal_value is None and stat_data.get("ideal") is not None:
-            ideal_value = stat_data.get("ideal")
 
-        score = stat_data.get("score")
-        if score is not None:
-            note_weights.append((float(score), weights.get(month, 0.0)))
+def _stat_matrix(stats_by_month: List[Any]) -> Dict[str, List[StatRow | None]]:
+    """
+    Normalize the stats dicts of every month into ``stat -> [row per month]``.
 
-    note = _weighted_average(note_weights)
+    Months where the stats dict (or the stat itself) is missing hold None.
+    """
 
-    return {
-        "score": note,
-        "opportunities": opportunities_total,
-        "attempts": attempts_total,
-        "sample_total": opportunities_total,
-        "frequencies_by_month": frequency_by_month,
-        "ideal": ideal_value,
-    }
+    month_count = len(stats_by_month)
+    matrix: Dict[str, List[StatRow | None]] = {}
+    for index, stats_dict in enumerate(stats_by_month):
+        if not isinstance(stats_dict, dict):
+            continue
+        for stat_name, stat_data in stats_dict.items():
+            rows = matrix.get(stat_name)
+            if rows is None:
+                rows = matrix[stat_name] = [None] * month_count
+            if isinstance(stat_data, dict):
+                rows[index] = _normalize_stat(stat_data)
+    return matrix
 
 
-def _aggregate_subgroup_stat(
-    group_name: str,
-    subgroup_name: str,
-    stat_name: str,
-    month_payloads: List[Tuple[str, Dict[str, Any]]],
-    weights: Dict[str, float],
-) -> Dict[str, Any]:
-    """Aggregate stats that live inside subgroup structures (e.g., POSTFLOP tree)."""
+def _reduce_stat_rows(rows: List[StatRow | None], month_weights: List[float]) -> Dict[str, Any]:
+    """Totals, per-month frequencies and weighted pct/score of one stat in a single pass."""
 
     opportunities_total = 0
     attempts_total = 0
     frequency_by_month: List[Any] = []
-    pct_weights: List[Tuple[float, float]] = []
-    stat_score_weights: List[Tuple[float, float]] = []
+    pct_sum = pct_weight = 0.0
+    score_sum = score_weight = 0.0
     ideal_value = None
     stat_weight = None
 
-    for month, payload in month_payloads:
-        group_data = payload.get("groups", {}).get(group_name)
-        if not isinstance(group_data, dict):
-            frequency_by_month.append(None)
-            continue
-
-        subgroup_data = (group_data.get("subgroups") or {}).get(subgroup_name)
-        if not isinstance(subgroup_data, dict):
+    for row, month_weight in zip(rows, month_weights):
+        if row is None:
             frequency_by_month.append(None)
             continue
 
-        stats_dict = subgroup_data.get("stats")
-        if not isinstance(stats_dict, dict):
-            frequency_by_month.append(None)
-            continue
-
-        stat_data = stats_dict.get(stat_name)
-        if not isinstance(stat_data, dict):
-            frequency_by_month.append(None)
-            continue
-
-        opps_value = stat_data.get("opportunities")
-        if opps_value is None:
-            opps_value = stat_data.get("opps")
-        attempts_value = stat_data.get("attempts")
-        if attempts_value is None:
-            attempts_value = stat_data.get("att")
-
-        opportunities_total += int(opps_value or 0)
-        attempts_total += int(attempts_value or 0)
-
-        pct_value = stat_data.get("percentage")
-        if pct_value is None:
-            pct_value = stat_data.get("pct")
-        frequency_by_month.append(pct_value if pct_value is not None else None)
-        if pct_value is not None:
-            pct_weights.append((float(pct_value), weights.get(month, 0.0)))
-
-        if ideal_value is None and stat_data.get("ideal") is not None:
-            ideal_value = stat_data.get("ideal")
-
-        if stat_weight is None and stat_data.get("weight") is not None:
-            stat_weight = stat_data.get("weight")
+        opps, attempts, pct_value, score, ideal, weight = row
+        opportunities_total += opps
+        attempts_total += attempts
+        frequency_by_month.append(pct_value)
 
-        stat_score = stat_data.get("score")
-        if stat_score is not None:
-            stat_score_weights.append((float(stat_score), weights.get(month, 0.0)))
+        if month_weight > 0:
+            if pct_value is not None:
+                pct_sum += float(pct_value) * month_weight
+                pct_weight += month_weight
+            if score is not None:
+                score_sum += float(score) * month_weight
+                score_weight += month_weight
 
-    aggregated_pct = _weighted_average(pct_weights)
-    aggregated_score = _weighted_average(stat_score_weights)
+        if ideal_value is None and ideal is not None:
+            ideal_value = ideal
+        if stat_weight is None and weight is not None:
+            stat_weight = weight
 
     return {
-        "opps": opportunities_total,
         "opportunities": opportunities_total,
-        "att": attempts_total,
         "attempts": attempts_total,
-        "sample_total": opportunities_total,
-        "pct": aggregated_pct,
-        "percentage": aggregated_pct,
-        "score": aggregated_score,
+        "frequencies_by_month": frequency_by_month,
+        "pct": pct_sum / pct_weight if pct_weight > 0 else None,
+        "score": score_sum / score_weight if score_weight > 0 else None,
         "ideal": ideal_value,
         "weight": stat_weight,
-        "frequencies_by_month": frequency_by_month,
+    }
+
+
+def _group_stat_entry(reduced: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "score": reduced["score"],
+        "opportunities": reduced["opportunities"],
+        "attempts": reduced["attempts"],
+        "sample_total": reduced["opportunities"],
+        "frequencies_by_month": reduced["frequencies_by_month"],
+        "ideal": reduced["ideal"],
+    }
+
+
+def _subgroup_stat_entry(reduced: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "opps": reduced["opportunities"],
+        "opportunities": reduced["opportunities"],
+        "att": reduced["attempts"],
+        "attempts": reduced["attempts"],
+        "sample_total": reduced["opportunities"],
+        "pct": reduced["pct"],
+        "percentage": reduced["pct"],
+        "score": reduced["score"],
+        "ideal": reduced["ideal"],
+        "weight": reduced["weight"],
+        "frequencies_by_month": reduced["frequencies_by_month"],
     }
 
 
@@ -245,23 +229,30 @@ def _merge_group_stats(
 ) -> Dict[str, Any]:
     aggregated_groups: Dict[str, Any] = {}
 
-    group_keys = set()
-    for _, payload in month_payloads:
-        group_keys.update(payload.get("groups", {}).keys())
+    month_weights = [weights.get(month, 0.0) for month, _ in month_payloads]
+    month_groups = [payload.get("groups", {}) for _, payload in month_payloads]
+    empty_rows: List[StatRow | None] = [None] * len(month_payloads)
+
+    group_keys: Dict[str, None] = {}
+    for groups in month_groups:
+        group_keys.update(dict.fromkeys(groups.keys()))
 
     for group_name in group_keys:
-        stat_names: Set[str] = set()
+        group_by_month = [
+            group if isinstance(group, dict) else None
+            for group in (groups.get(group_name) for groups in month_groups)
+        ]
+
         group_hands = 0
         label = None
         subgroup_scores: Dict[str, List[Tuple[float, float]]] = {}
         subgroup_metadata: Dict[str, Dict[str, Any]] = {}
-        subgroup_stat_names: Dict[str, Set[str]] = {}
-        subgroup_keys: Set[str] = set()
+        subgroup_stat_names: Dict[str, Dict[str, None]] = {}
+        subgroup_keys: Dict[str, None] = {}
         group_score_values: List[Tuple[float, float]] = []
 
-        for month, payload in month_payloads:
-            group_data = payload.get("groups", {}).get(group_name)
-            if not isinstance(group_data, dict):
+        for group_data, month_weight in zip(group_by_month, month_weights):
+            if group_data is None:
                 continue
 
             group_hands += int(group_data.get("hands_count", 0) or 0)
@@ -269,14 +260,10 @@ def _merge_group_stats(
             if label is None and group_data.get("label"):
                 label = group_data.get("label")
 
-            stats_dict = group_data.get("stats")
-            if isinstance(stats_dict, dict):
-                stat_names.update(stats_dict.keys())
-
             for subgroup, data in (group_data.get("subgroups") or {}).items():
                 if not isinstance(data, dict):
                     continue
-                subgroup_keys.add(subgroup)
+                subgroup_keys[subgroup] = None
                 meta = subgroup_metadata.setdefault(subgroup, {})
                 if not meta:
                     for key in ("label", "weight"):
@@ -285,39 +272,42 @@ def _merge_group_stats(
                 score = data.get("score")
                 if score is None:
                     continue
-                subgroup_scores.setdefault(subgroup, []).append(
-                    (float(score), weights.get(month, 0.0))
-                )
+                subgroup_scores.setdefault(subgroup, []).append((float(score), month_weight))
 
                 stats_dict = data.get("stats")
                 if isinstance(stats_dict, dict):
-                    subgroup_stat_names.setdefault(subgroup, set()).update(stats_dict.keys())
+                    subgroup_stat_names.setdefault(subgroup, {}).update(dict.fromkeys(stats_dict))
 
             if group_data.get("overall_score") is not None:
-                group_score_values.append((float(group_data.get("overall_score")), weights.get(month, 0.0)))
+                group_score_values.append((float(group_data.get("overall_score")), month_weight))
 
-        group_stats: Dict[str, Any] = {}
-        for stat_name in stat_names:
-            group_stats[stat_name] = _aggregate_stat_for_group(
-                group_name, stat_name, month_payloads, weights
-            )
+        group_matrix = _stat_matrix(
+            [group.get("stats") if group else None for group in group_by_month]
+        )
+        group_stats = {
+            stat_name: _group_stat_entry(_reduce_stat_rows(rows, month_weights))
+            for stat_name, rows in group_matrix.items()
+        }
 
         merged_subgroups: Dict[str, Any] = {}
-        all_subgroup_names = set(subgroup_keys) | set(subgroup_scores.keys())
-        for subgroup in all_subgroup_names:
+        for subgroup in subgroup_keys:
             entries = subgroup_scores.get(subgroup, [])
-            merged_score = _weighted_average(entries) if entries else None
             entry = dict(subgroup_metadata.get(subgroup, {}))
-            entry["score"] = merged_score
+            entry["score"] = _weighted_average(entries) if entries else None
 
             stat_names_for_subgroup = subgroup_stat_names.get(subgroup)
             if stat_names_for_subgroup:
-                stats_payload = {}
-                for stat_name in stat_names_for_subgroup:
-                    stats_payload[stat_name] = _aggregate_subgroup_stat(
-                        group_name, subgroup, stat_name, month_payloads, weights
+                subgroup_by_month = []
+                for group in group_by_month:
+                    data = (group.get("subgroups") or {}).get(subgroup) if group else None
+                    subgroup_by_month.append(data.get("stats") if isinstance(data, dict) else None)
+                subgroup_matrix = _stat_matrix(subgroup_by_month)
+                entry["stats"] = {
+                    stat_name: _subgroup_stat_entry(
+                        _reduce_stat_rows(subgroup_matrix.get(stat_name, empty_rows), month_weights)
                     )
-                entry["stats"] = stats_payload
+                    for stat_name in stat_names_for_subgroup
+                }
 
             merged_subgroups[subgroup] = entry
 
@@ -333,48 +323,16 @@ def _merge_group_stats(
     return aggregated_groups
 
 
-def get_or_build_month_dashboard_payload(
-    user_id: str,
-    month: str,
-    *,
-    result_storage: ResultStorageService | None = None,
-    ignore_cache: bool = True,
+def _build_month_payload(
+    user_id: str, month: str, storage: ResultStorageService, stamp: str | None
 ) -> dict:
-    """Load cached monthly payload or build and persist it on-demand."""
-
-    storage = result_storage or ResultStorageService()
     start = time.monotonic()
-
-    if not ignore_cache:
-        try:
-            cached = storage.load_month_dashboard_payload(user_id, month)
-            if cached:
-                logger.info(
-                    "[USER_MONTH] Loaded cached dashboard payload for %s/%s in %.2fs",
-                    user_id,
-                    month,
-                    time.monotonic() - start,
-                )
-                return cached
-        except Exception as exc:  # noqa: BLE001 - fallback to build
-            logger.debug(
-                "[USER_MONTH] Failed to load cached month payload for %s/%s: %s",
-                user_id,
-                month,
-                exc,
-            )
-    else:
-        logger.debug(
-            "[USER_MONTH] Ignoring existing month cache for %s/%s; rebuilding from pipeline_result",
-            user_id,
-            month,
-        )
-
     payload = build_user_month_dashboard_payload(
         user_id, month, use_cache=False, result_storage=storage
     )
 
     if payload:
+        stamp_payload(payload, stamp)
         try:
             storage.save_month_dashboard_payload(user_id, month, payload)
         except Exception as exc:  # noqa: BLE001 - cache best-effort
@@ -394,40 +352,149 @@ def get_or_build_month_dashboard_payload(
     return payload or {}
 
 
+def _get_month_payload(
+    user_id: str,
+    month: str,
+    storage: ResultStorageService,
+    stamp: str | None,
+    *,
+    allow_stale: bool,
+) -> dict:
+    """Return the month payload cached under ``stamp``, rebuilding when needed."""
+
+    if stamp is None:
+        return _build_month_payload(user_id, month, storage, stamp)
+
+    start = time.monotonic()
+    try:
+        cached = storage.load_month_dashboard_payload(user_id, month)
+    except Exception as exc:  # noqa: BLE001 - fallback to build
+        logger.debug(
+            "[USER_MONTH] Failed to load cached month payload for %s/%s: %s",
+            user_id,
+            month,
+            exc,
+        )
+        cached = None
+
+    if cached:
+        if payload_stamp(cached) == stamp:
+            logger.info(
+                "[USER_MONTH] Loaded cached dashboard payload for %s/%s in %.2fs",
+                user_id,
+                month,
+                time.monotonic() - start,
+            )
+            return cached
+        if allow_stale:
+            logger.info(
+                "[USER_MONTH] Serving stale dashboard payload for %s/%s; refreshing in background",
+                user_id,
+                month,
+            )
+            refresh_in_background(
+                f"month:{user_id}:{month}",
+                lambda: _build_month_payload(user_id, month, storage, stamp),
+            )
+            return cached
+
+    return _build_month_payload(user_id, month, storage, stamp)
+
+
+def get_or_build_month_dashboard_payload(
+    user_id: str,
+    month: str,
+    *,
+    result_storage: ResultStorageService | None = None,
+    cache_service: DashboardCacheService | None = None,
+    ignore_cache: bool = False,
+) -> dict:
+    """Load the generation-stamped monthly payload or build and persist it on-demand."""
+
+    storage = result_storage or ResultStorageService()
+    stamp = (cache_service or DashboardCacheService()).current_stamp(user_id)
+
+    if ignore_cache:
+        logger.debug(
+            "[USER_MONTH] Ignoring existing month cache for %s/%s; rebuilding from pipeline_result",
+            user_id,
+            month,
+        )
+        return _build_month_payload(user_id, month, storage, stamp)
+
+    return _get_month_payload(user_id, month, storage, stamp, allow_stale=True)
+
+
 def get_or_build_main_dashboard_payload(
     user_id: str,
     *,
     result_storage: ResultStorageService | None = None,
     months_service: UserMonthsService | None = None,
     upload_service: UploadService | None = None,
-    ignore_cache: bool = True,
+    cache_service: DashboardCacheService | None = None,
+    ignore_cache: bool = False,
 ) -> dict:
-    """Return cached main payload or rebuild it by aggregating monthly caches."""
+    """
+    Return the main payload cached under the user's current generation.
+
+    A stale cached payload is returned immediately and rebuilt in the
+    background; without a cached payload (or with ``ignore_cache``) it is
+    rebuilt by aggregating the monthly payloads.
+    """
 
     storage = result_storage or ResultStorageService()
     months_service = months_service or UserMonthsService()
     upload_service = upload_service or UploadService()
     start = time.monotonic()
 
-    if not ignore_cache:
+    stamp = (cache_service or DashboardCacheService()).current_stamp(user_id)
+
+    def _rebuild() -> dict:
+        return _build_main_payload(user_id, storage, months_service, upload_service, stamp)
+
+    if ignore_cache:
+        logger.debug(
+            "[USER_MAIN] Ignoring cached main payload for %s; aggregating fresh monthly data",
+            user_id,
+        )
+        return _rebuild()
+
+    if stamp is not None:
         try:
             cached = storage.load_main_dashboard_payload(user_id)
-            if cached:
+        except Exception as exc:  # noqa: BLE001 - rebuild on cache errors
+            logger.debug(
+                "[USER_MAIN] Failed to load cached main payload for %s: %s", user_id, exc
+            )
+            cached = None
+
+        if cached:
+            if payload_stamp(cached) == stamp:
                 logger.info(
                     "[USER_MAIN] Loaded cached main payload for %s in %.2fs",
                     user_id,
                     time.monotonic() - start,
                 )
                 return cached
-        except Exception as exc:  # noqa: BLE001 - rebuild on cache errors
-            logger.debug(
-                "[USER_MAIN] Failed to load cached main payload for %s: %s", user_id, exc
+            logger.info(
+                "[USER_MAIN] Serving stale main payload for %s; refreshing in background", user_id
             )
-    else:
-        logger.debug(
-            "[USER_MAIN] Ignoring cached main payload for %s; aggregating fresh monthly data",
-            user_id,
-        )
+            refresh_in_background(f"main:{user_id}", _rebuild)
+            return cached
+
+    return _rebuild()
+
+
+def _build_main_payload(
+    user_id: str,
+    storage: ResultStorageService,
+    months_service: UserMonthsService,
+    upload_service: UploadService,
+    stamp: str | None,
+) -> dict:
+    """Aggregate the selected monthly payloads into the main payload and persist it."""
+
+    start = time.monotonic()
 
     months_map = months_service.get_user_months_map(user_id)
     all_months = list(months_map.keys())
@@ -445,9 +512,7 @@ def get_or_build_main_dashboard_payload(
     month_payloads: List[Tuple[str, Dict[str, Any]]] = []
     for month in selected_months:
         try:
-            payload = get_or_build_month_dashboard_payload(
-                user_id, month, result_storage=storage
-            )
+            payload = _get_month_payload(user_id, month, storage, stamp, allow_stale=False)
             if payload:
                 month_payloads.append((month, payload))
         except Exception as exc:  # noqa: BLE001 - continue aggregating available months
@@ -466,6 +531,7 @@ def get_or_build_main_dashboard_payload(
             "groups": {},
             "has_data": False,
         }
+        stamp_payload(payload, stamp)
         try:
             storage.save_main_dashboard_payload(user_id, payload)
         except Exception:  # noqa: BLE001 - optional cache write
@@ -511,6 +577,7 @@ def get_or_build_main_dashboard_payload(
         "weighted_scores": weighted_scores,
         "has_data": True,
     }
+    stamp_payload(payload, stamp)
 
     try:
         storage.save_main_dashboard_payload(user_id, payload)
@@ -1,11 +1,16 @@
 import json
 import logging
-import re
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from app.services.master_result_builder import _merge_pipeline_results
+from app.services.months_catalog_service import (
+    CatalogEntry,
+    MonthsCatalogService,
+    is_catalog_month,
+    monthly_payload_path,
+)
 from app.services.result_storage import ResultStorageService
 from app.services.upload_service import UploadService
 
@@ -19,76 +24,48 @@ class UserMonthsService:
         self,
         upload_service: UploadService | None = None,
         result_storage_service: ResultStorageService | None = None,
+        months_catalog_service: MonthsCatalogService | None = None,
     ) -> None:
         self.upload_service = upload_service or UploadService()
         self.result_storage = result_storage_service or ResultStorageService()
+        self.months_catalog = months_catalog_service or MonthsCatalogService()
 
     def get_user_months_map(self, user_id: str) -> Dict[str, List[str]]:
         """
         Build a mapping of months to job tokens for a user.
 
-        Returns a dict like {"2025-08": ["jobtoken1"], "2025-09": ["jobtoken2"]}
-        based on uploads stored in the primary database and months_manifest.json
-        entries stored under /results/<job_id>/.
+        Returns a dict like {"2025-08": ["jobtoken1"], "2025-09": ["jobtoken2"]}.
+        Months come from the materialized ``user_months_catalog``; tokens not yet
+        catalogued (processed before the catalog existed) are scanned from their
+        stored pipeline results once and written back to the catalog.
         """
 
         logger.debug("[USER_MONTHS] Building months map for user %s", user_id)
 
-        uploads = self.upload_service.list_all_uploads(user_id)
-        logger.debug("[USER_MONTHS] Upload entries for %s: %s", user_id, uploads)
+        token_months = self.months_catalog.get_user_token_months(user_id)
+        if token_months is None:
+            # Catalog unavailable: fall back to scanning every upload
+            uploads = self.upload_service.list_all_uploads(user_id)
+            token_months = {u.get("token"): [] for u in uploads if u.get("token")}
+            backfill = False
+        else:
+            backfill = True
 
-        tokens = [u.get("token") for u in uploads if u.get("token")]
-
-        logger.debug("[USER_MONTHS] Found tokens for user %s: %s", user_id, tokens)
+        logger.debug("[USER_MONTHS] Found tokens for user %s: %s", user_id, list(token_months))
 
         months_map: Dict[str, List[str]] = defaultdict(list)
 
-        for token in tokens:
-            # Prefer the canonical global pipeline to discover month coverage so that
-            # the mapping reflects the exact set of valid hands used by the pipeline.
-            try:
-                global_result = self.result_storage.get_pipeline_result(token)
-            except Exception as exc:  # noqa: BLE001 - skip tokens without usable results
-                logger.warning("[USER_MONTHS] Skipping token %s (global result unavailable: %s)", token, exc)
-                continue
-
-            hands_per_month = global_result.get("hands_per_month") or {}
-            if not isinstance(hands_per_month, dict):
-                hands_per_month = {}
-
-            discovered_months: set[str] = set()
-            for month, count in hands_per_month.items():
-                if not self._is_valid_month(month):
-                    continue
-                if int(count or 0) <= 0:
-                    continue
-                discovered_months.add(month)
-
-            # Fallback to months_manifest when hands_per_month is missing
-            if not discovered_months:
-                try:
-                    manifest = self.result_storage.get_months_manifest(token)
-                except Exception as exc:  # noqa: BLE001 - bubble up debug info without stopping the loop
-                    logger.warning("[USER_MONTHS] Failed to load months_manifest for %s: %s", token, exc)
-                    manifest = None
-
-                months = manifest.get("months", []) if isinstance(manifest, dict) else []
-                for month_entry in months:
-                    if not isinstance(month_entry, dict):
-                        continue
-
-                    month = month_entry.get("month")
-                    if not self._is_valid_month(month):
-                        continue
-                    discovered_months.add(month)
-
-            for month in sorted(discovered_months):
-                if not self._month_has_payload(token, month):
-                    logger.debug(
-                        "[USER_MONTHS] Skipping %s for %s (missing monthly payload)", month, token
-                    )
+        for token, months in token_months.items():
+            if not months:
+                entries = self.scan_token_months(token)
+                if entries is None:
                     continue
+                if backfill:
+                    # também sem meses, para não voltar a ler o storage
+                    self.months_catalog.record_token_months(user_id, token, entries)
+                months = [month for month, _, _ in entries]
 
+            for month in months:
                 if token not in months_map[month]:
                     months_map[month].append(token)
 
@@ -100,6 +77,63 @@ class UserMonthsService:
 
         return final_map
 
+    def scan_token_months(self, token: str) -> Optional[List[CatalogEntry]]:
+        """
+        Discover the months of a token from its stored results.
+
+        Returns catalog entries (month, hand_count, payload_path) for months that
+        have a monthly payload, or None when the global result is unavailable.
+        """
+
+        # Prefer the canonical global pipeline to discover month coverage so that
+        # the mapping reflects the exact set of valid hands used by the pipeline.
+        try:
+            global_result = self.result_storage.get_pipeline_result(token)
+        except Exception as exc:  # noqa: BLE001 - skip tokens without usable results
+            logger.warning("[USER_MONTHS] Skipping token %s (global result unavailable: %s)", token, exc)
+            return None
+
+        hands_per_month = (global_result or {}).get("hands_per_month") or {}
+        if not isinstance(hands_per_month, dict):
+            hands_per_month = {}
+
+        discovered_months: Dict[str, int] = {}
+        for month, count in hands_per_month.items():
+            if not self._is_valid_month(month):
+                continue
+            if int(count or 0) <= 0:
+                continue
+            discovered_months[month] = int(count)
+
+        # Fallback to months_manifest when hands_per_month is missing
+        if not discovered_months:
+            try:
+                manifest = self.result_storage.get_months_manifest(token)
+            except Exception as exc:  # noqa: BLE001 - bubble up debug info without stopping the loop
+                logger.warning("[USER_MONTHS] Failed to load months_manifest for %s: %s", token, exc)
+                manifest = None
+
+            months = manifest.get("months", []) if isinstance(manifest, dict) else []
+            for month_entry in months:
+                if not isinstance(month_entry, dict):
+                    continue
+
+                month = month_entry.get("month")
+                if not self._is_valid_month(month):
+                    continue
+                discovered_months[month] = int(month_entry.get("hand_count") or 0)
+
+        entries: List[CatalogEntry] = []
+        for month in sorted(discovered_months):
+            if not self._month_has_payload(token, month):
+                logger.debug(
+                    "[USER_MONTHS] Skipping %s for %s (missing monthly payload)", month, token
+                )
+                continue
+            entries.append((month, discovered_months[month], monthly_payload_path(token, month)))
+
+        return entries
+
     def list_user_months_with_hands(self, user_id: str) -> list[dict]:
         """Return months with a friendly hands count for dropdowns and selectors."""
 
@@ -163,13 +197,7 @@ class UserMonthsService:
 
     @staticmethod
     def _is_valid_month(month: str | None) -> bool:
-        if not month or not isinstance(month, str):
-            return False
-        if not re.fullmatch(r"\d{4}-\d{2}", month):
-            return False
-        if month.startswith("1970-"):
-            return False
-        return True
+        return is_catalog_month(month)
 
     def _month_has_payload(self, token: str, month: str) -> bool:
         try:
@@ -7,6 +7,7 @@ import json
 import logging
 from typing import Dict, List, Any, Optional, Set
 from pathlib import Path
+from app.stats.hand_bundle import BUNDLE_NAME, write_hand_bundle
 from app.stats.scoring_calculator import ScoringCalculator
 from app.stats.scoring_config import get_stat_config
 from app.utils.hand_fingerprint import fingerprint_hand
@@ -327,6 +328,12 @@ class MultiSiteAggregator:
                 
                 logger.info(f"Wrote {len(hands_list)} combined hands to {filename}")
         
+        # Pacote do grupo (todas as stats + índice) - é o que se publica por mês
+        bundle_info = write_hand_bundle(
+            os.path.join(hands_dir, BUNDLE_NAME), merged_hands, HandCollector.stat_filenames
+        )
+        logger.info(f"Wrote {group} hand bundle: {bundle_info}")
+        
         # Create summary file
         summary_file = os.path.join(combined_dir, f"{group}_summary.json")
         summary = {
@@ -436,6 +443,10 @@ class MultiSiteAggregator:
                 
                 logger.info(f"Wrote {len(hands_list)} cross-format postflop hands to {filename}")
         
+        write_hand_bundle(
+            os.path.join(hands_dir, BUNDLE_NAME), cross_format_hands, HandCollector.stat_filenames
+        )
+        
         logger.info(f"Created cross-format postflop outputs with {len(cross_format_hands)} stats")
         
         return cross_format_stats
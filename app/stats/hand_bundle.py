@@ -0,0 +1,299 @@
+"""Packed hands_by_stat bundle: every stat file of a group in one object.
+
+A group directory used to be ~50 ``<stat>.txt`` files, each uploaded and
+downloaded whole. The bundle stores each distinct hand once, in blocks that
+are zlib-compressed when that helps, followed by a binary index mapping
+stat -> hands -> (block, offset, length). A reader fetches the header and
+index with one range read and then only the blocks holding the hands it
+needs, so a sample view no longer scales with the size of the stat file.
+
+Layout (little endian)::
+
+    header   magic 'HBDL', u16 version, u16 flags, u32 index_length
+    index    zlib( u32 stats, u32 hands, u32 blocks,
+                   blocks x (u64 offset, u32 stored_len, u32 raw_len, u8 codec),
+                   hands  x (u32 block, u32 offset, u32 length, 20s sha1 id),
+                   stats  x (str name, str filename, u32 count, count x u32 hand) )
+    data     blocks, offsets relative to the end of the index
+
+Strings are u16 length + UTF-8. Hand ids are ``fingerprint_hand`` digests.
+"""
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.hand_fingerprint import fingerprint_hand
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_NAME = "hands.bundle"
+MAGIC = b"HBDL"
+VERSION = 1
+BLOCK_SIZE = 64 * 1024
+# primeira leitura: header + (normalmente) o índice inteiro
+HEAD_PROBE = 64 * 1024
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+_HEADER = struct.Struct("<4sHHI")
+_COUNTS = struct.Struct("<III")
+_BLOCK = struct.Struct("<QIIB")
+_HAND = struct.Struct("<III20s")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+# (start, length) -> bytes, ou None se o objeto não existir
+RangeReader = Callable[[int, int], Optional[bytes]]
+
+
+class BundleFormatError(ValueError):
+    """The data is not a hand bundle (or is truncated)."""
+
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return _U16.pack(len(raw)) + raw
+
+
+def _stat_filename(stat_name: str, filenames: Optional[Dict[str, str]]) -> str:
+    if filenames and stat_name in filenames:
+        return filenames[stat_name]
+    return stat_name.replace("/", "_").replace(" ", "_") + ".txt"
+
+
+def write_hand_bundle(
+    path: str,
+    hands_by_stat: Dict[str, List[str]],
+    filenames: Optional[Dict[str, str]] = None,
+    block_size: int = BLOCK_SIZE,
+    compress: bool = True,
+) -> Dict[str, int]:
+    """
+    Write the hands of one group as a bundle at ``path``.
+
+    Hands are stripped like the stat .txt files; a hand shared by several
+    stats is stored once. ``filenames`` maps stat name -> .txt name (stats
+    missing from it get the sanitized name the aggregator uses).
+    """
+    hand_index: Dict[str, int] = {}
+    hands: List[Tuple[int, int, int, bytes]] = []
+    stats: List[Tuple[str, str, List[int]]] = []
+    blocks: List[Tuple[int, int, int, int]] = []
+    data = bytearray()
+    pending = bytearray()
+
+    def flush_block():
+        if not pending:
+            return
+        raw = bytes(pending)
+        codec = CODEC_RAW
+        stored = raw
+        if compress:
+            packed = zlib.compress(raw, 6)
+            if len(packed) < len(raw):
+                codec, stored = CODEC_ZLIB, packed
+        blocks.append((len(data), len(stored), len(raw), codec))
+        data.extend(stored)
+        pending.clear()
+
+    for stat_name, hands_list in hands_by_stat.items():
+        members: List[int] = []
+        for hand in hands_list:
+            text = hand.strip() if hand else ""
+            if not text:
+                continue
+            index = hand_index.get(text)
+            if index is None:
+                encoded = text.encode("utf-8")
+                if pending and len(pending) + len(encoded) > block_size:
+                    flush_block()
+                index = hand_index[text] = len(hands)
+                hands.append((len(blocks), len(pending), len(encoded),
+                              bytes.fromhex(fingerprint_hand(text))))
+                pending.extend(encoded)
+            members.append(index)
+        if members:
+            stats.append((stat_name, _stat_filename(stat_name, filenames), members))
+    flush_block()
+
+    index_parts = [_COUNTS.pack(len(stats), len(hands), len(blocks))]
+    index_parts.extend(_BLOCK.pack(*block) for block in blocks)
+    index_parts.extend(_HAND.pack(*hand) for hand in hands)
+    for stat_name, filename, members in stats:
+        index_parts.append(_pack_str(stat_name))
+        index_parts.append(_pack_str(filename))
+        index_parts.append(_U32.pack(len(members)))
+        index_parts.append(struct.pack(f"<{len(members)}I", *members))
+    index_blob = zlib.compress(b"".join(index_parts), 6)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(index_blob)))
+        f.write(index_blob)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    return {
+        "stats": len(stats),
+        "hands": len(hands),
+        "blocks": len(blocks),
+        "bytes": _HEADER.size + len(index_blob) + len(data),
+    }
+
+
+class HandBundle:
+    """Read side of a bundle, driven by a byte-range reader."""
+
+    def __init__(self, read_range: RangeReader, index: bytes, data_offset: int):
+        self._read_range = read_range
+        self._data_offset = data_offset
+        self._block_cache: Dict[int, bytes] = {}
+        self._parse_index(index)
+
+    @classmethod
+    def open(cls, read_range: RangeReader) -> Optional["HandBundle"]:
+        """Read header and index; None when the object does not exist."""
+        head = read_range(0, HEAD_PROBE)
+        if not head:
+            return None
+        if len(head) < _HEADER.size:
+            raise BundleFormatError("truncated header")
+        magic, version, _flags, index_length = _HEADER.unpack_from(head)
+        if magic != MAGIC or version != VERSION:
+            raise BundleFormatError(f"not a hand bundle (magic={magic!r}, version={version})")
+
+        data_offset = _HEADER.size + index_length
+        index = head[_HEADER.size:data_offset]
+        if len(index) < index_length:
+            rest = read_range(len(head), data_offset - len(head)) or b""
+            index += rest
+            if len(index) < index_length:
+                raise BundleFormatError("truncated index")
+        return cls(read_range, zlib.decompress(index), data_offset)
+
+    @classmethod
+    def open_file(cls, path) -> Optional["HandBundle"]:
+        return cls.open(local_range_reader(path))
+
+    def _parse_index(self, index: bytes) -> None:
+        stat_count, hand_count, block_count = _COUNTS.unpack_from(index)
+        pos = _COUNTS.size
+        self._blocks = [_BLOCK.unpack_from(index, pos + i * _BLOCK.size) for i in range(block_count)]
+        pos += block_count * _BLOCK.size
+        self._hands = [_HAND.unpack_from(index, pos + i * _HAND.size) for i in range(hand_count)]
+        pos += hand_count * _HAND.size
+
+        def read_str(offset: int) -> Tuple[str, int]:
+            (length,) = _U16.unpack_from(index, offset)
+            offset += _U16.size
+            return index[offset:offset + length].decode("utf-8"), offset + length
+
+        self._stats: Dict[str, List[int]] = {}
+        self._filenames: Dict[str, str] = {}
+        for _ in range(stat_count):
+            name, pos = read_str(pos)
+            filename, pos = read_str(pos)
+            (count,) = _U32.unpack_from(index, pos)
+            pos += _U32.size
+            self._stats[name] = list(struct.unpack_from(f"<{count}I", index, pos))
+            pos += count * _U32.size
+            self._filenames[filename] = name
+
+    # ------------------------------------------------------------- metadata
+    @property
+    def stats(self) -> List[str]:
+        return list(self._stats)
+
+    def stat_for_filename(self, filename: str) -> Optional[str]:
+        return self._filenames.get(filename)
+
+    def hand_ids(self, stat_name: str) -> List[str]:
+        return [self._hands[i][3].hex() for i in self._stats.get(stat_name, ())]
+
+    def hands_per_stat(self) -> Dict[str, int]:
+        return {name: len(members) for name, members in self._stats.items()}
+
+    def metadata(self) -> Dict[str, Dict]:
+        """Same keys as the HandCollector metadata.json the listings read."""
+        return {
+            "hands_per_stat": self.hands_per_stat(),
+            "hand_ids": {name: self.hand_ids(name) for name in self._stats},
+        }
+
+    # ---------------------------------------------------------------- hands
+    def _load_blocks(self, block_numbers: Iterable[int]) -> None:
+        wanted = sorted(set(block_numbers) - set(self._block_cache))
+        # blocos contíguos são pedidos numa só leitura
+        runs: List[List[int]] = []
+        for number in wanted:
+            if runs and runs[-1][-1] == number - 1:
+                runs[-1].append(number)
+            else:
+                runs.append([number])
+
+        for run in runs:
+            first = self._blocks[run[0]]
+            last = self._blocks[run[-1]]
+            start = first[0]
+            length = last[0] + last[1] - start
+            blob = self._read_range(self._data_offset + start, length)
+            if blob is None or len(blob) < length:
+                raise BundleFormatError("truncated data block")
+            for number in run:
+                offset, stored_len, raw_len, codec = self._blocks[number]
+                stored = blob[offset - start:offset - start + stored_len]
+                self._block_cache[number] = zlib.decompress(stored) if codec == CODEC_ZLIB else stored
+
+    def hands(self, stat_name: str, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(hand_id, text) pairs of a stat, in the order they were written."""
+        members = self._stats.get(stat_name, [])
+        if limit is not None:
+            members = members[:limit]
+        records = [self._hands[i] for i in members]
+        self._load_blocks(record[0] for record in records)
+        result = []
+        for block, offset, length, digest in records:
+            text = self._block_cache[block][offset:offset + length].decode("utf-8")
+            result.append((digest.hex(), text))
+        return result
+
+    def stat_text(self, stat_name: str) -> str:
+        """The stat's .txt content (hands joined by a blank line)."""
+        return "\n\n".join(text for _, text in self.hands(stat_name))
+
+
+def local_range_reader(path) -> RangeReader:
+    path = Path(path)
+
+    def read_range(start: int, length: int) -> Optional[bytes]:
+        if not path.exists():
+            return None
+        with path.open("rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    return read_range
+
+
+def open_stored_bundle(storage, storage_path: str, local_path=None) -> Optional[HandBundle]:
+    """Open a bundle through ``storage.download_range``, falling back to a local copy."""
+    readers: List[RangeReader] = [
+        lambda start, length: storage.download_range(storage_path, start, length)
+    ]
+    if local_path is not None:
+        readers.append(local_range_reader(local_path))
+
+    for read_range in readers:
+        try:
+            bundle = HandBundle.open(read_range)
+        except Exception as exc:  # noqa: BLE001 - tenta a próxima origem
+            logger.debug("Hand bundle unreadable at %s: %s", storage_path, exc)
+            continue
+        if bundle is not None:
+            return bundle
+    return None
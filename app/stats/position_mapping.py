@@ -1,135 +1,154 @@
 """
 Centralized position mapping following GG Poker standard.
 All position assignments must use this module for consistency.
+
+Everything is precomputed at import: ``POSITION_TABLE[num_players][relative_seat]``
+gives the position, its category, its RFI stat and the positions acting
+after it preflop, so resolving a seat is a tuple index.
 """
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# Position names by relative seat (0=BTN, 1=SB, 2=BB, ...), per player count.
+#
+# Position removal order as players decrease:
+# 9->8: Remove UTG+2 (Early position)
+# 8->7: Remove HJ (Middle position) - CUSTOM: Keep 2 EP + 1 MP for 7-max
+# 7->6: Remove HJ again (Middle position)
+# 6->5: Remove UTG (Early position)
+# 5->4: Remove MP (Middle position)
+_POSITIONS_BY_PLAYERS: Dict[int, Tuple[str, ...]] = {
+    # Full ring: 3 Early (UTG, UTG+1, UTG+2), 2 Middle (MP, HJ), 2 Late (CO, BTN)
+    9: ("BTN", "SB", "BB", "UTG", "UTG+1", "UTG+2", "MP", "HJ", "CO"),
+    # Remove UTG+2: 2 Early (UTG, UTG+1), 2 Middle (MP, HJ), 2 Late (CO, BTN)
+    8: ("BTN", "SB", "BB", "UTG", "UTG+1", "MP", "HJ", "CO"),
+    # Remove HJ: 2 Early (UTG, UTG+1), 1 Middle (MP), 2 Late (CO, BTN)
+    7: ("BTN", "SB", "BB", "UTG", "UTG+1", "MP", "CO"),
+    # 6-max standard: 1 Early (UTG), 1 Middle (MP), 2 Late (CO, BTN)
+    6: ("BTN", "SB", "BB", "UTG", "MP", "CO"),
+    # Remove UTG: 0 Early, 1 Middle (MP), 2 Late (CO, BTN)
+    5: ("BTN", "SB", "BB", "MP", "CO"),
+    # Remove MP: 0 Early, 0 Middle, 2 Late (CO, BTN)
+    4: ("BTN", "SB", "BB", "CO"),
+    # Heads-up + 1: Only BTN, SB, BB
+    3: ("BTN", "SB", "BB"),
+    # Heads-up: BTN = SB
+    2: ("BTN/SB", "BB"),
+}
+MAX_PLAYERS = max(_POSITIONS_BY_PLAYERS)
+
+# GG Poker categories:
+# - Early: UTG, UTG+1, UTG+2
+# - Middle: MP, MP+1, MP+2, HJ (MP+1, MP+2 are alternative names; we use MP and HJ)
+# - Late: CO, BTN
+# - Blinds: SB, BB (not categorized for RFI)
+_CATEGORY_BY_POSITION: Mapping[str, str] = MappingProxyType({
+    "UTG": "Early", "UTG+1": "Early", "UTG+2": "Early",
+    "MP": "Middle", "MP+1": "Middle", "MP+2": "Middle", "HJ": "Middle",
+    "CO": "Late", "BTN": "Late",
+})
+
+_RFI_STAT_BY_POSITION: Mapping[str, str] = MappingProxyType({
+    **{position: f"{category} RFI" for position, category in _CATEGORY_BY_POSITION.items()
+       if category != "Late"},
+    "CO": "CO Steal",
+    "BTN": "BTN Steal",
+})
+
+
+class PositionInfo(NamedTuple):
+    position: str
+    category: Optional[str]
+    rfi_stat: Optional[str]
+    acts_after: Tuple[str, ...]  # posições que agem depois desta no preflop
+
+
+def preflop_order(positions: Sequence[str]) -> Tuple[str, ...]:
+    """Preflop action order of a BTN-first seat list: UTG.. CO, then BTN, SB, BB."""
+    if len(positions) <= 2:
+        return tuple(positions)
+    return tuple(positions[3:]) + tuple(positions[:3])
+
 
-def get_position_map(num_players: int) -> dict:
+def acting_after_table(order: Iterable[str]) -> Mapping[str, Tuple[str, ...]]:
+    """For each position of an action order, the positions acting after it."""
+    order = tuple(order)
+    return MappingProxyType({position: order[i + 1:] for i, position in enumerate(order)})
+
+
+def _build_row(names: Tuple[str, ...]) -> Tuple[PositionInfo, ...]:
+    after = acting_after_table(preflop_order(names))
+    return tuple(
+        PositionInfo(name, _CATEGORY_BY_POSITION.get(name), _RFI_STAT_BY_POSITION.get(name), after[name])
+        for name in names
+    )
+
+
+# POSITION_TABLE[num_players] -> linha indexada pelo lugar relativo ao botão
+# (linhas vazias para contagens não suportadas)
+POSITION_TABLE: Tuple[Tuple[PositionInfo, ...], ...] = tuple(
+    _build_row(_POSITIONS_BY_PLAYERS[n]) if n in _POSITIONS_BY_PLAYERS else ()
+    for n in range(MAX_PLAYERS + 1)
+)
+_POSITION_NAMES: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(info.position for info in row) for row in POSITION_TABLE
+)
+_POSITION_MAPS: Tuple[Mapping[int, str], ...] = tuple(
+    MappingProxyType(dict(enumerate(names))) for names in _POSITION_NAMES
+)
+_EMPTY_MAP: Mapping[int, str] = MappingProxyType({})
+
+
+def get_position_map(num_players: int) -> Mapping[int, str]:
     """
     Get position mapping for a given number of players.
     Follows GG Poker standard exactly.
     
-    Returns mapping of relative_position (0=BTN, 1=SB, 2=BB, etc.) to position name.
-    
-    Position removal order as players decrease:
-    9->8: Remove UTG+2 (Early position)
-    8->7: Remove HJ (Middle position) - CUSTOM: Keep 2 EP + 1 MP for 7-max
-    7->6: Remove HJ again (Middle position)
-    6->5: Remove UTG (Early position)
-    5->4: Remove MP (Middle position)
+    Returns a read-only mapping of relative_position (0=BTN, 1=SB, 2=BB, etc.)
+    to position name; empty for unsupported player counts.
     """
-    if num_players == 9:
-        # Full ring: 3 Early (UTG, UTG+1, UTG+2), 2 Middle (MP, HJ), 2 Late (CO, BTN)
-        return {
-            0: "BTN",    # Button
-            1: "SB",     # Small Blind
-            2: "BB",     # Big Blind
-            3: "UTG",    # Under the Gun (Early)
-            4: "UTG+1",  # UTG+1 (Early)
-            5: "UTG+2",  # UTG+2 (Early) - THIS WAS MISSING IN PREFLOP_STATS!
-            6: "MP",     # Middle Position
-            7: "HJ",     # Hijack (Middle)
-            8: "CO"      # Cutoff (Late)
-        }
-    elif num_players == 8:
-        # Remove UTG+2: 2 Early (UTG, UTG+1), 2 Middle (MP, HJ), 2 Late (CO, BTN)
-        return {
-            0: "BTN",
-            1: "SB",
-            2: "BB",
-            3: "UTG",    # Early
-            4: "UTG+1",  # Early
-            5: "MP",     # Middle
-            6: "HJ",     # Middle
-            7: "CO"      # Late
-        }
-    elif num_players == 7:
-        # Remove HJ: 2 Early (UTG, UTG+1), 1 Middle (MP), 2 Late (CO, BTN)
-        return {
-            0: "BTN",
-            1: "SB",
-            2: "BB",
-            3: "UTG",    # Early
-            4: "UTG+1",  # Early
-            5: "MP",     # Middle (only one)
-            6: "CO"      # Late
-        }
-    elif num_players == 6:
-        # 6-max standard: Remove HJ: 1 Early (UTG), 1 Middle (MP), 2 Late (CO, BTN)
-        return {
-            0: "BTN",
-            1: "SB",
-            2: "BB",
-            3: "UTG",    # Early
-            4: "MP",     # Middle
-            5: "CO"      # Late
-        }
-    elif num_players == 5:
-        # Remove UTG: 0 Early, 1 Middle (MP), 2 Late (CO, BTN)
-        return {
-            0: "BTN",
-            1: "SB",
-            2: "BB",
-            3: "MP",     # Middle (no Early positions)
-            4: "CO"      # Late
-        }
-    elif num_players == 4:
-        # Remove MP: 0 Early, 0 Middle, 2 Late (CO, BTN)
-        return {
-            0: "BTN",
-            1: "SB",
-            2: "BB",
-            3: "CO"      # Late (no Early or Middle)
-        }
-    elif num_players == 3:
-        # Heads-up + 1: Only BTN, SB, BB
-        return {
-            0: "BTN",
-            1: "SB",
-            2: "BB"
-        }
-    elif num_players == 2:
-        # Heads-up: BTN = SB
-        return {
-            0: "BTN/SB",
-            1: "BB"
-        }
-    else:
-        # Unsupported player count - return empty
+    if 0 <= num_players <= MAX_PLAYERS:
+        return _POSITION_MAPS[num_players]
+    return _EMPTY_MAP
+
+
+def position_names(num_players: int) -> Tuple[str, ...]:
+    """Position names indexed by seat relative to the button (empty if unsupported)."""
+    if 0 <= num_players <= MAX_PLAYERS:
+        return _POSITION_NAMES[num_players]
+    return ()
+
+
+def position_info(num_players: int, relative_seat: int) -> Optional[PositionInfo]:
+    if 0 <= num_players <= MAX_PLAYERS:
+        row = POSITION_TABLE[num_players]
+        if 0 <= relative_seat < len(row):
+            return row[relative_seat]
+    return None
+
+
+def assign_positions(players: Sequence[str], button_idx: int) -> Dict[str, str]:
+    """
+    Positions of ``players`` (in seat order) given the index of the button.
+    Empty for unsupported player counts.
+    """
+    num_players = len(players)
+    names = position_names(num_players)
+    if not names:
         return {}
+    return {
+        player: names[(i - button_idx) % num_players]
+        for i, player in enumerate(players)
+    }
 
 
-def get_position_category(position: str) -> str:
+def get_position_category(position: str) -> Optional[str]:
     """
     Categorize position for RFI and other statistics.
     
-    Returns: "Early", "Middle", "Late", or None
-    
-    GG Poker categories:
-    - Early: UTG, UTG+1, UTG+2
-    - Middle: MP, MP+1, MP+2, HJ (but we simplify to MP, HJ)
-    - Late: CO, BTN
-    - Blinds: SB, BB (not categorized for RFI)
+    Returns: "Early", "Middle", "Late", or None (blinds and unknown positions)
     """
-    # Early positions
-    if position in ["UTG", "UTG+1", "UTG+2"]:
-        return "Early"
-    
-    # Middle positions
-    # Note: MP+1, MP+2 are alternative names for the same positions
-    # In our standardized mapping, we use MP and HJ
-    elif position in ["MP", "MP+1", "MP+2", "HJ"]:
-        return "Middle"
-    
-    # Late positions
-    elif position in ["CO", "BTN"]:
-        return "Late"
-    
-    # Blinds (not used for RFI categories)
-    elif position in ["SB", "BB", "BTN/SB"]:
-        return None
-    
-    # Unknown position
-    return None
+    return _CATEGORY_BY_POSITION.get(position)
 
 
 def get_rfi_stat_name(position_category: str) -> str:
@@ -152,21 +171,10 @@ def get_rfi_stat_name(position_category: str) -> str:
     return None
 
 
-def get_rfi_stat_for_position(position: str) -> str:
+def get_rfi_stat_for_position(position: str) -> Optional[str]:
     """
     Get the specific RFI statistic name for a position.
     
     Returns the exact stat name like "Early RFI", "Middle RFI", "CO Steal", "BTN Steal"
     """
-    category = get_position_category(position)
-    
-    if category == "Early":
-        return "Early RFI"
-    elif category == "Middle":
-        return "Middle RFI"
-    elif position == "CO":
-        return "CO Steal"
-    elif position == "BTN":
-        return "BTN Steal"
-    
-    return None
\ No newline at end of file
+    return _RFI_STAT_BY_POSITION.get(position)
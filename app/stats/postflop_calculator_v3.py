@@ -6,7 +6,7 @@ import logging
 import re
 from typing import Dict, Any, List, Optional, Tuple
 from collections import defaultdict
-from app.stats.position_mapping import get_position_map, get_position_category
+from app.stats.position_mapping import assign_positions, get_position_category
 
 logger = logging.getLogger(__name__)
 
@@ -176,25 +176,12 @@ class PostflopCalculatorV3:
             if button_idx is None and active_seats:
                 button_idx = 0
         
-        # Assign positions based on button
-        num_players = len(active_seats)
-        
         # Safety check: if still no button_idx, can't assign positions
         if button_idx is None:
             return positions
         
-        for i, (seat_num, player) in enumerate(active_seats):
-            # Calculate position relative to button
-            relative_pos = (i - button_idx) % num_players
-            
-            # Use centralized position mapping
-            position_map = get_position_map(num_players)
-            if not position_map:
-                continue
-            
-            positions[player] = position_map.get(relative_pos, "Unknown")
-        
-        return positions
+        # Positions relative to the button from the centralized precomputed table
+        return assign_positions([player for _, player in active_seats], button_idx)
     
     def _extract_preflop_actions(self, hand_text: str) -> List[Dict[str, Any]]:
         """
@@ -5,7 +5,7 @@ Calculates all the required pre-flop stats for poker hands
 from typing import Dict, List, Any, Optional
 import re
 import logging
-from app.stats.position_mapping import get_position_map, get_position_category, get_rfi_stat_for_position
+from app.stats.position_mapping import assign_positions, get_position_category, get_rfi_stat_for_position
 from app.stats.preflop_validators import PreflopOpportunityValidator
 
 logger = logging.getLogger(__name__)
@@ -239,22 +239,9 @@ class PreflopStats:
         if button_idx is None:
             return positions
         
-        # Assign positions based on button
-        num_players = len(active_seats)
-        
-        # Rotate the list so button is at index 0
-        # This anchors the position mapping to BTN instead of SB
-        rotated_seats = active_seats[button_idx:] + active_seats[:button_idx]
-        
-        # Use centralized position mapping (GG Poker standard)
-        position_map = get_position_map(num_players)
-        if not position_map:
-            return positions  # Unsupported player count
-        
-        for i, (seat_num, player) in enumerate(rotated_seats):
-            positions[player] = position_map.get(i, "Unknown")
-        
-        return positions
+        # Assign positions relative to the button from the centralized
+        # precomputed table (GG Poker standard); empty for unsupported counts
+        return assign_positions([player for _, player in active_seats], button_idx)
     
     
     def _normalize_currency_value(self, value: str) -> float:
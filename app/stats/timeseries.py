@@ -3,13 +3,24 @@ Phase 9.A - Time series and breakdown aggregation for stats
 """
 import json
 import os
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Position groups and streets recognised in stat names (used by breakdown)
+POSITION_GROUPS = {
+    "EP": ["EP", "UTG", "UTG1", "UTG2"],
+    "MP": ["MP", "MP1", "MP2", "LJ"],
+    "CO": ["CO", "HJ"],
+    "BTN": ["BTN", "BU"],
+    "BLINDS": ["SB", "BB"]
+}
+STREETS = ["FLOP", "TURN", "RIVER"]
+
 
 def load_all_monthly_stats(stats_dir: str = "stats") -> Dict[str, Any]:
     """
@@ -41,6 +52,153 @@ def load_all_monthly_stats(stats_dir: str = "stats") -> Dict[str, Any]:
     return all_stats
 
 
+def _stat_tags(stat_name: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """
+    Derive (position_group, street, ip_oop, cbet_street) from a stat name.
+    
+    cbet_street is the looser street match used for CBET stats that carry
+    neither a position nor an underscore-delimited street.
+    """
+    stat_upper = stat_name.upper()
+    
+    found_position = None
+    for pos_group, pos_list in POSITION_GROUPS.items():
+        for pos in pos_list:
+            if f"_{pos}_" in stat_upper or stat_upper.endswith(f"_{pos}"):
+                found_position = pos_group
+                break
+        if found_position:
+            break
+    
+    found_street = None
+    for street in STREETS:
+        if f"_{street}_" in stat_upper or f"_{street}" in stat_upper:
+            found_street = street
+            break
+    
+    ip_oop = None
+    if "_IP" in stat_upper and not "_SKIP" in stat_upper:
+        ip_oop = "IP"
+    elif "_OOP" in stat_upper:
+        ip_oop = "OOP"
+    
+    cbet_street = None
+    if "CBET" in stat_upper:
+        cbet_street = "FLOP" if "FLOP" in stat_upper else "TURN" if "TURN" in stat_upper else "RIVER" if "RIVER" in stat_upper else None
+    
+    return found_position, found_street, ip_oop, cbet_street
+
+
+class StatsCube:
+    """
+    Month x group x stat view of the monthly stat counts.
+    
+    Values live in flat lists indexed by (month, group, stat); cell
+    (m, g, s) is at ``(m * n_groups + g) * n_stats + s``. Per-stat
+    position/street tags are computed once, and each (month, group) keeps
+    its stats in file order so breakdowns match the source ordering.
+    """
+    
+    def __init__(self, all_stats: Dict[str, Any]):
+        self.months: List[str] = sorted(all_stats.keys())
+        self.groups: List[str] = []
+        self.stats: List[str] = []
+        self.group_idx: Dict[str, int] = {}
+        self.stat_idx: Dict[str, int] = {}
+        
+        for month in self.months:
+            for group, group_data in (all_stats.get(month) or {}).items():
+                if group not in self.group_idx:
+                    self.group_idx[group] = len(self.groups)
+                    self.groups.append(group)
+                for stat in (group_data or {}):
+                    if stat not in self.stat_idx:
+                        self.stat_idx[stat] = len(self.stats)
+                        self.stats.append(stat)
+        
+        self.month_idx = {m: i for i, m in enumerate(self.months)}
+        self.tags = [_stat_tags(stat) for stat in self.stats]
+        
+        n_cells = len(self.months) * len(self.groups) * len(self.stats)
+        self.present = bytearray(n_cells)
+        self.opportunities: List[Any] = [0] * n_cells
+        self.attempts: List[Any] = [0] * n_cells
+        self.percentage: List[Any] = [0.0] * n_cells
+        # (month, group) -> stat indices in source order
+        self.order: Dict[Tuple[int, int], List[int]] = {}
+        
+        for m, month in enumerate(self.months):
+            for group, group_data in (all_stats.get(month) or {}).items():
+                g = self.group_idx[group]
+                order = self.order.setdefault((m, g), [])
+                for stat, stat_data in (group_data or {}).items():
+                    s = self.stat_idx[stat]
+                    order.append(s)
+                    if not stat_data:
+                        continue
+                    i = self._cell(m, g, s)
+                    self.present[i] = 1
+                    self.opportunities[i] = stat_data.get("opportunities", 0)
+                    self.attempts[i] = stat_data.get("attempts", 0)
+                    self.percentage[i] = stat_data.get("percentage", 0.0)
+    
+    def _cell(self, m: int, g: int, s: int) -> int:
+        return (m * len(self.groups) + g) * len(self.stats) + s
+    
+    def cell(self, month: str, group: str, stat: str) -> Optional[int]:
+        """Flat index of a populated cell, or None"""
+        m = self.month_idx.get(month)
+        g = self.group_idx.get(group)
+        s = self.stat_idx.get(stat)
+        if m is None or g is None or s is None:
+            return None
+        i = self._cell(m, g, s)
+        return i if self.present[i] else None
+    
+    def group_stats(self, month: Optional[str], group: str) -> List[Tuple[str, int]]:
+        """(stat_name, stat_index) pairs present in a month/group, source order"""
+        m = self.month_idx.get(month)
+        g = self.group_idx.get(group)
+        if m is None or g is None:
+            return []
+        return [(self.stats[s], s) for s in self.order.get((m, g), [])]
+
+
+_CUBE_CACHE: Dict[str, Tuple[tuple, StatsCube]] = {}
+_CUBE_LOCK = threading.Lock()
+
+
+def _stats_signature(stats_dir: str) -> tuple:
+    """(name, mtime_ns, size) of every stat_counts file; changes invalidate the cube"""
+    entries = []
+    for file in sorted(os.listdir(stats_dir)):
+        if file == "stat_counts.json" or (file.startswith("stat_counts_") and file.endswith(".json")):
+            try:
+                st = os.stat(os.path.join(stats_dir, file))
+            except OSError:
+                continue
+            entries.append((file, st.st_mtime_ns, st.st_size))
+    return tuple(entries)
+
+
+def get_stats_cube(stats_dir: str = "stats") -> StatsCube:
+    """
+    Cached StatsCube for a stats directory, rebuilt when any stat_counts
+    file is added, removed or modified.
+    """
+    key = os.path.abspath(stats_dir)
+    signature = _stats_signature(stats_dir)
+    with _CUBE_LOCK:
+        cached = _CUBE_CACHE.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+    
+    cube = StatsCube(load_all_monthly_stats(stats_dir))
+    with _CUBE_LOCK:
+        _CUBE_CACHE[key] = (signature, cube)
+    return cube
+
+
 def get_timeseries(
     stat: str,
     group: str,
@@ -61,35 +219,32 @@ def get_timeseries(
     Returns:
         Dictionary with timeseries data
     """
-    all_stats = load_all_monthly_stats(stats_dir)
+    cube = get_stats_cube(stats_dir)
     
-    # Sort months chronologically
-    sorted_months = sorted(all_stats.keys())
+    # Months are already sorted chronologically
+    sorted_months = cube.months
     
     # Take the last N months
     if len(sorted_months) > months:
         sorted_months = sorted_months[-months:]
     
     timeseries = []
+    total_months = len(sorted_months)
     
-    for month in sorted_months:
-        month_data = all_stats.get(month, {})
-        group_data = month_data.get(group, {})
-        stat_data = group_data.get(stat, {})
+    for month_idx, month in enumerate(sorted_months):
+        i = cube.cell(month, group, stat)
         
-        if stat_data:
+        if i is not None:
             point = {
                 "month": month,
-                "opportunities": stat_data.get("opportunities", 0),
-                "attempts": stat_data.get("attempts", 0),
-                "percentage": stat_data.get("percentage", 0.0)
+                "opportunities": cube.opportunities[i],
+                "attempts": cube.attempts[i],
+                "percentage": cube.percentage[i]
             }
             
             # Apply time decay if requested
             if apply_time_decay:
                 # More recent months get higher weight
-                month_idx = sorted_months.index(month)
-                total_months = len(sorted_months)
                 weight = (month_idx + 1) / total_months
                 point["weight"] = round(weight, 2)
             
@@ -136,33 +291,11 @@ def get_breakdown(
     Returns:
         Dictionary with breakdown by position and street
     """
-    all_stats = load_all_monthly_stats(stats_dir)
+    cube = get_stats_cube(stats_dir)
     
     # Use specified month or latest
-    if month:
-        month_data = all_stats.get(month, {})
-    else:
-        # Get latest month
-        sorted_months = sorted(all_stats.keys())
-        if sorted_months:
-            month = sorted_months[-1]
-            month_data = all_stats.get(month, {})
-        else:
-            month_data = {}
-    
-    group_data = month_data.get(group, {})
-    
-    # Define position groups
-    positions = {
-        "EP": ["EP", "UTG", "UTG1", "UTG2"],
-        "MP": ["MP", "MP1", "MP2", "LJ"],
-        "CO": ["CO", "HJ"],
-        "BTN": ["BTN", "BU"],
-        "BLINDS": ["SB", "BB"]
-    }
-    
-    # Define street mappings
-    streets = ["FLOP", "TURN", "RIVER"]
+    if not month and cube.months:
+        month = cube.months[-1]
     
     # Initialize breakdown structure
     breakdown = {
@@ -172,37 +305,19 @@ def get_breakdown(
     }
     
     # Process all stats in the group
-    for stat_name, stat_data in group_data.items():
+    for stat_name, s in cube.group_stats(month, group):
         # Check if stat belongs to the family
         if not stat_name.startswith(family):
             continue
         
-        # Extract position and street from stat name
-        stat_upper = stat_name.upper()
-        
-        # Find position
-        found_position = None
-        for pos_group, pos_list in positions.items():
-            for pos in pos_list:
-                if f"_{pos}_" in stat_upper or stat_upper.endswith(f"_{pos}"):
-                    found_position = pos_group
-                    break
-            if found_position:
-                break
-        
-        # Find street
-        found_street = None
-        for street in streets:
-            if f"_{street}_" in stat_upper or f"_{street}" in stat_upper:
-                found_street = street
-                break
-        
-        # Special handling for IP/OOP
-        ip_oop = None
-        if "_IP" in stat_upper and not "_SKIP" in stat_upper:
-            ip_oop = "IP"
-        elif "_OOP" in stat_upper:
-            ip_oop = "OOP"
+        # Position, street and IP/OOP are precomputed per stat name
+        found_position, found_street, ip_oop, cbet_street = cube.tags[s]
+        i = cube.cell(month, group, stat_name)
+        stat_data = {
+            "opportunities": cube.opportunities[i],
+            "attempts": cube.attempts[i],
+            "percentage": cube.percentage[i]
+        } if i is not None else {}
         
         # Aggregate by position
         if found_position:
@@ -247,20 +362,19 @@ def get_breakdown(
         # If no position/street found but belongs to family
         if not found_position and not found_street:
             # Try to extract from common patterns
-            if "CBET" in stat_upper:
-                street = "FLOP" if "FLOP" in stat_upper else "TURN" if "TURN" in stat_upper else "RIVER" if "RIVER" in stat_upper else None
-                
-                if street and street not in breakdown["by_street"]:
-                    breakdown["by_street"][street] = {
-                        "opportunities": 0,
-                        "attempts": 0,
-                        "stats": []
-                    }
-                
-                if street:
-                    breakdown["by_street"][street]["opportunities"] += stat_data.get("opportunities", 0)
-                    breakdown["by_street"][street]["attempts"] += stat_data.get("attempts", 0)
-                    breakdown["by_street"][street]["stats"].append(stat_name)
+            street = cbet_street
+            
+            if street and street not in breakdown["by_street"]:
+                breakdown["by_street"][street] = {
+                    "opportunities": 0,
+                    "attempts": 0,
+                    "stats": []
+                }
+            
+            if street:
+                breakdown["by_street"][street]["opportunities"] += stat_data.get("opportunities", 0)
+                breakdown["by_street"][street]["attempts"] += stat_data.get("attempts", 0)
+                breakdown["by_street"][street]["stats"].append(stat_name)
     
     # Calculate percentages
     for pos_data in breakdown["by_position"].values():
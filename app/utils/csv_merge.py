@@ -0,0 +1,268 @@
+"""
+Streaming CSV merge engine for the tracker export endpoints
+(/merge-csv and /process-room-csv).
+
+Uploads are read row by row straight from the request stream. Column
+selection, ordering, duplications and VPIP columns are resolved once from
+the headers into a plan, and rows are formatted one at a time, so memory
+does not grow with the size of the export.
+"""
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MERGE_ORDER = ('9max', '6max', 'pko', 'postflop')
+
+UO_VPIP_STATS = ('Early UO VPIP', 'Middle UO VPIP', 'Cutoff UO VPIP', 'Button UO VPIP')
+PKO_SKIPPED_STATS = ('Early RFI', 'Middle RFI', 'CO Steal', 'BTN Steal')
+PKO_KEPT_STATS = ('Fold to', 'Resteal')
+RAW_VALUE_MARKERS = ('Total Hands', 'POSTFLOP_River Agg', 'POSTFLOP_W$WSF Rating')
+
+VPIP_MAPPINGS = {
+    'EP Cold Call': 'EP VPIP',
+    'MP Cold Call': 'MP VPIP',
+    'CO Cold Call': 'CO VPIP',
+    'BTN Cold Call': 'BTN VPIP',
+}
+
+# Nº de valores por pedaço na resposta em streaming
+RESPONSE_CHUNK_VALUES = 2000
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[List[str]]:
+    """Yield CSV rows from a binary stream, decoding UTF-8 incrementally."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        # não fechar o stream do pedido ao libertar o wrapper
+        text.detach()
+
+
+def _to_float(value: str) -> float:
+    return float(value.replace(',', '.')) if value and value != 'NA' else 0.0
+
+
+def format_percentage(value: str) -> str:
+    """'0.123' -> '12,3'; empty/NA count as 0; unparsable values are kept."""
+    try:
+        return f"{_to_float(value) * 100:.1f}".replace('.', ',')
+    except (ValueError, AttributeError):
+        return value
+
+
+# ---------------------------------------------------------------------------
+# /merge-csv
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MergeColumn:
+    header: str
+    source: int
+    percent: bool = True
+    # Colunas VPIP calculadas: soma de source (3Bet) com extra (Cold Call)
+    extra: Optional[int] = None
+
+
+@dataclass
+class MergePlan:
+    """Output columns of a merge, resolved once from the combined headers."""
+
+    columns: List[MergeColumn] = field(default_factory=list)
+
+    @classmethod
+    def from_headers(cls, combined_headers: List[str]) -> 'MergePlan':
+        first_index: Dict[str, int] = {}
+        for idx, header in enumerate(combined_headers):
+            first_index.setdefault(header, idx)
+
+        plan = cls()
+        for file_type in MERGE_ORDER:
+            file_prefix = file_type.upper()
+            file_columns = [
+                (i, h) for i, h in enumerate(combined_headers) if h.startswith(file_prefix + '_')
+            ]
+
+            # For PKO: Total Hands first, then UO VPIP stats, then the rest
+            if file_type == 'pko':
+                total_hands = [c for c in file_columns if 'Total Hands' in c[1]]
+                uo_vpip = [
+                    c for c in file_columns
+                    if 'Total Hands' not in c[1] and any(s in c[1] for s in UO_VPIP_STATS)
+                ]
+                others = [c for c in file_columns if c not in total_hands and c not in uo_vpip]
+                file_columns = total_hands + uo_vpip + others
+
+            for idx, header in file_columns:
+                if _skip_merge_column(file_type, header):
+                    continue
+
+                plan.columns.append(MergeColumn(
+                    header, idx, percent=not any(m in header for m in RAW_VALUE_MARKERS)
+                ))
+
+                if file_type == 'postflop':
+                    continue
+
+                # After "BB Fold to BTN Steal", insert duplicated "BB Fold to SB Steal"
+                if header.endswith('BB Fold to BTN Steal'):
+                    sb_steal_idx = first_index.get(f"{file_prefix}_BB Fold to SB Steal")
+                    if sb_steal_idx is not None:
+                        plan.columns.append(
+                            MergeColumn(f"{file_prefix}_BB Fold to SB Steal (Dup)", sb_steal_idx)
+                        )
+
+                # After the cold call columns, insert calculated VPIP (3Bet + Cold Call)
+                for col_suffix, vpip_suffix in VPIP_MAPPINGS.items():
+                    if header.endswith(col_suffix):
+                        threbet_idx = first_index.get(header.replace('Cold Call', '3Bet'))
+                        if threbet_idx is not None:
+                            plan.columns.append(MergeColumn(
+                                f"{file_prefix}_{vpip_suffix}", threbet_idx, extra=first_index[header]
+                            ))
+        return plan
+
+    def apply(self, combined_row: List[str]) -> Tuple[List[str], List[str]]:
+        """Format one combined row; VPIP columns that cannot be computed are left out."""
+        headers: List[str] = []
+        values: List[str] = []
+        for column in self.columns:
+            if column.extra is None:
+                value = combined_row[column.source]
+                headers.append(column.header)
+                values.append(format_percentage(value) if column.percent else value)
+                continue
+            try:
+                vpip = _to_float(combined_row[column.source]) + _to_float(combined_row[column.extra])
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Could not calculate {column.header}: {e}")
+                continue
+            headers.append(column.header)
+            values.append(f"{vpip * 100:.1f}".replace('.', ','))
+        return headers, values
+
+
+def _skip_merge_column(file_type: str, header: str) -> bool:
+    if file_type in ('9max', '6max'):
+        # exclude only the positional UO VPIP stats (not SB UO VPIP)
+        return any(s in header for s in UO_VPIP_STATS)
+    if file_type == 'pko':
+        return (any(s in header for s in PKO_SKIPPED_STATS)
+                and not any(s in header for s in PKO_KEPT_STATS))
+    return False
+
+
+def merge_tracker_exports(streams: Dict[str, Tuple[str, IO[bytes]]]) -> Dict[str, List[str]]:
+    """
+    Merge the first data row (line 2) of each export into one report row.
+
+    ``streams`` maps file type ('9max', '6max', 'pko', 'postflop') to
+    (filename, binary stream). Only the header and first data row of each
+    file are read.
+    """
+    combined_headers: List[str] = []
+    combined_row: List[str] = []
+
+    for file_type in MERGE_ORDER:
+        if file_type not in streams:
+            logger.error(f"Missing file type: {file_type}")
+            continue
+
+        filename, stream = streams[file_type]
+        rows = iter_csv_rows(stream)
+        headers = next(rows, None)
+        data_row = next(rows, None)
+        rows.close()
+
+        if headers is None or data_row is None:
+            logger.error(f"File {filename} doesn't have enough rows (need at least 2)")
+            continue
+
+        combined_headers.extend(f"{file_type.upper()}_{header}" for header in headers)
+        combined_row.extend(data_row)
+        logger.debug(f"Added {len(data_row)} columns from {file_type}")
+
+    headers, values = MergePlan.from_headers(combined_headers).apply(combined_row)
+    logger.info(f"Successfully merged CSV files. Result has {len(headers)} columns (including calculated)")
+    return {'headers': headers, 'data': values}
+
+
+# ---------------------------------------------------------------------------
+# /process-room-csv
+# ---------------------------------------------------------------------------
+
+def _format_room_value(value: str) -> str:
+    try:
+        if value and value.strip() and value != 'NA':
+            return f"{float(value.replace(',', '.')) * 100:.1f}".replace('.', ',')
+    except (ValueError, AttributeError):
+        pass
+    return value
+
+
+def find_player_column(headers: List[str]) -> Optional[int]:
+    for idx, header in enumerate(headers):
+        if 'player' in header.lower() and 'site' in header.lower():
+            return idx
+    return None
+
+
+def format_room_rows(headers: List[str], rows: Iterable[List[str]]) -> Iterator[List[str]]:
+    """Format room export rows one at a time (percentages except Count/Total Hands)."""
+    raw_columns = [('Count' in h or 'Total Hands' in h) for h in headers]
+    player_col_idx = find_player_column(headers)
+    header_count = len(headers)
+
+    for row in rows:
+        # Skip rows where player column is empty (usually average/total rows)
+        if player_col_idx is not None and (
+            len(row) <= player_col_idx or not row[player_col_idx] or not row[player_col_idx].strip()
+        ):
+            continue
+
+        formatted = [
+            value if raw_columns[i] else _format_room_value(value)
+            for i, value in enumerate(row[:header_count])
+        ]
+        formatted.extend('' for _ in range(len(row) - header_count))
+        yield formatted
+
+
+def stream_json_report(headers: List[str], rows: Iterable[List[str]]) -> Iterator[str]:
+    """
+    Yield ``{"headers": [...], "data": [...], "success": true}`` in chunks,
+    with the values of every row flattened into ``data``.
+
+    ``success`` goes last so that a failure while reading the upload still
+    ends in valid JSON (``"success": false`` plus ``error``).
+    """
+    yield '{"headers": ' + json.dumps(headers) + ', "data": ['
+    pending: List[str] = []
+    first = True
+    row_count = 0
+    error: Optional[str] = None
+    try:
+        for row in rows:
+            row_count += 1
+            pending.extend(json.dumps(value) for value in row)
+            if len(pending) >= RESPONSE_CHUNK_VALUES:
+                yield ('' if first else ', ') + ', '.join(pending)
+                first = False
+                pending = []
+    except Exception as e:
+        logger.error(f"Error processing room CSV after {row_count} rows: {e}")
+        error = str(e)
+        pending = []
+
+    if pending:
+        yield ('' if first else ', ') + ', '.join(pending)
+    if error is not None:
+        yield '], "success": false, "error": ' + json.dumps(error) + '}'
+        return
+    yield '], "success": true}'
+    logger.info(f"Successfully processed room CSV. Headers: {len(headers)}, Rows: {row_count}")
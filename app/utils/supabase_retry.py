@@ -2,7 +2,7 @@
 
 import logging
 import time
-from typing import Callable, TypeVar
+from typing import Callable, Optional, TypeVar
 
 
 logger = logging.getLogger(__name__)
@@ -24,8 +24,44 @@ def _is_rate_limit_error(exc: Exception) -> bool:
     return "too many requests" in text or "429" in text
 
 
-def with_supabase_retry(fn: Callable[[], T], *, max_attempts: int = 5) -> T:
-    """Execute a callable with exponential backoff on 429 responses."""
+_TRANSIENT_MARKERS = (
+    "timed out",
+    "timeout",
+    "connection reset",
+    "connection aborted",
+    "remote end closed",
+    "502",
+    "503",
+    "504",
+)
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """429s plus timeouts, dropped connections and gateway errors.
+
+    Only safe for idempotent calls (e.g. upserts on a natural key), since a
+    timed-out request may still have been applied server-side.
+    """
+    if _is_rate_limit_error(exc):
+        return True
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    text = str(exc).lower()
+    return any(marker in text for marker in _TRANSIENT_MARKERS)
+
+
+def with_supabase_retry(
+    fn: Callable[[], T],
+    *,
+    max_attempts: int = 5,
+    is_retryable: Optional[Callable[[Exception], bool]] = None,
+) -> T:
+    """Execute a callable with exponential backoff on 429 responses.
+
+    ``is_retryable`` widens the set of retried errors (see ``is_transient_error``).
+    """
+
+    should_retry = is_retryable or _is_rate_limit_error
 
     delays = [0.5, 1, 2, 4]
     attempt = 0
@@ -34,12 +70,13 @@ def with_supabase_retry(fn: Callable[[], T], *, max_attempts: int = 5) -> T:
             return fn()
         except Exception as exc:  # noqa: BLE001 - need to inspect Supabase errors
             attempt += 1
-            if attempt >= max_attempts or not _is_rate_limit_error(exc):
+            if attempt >= max_attempts or not should_retry(exc):
                 raise
 
             delay = delays[min(attempt - 1, len(delays) - 1)]
             logger.warning(
-                "Supabase returned 429 (attempt %s/%s). Retrying in %.1fs...",
+                "Supabase call failed (%s) (attempt %s/%s). Retrying in %.1fs...",
+                "429" if _is_rate_limit_error(exc) else exc,
                 attempt,
                 max_attempts,
                 delay,
@@ -0,0 +1,85 @@
+"""Command line entry point: ``python -m benchmarks``.
+
+    python -m benchmarks                       # corre e compara com baseline.json
+    python -m benchmarks --hands 500 --sites gg,wpn
+    python -m benchmarks --update-baseline     # grava a baseline desta máquina
+    python -m benchmarks --importtime main     # junta o relatório de -X importtime
+
+Exits with status 1 when a stage regresses past ``--tolerance``.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from benchmarks.importtime import format_importtime, measure_imports
+from benchmarks.suite import DEFAULT_TOLERANCE, compare, format_report, run_suite
+from benchmarks.synthetic_hands import SITES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--hands", type=int, default=2000, help="hands generated per site")
+    parser.add_argument("--sites", default=",".join(SITES), help="comma-separated sites")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per stage")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown / RSS growth as a fraction (default 0.20)")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    parser.add_argument("--importtime", metavar="MODULE",
+                        help="also report python -X importtime for MODULE (not compared with the baseline)")
+    args = parser.parse_args(argv)
+
+    sites = [s.strip() for s in args.sites.split(",") if s.strip()]
+    unknown = sorted(set(sites) - set(SITES))
+    if unknown:
+        parser.error(f"unknown sites: {', '.join(unknown)}")
+
+    # os calculadores registam cada mão; aqui só interessa o relatório
+    logging.disable(logging.WARNING)
+    report = run_suite(args.hands, sites, seed=args.seed, repeat=args.repeat)
+    print(format_report(report))
+    if args.importtime:
+        report["importtime"] = measure_imports(args.importtime, repeat=args.repeat)
+        print()
+        print(format_importtime(report["importtime"]))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    if baseline.get("config", {}).get("hands_per_site") != report["config"]["hands_per_site"]:
+        print("\nwarning: baseline was recorded with a different --hands; throughput may not compare")
+    if baseline.get("environment") != report["environment"]:
+        print("\nwarning: baseline was recorded on a different machine/interpreter")
+
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nno regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
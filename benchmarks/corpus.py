@@ -0,0 +1,231 @@
+"""Production-scale synthetic uploads.
+
+Streams tournament files for every site over a spread of months, with the
+noise real uploads carry (mystery tournaments, cash sessions, tournament
+summaries), and packages the result as nested archives the upload path
+accepts::
+
+    python -m benchmarks.corpus --hands 1000000 --months 2025-03:6 --out /tmp/corpus \\
+        --archive /tmp/upload.zip
+
+Files are written one at a time, so memory stays flat at millions of hands.
+Layout: ``<out>/<site>/<YYYY-MM>/<file>.txt`` plus ``manifest.json``.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from benchmarks.synthetic_hands import (
+    CASH_SITES,
+    KINDS,
+    SITES,
+    SyntheticFile,
+    generate_cash_session,
+    generate_tournament,
+    render_summary,
+)
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_KIND_SHARES = {"regular": 0.55, "pko": 0.35, "mystery": 0.10}
+INNER_FORMATS = ("zip", "rar", "mixed")
+
+
+def month_range(first: str, count: int) -> List[str]:
+    """``count`` consecutive ``YYYY-MM`` months starting at ``first``."""
+    year, month = (int(part) for part in first.split("-"))
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _month_start(rng: random.Random, month: str) -> datetime:
+    year, number = (int(part) for part in month.split("-"))
+    return datetime(year, number, 1, 12, 0) + timedelta(days=rng.randrange(28), minutes=rng.randrange(360))
+
+
+def iter_corpus(hands: int, sites: Sequence[str] = SITES, seed: int = 0,
+                months: Sequence[str] = ("2025-07",), hands_per_file: int = 150,
+                kind_shares: Optional[Dict[str, float]] = None, cash_share: float = 0.05,
+                summaries: bool = True) -> Iterator[tuple]:
+    """Yield ``(month, SyntheticFile)`` until ``hands`` tournament hands are out.
+
+    Tournament hands are split evenly across ``sites``; ``cash_share`` adds
+    that fraction on top as cash sessions (PokerStars/GG formats), and each
+    tournament optionally ships its summary file.
+    """
+    shares = kind_shares or DEFAULT_KIND_SHARES
+    unknown = set(shares) - set(KINDS)
+    if unknown:
+        raise ValueError(f"unknown tournament kinds: {sorted(unknown)}")
+    kinds, weights = zip(*sorted(shares.items()))
+    rng = random.Random(f"corpus:{seed}")
+    sites = list(sites)
+
+    per_site = [hands // len(sites) + (1 if i < hands % len(sites) else 0) for i in range(len(sites))]
+    for site, remaining in zip(sites, per_site):
+        while remaining > 0:
+            count = min(remaining, rng.randint(max(1, hands_per_file // 2), hands_per_file))
+            month = rng.choice(months)
+            kind = rng.choices(kinds, weights)[0]
+            file_seed = rng.randrange(2 ** 32)
+            synthetic = generate_tournament(site, count, seed=file_seed, kind=kind,
+                                            start=_month_start(rng, month))
+            yield month, synthetic
+            if summaries:
+                yield month, _summary_file(site, synthetic, rng)
+            remaining -= count
+
+    cash_hands = int(hands * cash_share)
+    while cash_hands > 0:
+        count = min(cash_hands, hands_per_file)
+        month = rng.choice(months)
+        site = rng.choice([s for s in sites if s in CASH_SITES] or list(CASH_SITES))
+        yield month, generate_cash_session(site, count, seed=rng.randrange(2 ** 32),
+                                           start=_month_start(rng, month))
+        cash_hands -= count
+
+
+def _summary_file(site: str, synthetic: SyntheticFile, rng: random.Random) -> SyntheticFile:
+    entrants = rng.randint(50, 2000)
+    filename, text = render_summary(site, synthetic.kind, synthetic.tournament_id, synthetic.started_at,
+                                    entrants, rng.randint(1, entrants))
+    return SyntheticFile(site=site, kind="summary", filename=filename, text=text + "\n", hands=0,
+                         tournament_id=synthetic.tournament_id, started_at=synthetic.started_at)
+
+
+def write_corpus(out_dir: str, hands: int, **options) -> Dict:
+    """Write ``iter_corpus`` output under ``out_dir`` and return the manifest."""
+    manifest = {
+        "hands": hands, "options": {k: list(v) if isinstance(v, tuple) else v for k, v in options.items()},
+        "files": 0, "bytes": 0, "tournament_hands": 0, "cash_hands": 0, "summaries": 0,
+        "by_site": {}, "by_month": {}, "by_kind": {},
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    for month, synthetic in iter_corpus(hands, **options):
+        directory = os.path.join(out_dir, synthetic.site, month)
+        os.makedirs(directory, exist_ok=True)
+        data = synthetic.text.encode("utf-8")
+        with open(os.path.join(directory, synthetic.filename), "wb") as f:
+            f.write(data)
+
+        manifest["files"] += 1
+        manifest["bytes"] += len(data)
+        if synthetic.kind == "summary":
+            manifest["summaries"] += 1
+            continue
+        if synthetic.kind == "cash":
+            manifest["cash_hands"] += synthetic.hands
+            continue
+        manifest["tournament_hands"] += synthetic.hands
+        for key, value in (("by_site", synthetic.site), ("by_month", month), ("by_kind", synthetic.kind)):
+            manifest[key][value] = manifest[key].get(value, 0) + synthetic.hands
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _zip_dir(source: str, target: str, entries: Sequence[str]):
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in entries:
+            zf.write(os.path.join(source, name), name)
+
+
+def _rar_dir(source: str, target: str, entries: Sequence[str]):
+    import patoolib
+
+    if not shutil.which("rar"):
+        raise RuntimeError("creating RAR archives needs the 'rar' program on PATH")
+    cwd = os.getcwd()
+    try:
+        os.chdir(source)  # caminhos relativos dentro do RAR
+        patoolib.create_archive(os.path.abspath(target), list(entries), verbosity=-1)
+    finally:
+        os.chdir(cwd)
+
+
+def package_corpus(corpus_dir: str, archive_path: str, inner_format: str = "zip") -> str:
+    """Pack a corpus as ``archive.zip > <site>.zip > <site>_<month>.{zip,rar} > *.txt``.
+
+    ``inner_format`` picks the month archives' type; ``mixed`` alternates
+    ZIP and RAR. RAR needs the ``rar`` program.
+    """
+    if inner_format not in INNER_FORMATS:
+        raise ValueError(f"inner_format must be one of {INNER_FORMATS}")
+    staging = tempfile.mkdtemp(prefix="corpus_pack_")
+    try:
+        site_archives = []
+        index = 0
+        for site in sorted(os.listdir(corpus_dir)):
+            site_dir = os.path.join(corpus_dir, site)
+            if not os.path.isdir(site_dir):
+                continue
+            month_archives = []
+            for month in sorted(os.listdir(site_dir)):
+                month_dir = os.path.join(site_dir, month)
+                kind = inner_format if inner_format != "mixed" else ("zip", "rar")[index % 2]
+                index += 1
+                target = os.path.join(staging, f"{site}_{month}.{kind}")
+                packer = _rar_dir if kind == "rar" else _zip_dir
+                packer(month_dir, target, sorted(os.listdir(month_dir)))
+                month_archives.append(os.path.basename(target))
+            site_zip = f"{site}.zip"
+            _zip_dir(staging, os.path.join(staging, site_zip), month_archives)
+            for name in month_archives:
+                os.remove(os.path.join(staging, name))
+            site_archives.append(site_zip)
+        os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+        _zip_dir(staging, archive_path, site_archives)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return archive_path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.corpus",
+                                     description="Generate a synthetic multi-site upload.")
+    parser.add_argument("--hands", type=int, default=10000, help="tournament hands in total")
+    parser.add_argument("--sites", default=",".join(SITES))
+    parser.add_argument("--months", default="2025-07:1", help="FIRST:COUNT, e.g. 2025-03:6")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hands-per-file", type=int, default=150)
+    parser.add_argument("--cash-share", type=float, default=0.05)
+    parser.add_argument("--mystery-share", type=float, default=DEFAULT_KIND_SHARES["mystery"])
+    parser.add_argument("--pko-share", type=float, default=DEFAULT_KIND_SHARES["pko"])
+    parser.add_argument("--no-summaries", action="store_true")
+    parser.add_argument("--out", required=True, help="directory for the .txt files")
+    parser.add_argument("--archive", help="also pack the corpus into this .zip")
+    parser.add_argument("--inner-format", choices=INNER_FORMATS, default="zip")
+    args = parser.parse_args(argv)
+
+    first, _, count = args.months.partition(":")
+    regular = 1 - args.mystery_share - args.pko_share
+    if regular < 0:
+        parser.error("--mystery-share + --pko-share must not exceed 1")
+    manifest = write_corpus(
+        args.out, args.hands,
+        sites=[s.strip() for s in args.sites.split(",") if s.strip()],
+        seed=args.seed, months=month_range(first, int(count or 1)),
+        hands_per_file=args.hands_per_file, cash_share=args.cash_share,
+        kind_shares={"regular": regular, "pko": args.pko_share, "mystery": args.mystery_share},
+        summaries=not args.no_summaries,
+    )
+    print(f"{manifest['files']} files, {manifest['tournament_hands']} tournament hands, "
+          f"{manifest['cash_hands']} cash hands, {manifest['bytes'] / 1024 / 1024:.1f} MB in {args.out}")
+    if args.archive:
+        package_corpus(args.out, args.archive, args.inner_format)
+        print(f"packed into {args.archive} ({os.path.getsize(args.archive) / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
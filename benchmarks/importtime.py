@@ -0,0 +1,134 @@
+"""Import-time report for the web/worker entry points.
+
+Each gunicorn worker is recycled after ``max_requests`` and imports ``main``
+again, so boot time is paid over and over. This runs ``python -X importtime``
+in a fresh interpreter and summarises its output:
+
+    python -m benchmarks.importtime                # import main
+    python -m benchmarks.importtime app.services.jobs_background_worker --top 20
+
+``import main`` runs ``init_app()``, which needs ``DATABASE_URL``; without it
+the import fails at that point, but everything imported before is still timed
+and the report says the import did not finish.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULE = "main"
+DEFAULT_TOP = 15
+_PREFIX = "import time:"
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> List[ImportEntry]:
+    """Entries of ``-X importtime`` output, in the order Python printed them."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith(_PREFIX):
+            continue
+        parts = line[len(_PREFIX):].split("|", 2)
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # cabeçalho "self [us] | cumulative | imported package"
+        label = parts[2][1:]
+        name = label.lstrip(" ")
+        entries.append(ImportEntry(name, (len(label) - len(name)) // 2, self_us, cumulative_us))
+    return entries
+
+
+def direct_imports(entries: List[ImportEntry], module: str) -> List[ImportEntry]:
+    """Depth-1 imports under ``module`` (children print before their parent)."""
+    for index in range(len(entries) - 1, -1, -1):
+        if entries[index].depth == 0 and entries[index].name == module:
+            break
+    else:
+        return []
+    children = []
+    for entry in reversed(entries[:index]):
+        if entry.depth == 0:
+            break
+        if entry.depth == 1:
+            children.append(entry)
+    return children[::-1]
+
+
+def _run_once(module: str, python: str, env: Optional[Dict[str, str]]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+def _last_error(stderr: str) -> Optional[str]:
+    lines = [line for line in stderr.splitlines() if line.strip() and not line.startswith(_PREFIX)]
+    return lines[-1].strip() if lines else None
+
+
+def measure_imports(module: str = DEFAULT_MODULE, top: int = DEFAULT_TOP, repeat: int = 1,
+                    python: str = sys.executable, env: Optional[Dict[str, str]] = None) -> Dict:
+    """Import ``module`` in a new interpreter (best of ``repeat``) and summarise."""
+    best = None
+    for _ in range(max(repeat, 1)):
+        proc = _run_once(module, python, env)
+        entries = parse_importtime(proc.stderr)
+        root = next((e for e in reversed(entries) if e.depth == 0 and e.name == module), None)
+        total = root.cumulative_us if root else sum(e.cumulative_us for e in entries if e.depth == 0)
+        if best is None or total < best[0]:
+            best = (total, proc, entries)
+
+    total, proc, entries = best
+    # o que cada import de topo do módulo custa, já com as suas dependências
+    children = direct_imports(entries, module)
+    return {
+        "module": module,
+        "completed": proc.returncode == 0,
+        "error": None if proc.returncode == 0 else _last_error(proc.stderr),
+        "total_seconds": round(total / 1e6, 4),
+        "modules": len(entries),
+        "top_cumulative": [asdict(e) for e in sorted(children, key=lambda e: e.cumulative_us, reverse=True)[:top]],
+        "top_self": [asdict(e) for e in sorted(entries, key=lambda e: e.self_us, reverse=True)[:top]],
+    }
+
+
+def format_importtime(report: Dict) -> str:
+    status = "ok" if report["completed"] else f"did not finish: {report['error']}"
+    lines = [f"import {report['module']}: {report['total_seconds']:.3f}s, "
+             f"{report['modules']} modules ({status})",
+             f"{'top-level imports':<52}{'cumulative ms':>15}"]
+    for entry in report["top_cumulative"]:
+        lines.append(f"  {entry['name']:<50}{entry['cumulative_us'] / 1000:>15.1f}")
+    lines.append(f"{'slowest modules (self)':<52}{'self ms':>15}")
+    for entry in report["top_self"]:
+        lines.append(f"  {entry['name']:<50}{entry['self_us'] / 1000:>15.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime",
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default=DEFAULT_MODULE)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N interpreters")
+    args = parser.parse_args(argv)
+
+    print(format_importtime(measure_imports(args.module, args.top, args.repeat)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""Throughput benchmarks for the hand pipeline stages.
+
+Each stage runs on the synthetic hands from ``benchmarks.synthetic_hands`` and
+is timed on its own, the same way ``multi_site_runner`` chains them:
+
+    split       split_into_hands_with_stats (per file)
+    classify    classify_hands_individually (per file, as the classifier does)
+    preflop     PreflopStats.analyze_hand + get_stats_summary
+    postflop    PostflopCalculatorV3.analyze_hand + get_stats_summary
+    aggregate   MultiSiteAggregator over every site/group, writing outputs
+    serialize   serialize_json of the combined result
+
+Results carry seconds, hands/s and the peak RSS seen while the stage ran.
+``compare`` checks a report against a stored baseline.
+"""
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+from benchmarks.synthetic_hands import SITES, SyntheticFile, generate_site_files
+
+STAGES = ("split", "classify", "preflop", "postflop", "aggregate", "serialize")
+# estágios que correm por site (os outros juntam todos os sites)
+SITE_STAGES = ("split", "classify", "preflop", "postflop")
+DEFAULT_TOLERANCE = 0.20
+RSS_SAMPLE_SECONDS = 0.005
+
+
+@dataclass
+class StageResult:
+    seconds: float
+    hands: int
+    peak_rss_mb: float
+    bytes: int = 0
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        data = asdict(self)
+        data["seconds"] = round(self.seconds, 4)
+        data["peak_rss_mb"] = round(self.peak_rss_mb, 1)
+        data["hands_per_second"] = round(self.hands_per_second, 1)
+        return data
+
+
+class _PeakRss:
+    """Amostra o RSS do processo numa thread enquanto o bloco corre."""
+
+    def __init__(self):
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self.peak = 0
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            self._stop.wait(RSS_SAMPLE_SECONDS)
+
+    def __enter__(self):
+        self.peak = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / 1024 / 1024
+
+
+def _measure(fn: Callable[[], Tuple[int, int]], repeat: int) -> StageResult:
+    """Best of ``repeat`` runs; ``fn`` returns (hands, bytes)."""
+    best = None
+    for _ in range(max(1, repeat)):
+        with _PeakRss() as rss:
+            started = time.perf_counter()
+            hands, size = fn()
+            elapsed = time.perf_counter() - started
+        if best is None or elapsed < best.seconds:
+            best = StageResult(elapsed, hands, rss.peak_mb, size)
+    return best
+
+
+def _sum_results(results: Iterable[StageResult]) -> StageResult:
+    results = list(results)
+    return StageResult(
+        seconds=sum(r.seconds for r in results),
+        hands=sum(r.hands for r in results),
+        peak_rss_mb=max((r.peak_rss_mb for r in results), default=0.0),
+        bytes=sum(r.bytes for r in results),
+    )
+
+
+def _split(files: List[SyntheticFile]) -> Tuple[int, int]:
+    from app.parse.hand_splitter import split_into_hands_with_stats
+
+    hands = 0
+    for f in files:
+        hands += len(split_into_hands_with_stats(f.text)[0])
+    return hands, sum(len(f.text.encode("utf-8")) for f in files)
+
+
+def _classify(files: List[SyntheticFile], groups: Dict[str, List[str]]) -> Tuple[int, int]:
+    from app.classify.hand_by_hand_classifier import classify_hands_individually
+
+    groups.clear()
+    for f in files:
+        classified, _ = classify_hands_individually(f.text, f.filename)
+        for hand in classified:
+            groups.setdefault(hand["group"], []).append(hand["hand_text"])
+    return sum(len(h) for h in groups.values()), 0
+
+
+def _run_calculator(factory, groups: Dict[str, List[str]], work_dir: str, results: Dict) -> Tuple[int, int]:
+    from app.stats.hand_collector import HandCollector
+
+    hands = 0
+    for group, texts in groups.items():
+        collector = HandCollector(os.path.join(work_dir, group))
+        calculator = factory(collector)
+        for text in texts:
+            calculator.analyze_hand(text)
+        results[group] = (calculator.get_stats_summary(), collector)
+        hands += len(texts)
+    return hands, 0
+
+
+def run_suite(hands_per_site: int = 2000, sites: Iterable[str] = SITES, seed: int = 0,
+              repeat: int = 1, work_dir: Optional[str] = None) -> Dict:
+    """Run every stage and return the report (plain dicts, ready for JSON)."""
+    from app.services.content_store import serialize_json
+    from app.stats.aggregate import MultiSiteAggregator
+    from app.stats.postflop_calculator_v3 import PostflopCalculatorV3
+    from app.stats.preflop_stats import PreflopStats
+    from app.stats.preflop_stats_multisite import patch_preflop_stats
+
+    patch_preflop_stats()
+    sites = list(sites)
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="bench_")
+    by_site: Dict[str, Dict[str, StageResult]] = {}
+    site_groups: Dict[str, Dict[str, Tuple[Dict, Dict]]] = {}
+    try:
+        started = time.perf_counter()
+        corpus = {site: generate_site_files(site, hands_per_site, seed=seed) for site in sites}
+        generate_seconds = time.perf_counter() - started
+
+        for site in sites:
+            files = corpus[site]
+            groups: Dict[str, List[str]] = {}
+            preflop: Dict = {}
+            postflop: Dict = {}
+            site_dir = os.path.join(work_dir, site.replace(".", "_"))
+            by_site[site] = {
+                "split": _measure(lambda: _split(files), repeat),
+                "classify": _measure(lambda: _classify(files, groups), repeat),
+                "preflop": _measure(lambda: _run_calculator(
+                    lambda c: PreflopStats(hand_collector=c), groups,
+                    os.path.join(site_dir, "preflop"), preflop), repeat),
+                "postflop": _measure(lambda: _run_calculator(
+                    lambda c: PostflopCalculatorV3(hand_collector=c), groups,
+                    os.path.join(site_dir, "postflop"), postflop), repeat),
+            }
+            site_groups[site] = {}
+            for group, (stats, collector) in preflop.items():
+                stats = dict(stats)
+                stats.update(postflop[group][0])
+                hands_by_stat = collector.get_hands_by_stat()
+                hands_by_stat.update(postflop[group][1].get_hands_by_stat())
+                site_groups[site][group] = (stats, hands_by_stat)
+
+        all_groups = sorted({g for groups in site_groups.values() for g in groups})
+        classified = sum(by_site[s]["classify"].hands for s in sites)
+        combined: Dict = {}
+
+        def aggregate():
+            aggregator = MultiSiteAggregator()
+            for site, groups in site_groups.items():
+                for group, (stats, hands_by_stat) in groups.items():
+                    aggregator.add_site_results(site, group, stats, hands_by_stat)
+            out_dir = os.path.join(work_dir, "combined_out")
+            shutil.rmtree(out_dir, ignore_errors=True)
+            combined.clear()
+            for group in all_groups:
+                combined[group] = aggregator.aggregate_stats(group)
+                aggregator.write_combined_outputs(out_dir, group)
+            return classified, 0
+
+        def serialize():
+            payload = {"combined": combined, "sites": {s: {g: v[0] for g, v in groups.items()}
+                                                        for s, groups in site_groups.items()}}
+            data = serialize_json(payload)
+            return classified, len(data)
+
+        totals = {stage: _sum_results(by_site[s][stage] for s in sites) for stage in SITE_STAGES}
+        totals["aggregate"] = _measure(aggregate, repeat)
+        totals["serialize"] = _measure(serialize, repeat)
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "config": {"hands_per_site": hands_per_site, "sites": sites, "seed": seed, "repeat": repeat},
+        "environment": environment(),
+        "generate_seconds": round(generate_seconds, 3),
+        "stages": {stage: totals[stage].as_dict() for stage in STAGES},
+        "by_site": {site: {stage: result.as_dict() for stage, result in stages.items()}
+                    for site, stages in by_site.items()},
+        "peak_rss_mb": round(max(r.peak_rss_mb for r in totals.values()), 1),
+    }
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Regressions of ``report`` against ``baseline`` (empty when none).
+
+    A stage regresses when its throughput drops, or its peak RSS grows, by
+    more than ``tolerance`` (a fraction).
+    """
+    regressions = []
+
+    def check(label: str, current: Dict, base: Dict):
+        if not current or not base:
+            return
+        base_rate, rate = base.get("hands_per_second", 0), current.get("hands_per_second", 0)
+        if base_rate and rate < base_rate * (1 - tolerance):
+            regressions.append(f"{label}: {rate:.0f} hands/s vs baseline {base_rate:.0f} "
+                               f"({(rate / base_rate - 1) * 100:+.0f}%)")
+        base_rss, rss = base.get("peak_rss_mb", 0), current.get("peak_rss_mb", 0)
+        if base_rss and rss > base_rss * (1 + tolerance):
+            regressions.append(f"{label}: peak RSS {rss:.0f} MB vs baseline {base_rss:.0f} MB "
+                               f"({(rss / base_rss - 1) * 100:+.0f}%)")
+
+    for stage in STAGES:
+        check(stage, report["stages"].get(stage), baseline.get("stages", {}).get(stage))
+    for site, stages in report.get("by_site", {}).items():
+        for stage, result in stages.items():
+            check(f"{site}/{stage}", result, baseline.get("by_site", {}).get(site, {}).get(stage))
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"{'stage':<22}{'hands':>9}{'seconds':>10}{'hands/s':>12}{'peak MB':>10}"]
+
+    def row(label, r):
+        lines.append(f"{label:<22}{r['hands']:>9}{r['seconds']:>10.3f}"
+                     f"{r['hands_per_second']:>12.0f}{r['peak_rss_mb']:>10.0f}")
+
+    for stage in STAGES:
+        row(stage, report["stages"][stage])
+    for site, stages in report["by_site"].items():
+        for stage in SITE_STAGES:
+            row(f"  {site}/{stage}", stages[stage])
+    return "\n".join(lines)
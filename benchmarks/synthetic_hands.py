@@ -0,0 +1,668 @@
+"""Deterministic synthetic tournament hand histories for every supported site.
+
+A hand is played once on a site-neutral model (seats, stacks, blinds, a
+simple betting engine) and then rendered in the text format of each site, so
+the same seed yields the same action on PokerStars, GG, Winamax, 888, 888.pt
+and WPN. The formats follow the real files under ``attached_assets``.
+
+    files = generate_site_files("gg", hands=500, seed=7)
+    files[0].filename, files[0].text
+
+Besides tournament hands (regular, PKO and mystery) it renders cash-game
+sessions and tournament summaries, the noise a real upload carries;
+``benchmarks.corpus`` assembles all of it into upload-sized archives.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+SITES = ("pokerstars", "gg", "winamax", "888", "888.pt", "wpn")
+KINDS = ("regular", "pko", "mystery")
+CASH_SITES = ("pokerstars", "gg")
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+DECK = tuple(r + s for r in RANKS for s in SUITS)
+
+# (small blind, big blind, ante) — a level a cada LEVEL_HANDS mãos
+LEVELS = (
+    (50, 100, 12), (75, 150, 20), (100, 200, 25), (150, 300, 40),
+    (200, 400, 50), (300, 600, 75), (400, 800, 100), (500, 1000, 125),
+    (750, 1500, 200), (1000, 2000, 250), (1500, 3000, 400), (2000, 4000, 500),
+)
+LEVEL_HANDS = 12
+CASH_BLINDS = (5, 10, 0)  # em cêntimos: $0.05/$0.10
+SHOVE_BB = 15  # stacks até aqui vão all-in em vez de abrir
+ROMAN = ("I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII")
+
+# lugares por tamanho de mesa (888 numera até 10 numa mesa de 8)
+TABLE_SIZES = {"pokerstars": (9, 6), "gg": (8, 6), "winamax": (6,), "888": (8,), "888.pt": (8,), "wpn": (8, 6)}
+SEAT_NUMBERS = {"888": (1, 2, 3, 5, 6, 7, 8, 10), "888.pt": (1, 2, 3, 5, 6, 7, 8, 10)}
+
+HERO = "Hero"
+VILLAINS = (
+    "abc205a9", "Mr.N0body", "Eunoia", "rocksol1d", "darrling3121", "Belamian",
+    "orlak6", "maxsteal", "ubetrippin", "Flopyoudead", "lukerawiins", "Epimone",
+    "88Keeex88", "monteiro23", "xatifnaft", "DeyvissonVS", "Txusoooo", "Richarfish",
+)
+
+STREETS = ("preflop", "flop", "turn", "river")
+
+# nome do torneio por site e tipo; o classificador lê-o do cabeçalho e/ou do nome do ficheiro
+TOURNAMENT_NAMES = {
+    "pokerstars": {"regular": "$10+$1", "pko": "$4.90+$4.90+$1.20", "mystery": "$5+$5+$1"},
+    "gg": {"regular": "$30 Sunday Monster Stack", "pko": "Bounty Hunters $10",
+           "mystery": "Mystery Bounty $25"},
+    "winamax": {"regular": "CRUNCH", "pko": "KNOCKOUT", "mystery": "MYSTERY BOUNTY"},
+    "888": {"regular": "$ 1.000 Rumble", "pko": "$ 1.000 PKO Rumble", "mystery": "$ 2.000 Mystery Bounty"},
+    "888.pt": {"regular": "4.000 € Domingo", "pko": "4.000 € PKO Domingo",
+               "mystery": "4.000 € Domingo Mystery Bounty"},
+    "wpn": {"regular": "Early Special - $10,000 GTD", "pko": "Bounty Special - $10,000 GTD",
+            "mystery": "Mystery Bounty - $10,000 GTD"},
+}
+WINAMAX_BUYINS = {"regular": "18€ + 2€", "pko": "9€ + 9€ + 2€", "mystery": "9€ + 9€ + 2€"}
+
+
+@dataclass
+class Action:
+    street: str
+    player: str
+    verb: str  # folds, checks, calls, bets, raises
+    amount: int = 0  # fichas colocadas nesta ação
+    to: int = 0  # contribuição total na street depois da ação
+    all_in: bool = False
+
+
+@dataclass
+class SyntheticHand:
+    hand_id: int
+    tournament_id: int
+    kind: str
+    table_size: int
+    level: int
+    started_at: datetime
+    button_seat: int
+    seats: List[Tuple[int, str, int]]  # (seat, name, stack) em ordem de lugar
+    sb: int
+    bb: int
+    ante: int
+    posts: List[Tuple[str, str, int]]  # (player, 'ante'|'small blind'|'big blind', amount)
+    hole_cards: Dict[str, Tuple[str, str]]
+    board: List[str]
+    actions: List[Action]
+    streets_dealt: int  # 1 = só preflop ... 4 = river
+    uncalled: Optional[Tuple[str, int]] = None
+    winner: str = ""
+    pot: int = 0
+    showdown: List[str] = field(default_factory=list)
+
+    @property
+    def players(self) -> List[str]:
+        return [name for _, name, _ in self.seats]
+
+
+@dataclass
+class SyntheticFile:
+    site: str
+    kind: str
+    filename: str
+    text: str
+    hands: int
+    tournament_id: int = 0
+    started_at: Optional[datetime] = None
+
+
+# ---------------------------------------------------------------------------
+# Motor de apostas (independente do site)
+# ---------------------------------------------------------------------------
+
+class _Table:
+    def __init__(self, rng: random.Random, order: List[str], stacks: Dict[str, int], bb: int):
+        self.rng = rng
+        self.order = order  # a partir do botão
+        self.stack = dict(stacks)
+        self.total_in = {p: 0 for p in order}
+        self.folded = set()
+        self.all_in = set()
+        self.bb = bb
+        self.actions: List[Action] = []
+        self.uncalled: Optional[Tuple[str, int]] = None
+
+    def live(self) -> List[str]:
+        return [p for p in self.order if p not in self.folded]
+
+    def can_act(self) -> List[str]:
+        return [p for p in self.order if p not in self.folded and p not in self.all_in]
+
+    def pot(self) -> int:
+        return sum(self.total_in.values())
+
+    def put(self, player: str, amount: int) -> int:
+        amount = min(amount, self.stack[player])
+        self.stack[player] -= amount
+        self.total_in[player] += amount
+        if self.stack[player] == 0:
+            self.all_in.add(player)
+        return amount
+
+    def betting_round(self, street: str, first: int, street_in: Dict[str, int], max_raises: int):
+        """Joga uma street; ``first`` é o índice (em ``order``) de quem abre."""
+        n = len(self.order)
+        seq = [self.order[(first + i) % n] for i in range(n)]
+        queue = [p for p in seq if p not in self.folded and p not in self.all_in]
+        high = max(street_in.values()) if street_in else 0
+        min_raise = self.bb
+        raises = 1 if street == "preflop" else 0
+        shoved = False
+        while queue:
+            player = queue.pop(0)
+            if player in self.folded or player in self.all_in:
+                continue
+            if len(self.live()) == 1:
+                break
+            current = street_in.get(player, 0)
+            to_call = high - current
+            verb = self._decide(street, to_call, raises, max_raises, shoved)
+            if verb in ("bets", "raises"):
+                target = self._size(street, high, to_call, raises, self.stack[player] + current)
+                # nunca acima do que o menor adversário vivo consegue pagar: sem side pots
+                cap = min(self.stack[p] + street_in.get(p, 0) for p in self.can_act())
+                target = min(max(target, high + min_raise), cap)
+                if target <= high:
+                    verb = "calls" if to_call else "checks"
+                else:
+                    amount = self.put(player, target - current)
+                    street_in[player] = current + amount
+                    all_in = player in self.all_in
+                    self.actions.append(Action(street, player, "raises" if high else "bets",
+                                               amount, target, all_in))
+                    min_raise = max(min_raise, target - high)
+                    high = target
+                    raises += 1
+                    # quem ficar all-in ao pagar fecha a ação: ninguém volta a subir
+                    shoved = shoved or all_in or any(self.stack[p] + street_in.get(p, 0) == target
+                                                     for p in self.can_act())
+                    idx = seq.index(player)
+                    queue = [p for p in seq[idx + 1:] + seq[:idx]
+                             if p not in self.folded and p not in self.all_in]
+                    continue
+            if verb == "folds" and to_call == 0:
+                verb = "checks"
+            if verb == "folds":
+                self.folded.add(player)
+                self.actions.append(Action(street, player, "folds", 0, current))
+            elif verb == "checks" or to_call == 0:
+                self.actions.append(Action(street, player, "checks", 0, current))
+            else:
+                amount = self.put(player, to_call)
+                street_in[player] = current + amount
+                self.actions.append(Action(street, player, "calls", amount, current + amount,
+                                           player in self.all_in))
+        # aposta sem resposta volta para quem a fez
+        if len(self.live()) == 1 and street_in:
+            winner = self.live()[0]
+            others = [v for p, v in street_in.items() if p != winner]
+            excess = street_in.get(winner, 0) - max(others, default=0)
+            if excess > 0:
+                self.stack[winner] += excess
+                self.total_in[winner] -= excess
+                street_in[winner] -= excess
+                self.uncalled = (winner, excess)
+
+    def _decide(self, street: str, to_call: int, raises: int, max_raises: int, shoved: bool) -> str:
+        roll = self.rng.random()
+        can_raise = raises < max_raises and not shoved
+        if street == "preflop":
+            if raises <= 1 and to_call == 0:  # BB sem raise
+                return "raises" if can_raise and roll < 0.2 else "checks"
+            if raises <= 1:
+                return "raises" if can_raise and roll < 0.28 else ("calls" if roll < 0.36 else "folds")
+            if raises == 2:
+                return "raises" if can_raise and roll < 0.1 else ("calls" if roll < 0.38 else "folds")
+            return "calls" if roll < 0.45 else "folds"
+        if to_call == 0:
+            return "bets" if can_raise and roll < 0.45 else "checks"
+        if raises == 1:
+            return "raises" if can_raise and roll < 0.12 else ("calls" if roll < 0.55 else "folds")
+        return "raises" if can_raise and roll < 0.06 else ("calls" if roll < 0.45 else "folds")
+
+    def _size(self, street: str, high: int, to_call: int, raises: int, behind: int) -> int:
+        rng = self.rng
+        if behind <= self.bb * SHOVE_BB or behind <= self.pot():
+            return behind  # all-in (limitado depois pelo menor stack)
+        if street == "preflop":
+            if raises <= 1:
+                return int(self.bb * rng.choice((2, 2.2, 2.5, 3)))
+            return int(high * rng.choice((2.2, 2.5, 3)))
+        pot = self.pot()
+        if to_call == 0:
+            return max(self.bb, int(pot * rng.choice((0.33, 0.5, 0.66, 0.75))))
+        return int(high * rng.choice((2.5, 3)))
+
+
+def play_hand(rng: random.Random, hand_id: int, tournament_id: int, kind: str, table_size: int,
+              seat_numbers: Tuple[int, ...], level: int, started_at: datetime,
+              blinds: Optional[Tuple[int, int, int]] = None) -> SyntheticHand:
+    """Play one hand on the site-neutral model."""
+    sb, bb, ante = blinds or LEVELS[min(level, len(LEVELS) - 1)]
+    n_players = rng.randint(4, table_size)
+    seats = sorted(rng.sample(seat_numbers[:table_size], n_players))
+    names = [HERO] + rng.sample(VILLAINS, n_players - 1)
+    rng.shuffle(names)
+    stacks = {name: bb * rng.randint(8, 120) + rng.randint(0, bb - 1) for name in names}
+    seat_rows = [(seat, name, stacks[name]) for seat, name in zip(seats, names)]
+
+    button_idx = rng.randrange(n_players)
+    order = [seat_rows[(button_idx + i) % n_players][1] for i in range(n_players)]
+    table = _Table(rng, order, stacks, bb)
+
+    posts = []
+    if ante:
+        for name in names:
+            posts.append((name, "ante", table.put(name, ante)))
+    street_in = {}
+    for name, blind, amount in ((order[1], "small blind", sb), (order[2], "big blind", bb)):
+        street_in[name] = table.put(name, amount)
+        posts.append((name, blind, street_in[name]))
+    # o ante não conta para a primeira street
+    preflop_in = dict(street_in)
+
+    cards = rng.sample(DECK, 2 * n_players + 5)
+    hole_cards = {name: (cards[2 * i], cards[2 * i + 1]) for i, name in enumerate(order)}
+    board = cards[2 * n_players:]
+
+    table.betting_round("preflop", 3 % n_players, preflop_in, max_raises=4)
+    streets_dealt = 1
+    for street in STREETS[1:]:
+        if len(table.live()) == 1:
+            break
+        streets_dealt += 1
+        # com alguém all-in a mão é só corrida até ao river
+        if len(table.can_act()) > 1 and not table.all_in:
+            table.betting_round(street, 1, {}, max_raises=3)
+
+    live = table.live()
+    showdown = live if len(live) > 1 else []
+    winner = rng.choice(live) if showdown else live[0]
+    if showdown:
+        streets_dealt = 4
+    return SyntheticHand(
+        hand_id=hand_id, tournament_id=tournament_id, kind=kind, table_size=table_size,
+        level=level, started_at=started_at, button_seat=seat_rows[button_idx][0], seats=seat_rows,
+        sb=sb, bb=bb, ante=ante, posts=posts, hole_cards=hole_cards, board=board,
+        actions=table.actions, streets_dealt=streets_dealt, uncalled=table.uncalled,
+        winner=winner, pot=table.pot(), showdown=showdown,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Formatação por site
+# ---------------------------------------------------------------------------
+
+def _plain(n: int) -> str:
+    return str(n)
+
+
+def _commas(n: int) -> str:
+    return f"{n:,}"
+
+
+def _dots(n: int) -> str:
+    return f"{n:,}".replace(",", ".")
+
+
+def _decimal(n: int) -> str:
+    return f"{n:.2f}"
+
+
+def _dollars(cents: int) -> str:
+    return f"${cents / 100:.2f}"
+
+
+def _bounty(hand: SyntheticHand, site: str) -> str:
+    if hand.kind != "pko":
+        return ""
+    if site == "winamax":
+        return ", 9€ bounty"
+    return ", $4.90 bounty"
+
+
+def _street_line(site: str, street: str, board: List[str]) -> str:
+    if street == "flop":
+        return f"*** FLOP *** [{' '.join(board[:3])}]"
+    shown = 4 if street == "turn" else 5
+    sep = "" if site == "winamax" else " "
+    return f"*** {street.upper()} *** [{' '.join(board[:shown - 1])}]{sep}[{board[shown - 1]}]"
+
+
+def _action_line(site: str, action: Action, fmt, high_before: int) -> str:
+    name = action.player
+    colon = ":" if site in ("pokerstars", "gg") else ""
+    if action.verb in ("folds", "checks"):
+        return f"{name}{colon} {action.verb}"
+    if action.verb == "raises":
+        if site == "wpn":
+            text = f"{name} raises {fmt(action.to)} to {fmt(action.to)}"
+        else:
+            text = f"{name}{colon} raises {fmt(action.to - high_before)} to {fmt(action.to)}"
+    else:
+        text = f"{name}{colon} {action.verb} {fmt(action.amount)}"
+    return text + (" and is all-in" if action.all_in else "")
+
+
+def _dealt_lines(site: str, hand: SyntheticHand) -> List[str]:
+    cards = " ".join(hand.hole_cards[HERO])
+    if site == "gg":
+        # GG lista todos os jogadores, com cartas só para o herói
+        return [f"Dealt to {name} [{cards}]" if name == HERO else f"Dealt to {name} "
+                for name in hand.players]
+    return [f"Dealt to {HERO} [{cards}]"]
+
+
+def _betting_lines(site: str, hand: SyntheticHand, fmt) -> List[str]:
+    lines = []
+    street = "preflop"
+    high = hand.bb
+    for action in hand.actions:
+        if action.street != street:
+            street = action.street
+            high = 0
+        lines.append((action.street, _action_line(site, action, fmt, high)))
+        if action.verb in ("bets", "raises"):
+            high = action.to
+    return lines
+
+
+def _seat_summary(hand: SyntheticHand, fmt, won_format: str) -> List[str]:
+    folded_on = {}
+    for action in hand.actions:
+        if action.verb == "folds":
+            folded_on[action.player] = action.street
+    button = hand.button_seat
+    lines = []
+    for seat, name, _ in hand.seats:
+        tag = " (button)" if seat == button else ""
+        if name == hand.winner:
+            if hand.showdown:
+                lines.append(f"Seat {seat}: {name}{tag} showed [{' '.join(hand.hole_cards[name])}] "
+                             f"and won {won_format.format(fmt(hand.pot))}")
+            else:
+                lines.append(f"Seat {seat}: {name}{tag} collected {won_format.format(fmt(hand.pot))}")
+        elif name in hand.showdown:
+            lines.append(f"Seat {seat}: {name}{tag} showed [{' '.join(hand.hole_cards[name])}] and lost")
+        elif name in folded_on:
+            where = "before Flop" if folded_on[name] == "preflop" else f"on the {folded_on[name].title()}"
+            lines.append(f"Seat {seat}: {name}{tag} folded {where}")
+        else:
+            lines.append(f"Seat {seat}: {name}{tag} mucked")
+    return lines
+
+
+def _render_classic(site: str, hand: SyntheticHand) -> str:
+    """PokerStars, GG e WPN: mesmo esqueleto com cabeçalhos e números diferentes."""
+    fmt = {"pokerstars": _plain, "gg": _commas, "wpn": _decimal}[site]
+    when = hand.started_at.strftime("%Y/%m/%d %H:%M:%S")
+    if hand.kind == "cash":
+        fmt = _dollars
+        if site == "pokerstars":
+            header = (f"PokerStars Hand #{hand.hand_id}:  Hold'em No Limit "
+                      f"({fmt(hand.sb)}/{fmt(hand.bb)} USD) - {when} ET")
+        else:
+            header = f"Poker Hand #RC{hand.hand_id}: Hold'em No Limit ({fmt(hand.sb)}/{fmt(hand.bb)}) - {when}"
+        table = f"Table 'Ariadne {ROMAN[hand.tournament_id % len(ROMAN)]}' {hand.table_size}-max"
+    elif site == "pokerstars":
+        buyin = TOURNAMENT_NAMES[site][hand.kind]
+        header = (f"PokerStars Hand #{hand.hand_id}: Tournament #{hand.tournament_id}, {buyin} USD "
+                  f"Hold'em No Limit - Level {ROMAN[hand.level % len(ROMAN)]} ({hand.sb}/{hand.bb}) - {when} ET")
+        table = f"Table '{hand.tournament_id} {hand.level + 1}' {hand.table_size}-max"
+    elif site == "gg":
+        name = TOURNAMENT_NAMES[site][hand.kind]
+        header = (f"Poker Hand #TM{hand.hand_id}: Tournament #{hand.tournament_id}, {name} Hold'em No Limit - "
+                  f"Level{hand.level + 1}({fmt(hand.sb)}/{fmt(hand.bb)}) - {when}")
+        table = f"Table '{hand.level + 1}' {hand.table_size}-max"
+    else:
+        header = (f"Game Hand #{hand.hand_id} - Tournament #{hand.tournament_id} - Holdem (No Limit) - "
+                  f"Level {hand.level + 1} ({fmt(hand.sb)}/{fmt(hand.bb)}) - {when} UTC")
+        table = f"Table '{hand.level + 1}' {hand.table_size}-max"
+    lines = [header, f"{table} Seat #{hand.button_seat} is the button"]
+    if site == "wpn":
+        lines += [f"Seat {seat}: {name} ({fmt(stack)})" for seat, name, stack in hand.seats]
+    else:
+        bounty = _bounty(hand, site)
+        lines += [f"Seat {seat}: {name} ({fmt(stack)} in chips{bounty})" for seat, name, stack in hand.seats]
+
+    colon = "" if site == "wpn" else ":"
+    for name, what, amount in hand.posts:
+        # Stars/GG: "posts the ante 20", "posts small blind 80"; WPN ao contrário
+        if (what == "ante") != (site == "wpn"):
+            what = f"the {what}"
+        lines.append(f"{name}{colon} posts {what} {fmt(amount)}")
+    lines.append("*** HOLE CARDS ***")
+    lines += _dealt_lines(site, hand)
+
+    street_lines = _betting_lines(site, hand, fmt)
+    for street in STREETS[:hand.streets_dealt]:
+        if street != "preflop":
+            lines.append(_street_line(site, street, hand.board))
+        lines += [line for s, line in street_lines if s == street]
+    if hand.uncalled and site != "wpn":
+        player, amount = hand.uncalled
+        lines.append(f"Uncalled bet ({fmt(amount)}) returned to {player}")
+
+    pot_word = "main pot" if site == "wpn" else "pot"
+    if hand.showdown:
+        lines.append("*** SHOWDOWN ***" if site == "gg" else "*** SHOW DOWN ***")
+        for name in hand.showdown:
+            lines.append(f"{name}{colon} shows [{' '.join(hand.hole_cards[name])}]")
+    lines.append(f"{hand.winner} collected {fmt(hand.pot)} from {pot_word}")
+    lines.append("*** SUMMARY ***")
+    if site == "gg":
+        lines.append(f"Total pot {fmt(hand.pot)} | Rake 0 | Jackpot 0 | Bingo 0 | Fortune 0 | Tax 0")
+    elif site == "wpn":
+        lines.append(f"Total pot {fmt(hand.pot)}")
+    else:
+        lines.append(f"Total pot {fmt(hand.pot)} | Rake 0")
+    if hand.streets_dealt > 1:
+        lines.append(f"Board [{' '.join(hand.board[:hand.streets_dealt + 1])}]")
+    lines += _seat_summary(hand, fmt, "({})" if site != "wpn" else "{}")
+    return "\n".join(lines)
+
+
+def _render_winamax(hand: SyntheticHand) -> str:
+    fmt = _plain
+    when = hand.started_at.strftime("%Y/%m/%d %H:%M:%S")
+    name = TOURNAMENT_NAMES["winamax"][hand.kind]
+    buyin = WINAMAX_BUYINS[hand.kind]
+    epoch = int(hand.started_at.timestamp())
+    lines = [
+        f'Winamax Poker - Tournament "{name}" buyIn: {buyin} level: {hand.level + 1} - '
+        f"HandId: #{hand.tournament_id}-{hand.hand_id}-{epoch} - Holdem no limit "
+        f"({hand.ante}/{hand.sb}/{hand.bb}) - {when} UTC",
+        f"Table: '{name}({hand.tournament_id})#{hand.level + 1:03d}' {hand.table_size}-max (real money) "
+        f"Seat #{hand.button_seat} is the button",
+    ]
+    bounty = _bounty(hand, "winamax")
+    lines += [f"Seat {seat}: {player} ({fmt(stack)}{bounty})" for seat, player, stack in hand.seats]
+    lines.append("*** ANTE/BLINDS ***")
+    lines += [f"{player} posts {what} {fmt(amount)}" for player, what, amount in hand.posts]
+    lines += _dealt_lines("winamax", hand)
+    street_lines = _betting_lines("winamax", hand, fmt)
+    for street in STREETS[:hand.streets_dealt]:
+        lines.append("*** PRE-FLOP *** " if street == "preflop" else _street_line("winamax", street, hand.board))
+        lines += [line for s, line in street_lines if s == street]
+    if hand.showdown:
+        lines.append("*** SHOW DOWN ***")
+        lines += [f"{player} shows [{' '.join(hand.hole_cards[player])}]" for player in hand.showdown]
+    lines.append(f"{hand.winner} collected {fmt(hand.pot)} from pot")
+    lines.append("*** SUMMARY ***")
+    lines.append(f"Total pot {fmt(hand.pot)} | No rake")
+    if hand.streets_dealt > 1:
+        lines.append(f"Board: [{' '.join(hand.board[:hand.streets_dealt + 1])}]")
+    for seat, player, _ in hand.seats:
+        if player == hand.winner:
+            shown = f" showed [{' '.join(hand.hole_cards[player])}] and" if hand.showdown else ""
+            lines.append(f"Seat {seat}: {player}{shown} won {fmt(hand.pot)}")
+        elif player in hand.showdown:
+            lines.append(f"Seat {seat}: {player} showed [{' '.join(hand.hole_cards[player])}] and lost")
+    return "\n".join(lines)
+
+
+def _render_888(site: str, hand: SyntheticHand) -> str:
+    fmt = _dots
+    brand = "888.pt" if site == "888.pt" else "888poker"
+    when = hand.started_at.strftime("%d %m %Y %H:%M:%S")
+    buyin = "9,90 € + 1,10 €" if site == "888.pt" else "$\xa030 + $\xa03"
+    lines = [
+        f"#Game No : {hand.hand_id}",
+        f"***** {brand} Hand History for Game {hand.hand_id} *****",
+        f"{fmt(hand.sb)}/{fmt(hand.bb)} Blinds No Limit Holdem - *** {when}",
+        f"Tournament #{hand.tournament_id} {buyin} - Table #{hand.level + 1} {hand.table_size} Max (Real Money)",
+        f"Seat {hand.button_seat} is the button",
+        f"Total number of players : {len(hand.seats)}",
+    ]
+    lines += [f"Seat {seat}: {player} ( {fmt(stack)} )" for seat, player, stack in hand.seats]
+    lines += [f"{player} posts {what} [{fmt(amount)}]" for player, what, amount in hand.posts]
+    lines.append("** Dealing down cards **")
+    lines.append(f"Dealt to {HERO} [ {', '.join(hand.hole_cards[HERO])} ]")
+    for street in STREETS[:hand.streets_dealt]:
+        if street != "preflop":
+            lines.append(_888_street(street, hand.board))
+        for action in hand.actions:
+            if action.street != street:
+                continue
+            if action.verb in ("folds", "checks"):
+                lines.append(f"{action.player} {action.verb}")
+            else:
+                # 888 mostra as fichas colocadas na ação, não o total
+                lines.append(f"{action.player} {action.verb} [{fmt(action.amount)}]")
+    lines.append("** Summary **")
+    for player in hand.showdown:
+        lines.append(f"{player} shows [ {', '.join(hand.hole_cards[player])} ]")
+    lines.append(f"{hand.winner} collected [ {fmt(hand.pot)} ]")
+    return "\n".join(lines)
+
+
+def _888_street(street: str, board: List[str]) -> str:
+    cards = {"flop": board[:3], "turn": board[3:4], "river": board[4:5]}[street]
+    return f"** Dealing {street} ** [ {', '.join(cards)} ]"
+
+
+def render_hand(site: str, hand: SyntheticHand) -> str:
+    if site in ("888", "888.pt"):
+        return _render_888(site, hand)
+    if site == "winamax":
+        return _render_winamax(hand)
+    return _render_classic(site, hand)
+
+
+def tournament_filename(site: str, kind: str, tournament_id: int, started_at: datetime) -> str:
+    day = started_at.strftime("%Y%m%d")
+    name = TOURNAMENT_NAMES[site][kind]
+    if site == "pokerstars":
+        return f"HH{day} T{tournament_id} No Limit Hold'em {name}.txt"
+    if site == "gg":
+        return f"GG{day}-{started_at:%H%M} - {name.replace('$', '')}.txt"
+    if site == "winamax":
+        return f"{day}_{name}({tournament_id})_real_holdem_no-limit.txt"
+    if site == "888":
+        return f"888poker{day} Tournament $ 30 + $ 3 {name} ({tournament_id}) No Limit Holdem.txt"
+    if site == "888.pt":
+        return f"888.pt{day} Tournament 9,90 € + 1,10 € {name} ({tournament_id}) No Limit Holdem.txt"
+    return (f"HH{day} SCHEDULEDID-G{tournament_id}T1 TN-{name} GAMETYPE-Hold'em LIMIT-no "
+            f"CUR-REAL OND-F BUYIN-0.txt")
+
+
+def render_summary(site: str, kind: str, tournament_id: int, started_at: datetime,
+                   entrants: int, finish: int) -> Tuple[str, str]:
+    """(filename, text) of the tournament summary a site ships next to the hands."""
+    hands_name = tournament_filename(site, kind, tournament_id, started_at)
+    name = TOURNAMENT_NAMES[site][kind]
+    when = started_at.strftime("%Y/%m/%d %H:%M:%S")
+    place = _ordinal(finish)
+    if site == "pokerstars":
+        text = (f"PokerStars Tournament #{tournament_id}, No Limit Hold'em\n"
+                f"Buy-In: {name.replace('+', '/')} USD\n{entrants} players\n"
+                f"Total Prize Pool: ${entrants * 10}.00 USD\nTournament started {when} ET\n"
+                f"{finish}: {HERO} (Portugal),\nYou finished in {place} place.")
+        return "TS" + hands_name[2:], text
+    if site in ("888", "888.pt"):
+        buyin = "9,90 € + 1,10 €" if site == "888.pt" else "$ 30 + $ 3"
+        text = (f"***** Tournament Summary *****\nTournament ID: {tournament_id}\n"
+                f"Buy-In: {buyin}\n{HERO} finished {finish}/{entrants}")
+        return f"{hands_name} - Summary.txt", text
+    if site == "winamax":
+        text = (f"Winamax Poker - Tournament summary : {name}({tournament_id})\nPlayer : {HERO}\n"
+                f"Buy-In : {WINAMAX_BUYINS[kind]}\nRegistered players : {entrants}\n"
+                f"You finished in {place} place")
+        return hands_name.replace(".txt", "_summary.txt"), text
+    text = (f"Tournament #{tournament_id}, {name}, Hold'em No Limit\n{entrants} Players\n"
+            f"Total Prize Pool: ${entrants * 10:,}\nTournament started {when}\n"
+            f"{place} : {HERO}, $0\nYou finished the tournament in {place} place.")
+    return hands_name.replace(".txt", " - Summary.txt"), text
+
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def generate_tournament(site: str, hands: int, seed: int = 0, kind: str = "regular",
+                        table_size: Optional[int] = None,
+                        start: datetime = datetime(2025, 7, 1, 18, 0)) -> SyntheticFile:
+    """One tournament file with ``hands`` hands, fully determined by ``seed``."""
+    if site not in SITES:
+        raise ValueError(f"unknown site: {site}")
+    if kind not in KINDS:
+        raise ValueError(f"unknown tournament kind: {kind}")
+    rng = random.Random(f"{site}:{kind}:{seed}")
+    table_size = table_size or rng.choice(TABLE_SIZES[site])
+    seat_numbers = SEAT_NUMBERS.get(site, tuple(range(1, table_size + 1)))
+    tournament_id = rng.randrange(10 ** 8, 10 ** 9)
+    hand_id = rng.randrange(10 ** 9, 5 * 10 ** 9)
+    started_at = start + timedelta(minutes=rng.randrange(0, 600))
+
+    texts = []
+    for i in range(hands):
+        hand = play_hand(rng, hand_id + i, tournament_id, kind, table_size, seat_numbers,
+                         level=i // LEVEL_HANDS, started_at=started_at + timedelta(seconds=75 * i))
+        texts.append(render_hand(site, hand))
+    return SyntheticFile(
+        site=site, kind=kind, filename=tournament_filename(site, kind, tournament_id, started_at),
+        text="\n\n\n".join(texts) + "\n", hands=hands, tournament_id=tournament_id, started_at=started_at,
+    )
+
+
+def generate_cash_session(site: str, hands: int, seed: int = 0,
+                          start: datetime = datetime(2025, 7, 1, 18, 0)) -> SyntheticFile:
+    """A cash-game session: uploads carry these and classification must drop them."""
+    if site not in CASH_SITES:
+        raise ValueError(f"no cash format for site: {site}")
+    rng = random.Random(f"{site}:cash:{seed}")
+    table_id = rng.randrange(10 ** 6)
+    hand_id = rng.randrange(10 ** 9, 5 * 10 ** 9)
+    started_at = start + timedelta(minutes=rng.randrange(0, 600))
+    texts = []
+    for i in range(hands):
+        hand = play_hand(rng, hand_id + i, table_id, "cash", 6, tuple(range(1, 7)), level=0,
+                         started_at=started_at + timedelta(seconds=40 * i), blinds=CASH_BLINDS)
+        texts.append(render_hand(site, hand))
+    day = started_at.strftime("%Y%m%d")
+    filename = (f"HH{day} Ariadne II - $0.05-$0.10 - USD No Limit Hold'em.txt" if site == "pokerstars"
+                else f"GG{day}-{started_at:%H%M} - RushAndCash NLH0.1.txt")
+    return SyntheticFile(site=site, kind="cash", filename=filename, text="\n\n\n".join(texts) + "\n",
+                         hands=hands, started_at=started_at)
+
+
+def generate_site_files(site: str, hands: int, seed: int = 0, hands_per_file: int = 150,
+                        kinds: Tuple[str, ...] = ("regular", "pko")) -> List[SyntheticFile]:
+    """``hands`` hands for one site, spread over tournaments alternating ``kinds``."""
+    files = []
+    index = 0
+    while hands > 0:
+        count = min(hands, hands_per_file)
+        files.append(generate_tournament(site, count, seed=seed * 100003 + index,
+                                         kind=kinds[index % len(kinds)]))
+        hands -= count
+        index += 1
+    return files
@@ -1,6 +1,7 @@
 
 import os
 import multiprocessing
+import shutil
 
 # Performance optimizations for distributed upload system
 # Multiple workers safe due to atomic job claiming via PostgreSQL
@@ -31,6 +32,9 @@ keepalive = 5
 # Memory management
 worker_tmp_dir = "/dev/shm"
 
+# /metrics: each worker saves its pipeline totals here and answers with the sum
+os.environ.setdefault("PIPELINE_METRICS_DIR", "/dev/shm/stat_manager_metrics")
+
 # Binding
 bind = "0.0.0.0:5000"
 
@@ -44,6 +48,11 @@ proc_name = "stat_manager"
 # Graceful timeout
 graceful_timeout = 60
 
+def on_starting(server):
+    """Called once in the master before any worker starts"""
+    # totals of a previous run would be added to this one's
+    shutil.rmtree(os.environ["PIPELINE_METRICS_DIR"], ignore_errors=True)
+
 def when_ready(server):
     """Called once when the master process is ready"""
     server.log.info("Stat Manager ready to serve requests")
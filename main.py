@@ -7,6 +7,7 @@ import uuid
 import logging
 import csv
 import io
+import itertools
 import time
 import sqlite3
 import json
@@ -16,22 +17,15 @@ from pathlib import Path
 from flask import Flask, render_template, request, send_file, abort, flash, redirect, url_for, Response, jsonify, session, stream_with_context, make_response
 from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
-import magic
-import rarfile
-import chardet
 from flask_login import LoginManager, current_user, login_required
-from fastapi import FastAPI
-from fastapi.middleware.wsgi import WSGIMiddleware
 
-# Import partition module
-from app.partition.runner import build_partitions
-
-# Import stats module
-from app.stats.engine import run_stats
+# magic, rarfile, chardet, o motor de partições/stats, o CSV merge e o FastAPI
+# são importados só quando usados: cada worker reciclado do gunicorn arranca
+# sem eles
 
 # Import hands API blueprint
 from app.hands.api import bp as hands_api_bp
-from app.api_dashboard import build_dashboard_payload, router as dashboard_debug_router
+from app.api_dashboard import build_dashboard_payload
 from app.dashboard import bp_dashboard, bp_dashboard_debug, bp_dashboard_internal
 from app.dashboard.routes import dashboard_bp
 from app.api.jobs import bp_jobs
@@ -50,14 +44,10 @@ from app.admin import admin_bp
 from app.admin.routes import *
 from app.admin.initializer import initialize_production_emails, ensure_primary_admin
 
-# Import simple upload FastAPI router
-from app.api.simple_upload import router as simple_upload_router
-from app.dashboard.main_page import router as main_page_router
-from app.api.debug_by_user_pipeline import router as debug_by_user_pipeline_router
-
 # Import database pool only (no background worker needed)
 from app.services.db_pool import DatabasePool
 from app.services.upload_service import UploadService
+from app.services.chunk_store import ChunkStoreError, get_chunk_store
 from app.services.jobs_background_worker import ensure_jobs_worker
 
 # Import database migrations
@@ -361,6 +351,9 @@ def extract_single_archive(archive_path: Path, dest_dir: Path):
     Extract a single archive file (ZIP or RAR) to destination directory.
     Returns True if successful.
     """
+    import magic
+    import rarfile
+
     try:
         # Validate file exists and size
         if not archive_path.exists():
@@ -536,6 +529,8 @@ def process_txt_tree(root_dir: Path, output_dir: Path):
     Searches for keywords in both filename and file content.
     Returns both statistics and detailed file classification info.
     """
+    import chardet
+
     pko_dir = output_dir / 'PKO'
     nonko_dir = output_dir / 'NON-KO'
     mysteries_dir = output_dir / 'MYSTERIES'
@@ -891,13 +886,32 @@ app.register_blueprint(history_bp)
 from app.api.cleanup_admin import cleanup_admin_bp
 app.register_blueprint(cleanup_admin_bp)
 
-# FastAPI application exposing the asynchronous upload router
-fastapi_app = FastAPI(title="Stats Upload Service")
-fastapi_app.include_router(simple_upload_router)
-fastapi_app.include_router(main_page_router)
-fastapi_app.include_router(debug_by_user_pipeline_router)
-fastapi_app.include_router(dashboard_debug_router)
-fastapi_app.mount("/", WSGIMiddleware(app))
+# FastAPI application exposing the asynchronous upload router.
+# Só o uvicorn (main:fastapi_app) precisa dela; o gunicorn serve a app Flask
+# diretamente, por isso é construída no primeiro acesso ao atributo.
+def _build_fastapi_app():
+    from fastapi import FastAPI
+    from fastapi.middleware.wsgi import WSGIMiddleware
+    from app.api.dashboard_debug import router as dashboard_debug_router
+    from app.api.debug_by_user_pipeline import router as debug_by_user_pipeline_router
+    from app.api.simple_upload import router as simple_upload_router
+    from app.dashboard.main_page import router as main_page_router
+
+    asgi_app = FastAPI(title="Stats Upload Service")
+    asgi_app.include_router(simple_upload_router)
+    asgi_app.include_router(main_page_router)
+    asgi_app.include_router(debug_by_user_pipeline_router)
+    asgi_app.include_router(dashboard_debug_router)
+    asgi_app.mount("/", WSGIMiddleware(app))
+    return asgi_app
+
+
+def __getattr__(name):
+    if name == "fastapi_app":
+        asgi_app = _build_fastapi_app()
+        globals()["fastapi_app"] = asgi_app
+        return asgi_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 @app.route('/')
 def index():
@@ -973,6 +987,20 @@ def health_check():
     status_code = 200 if health_status['status'] == 'healthy' else 503
     return jsonify(health_status), status_code
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Pipeline metrics in the Prometheus text format
+
+    Job counts, job duration histogram by archive size and per-stage totals
+    (wall/CPU time, hands, bytes, peak RSS) for jobs run by every gunicorn
+    worker (see PIPELINE_METRICS_DIR); running jobs and RSS are the answering
+    worker's, labelled with its pid.
+    """
+    from app.services.pipeline_metrics import registry
+
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/upload-legacy', methods=['POST'])
 def upload_legacy():
     """Handle simple file upload with fallback to chunked processing."""
@@ -1248,358 +1276,30 @@ def upload_legacy():
         # For now, we'll leave cleanup to the OS temp directory management
         pass
 
-def duplicate_bb_fold_columns(headers, data):
-    """
-    Duplicate 'BB Fold to SB Steal' column for 9max, 6max, and PKO files.
-    Returns dictionary with duplicated headers and values.
-    """
-    duplications = {
-        'headers': [],
-        'values': []
-    }
-
-    # Define which columns to duplicate for each file type
-    source_columns = [
-        '9MAX_BB Fold to SB Steal',
-        '6MAX_BB Fold to SB Steal',
-        'PKO_BB Fold to SB Steal'
-    ]
-
-    # Define new column names (will be placed after "BB Fold to BTN Steal")
-    duplicate_names = [
-        '9MAX_BB Fold to SB Steal (Dup)',
-        '6MAX_BB Fold to SB Steal (Dup)',
-        'PKO_BB Fold to SB Steal (Dup)'
-    ]
-
-    for i, source_col in enumerate(source_columns):
-        try:
-            # Find the index of the source column
-            source_idx = headers.index(source_col) if source_col in headers else -1
-
-            if source_idx >= 0:
-                # Get the value from the source column
-                source_value = data[source_idx]
-
-                # Add to duplications
-                duplications['headers'].append(duplicate_names[i])
-                duplications['values'].append(source_value)
-
-                app.logger.debug(f"Duplicated {source_col} as {duplicate_names[i]}: {source_value}")
-            else:
-                app.logger.warning(f"Source column not found: {source_col}")
-
-        except (ValueError, IndexError) as e:
-            app.logger.warning(f"Could not duplicate {source_col}: {e}")
-            continue
-
-    return duplications
-
-def organize_csv_columns(headers, data):
-    """
-    Organize columns in the correct order, inserting duplicated BB Fold columns
-    and calculated VPIP columns in their proper positions.
-    """
-    organized_headers = []
-    organized_data = []
-
-    # Process each file type separately to maintain order
-    file_types = ['9max', '6max', 'pko', 'postflop']
-
-    for file_type in file_types:
-        file_prefix = file_type.upper()
-
-        # Get all columns for this file type
-        file_columns = [(i, h) for i, h in enumerate(headers) if h.startswith(file_prefix + '_')]
-
-        for idx, header in file_columns:
-            organized_headers.append(header)
-            organized_data.append(data[idx])
-
-            # After "BB Fold to BTN Steal", insert duplicated "BB Fold to SB Steal"
-            if header.endswith('BB Fold to BTN Steal') and file_type != 'postflop':
-                # Find the corresponding "BB Fold to SB Steal" column
-                sb_steal_header = f"{file_prefix}_BB Fold to SB Steal"
-                if sb_steal_header in headers:
-                    sb_steal_idx = headers.index(sb_steal_header)
-                    dup_header = f"{file_prefix}_BB Fold to SB Steal (Dup)"
-                    organized_headers.append(dup_header)
-                    organized_data.append(data[sb_steal_idx])
-                    app.logger.debug(f"Inserted {dup_header} after {header}")
-
-            # After certain columns, insert calculated VPIP columns
-            vpip_mappings = {
-                'EP Cold Call': 'EP VPIP',
-                'MP Cold Call': 'MP VPIP', 
-                'CO Cold Call': 'CO VPIP',
-                'BTN Cold Call': 'BTN VPIP'
-            }
-
-            for col_suffix, vpip_suffix in vpip_mappings.items():
-                if header.endswith(col_suffix) and file_type != 'postflop':
-                    # Calculate VPIP value
-                    threbet_header = header.replace('Cold Call', '3Bet')
-                    coldcall_header = header
-
-                    if threbet_header in headers:
-                        threbet_idx = headers.index(threbet_header)
-                        coldcall_idx = headers.index(coldcall_header)
-
-                        try:
-                            threbet_val = float(data[threbet_idx].replace(',', '.')) if data[threbet_idx] and data[threbet_idx] != 'NA' else 0.0
-                            coldcall_val = float(data[coldcall_idx].replace(',', '.')) if data[coldcall_idx] and data[coldcall_idx] != 'NA' else 0.0
-
-                            vpip_val = threbet_val + coldcall_val
-                            vpip_formatted = f"{vpip_val:.2f}".replace('.', ',')
-
-                            vpip_header = f"{file_prefix}_{vpip_suffix}"
-                            organized_headers.append(vpip_header)
-                            organized_data.append(vpip_formatted)
-
-                            app.logger.debug(f"Calculated {vpip_header}: {threbet_val} + {coldcall_val} = {vpip_val}")
-                        except (ValueError, IndexError) as e:
-                            app.logger.warning(f"Could not calculate VPIP for {file_prefix}: {e}")
-
-    return {
-        'headers': organized_headers,
-        'data': organized_data
-    }
-
 def merge_csv_files(files_dict):
     """
     Merges CSV files by taking the second row (line 2) from each file.
     Expected format: files_dict = {'9max': file, '6max': file, 'pko': file, 'postflop': file}
     Returns a dictionary with headers and data for web display.
     """
-    order = ['9max', '6max', 'pko', 'postflop']
-    combined_headers = []
-    combined_data = []
+    from app.utils.csv_merge import merge_tracker_exports
 
     try:
-        for file_type in order:
-            if file_type not in files_dict:
-                app.logger.error(f"Missing file type: {file_type}")
-                continue
-
-            file = files_dict[file_type]
-            app.logger.debug(f"Processing CSV file: {file.filename}")
-
-            # Read file content
-            content = file.read().decode('utf-8')
-
-            # Parse CSV
-            csv_reader = csv.reader(io.StringIO(content))
-            rows = list(csv_reader)
-
-            if len(rows) < 2:
-                app.logger.error(f"File {file.filename} doesn't have enough rows (need at least 2)")
-                continue
-
-            # Get headers (row 1) and data (row 2)
-            headers = rows[0] if len(rows) > 0 else []
-            data_row = rows[1] if len(rows) > 1 else []
-
-            # Add prefix to headers to identify source
-            prefixed_headers = [f"{file_type.upper()}_{header}" for header in headers]
-
-            combined_headers.extend(prefixed_headers)
-            combined_data.extend(data_row)
-
-            app.logger.debug(f"Added {len(data_row)} columns from {file_type}")
-
-        # Organize columns in correct order with VPIP calculations and duplications
-        organized_headers = []
-        organized_data = []
-
-        # Process each file type separately to maintain order
-        file_types = ['9max', '6max', 'pko', 'postflop']
-
-        for file_type in file_types:
-            file_prefix = file_type.upper()
-
-            # Get all columns for this file type in original order
-            file_columns = [(i, h) for i, h in enumerate(combined_headers) if h.startswith(file_prefix + '_')]
-
-            # For PKO, reorganize to put Total Hands first, then UO VPIP stats
-            if file_type == 'pko':
-                # Separate columns by priority
-                total_hands_column = []
-                uo_vpip_columns = []
-                other_columns = []
-
-                for idx, header in file_columns:
-                    if 'Total Hands' in header:
-                        total_hands_column.append((idx, header))
-                    elif any(uo_stat in header for uo_stat in ['Early UO VPIP', 'Middle UO VPIP', 'Cutoff UO VPIP', 'Button UO VPIP']):
-                        uo_vpip_columns.append((idx, header))
-                    else:
-                        other_columns.append((idx, header))
-
-                # Reorder: Total Hands first, then UO VPIP, then others
-                file_columns = total_hands_column + uo_vpip_columns + other_columns
-                app.logger.debug(f"Reordered PKO columns: Total Hands first, then UO VPIP stats")
-
-            for idx, header in file_columns:
-                # Skip certain columns based on file type
-                should_skip = False
-
-                if file_type in ['9max', '6max']:
-                    # For 9max and 6max: exclude only specific UO VPIP stats (not SB UO VPIP)
-                    if any(uo_stat in header for uo_stat in ['Early UO VPIP', 'Middle UO VPIP', 'Cutoff UO VPIP', 'Button UO VPIP']):
-                        should_skip = True
-                        app.logger.debug(f"Skipping {header} for {file_type} report")
-
-                elif file_type == 'pko':
-                    # For PKO: exclude specific RFI/Steal stats but keep all others
-                    if any(rfi_stat in header for rfi_stat in ['Early RFI', 'Middle RFI', 'CO Steal', 'BTN Steal']) and not any(fold_stat in header for fold_stat in ['Fold to', 'Resteal']):
-                        should_skip = True
-                        app.logger.debug(f"Skipping {header} for PKO report")
-
-                if should_skip:
-                    continue
-
-                # Process the value: multiply by 100 (except Total Hands, River Agg, W$WSF Rating) and format
-                value = combined_data[idx]
-                if ('Total Hands' not in header and 
-                    'POSTFLOP_River Agg' not in header and 
-                    'POSTFLOP_W$WSF Rating' not in header):
-                    # Convert to percentage format (multiply by 100, round to 1 decimal)
-                    try:
-                        numeric_value = float(value.replace(',', '.')) if value and value != 'NA' else 0.0
-                        percentage_value = numeric_value * 100
-                        formatted_value = f"{percentage_value:.1f}".replace('.', ',')
-                    except (ValueError, AttributeError):
-                        formatted_value = value  # Keep original if conversion fails
-                else:
-                    formatted_value = value  # Keep Total Hands, River Agg, and W$WSF Rating as-is
-
-                organized_headers.append(header)
-                organized_data.append(formatted_value)
-
-                # After "BB Fold to BTN Steal", insert duplicated "BB Fold to SB Steal"
-                if header.endswith('BB Fold to BTN Steal') and file_type != 'postflop':
-                    # Find the corresponding "BB Fold to SB Steal" column
-                    sb_steal_header = f"{file_prefix}_BB Fold to SB Steal"
-                    if sb_steal_header in combined_headers:
-                        sb_steal_idx = combined_headers.index(sb_steal_header)
-                        dup_header = f"{file_prefix}_BB Fold to SB Steal (Dup)"
-
-                        # Format the duplicated value (multiply by 100, round to 1 decimal)
-                        dup_value = combined_data[sb_steal_idx]
-                        try:
-                            numeric_value = float(dup_value.replace(',', '.')) if dup_value and dup_value != 'NA' else 0.0
-                            percentage_value = numeric_value * 100
-                            formatted_dup_value = f"{percentage_value:.1f}".replace('.', ',')
-                        except (ValueError, AttributeError):
-                            formatted_dup_value = dup_value  # Keep original if conversion fails
-
-                        organized_headers.append(dup_header)
-                        organized_data.append(formatted_dup_value)
-                        app.logger.debug(f"Inserted {dup_header} after {header}")
-
-                # After certain columns, insert calculated VPIP columns
-                vpip_mappings = {
-                    'EP Cold Call': 'EP VPIP',
-                    'MP Cold Call': 'MP VPIP', 
-                    'CO Cold Call': 'CO VPIP',
-                    'BTN Cold Call': 'BTN VPIP'
-                }
-
-                for col_suffix, vpip_suffix in vpip_mappings.items():
-                    if header.endswith(col_suffix) and file_type != 'postflop':
-                        # Calculate VPIP value
-                        threbet_header = header.replace('Cold Call', '3Bet')
-                        coldcall_header = header
-
-                        if threbet_header in combined_headers:
-                            threbet_idx = combined_headers.index(threbet_header)
-                            coldcall_idx = combined_headers.index(coldcall_header)
-
-                            try:
-                                threbet_val = float(combined_data[threbet_idx].replace(',', '.')) if combined_data[threbet_idx] and combined_data[threbet_idx] != 'NA' else 0.0
-                                coldcall_val = float(combined_data[coldcall_idx].replace(',', '.')) if combined_data[coldcall_idx] and combined_data[coldcall_idx] != 'NA' else 0.0
-
-                                vpip_val = threbet_val + coldcall_val
-                                # Convert to percentage format (multiply by 100, round to 1 decimal)
-                                vpip_percentage = vpip_val * 100
-                                vpip_formatted = f"{vpip_percentage:.1f}".replace('.', ',')
-
-                                vpip_header = f"{file_prefix}_{vpip_suffix}"
-                                organized_headers.append(vpip_header)
-                                organized_data.append(vpip_formatted)
-
-                                app.logger.debug(f"Calculated {vpip_header}: {threbet_val} + {coldcall_val} = {vpip_val} ({vpip_percentage:.1f}%)")
-                            except (ValueError, IndexError) as e:
-                                app.logger.warning(f"Could not calculate VPIP for {file_prefix}: {e}")
-
-        app.logger.info(f"Successfully merged CSV files. Result has {len(organized_headers)} columns (including calculated)")
-
-        return {
-            'headers': organized_headers,
-            'data': organized_data
+        streams = {
+            file_type: (file.filename, file.stream)
+            for file_type, file in files_dict.items()
         }
+        return merge_tracker_exports(streams)
 
     except Exception as e:
         app.logger.error(f"Error merging CSV files: {e}")
         raise ValueError(f'Erro ao combinar ficheiros CSV: {str(e)}')
 
-def calculate_vpip_columns(headers, data):
-    """
-    Calculate VPIP columns from 3bet and cold call values.
-    Returns dictionary with new headers and calculated values.
-    """
-    calculations = {
-        'headers': [],
-        'values': []
-    }
-
-    # Define position mappings for each file type
-    position_mappings = [
-        ('9MAX_EP 3Bet', '9MAX_EP Cold Call', '9MAX_EP VPIP'),
-        ('9MAX_MP 3Bet', '9MAX_MP Cold Call', '9MAX_MP VPIP'),
-        ('9MAX_CO 3Bet', '9MAX_CO Cold Call', '9MAX_CO VPIP'),
-        ('9MAX_BTN 3Bet', '9MAX_BTN Cold Call', '9MAX_BTN VPIP'),
-        ('6MAX_EP 3Bet', '6MAX_EP Cold Call', '6MAX_EP VPIP'),
-        ('6MAX_MP 3Bet', '6MAX_MP Cold Call', '6MAX_MP VPIP'),
-        ('6MAX_CO 3Bet', '6MAX_CO Cold Call', '6MAX_CO VPIP'),
-        ('6MAX_BTN 3Bet', '6MAX_BTN Cold Call', '6MAX_BTN VPIP'),
-        ('PKO_EP 3Bet', 'PKO_EP Cold Call', 'PKO_EP VPIP'),
-        ('PKO_MP 3Bet', 'PKO_MP Cold Call', 'PKO_MP VPIP'),
-        ('PKO_CO 3Bet', 'PKO_CO Cold Call', 'PKO_CO VPIP'),
-        ('PKO_BTN 3Bet', 'PKO_BTN Cold Call', 'PKO_BTN VPIP'),
-    ]
-
-    for threbet_col, coldcall_col, vpip_col in position_mappings:
-        try:
-            # Find indices of the required columns
-            threbet_idx = headers.index(threbet_col) if threbet_col in headers else -1
-            coldcall_idx = headers.index(coldcall_col) if coldcall_col in headers else -1
-
-            if threbet_idx >= 0 and coldcall_idx >= 0:
-                # Get values and convert to float
-                threbet_val = float(data[threbet_idx].replace(',', '.')) if data[threbet_idx] else 0.0
-                coldcall_val = float(data[coldcall_idx].replace(',', '.')) if data[coldcall_idx] else 0.0
-
-                # Calculate VPIP (sum of 3bet and cold call)
-                vpip_val = threbet_val + coldcall_val
-
-                # Round to 2 decimal places and format
-                vpip_formatted = f"{vpip_val:.2f}".replace('.', ',')
-
-                calculations['headers'].append(vpip_col)
-                calculations['values'].append(vpip_formatted)
-
-                app.logger.debug(f"Calculated {vpip_col}: {threbet_val} + {coldcall_val} = {vpip_val}")
-
-        except (ValueError, IndexError) as e:
-            app.logger.warning(f"Could not calculate {vpip_col}: {e}")
-            continue
-
-    return calculations
-
 @app.route('/process-room-csv', methods=['POST'])
 def process_room_csv():
     """Handle room CSV processing and return formatted JSON data for web display."""
+    from app.utils.csv_merge import format_room_rows, iter_csv_rows, stream_json_report
+
     try:
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'Nenhum ficheiro enviado'})
@@ -1610,67 +1310,20 @@ def process_room_csv():
 
         app.logger.info(f"Processing room CSV file: {file.filename}")
 
-        # Read file content
-        content = file.read().decode('utf-8')
-
-        # Parse CSV
-        csv_reader = csv.reader(io.StringIO(content))
-        rows = list(csv_reader)
+        # Ler linha a linha a partir do stream do pedido
+        rows = iter_csv_rows(file.stream)
+        headers = next(rows, None)
+        first_row = next(rows, None)
 
-        if len(rows) < 2:
+        if headers is None or first_row is None:
+            rows.close()
             return jsonify({'success': False, 'error': 'Ficheiro CSV deve ter pelo menos 2 linhas (cabeçalho + dados)'})
 
-        headers = rows[0]
-        formatted_data = []
-
-        # Find player column index
-        player_col_idx = None
-        for idx, header in enumerate(headers):
-            if 'player' in header.lower() and 'site' in header.lower():
-                player_col_idx = idx
-                break
-
-        # Process each data row
-        for row_idx in range(1, len(rows)):
-            row = rows[row_idx]
-
-            # Skip rows where player column is empty (usually average/total rows)
-            if player_col_idx is not None and (len(row) <= player_col_idx or not row[player_col_idx] or not row[player_col_idx].strip()):
-                continue
-
-            formatted_row = []
-
-            for col_idx, value in enumerate(row):
-                if col_idx < len(headers):
-                    header = headers[col_idx]
-
-                    # Skip formatting for Count and Total Hands columns
-                    if 'Count' in header or 'Total Hands' in header:
-                        formatted_row.append(value)
-                    else:
-                        # Format other values: multiply by 100, round to 1 decimal
-                        try:
-                            if value and value.strip() and value != 'NA':
-                                numeric_value = float(value.replace(',', '.'))
-                                percentage_value = numeric_value * 100
-                                formatted_value = f"{percentage_value:.1f}".replace('.', ',')
-                                formatted_row.append(formatted_value)
-                            else:
-                                formatted_row.append(value)
-                        except (ValueError, AttributeError):
-                            formatted_row.append(value)  # Keep original if conversion fails
-                else:
-                    formatted_row.append('')
-
-            formatted_data.extend(formatted_row)
-
-        app.logger.info(f"Successfully processed room CSV. Headers: {len(headers)}, Rows: {len(rows)-1}")
-
-        return jsonify({
-            'success': True,
-            'headers': headers,
-            'data': formatted_data
-        })
+        formatted_rows = format_room_rows(headers, itertools.chain([first_row], rows))
+        return Response(
+            stream_with_context(stream_json_report(headers, formatted_rows)),
+            mimetype='application/json'
+        )
 
     except Exception as e:
         app.logger.error(f"Error processing room CSV: {e}")
@@ -1798,6 +1451,14 @@ def merge_csv():
 
 # Note: CHUNKED_UPLOADS is defined at the top of the file
 
+def _optional_int_form(name):
+    """Optional integer form field of /upload-chunk (None when absent or invalid)."""
+    value = request.form.get(name)
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
 @app.route('/upload-chunk', methods=['POST'])
 @login_required
 def upload_chunk():
@@ -1818,49 +1479,36 @@ def upload_chunk():
         except (ValueError, TypeError):
             return jsonify({'success': False, 'error': 'Invalid chunk parameters'}), 400
 
-        # Initialize upload tracking
-        if upload_id not in CHUNKED_UPLOADS:
-            upload_dir = Path(tempfile.mkdtemp(prefix=f"chunked_{upload_id}_"))
-            CHUNKED_UPLOADS[upload_id] = {
-                'upload_dir': upload_dir,
-                'file_name': file_name,
-                'total_chunks': total_chunks,
-                'received_chunks': {},
-                'created_at': time.time(),
-                'user_id': str(current_user.id) if current_user.is_authenticated else None
-            }
-            # Save state after creating new upload
-            save_upload_state()
-
-        upload_info = CHUNKED_UPLOADS[upload_id]
-
-        # Save chunk to disk with better error handling
-        chunk_path = upload_info['upload_dir'] / f"chunk_{chunk_index:06d}"
-        if chunk and hasattr(chunk, 'save'):
-            try:
-                chunk.save(str(chunk_path))
-                upload_info['received_chunks'][chunk_index] = chunk_path
-
-                # Verify chunk was saved correctly
-                if not chunk_path.exists():
-                    app.logger.error(f"Chunk file {chunk_path} was not created")
-                    return jsonify({'success': False, 'error': 'Failed to save chunk file'}), 500
-
-                chunk_size = chunk_path.stat().st_size
-                app.logger.debug(f"Saved chunk {chunk_index + 1}/{total_chunks} for upload {upload_id} (size: {chunk_size} bytes)")
-
-            except Exception as save_error:
-                app.logger.error(f"Error saving chunk {chunk_index}: {save_error}")
-                return jsonify({'success': False, 'error': f'Failed to save chunk: {str(save_error)}'}), 500
-        else:
+        if not hasattr(chunk, 'read'):
             app.logger.error(f"No chunk data received for upload {upload_id}, chunk {chunk_index}")
             return jsonify({'success': False, 'error': 'No chunk data received'}), 400
 
+        # Chunk escrito diretamente no offset final (partilhado entre workers)
+        try:
+            received_chunks = get_chunk_store().put_chunk(
+                upload_id,
+                chunk_index,
+                total_chunks,
+                file_name,
+                chunk.read(),
+                user_id=str(current_user.id) if current_user.is_authenticated else None,
+                offset=_optional_int_form('chunkOffset'),
+                chunk_size=_optional_int_form('chunkSize'),
+                total_size=_optional_int_form('totalSize'),
+            )
+        except ChunkStoreError as chunk_error:
+            return jsonify({'success': False, 'error': str(chunk_error)}), 400
+        except Exception as save_error:
+            app.logger.error(f"Error saving chunk {chunk_index}: {save_error}")
+            return jsonify({'success': False, 'error': f'Failed to save chunk: {str(save_error)}'}), 500
+
+        app.logger.debug(f"Saved chunk {chunk_index + 1}/{total_chunks} for upload {upload_id}")
+
         return jsonify({
             'success': True,
             'chunkIndex': chunk_index,
             'totalChunks': total_chunks,
-            'receivedChunks': len(upload_info['received_chunks'])
+            'receivedChunks': received_chunks
         })
 
     except Exception as e:
@@ -1877,38 +1525,30 @@ def finalize_upload():
         file_name = data.get('fileName')
         total_size = data.get('totalSize')
 
-        if upload_id not in CHUNKED_UPLOADS:
-            app.logger.error(f"Upload {upload_id} not found in tracking")
-            app.logger.debug(f"Available uploads: {list(CHUNKED_UPLOADS.keys())}")
-
-            # Try to load state in case it was lost
-            load_upload_state()
-
-            if upload_id not in CHUNKED_UPLOADS:
-                return jsonify({'success': False, 'error': 'Upload session expired. Please try uploading again.'}), 404
-
-        upload_info = CHUNKED_UPLOADS[upload_id]
-
-        # Check all chunks received
-        if len(upload_info['received_chunks']) != upload_info['total_chunks']:
-            return jsonify({
-                'success': False, 
-                'error': f"Missing chunks: received {len(upload_info['received_chunks'])}/{upload_info['total_chunks']}"
-            }), 400
-
-        # Combine chunks into final file
-        final_file_path = upload_info['upload_dir'] / file_name
-        app.logger.info(f"Combining {upload_info['total_chunks']} chunks into {final_file_path}")
-
-        with open(final_file_path, 'wb') as final_file:
-            for i in range(upload_info['total_chunks']):
-                chunk_path = upload_info['received_chunks'][i]
-                with open(chunk_path, 'rb') as chunk_file:
-                    final_file.write(chunk_file.read())
-                # Clean up chunk file
-                chunk_path.unlink()
+        try:
+            finalized = get_chunk_store().finalize(upload_id, file_name, total_size)
+        except ChunkStoreError as chunk_error:
+            return jsonify({'success': False, 'error': str(chunk_error)}), 400
+
+        if finalized is None:
+            app.logger.error(f"Upload {upload_id} not found in chunk store")
+            return jsonify({'success': False, 'error': 'Upload session expired. Please try uploading again.'}), 404
+
+        CHUNKED_UPLOADS[upload_id] = {
+            'upload_dir': finalized.upload_dir,
+            'file_name': finalized.file_name,
+            'total_chunks': finalized.total_chunks,
+            'received_chunks': {},
+            'created_at': finalized.created_at,
+            'user_id': finalized.user_id,
+        }
+        if finalized.file_hash:
+            # SHA256 calculado à medida que os chunks chegaram
+            CHUNKED_UPLOADS[upload_id]['file_hash'] = finalized.file_hash
+        save_upload_state()
 
-        app.logger.info(f"File reassembled: {final_file_path} ({final_file_path.stat().st_size} bytes)")
+        final_file_path = finalized.file_path
+        app.logger.info(f"File assembled in place: {final_file_path} ({finalized.size} bytes)")
 
         # Now process the file using existing logic
         return process_uploaded_file(final_file_path, upload_id)
@@ -1950,8 +1590,10 @@ def process_uploaded_file(file_path, upload_id):
         try:
             from app.services.file_hash import FileHashService
 
-            file_hash = FileHashService.calculate_hash(file_path)
-            upload_info['file_hash'] = file_hash
+            file_hash = upload_info.get('file_hash')
+            if not file_hash:
+                file_hash = FileHashService.calculate_hash(file_path)
+                upload_info['file_hash'] = file_hash
             app.logger.info(f"Calculated SHA256 for {file_path.name}: {file_hash}")
 
             user_id = upload_info.get('user_id') or (str(current_user.id) if current_user.is_authenticated else None)
@@ -2362,6 +2004,8 @@ init_app()
 @app.route('/api/partition', methods=['POST'])
 def api_partition():
     """Build partitions from enriched hands JSONL file."""
+    from app.partition.runner import build_partitions
+
     data = request.get_json(force=True)
     in_jsonl = data.get("in_jsonl")
     out_dir = data.get("out_dir", "partitions")
@@ -2954,7 +2598,7 @@ def api_pipeline_run_v2():
     Run the full pipeline on an uploaded ZIP file
     Returns a token for accessing results
     """
-    from app.pipeline.runner import run_full_pipeline
+    from app.pipeline.runner import run_full_pipeline, run_owner
     import tempfile
     
     try:
@@ -2968,6 +2612,16 @@ def api_pipeline_run_v2():
         if not file.filename or not file.filename.lower().endswith('.zip'):
             return jsonify({"ok": False, "error": "File must be a ZIP archive"}), 400
         
+        user_id = str(current_user.get_id()) if current_user.is_authenticated else None
+
+        # Optional token of an earlier run to resume from its checkpoints.
+        # Só quem iniciou a run (com sessão) a pode retomar; runs anónimas não.
+        resume_token = request.form.get('token') or None
+        if resume_token and not re.fullmatch(r'[0-9a-f]{12}', resume_token):
+            return jsonify({"ok": False, "error": "Invalid token"}), 400
+        if resume_token and (not user_id or run_owner(resume_token) != user_id):
+            return jsonify({"ok": False, "error": "Cannot resume this token"}), 403
+        
         # Save uploaded file to temp location
         with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp_file:
             file.save(tmp_file.name)
@@ -2975,7 +2629,7 @@ def api_pipeline_run_v2():
         
         try:
             # Run pipeline
-            success, token, error_info = run_full_pipeline(temp_zip_path)
+            success, token, error_info = run_full_pipeline(temp_zip_path, token=resume_token, owner=user_id)
             
             if success:
                 return jsonify({"ok": True, "token": token})
@@ -3041,9 +2695,10 @@ def api_download_result(token):
         if not result_path:
             return jsonify({"error": "Result path missing"}), 404
 
+        from app.services.content_store import download_resolved
         from app.services.storage import get_storage
         storage = get_storage()
-        file_data = storage.download_file(result_path)
+        file_data = download_resolved(storage, result_path)
 
         if file_data:
             app.logger.info(f"Serving result from storage: {result_path} ({len(file_data)} bytes)")
@@ -3923,6 +3578,9 @@ def api_mtt_import():
     Unified MTT import endpoint with safe unzip, network detection,
     tournament classification, and full pipeline execution.
     """
+    from app.partition.runner import build_partitions
+    from app.stats.engine import run_stats
+
     try:
         # Step 1: Receive and validate file
         if 'file' not in request.files:
@@ -4215,6 +3873,22 @@ def download_hands_by_stat_with_format(token, format_name, stat_filename):
             if not re.match(r'^\d{4}-\d{2}$', month):
                 return jsonify({"error": "Invalid month format"}), 400
             storage_paths.append(f"/results/{token}/months/{month}/hands_by_stat/{format_name}/{stat_filename}")
+
+            # Meses publicados como pacote: só os blocos da stat são lidos
+            from app.stats.hand_bundle import BUNDLE_NAME, open_stored_bundle
+            bundle = open_stored_bundle(
+                storage,
+                f"/results/{token}/months/{month}/hands_by_stat/{format_name}/{BUNDLE_NAME}",
+                os.path.join("work", token, "months", month, "hands_by_stat", format_name, BUNDLE_NAME),
+            )
+            stat_name = bundle.stat_for_filename(stat_filename) if bundle else None
+            if stat_name:
+                return send_file(
+                    io.BytesIO(bundle.stat_text(stat_name).encode('utf-8')),
+                    as_attachment=True,
+                    download_name=f"{format_name}_{stat_filename}",
+                    mimetype='text/plain'
+                )
         storage_paths.append(f"/results/{token}/hands_by_stat/{format_name}/{stat_filename}")
 
         file_data = None
@@ -4281,6 +3955,7 @@ def list_hands_by_stat(token):
         
         from app.services.storage import get_storage
         from app.services.result_storage import get_result_storage
+        from app.stats.hand_bundle import BUNDLE_NAME, open_stored_bundle
         from app.stats.hand_collector import HandCollector
 
         storage = get_storage()
@@ -4338,6 +4013,15 @@ def list_hands_by_stat(token):
                     except Exception as local_error:
                         app.logger.debug(f"Metadata read failed for %s: %s", local_path, local_error)
 
+            if not metadata:
+                bundle = open_stored_bundle(
+                    storage,
+                    f"{base_storage_prefix}/{group_key}/{BUNDLE_NAME}",
+                    os.path.join(base_local_dir, group_key, BUNDLE_NAME),
+                )
+                if bundle is not None:
+                    metadata = bundle.metadata()
+
             return metadata or {}
 
         formats_data = {}
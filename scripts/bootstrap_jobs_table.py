@@ -14,7 +14,8 @@ CREATE TABLE IF NOT EXISTS jobs (
     finished_at TIMESTAMPTZ,
     error_message TEXT,
     input_path TEXT NOT NULL,
-    result_path TEXT
+    result_path TEXT,
+    metrics JSONB
 );
 """
 
@@ -23,6 +24,7 @@ CREATE_INDEX_STATUS_CREATED_SQL = (
 )
 CREATE_INDEX_UPLOAD_SQL = "CREATE INDEX IF NOT EXISTS idx_jobs_upload ON jobs (upload_id);"
 CREATE_INDEX_USER_SQL = "CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user_id);"
+ADD_METRICS_COLUMN_SQL = "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS metrics JSONB;"
 
 
 def get_connection():
@@ -41,6 +43,7 @@ def ensure_jobs_table():
                 cur.execute(CREATE_INDEX_STATUS_CREATED_SQL)
                 cur.execute(CREATE_INDEX_UPLOAD_SQL)
                 cur.execute(CREATE_INDEX_USER_SQL)
+                cur.execute(ADD_METRICS_COLUMN_SQL)
         print("jobs table ensured.")
     finally:
         conn.close()
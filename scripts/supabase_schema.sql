@@ -77,6 +77,9 @@ CREATE INDEX IF NOT EXISTS idx_poker_stats_stat_name ON poker_stats_detail(stat_
 CREATE INDEX IF NOT EXISTS idx_poker_stats_token_month ON poker_stats_detail(token, month) WHERE month IS NOT NULL;
 -- Standalone month index for month-focused analytics
 CREATE INDEX IF NOT EXISTS idx_poker_stats_month ON poker_stats_detail(month) WHERE month IS NOT NULL;
+-- Natural key used by the stats writer to upsert idempotently (NULL month/site collide too)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_poker_stats_detail_natural
+    ON poker_stats_detail(token, month, site, table_format, stat_name) NULLS NOT DISTINCT;
 
 -- Comentários para documentação
 COMMENT ON TABLE processing_history IS 'Histórico de todos os processamentos de arquivos de poker';
@@ -0,0 +1,139 @@
+import json
+import threading
+
+import pytest
+
+from app.services import artifact_publisher
+from app.services.artifact_publisher import ArtifactPublishError, ArtifactPublisher
+from app.services.storage import StorageService
+
+
+class _RecordingStorage:
+    def __init__(self, delay=0.0, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.uploads = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def upload_file_stream(self, stream, path, content_type):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            threading.Event().wait(self.delay)
+            with self.lock:
+                if self.failures.get(path, 0) > 0:
+                    self.failures[path] -= 1
+                    raise Exception("Supabase stream upload returned False")
+            self.uploads[path] = (stream.read(), content_type)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def upload_file(self, data, path, content_type):
+        self.uploads[path] = (data, content_type)
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr("app.utils.supabase_retry.time.sleep", lambda _: None)
+
+
+def _make_results(tmp_path):
+    (tmp_path / "pipeline_result.json").write_text('{"ok": true}')
+    hands = tmp_path / "hands_by_stat" / "nonko_9max"
+    hands.mkdir(parents=True)
+    for index in range(12):
+        (hands / f"stat_{index}.txt").write_text(f"hand {index}")
+    return tmp_path
+
+
+def test_uploads_in_parallel_and_writes_manifest_last(tmp_path):
+    work = _make_results(tmp_path)
+    storage = _RecordingStorage(delay=0.02)
+    progress = []
+    publisher = ArtifactPublisher(
+        storage, "tok", "/results/tok", max_workers=4,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+
+    assert publisher.add_file(str(work / "pipeline_result.json"), "/results/tok/pipeline_result.json")
+    assert not publisher.add_file(str(work / "missing.json"), "/results/tok/missing.json")
+    assert publisher.add_directory(str(work / "hands_by_stat"), "/results/tok/hands_by_stat") == 12
+
+    report = publisher.publish()
+
+    assert report.uploaded == 13 and not report.failed
+    assert 1 < storage.max_in_flight <= 4
+    assert storage.uploads["/results/tok/hands_by_stat/nonko_9max/stat_3.txt"] == (b"hand 3", "text/plain")
+    assert storage.uploads["/results/tok/pipeline_result.json"][1] == "application/json"
+    manifest = json.loads(storage.uploads["/results/tok/publish_manifest.json"][0])
+    assert manifest["files"] == 13
+    assert {a["key"] for a in manifest["artifacts"]} == set(storage.uploads) - {"/results/tok/publish_manifest.json"}
+    assert set(report.published_keys) == {a["key"] for a in manifest["artifacts"]}
+    assert progress[-1] == (13, 13)
+
+
+def test_failed_file_is_retried_on_its_own(tmp_path):
+    work = _make_results(tmp_path)
+    flaky = "/results/tok/hands_by_stat/nonko_9max/stat_5.txt"
+    storage = _RecordingStorage(failures={flaky: 2})
+    publisher = ArtifactPublisher(storage, "tok", "/results/tok", max_attempts=3)
+    publisher.add_directory(str(work / "hands_by_stat"), "/results/tok/hands_by_stat")
+
+    report = publisher.publish()
+
+    assert report.uploaded == 12
+    # o ficheiro é reaberto em cada tentativa
+    assert storage.uploads[flaky][0] == b"hand 5"
+
+
+def test_partial_publish_raises_without_manifest(tmp_path):
+    work = _make_results(tmp_path)
+    broken = "/results/tok/pipeline_result.json"
+    storage = _RecordingStorage(failures={broken: 10})
+    publisher = ArtifactPublisher(storage, "tok", "/results/tok", max_attempts=2)
+    publisher.add_file(str(work / "pipeline_result.json"), broken)
+    publisher.add_directory(str(work / "hands_by_stat"), "/results/tok/hands_by_stat")
+
+    with pytest.raises(ArtifactPublishError, match="1/13"):
+        publisher.publish()
+
+    assert "/results/tok/publish_manifest.json" not in storage.uploads
+    assert len(storage.uploads) == 12
+
+    report = ArtifactPublisher(storage, "tok", "/results/tok", max_attempts=1)
+    report.add_file(str(work / "pipeline_result.json"), broken)
+    partial = report.publish(raise_on_error=False)
+    assert partial.failed.keys() == {broken} and partial.published_keys == []
+
+
+def test_local_storage_round_trip(tmp_path, monkeypatch):
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    (tmp_path / "work").mkdir()
+    work = _make_results(tmp_path / "work")
+    storage = StorageService(local_base_dir=str(tmp_path / "storage"))
+    publisher = ArtifactPublisher(storage, "tok", "/results/tok")
+    publisher.add_directory(str(work / "hands_by_stat"), "/results/tok/hands_by_stat")
+
+    publisher.publish()
+
+    assert storage.download_file("/results/tok/hands_by_stat/nonko_9max/stat_0.txt") == b"hand 0"
+    assert json.loads(storage.download_file("/results/tok/publish_manifest.json"))["files"] == 12
+    assert artifact_publisher.MANIFEST_NAME == "publish_manifest.json"
+
+
+def test_only_name_keeps_just_the_bundles(tmp_path):
+    work = _make_results(tmp_path)
+    (work / "hands_by_stat" / "nonko_9max" / "hands.bundle").write_bytes(b"HBDL")
+    publisher = ArtifactPublisher(_RecordingStorage(), "tok", "/results/tok")
+
+    queued = publisher.add_directory(
+        str(work / "hands_by_stat"), "/results/tok/months/2024-01/hands_by_stat",
+        content_type="application/octet-stream", only_name="hands.bundle",
+    )
+
+    assert queued == 1
+    assert publisher.artifacts[0].storage_key.endswith("/nonko_9max/hands.bundle")
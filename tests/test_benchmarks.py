@@ -0,0 +1,123 @@
+import logging
+
+import pytest
+
+from app.classify.hand_by_hand_classifier import classify_hands_individually
+from app.parse.site_parsers.site_detector import detect_poker_site, is_tournament_summary
+from app.pipeline.runner import safe_extract_archive
+from benchmarks.corpus import month_range, package_corpus, write_corpus
+from benchmarks.importtime import direct_imports, format_importtime, measure_imports, parse_importtime
+from benchmarks.suite import STAGES, compare, run_suite
+from benchmarks.synthetic_hands import SITES, generate_site_files, generate_tournament
+
+DETECTED = {"pokerstars": "pokerstars", "gg": "ggpoker", "winamax": "winamax",
+            "888": "888poker", "888.pt": "888.pt", "wpn": "wpn"}
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_generation_is_deterministic():
+    first = generate_site_files("gg", 40, seed=5, hands_per_file=15)
+    again = generate_site_files("gg", 40, seed=5, hands_per_file=15)
+
+    assert [f.text for f in first] == [f.text for f in again]
+    assert [f.hands for f in first] == [15, 15, 10]
+    assert generate_tournament("gg", 5, seed=6).text != generate_tournament("gg", 5, seed=5).text
+
+
+@pytest.mark.parametrize("site", SITES)
+def test_every_hand_is_classified(site):
+    for synthetic in generate_site_files(site, 60, seed=1, hands_per_file=30):
+        classified, discards = classify_hands_individually(synthetic.text, synthetic.filename)
+
+        assert detect_poker_site(synthetic.text, synthetic.filename) == DETECTED[site]
+        assert len(classified) == synthetic.hands
+        groups = {hand["group"] for hand in classified}
+        assert groups == {"pko"} if synthetic.kind == "pko" else groups <= {"nonko_6max", "nonko_9max"}
+
+
+def test_suite_reports_every_stage(tmp_path):
+    report = run_suite(hands_per_site=20, sites=["pokerstars", "888.pt"], work_dir=str(tmp_path))
+
+    assert list(report["stages"]) == list(STAGES)
+    assert report["stages"]["split"]["hands"] == 40
+    assert report["stages"]["serialize"]["bytes"] > 0
+    assert report["by_site"]["888.pt"]["preflop"]["hands_per_second"] > 0
+    assert compare(report, report) == []
+
+
+def test_compare_flags_slower_stages():
+    baseline = {"stages": {"preflop": {"hands_per_second": 1000, "peak_rss_mb": 100}}}
+    report = {"stages": {"preflop": {"hands_per_second": 700, "peak_rss_mb": 110}}}
+
+    regressions = compare(report, baseline, tolerance=0.2)
+
+    assert len(regressions) == 1 and regressions[0].startswith("preflop: 700 hands/s")
+    assert compare(report, baseline, tolerance=0.35) == []
+
+
+def test_corpus_spreads_months_and_packs_nested_archives(tmp_path):
+    manifest = write_corpus(str(tmp_path / "corpus"), 600, sites=["pokerstars", "888.pt"], seed=3,
+                            months=month_range("2025-11", 3), hands_per_file=40)
+
+    assert manifest["tournament_hands"] == 600 and manifest["cash_hands"] == 30
+    assert manifest["by_site"] == {"pokerstars": 300, "888.pt": 300}
+    assert set(manifest["by_month"]) <= {"2025-11", "2025-12", "2026-01"} and len(manifest["by_month"]) > 1
+    assert manifest["summaries"] > 0
+
+    archive = package_corpus(str(tmp_path / "corpus"), str(tmp_path / "upload.zip"))
+    extracted = tmp_path / "extracted"
+    extracted.mkdir()
+    assert safe_extract_archive(archive, str(extracted)) == manifest["files"]
+
+    kept = dropped = 0
+    for path in extracted.iterdir():
+        text = path.read_text(encoding="utf-8")
+        if is_tournament_summary(text, path.name):
+            continue
+        classified, discards = classify_hands_individually(text, path.name)
+        kept += len(classified)
+        dropped += discards["cash_game"] + discards["mystery"]
+    assert kept == manifest["tournament_hands"] - manifest["by_kind"].get("mystery", 0)
+    assert dropped == manifest["cash_hands"] + manifest["by_kind"].get("mystery", 0)
+
+
+def test_rar_needs_the_rar_program(tmp_path, monkeypatch):
+    write_corpus(str(tmp_path / "corpus"), 10, sites=["wpn"], cash_share=0, summaries=False)
+    monkeypatch.setattr("benchmarks.corpus.shutil.which", lambda _: None)
+
+    with pytest.raises(RuntimeError, match="rar"):
+        package_corpus(str(tmp_path / "corpus"), str(tmp_path / "upload.zip"), inner_format="rar")
+
+
+def test_importtime_report_parses_the_import_tree():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | _startup",
+        "import time:        20 |         20 |     json.scanner",
+        "import time:       300 |        320 |   json.decoder",
+        "import time:        50 |         50 |   json.encoder",
+        "import time:       400 |        770 | json",
+    ])
+
+    entries = parse_importtime(stderr)
+
+    assert [(e.name, e.depth) for e in entries] == [
+        ("_startup", 0), ("json.scanner", 2), ("json.decoder", 1), ("json.encoder", 1), ("json", 0)]
+    assert [e.name for e in direct_imports(entries, "json")] == ["json.decoder", "json.encoder"]
+
+
+def test_importtime_measures_a_fresh_interpreter():
+    report = measure_imports("json", top=3)
+
+    assert report["completed"] and report["error"] is None
+    assert report["total_seconds"] > 0 and report["modules"] >= 1
+    assert "import json" in format_importtime(report)
+
+    failed = measure_imports("benchmarks_no_such_module")
+    assert not failed["completed"] and "ModuleNotFoundError" in failed["error"]
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.chunk_store import ChunkStore, ChunkStoreError
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_out_of_order_chunks_finalize_in_place_with_incremental_hash(tmp_path):
+    store = ChunkStore(tmp_path)
+    data = os.urandom(10_000)
+    chunks = _chunks(data, 1024)
+    order = list(range(len(chunks)))
+    random.Random(3).shuffle(order)
+    # o último chunk chega primeiro e fica estacionado
+    order.remove(len(chunks) - 1)
+    order.insert(0, len(chunks) - 1)
+
+    for index in order:
+        store.put_chunk("up-1", index, len(chunks), "hands.zip", chunks[index], user_id="u1")
+
+    finalized = store.finalize("up-1", "hands.zip", len(data))
+
+    assert finalized.file_path == tmp_path / "up-1" / "hands.zip"
+    assert finalized.file_path.read_bytes() == data
+    assert finalized.file_hash == hashlib.sha256(data).hexdigest()
+    assert finalized.user_id == "u1"
+    assert not list((tmp_path / "up-1").glob("*.pending"))
+
+
+def test_parallel_intake_with_explicit_offsets(tmp_path):
+    store = ChunkStore(tmp_path)
+    data = os.urandom(64 * 1000 + 17)
+    chunks = _chunks(data, 1000)
+
+    def send(index):
+        return store.put_chunk(
+            "up-2", index, len(chunks), "big.zip", chunks[index],
+            chunk_size=1000, total_size=len(data),
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(send, range(len(chunks))))
+
+    finalized = store.finalize("up-2", "big.zip")
+
+    assert finalized.file_path.read_bytes() == data
+    assert finalized.file_hash == hashlib.sha256(data).hexdigest()
+
+
+def test_chunks_from_another_worker_defer_hash_to_caller(tmp_path):
+    creator = ChunkStore(tmp_path)
+    other = ChunkStore(tmp_path)
+    data = b"a" * 300
+
+    creator.put_chunk("up-3", 0, 3, "f.zip", data[:100])
+    other.put_chunk("up-3", 1, 3, "f.zip", data[100:200])
+    other.put_chunk("up-3", 2, 3, "f.zip", data[200:])
+
+    # finalize noutro worker: sem hash incremental
+    finalized = other.finalize("up-3")
+
+    assert finalized.file_path.read_bytes() == data
+    assert finalized.file_hash is None
+
+
+def test_missing_chunks_and_unknown_uploads(tmp_path):
+    store = ChunkStore(tmp_path)
+    store.put_chunk("up-4", 0, 2, "f.zip", b"x" * 10)
+
+    with pytest.raises(ChunkStoreError, match="received 1/2"):
+        store.finalize("up-4")
+    assert store.finalize("nope") is None
+    with pytest.raises(ChunkStoreError):
+        store.put_chunk("../evil", 0, 1, "f.zip", b"x")
+
+
+def test_finalize_race_returns_the_finalized_upload(tmp_path):
+    first = ChunkStore(tmp_path)
+    second = ChunkStore(tmp_path)
+    data = b"z" * 50
+    first.put_chunk("up-5", 0, 1, "f.zip", data)
+    done = first.finalize("up-5")
+
+    # o outro worker leu o estado antes do rename do primeiro
+    conn = second._get_connection()
+    conn.execute("UPDATE uploads SET status = 'receiving' WHERE upload_id = 'up-5'")
+    conn.commit()
+    again = second.finalize("up-5")
+
+    assert again.file_path == done.file_path and again.file_path.read_bytes() == data
+    assert again.file_hash == done.file_hash == hashlib.sha256(data).hexdigest()
+    assert second.finalize("up-5").file_path == done.file_path
+
+
+def test_purge_removes_old_uploads_finalized_or_not(tmp_path):
+    store = ChunkStore(tmp_path)
+    store.put_chunk("old-open", 0, 2, "f.zip", b"x")
+    store.put_chunk("old-done", 0, 1, "f.zip", b"y")
+    store.finalize("old-done")
+    (tmp_path / "old-done" / "out").mkdir()
+    store.put_chunk("fresh", 0, 1, "f.zip", b"z")
+    conn = store._get_connection()
+    conn.execute("UPDATE uploads SET created_at = 0 WHERE upload_id LIKE 'old-%'")
+    conn.commit()
+    orphan = tmp_path / "orphan"
+    orphan.mkdir()
+    os.utime(orphan, (0, 0))
+
+    assert store.purge_expired(max_age_hours=24) == 3
+
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == ["fresh"]
+    assert store.finalize("old-done") is None
+    assert store.finalize("fresh").file_path.read_bytes() == b"z"
@@ -0,0 +1,127 @@
+import json
+
+from app.services import result_storage
+from app.services.artifact_publisher import ArtifactPublisher
+from app.services.content_store import (
+    content_digest,
+    download_resolved,
+    pointer_target,
+    serialize_json,
+    write_json_copies,
+)
+from app.services.result_storage import ResultStorageService
+from app.services.storage import StorageService
+
+PAYLOAD = {"total_hands": 10, "valid_hands": 8, "combined": {"nonko_9max": {"hand_count": 8}}}
+
+
+def _local_storage(tmp_path, monkeypatch):
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    return StorageService(local_base_dir=str(tmp_path / "storage"))
+
+
+def test_copies_share_one_serialization(tmp_path):
+    paths = [tmp_path / "a.json", tmp_path / "sub" / "b.json"]
+
+    digest = write_json_copies(PAYLOAD, paths)
+
+    assert paths[0].read_bytes() == paths[1].read_bytes() == serialize_json(PAYLOAD)
+    assert json.loads(paths[1].read_text()) == PAYLOAD
+    assert digest == content_digest(serialize_json(PAYLOAD))
+
+
+def test_identical_results_upload_one_blob(tmp_path, monkeypatch):
+    storage = _local_storage(tmp_path, monkeypatch)
+    work = tmp_path / "work"
+    names = ["pipeline_result_global.json", "pipeline_result_GLOBAL.json", "pipeline_result.json"]
+    write_json_copies(PAYLOAD, [work / name for name in names])
+    write_json_copies({"month": "2024-01"}, [work / "pipeline_result_2024-01.json"])
+
+    publisher = ArtifactPublisher(storage, "abcdef123456", "/results/abcdef123456")
+    for name in names + ["pipeline_result_2024-01.json"]:
+        assert publisher.add_content_addressed(str(work / name), f"/results/abcdef123456/{name}")
+    report = publisher.publish()
+
+    blobs = list((tmp_path / "storage" / "results" / "abcdef123456" / "blobs").iterdir())
+    assert len(blobs) == 2
+    assert report.uploaded == 6
+    pointer = storage.download_file("/results/abcdef123456/pipeline_result_GLOBAL.json")
+    assert pointer_target(pointer).startswith("/results/abcdef123456/blobs/")
+    assert json.loads(download_resolved(storage, "/results/abcdef123456/pipeline_result.json")) == PAYLOAD
+
+
+def test_result_storage_follows_pointers(tmp_path, monkeypatch):
+    storage = _local_storage(tmp_path, monkeypatch)
+    work = tmp_path / "work"
+    write_json_copies(PAYLOAD, [work / "pipeline_result_global.json"])
+    publisher = ArtifactPublisher(storage, "abcdef123456", "/results/abcdef123456")
+    publisher.add_content_addressed(
+        str(work / "pipeline_result_global.json"), "/results/abcdef123456/pipeline_result_global.json"
+    )
+    publisher.publish()
+
+    monkeypatch.setattr(result_storage, "get_storage", lambda: storage)
+    service = ResultStorageService()
+    service.local_work_dir = tmp_path / "missing"
+
+    assert service._read_json_from_storage("/results/abcdef123456/pipeline_result_global.json") == PAYLOAD
+
+
+def test_pointer_is_not_uploaded_when_its_blob_fails(tmp_path, monkeypatch):
+    storage = _local_storage(tmp_path, monkeypatch)
+    write_json_copies(PAYLOAD, [tmp_path / "pipeline_result.json"])
+    original = storage.upload_file_stream
+
+    def failing_blobs(stream, path, content_type):
+        if "/blobs/" in path:
+            raise Exception("upload returned False")
+        return original(stream, path, content_type)
+
+    monkeypatch.setattr(storage, "upload_file_stream", failing_blobs)
+    monkeypatch.setattr("app.utils.supabase_retry.time.sleep", lambda _: None)
+    publisher = ArtifactPublisher(storage, "tok", "/results/tok", max_attempts=1)
+    publisher.add_content_addressed(str(tmp_path / "pipeline_result.json"), "/results/tok/pipeline_result.json")
+
+    report = publisher.publish(raise_on_error=False)
+
+    assert "/results/tok/pipeline_result.json" in report.failed
+    assert storage.download_file("/results/tok/pipeline_result.json") is None
+
+
+def test_regular_json_is_not_a_pointer():
+    assert pointer_target(serialize_json(PAYLOAD)) is None
+    assert pointer_target(b'{"$blob": "/etc/passwd"}') is None
+
+
+class _CloudView:
+    """Local storage reported as cloud, so the master upload runs."""
+
+    use_cloud = True
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+
+def test_master_results_replace_old_blobs(tmp_path, monkeypatch):
+    from app.services import master_result_builder
+
+    storage = _local_storage(tmp_path, monkeypatch)
+    output = tmp_path / "by_user"
+    write_json_copies(PAYLOAD, [output / "pipeline_result.json", output / "pipeline_result_global.json"])
+    old = ArtifactPublisher(storage, "user-u1", "/results/by_user/u1")
+    for name in ("pipeline_result.json", "pipeline_result_global.json"):
+        old.add_content_addressed(str(output / name), f"/results/by_user/u1/{name}")
+    old.publish()
+    blobs_dir = tmp_path / "storage" / "results" / "by_user" / "u1" / "blobs"
+    assert len(list(blobs_dir.iterdir())) == 1
+
+    monkeypatch.setattr(master_result_builder, "get_storage", lambda: _CloudView(storage))
+    master_result_builder._upload_user_results_to_storage(output, "u1")
+
+    assert list(blobs_dir.iterdir()) == []
+    assert json.loads(storage.download_file("/results/by_user/u1/pipeline_result.json")) == PAYLOAD
+    manifest = json.loads(storage.download_file("/results/by_user/u1/publish_manifest.json"))
+    assert not any("alias_of" in artifact for artifact in manifest["artifacts"])
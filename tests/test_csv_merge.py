@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+
+from app.utils import csv_merge
+from app.utils.csv_merge import (
+    format_room_rows,
+    iter_csv_rows,
+    merge_tracker_exports,
+    stream_json_report,
+)
+
+
+def _csv_stream(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return io.BytesIO(buffer.getvalue().encode("utf-8"))
+
+
+def test_merge_keeps_order_duplicates_and_vpip():
+    streams = {
+        "9max": ("a.csv", _csv_stream([
+            ["Total Hands", "Early UO VPIP", "BB Fold to BTN Steal", "BB Fold to SB Steal", "EP Cold Call", "EP 3Bet"],
+            ["1200", "0.2", "0.5", "0,4", "0.1", "0.05"],
+            ["ignored", "rows", "after", "line", "two", "x"],
+        ])),
+        "pko": ("b.csv", _csv_stream([
+            ["BTN Steal", "Early UO VPIP", "Total Hands", "BTN Resteal"],
+            ["0.3", "0.25", "800", "NA"],
+        ])),
+        "postflop": ("c.csv", _csv_stream([
+            ["River Agg", "Flop CBet"],
+            ["2.5", ""],
+        ])),
+    }
+
+    result = merge_tracker_exports(streams)
+
+    assert result["headers"] == [
+        "9MAX_Total Hands",
+        "9MAX_BB Fold to BTN Steal",
+        "9MAX_BB Fold to SB Steal (Dup)",
+        "9MAX_BB Fold to SB Steal",
+        "9MAX_EP Cold Call",
+        "9MAX_EP VPIP",
+        "9MAX_EP 3Bet",
+        "PKO_Total Hands",
+        "PKO_Early UO VPIP",
+        "PKO_BTN Resteal",
+        "POSTFLOP_River Agg",
+        "POSTFLOP_Flop CBet",
+    ]
+    assert result["data"] == [
+        "1200", "50,0", "40,0", "40,0", "10,0", "15,0", "5,0",
+        "800", "25,0", "0,0",
+        "2.5", "0,0",
+    ]
+
+
+def test_merge_drops_vpip_that_cannot_be_computed():
+    streams = {
+        "6max": ("a.csv", _csv_stream([["CO Cold Call", "CO 3Bet"], ["abc", "0.1"]])),
+    }
+
+    result = merge_tracker_exports(streams)
+
+    assert result["headers"] == ["6MAX_CO Cold Call", "6MAX_CO 3Bet"]
+    assert result["data"] == ["abc", "10,0"]
+
+
+def test_room_rows_are_formatted_and_streamed(monkeypatch):
+    monkeypatch.setattr(csv_merge, "RESPONSE_CHUNK_VALUES", 3)
+    rows = iter_csv_rows(_csv_stream([
+        ["Player/Site", "Count", "VPIP"],
+        ["hero", "10", "0.215"],
+        ["", "99", "0.5"],
+        ["villain", "5", "NA", "extra"],
+    ]))
+    headers = next(rows)
+
+    chunks = list(stream_json_report(headers, format_room_rows(headers, rows)))
+
+    assert len(chunks) > 3
+    body = json.loads("".join(chunks))
+    assert body == {
+        "success": True,
+        "headers": ["Player/Site", "Count", "VPIP"],
+        "data": ["hero", "10", "21,5", "villain", "5", "NA", ""],
+    }
+
+
+def test_room_stream_reports_errors_as_valid_json():
+    def failing_rows():
+        yield ["a"]
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    body = json.loads("".join(stream_json_report(["x"], failing_rows())))
+
+    assert body["success"] is False
+    assert "invalid start byte" in body["error"]
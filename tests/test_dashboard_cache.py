@@ -0,0 +1,85 @@
+import threading
+
+from app.services import dashboard_cache_service as cache_module
+from app.services import user_main_dashboard_service as service
+
+
+class _FakeCache:
+    def __init__(self, stamp):
+        self.stamp = stamp
+
+    def current_stamp(self, user_id):
+        return self.stamp
+
+
+class _FakeStorage:
+    def __init__(self, cached=None):
+        self.months = dict(cached or {})
+        self.saved = []
+
+    def load_month_dashboard_payload(self, user_id, month):
+        return self.months.get(month)
+
+    def save_month_dashboard_payload(self, user_id, month, payload):
+        self.saved.append(month)
+        self.months[month] = payload
+
+
+def _patch_builder(monkeypatch, builds):
+    def fake_build(user_id, month, use_cache=False, result_storage=None):
+        builds.append(month)
+        return {"meta": {"month": month}, "groups": {}, "version": len(builds)}
+
+    monkeypatch.setattr(service, "build_user_month_dashboard_payload", fake_build)
+
+
+def test_fresh_month_payload_is_served_from_cache(monkeypatch):
+    builds = []
+    _patch_builder(monkeypatch, builds)
+    storage = _FakeStorage({"2025-01": {"meta": {"cache_generation": "3:x"}, "cached": True}})
+
+    payload = service.get_or_build_month_dashboard_payload(
+        "u1", "2025-01", result_storage=storage, cache_service=_FakeCache("3:x")
+    )
+
+    assert payload["cached"] is True
+    assert builds == []
+
+
+def test_stale_month_payload_is_served_and_refreshed(monkeypatch):
+    builds = []
+    _patch_builder(monkeypatch, builds)
+    storage = _FakeStorage({"2025-01": {"meta": {"cache_generation": "2:x"}, "cached": True}})
+
+    refreshed = threading.Event()
+    original = cache_module.refresh_in_background
+
+    def tracking_refresh(key, rebuild):
+        def _wrapped():
+            rebuild()
+            refreshed.set()
+        return original(key, _wrapped)
+
+    monkeypatch.setattr(service, "refresh_in_background", tracking_refresh)
+
+    payload = service.get_or_build_month_dashboard_payload(
+        "u1", "2025-01", result_storage=storage, cache_service=_FakeCache("3:x")
+    )
+
+    assert payload["cached"] is True
+    assert refreshed.wait(5)
+    assert builds == ["2025-01"]
+    assert storage.months["2025-01"]["meta"]["cache_generation"] == "3:x"
+
+
+def test_missing_generation_always_rebuilds(monkeypatch):
+    builds = []
+    _patch_builder(monkeypatch, builds)
+    storage = _FakeStorage({"2025-01": {"meta": {"cache_generation": "3:x"}, "cached": True}})
+
+    payload = service.get_or_build_month_dashboard_payload(
+        "u1", "2025-01", result_storage=storage, cache_service=_FakeCache(None)
+    )
+
+    assert builds == ["2025-01"]
+    assert "cache_generation" not in payload["meta"]
@@ -0,0 +1,99 @@
+"""
+Tests for chunked parallel enrichment in app.derive.runner.
+"""
+import json
+
+import app.derive.runner as derive_runner
+from app.derive.runner import enrich_hands, _split_byte_ranges
+
+
+def _make_hand(i):
+    return {
+        'site': 'pokerstars',
+        'file_id': f'test_{i}.txt',
+        'hand_id': f'H{i}',
+        'tournament_id': '123',
+        'button_seat': 3,
+        'hero': 'Hero',
+        'table_max': 6,
+        'blinds': {'sb': 10, 'bb': 20},
+        'players': [
+            {'seat': 1, 'name': 'UTG', 'stack_chips': 1000 + i},
+            {'seat': 2, 'name': 'MP', 'stack_chips': 1500},
+            {'seat': 3, 'name': 'Hero', 'stack_chips': 2000},
+            {'seat': 4, 'name': 'SB', 'stack_chips': 1000},
+            {'seat': 5, 'name': 'BB', 'stack_chips': 800}
+        ],
+        'streets': {
+            'preflop': {
+                'actions': [
+                    {'type': 'POST_SB', 'actor': 'SB', 'amount': 10},
+                    {'type': 'POST_BB', 'actor': 'BB', 'amount': 20},
+                    {'type': 'FOLD', 'actor': 'UTG'},
+                    {'type': 'FOLD', 'actor': 'MP'},
+                    {'type': 'RAISE', 'actor': 'Hero', 'amount': 40 + i},
+                    {'type': 'FOLD', 'actor': 'SB'},
+                    {'type': 'CALL', 'actor': 'BB', 'amount': 20 + i}
+                ]
+            },
+            'flop': {'actions': [{'type': 'CHECK', 'actor': 'BB'}]},
+            'turn': {'actions': []},
+            'river': {'actions': []}
+        }
+    }
+
+
+def _write_input(path, n_hands, bad_line=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n_hands):
+            if i == bad_line:
+                f.write('{not json\n')
+            f.write(json.dumps(_make_hand(i)) + '\n')
+
+
+def test_split_byte_ranges_align_to_lines(tmp_path):
+    p = tmp_path / 'hands.jsonl'
+    _write_input(p, 10)
+    size = p.stat().st_size
+    ranges = _split_byte_ranges(str(p), size, 4)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == size
+    data = p.read_bytes()
+    for start, end in ranges:
+        assert start == 0 or data[start - 1:start] == b'\n'
+        assert start < end
+
+
+def test_parallel_matches_serial(tmp_path, monkeypatch):
+    in_file = tmp_path / 'hands.jsonl'
+    _write_input(in_file, 30, bad_line=17)
+
+    serial_dir = tmp_path / 'serial'
+    parallel_dir = tmp_path / 'parallel'
+    serial = enrich_hands(str(in_file), str(serial_dir / 'out.jsonl'), force=True, workers=1)
+
+    # Force several small chunks across two workers
+    monkeypatch.setattr(derive_runner, 'PARALLEL_MIN_BYTES', 2000)
+    parallel = enrich_hands(str(in_file), str(parallel_dir / 'out.jsonl'), force=True, workers=2)
+
+    assert serial['hands'] == parallel['hands'] == 30
+    assert (serial_dir / 'out.jsonl').read_text() == (parallel_dir / 'out.jsonl').read_text()
+    assert not (parallel_dir / 'out.jsonl.parts').exists()
+
+    serial_stats = json.loads((serial_dir / 'derive_stats.json').read_text())
+    parallel_stats = json.loads((parallel_dir / 'derive_stats.json').read_text())
+    assert serial_stats == parallel_stats
+    assert [e['line'] for e in parallel_stats['errors']] == [18]
+
+
+def test_parallel_is_opt_in(monkeypatch):
+    big = 10 * derive_runner.PARALLEL_MIN_BYTES
+    monkeypatch.delenv('DERIVE_WORKERS', raising=False)
+    assert derive_runner._resolve_workers(None, big) == 1
+
+    monkeypatch.setenv('DERIVE_WORKERS', '3')
+    assert derive_runner._resolve_workers(None, big) == 3
+    assert derive_runner._resolve_workers(2, big) == 2
+    # abaixo do limiar continua serial, mesmo pedindo workers
+    assert derive_runner._resolve_workers(4, derive_runner.PARALLEL_MIN_BYTES - 1) == 1
@@ -0,0 +1,153 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.auth import decorators
+from app.auth.decorators import email_confirmation_required, invalidate_session_verification
+
+
+class _FakeSupabase:
+    def __init__(self, confirmed=True):
+        self.confirmed = confirmed
+        self.calls = 0
+        self.jwts = []
+        self.revoked = set()
+        self.called = threading.Event()
+
+    def get_user(self, jwt=None):
+        self.calls += 1
+        self.jwts.append(jwt)
+        self.called.set()
+        if jwt in self.revoked:
+            raise RuntimeError("invalid JWT")
+        return SimpleNamespace(user=SimpleNamespace(
+            id="u1",
+            email="hero@example.com",
+            email_confirmed_at="2024-01-01" if self.confirmed else None,
+        ))
+
+
+@pytest.fixture
+def app(monkeypatch):
+    for name in ("REPLIT_DEV_DOMAIN", "REPL_ID"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(decorators, "current_user", SimpleNamespace(is_authenticated=True, id="u1"))
+    decorators._VERIFY_CACHE.clear()
+
+    flask_app = Flask(__name__)
+    flask_app.secret_key = "test"
+    flask_app.add_url_rule("/auth/login", "auth.login", lambda: "login")
+    flask_app.add_url_rule("/auth/pending", "auth.email_confirmation_pending", lambda: "pending")
+    yield flask_app
+    decorators._VERIFY_CACHE.clear()
+
+
+@email_confirmation_required
+def _view():
+    return "ok"
+
+
+def _call(app, token="abc"):
+    with app.test_request_context("/", base_url="https://stats.example.com"):
+        from flask import session
+        session["supabase_session"] = {"access_token": token}
+        return _view()
+
+
+def test_confirmed_session_is_checked_once(app, monkeypatch):
+    fake = _FakeSupabase()
+    monkeypatch.setattr(decorators, "supabase_service", fake)
+
+    assert [_call(app) for _ in range(5)] == ["ok"] * 5
+    assert fake.calls == 1
+
+    # outra sessão (outro token) faz a sua própria verificação
+    assert _call(app, token="other") == "ok"
+    assert fake.calls == 2
+
+
+def test_unconfirmed_is_not_cached(app, monkeypatch):
+    fake = _FakeSupabase(confirmed=False)
+    monkeypatch.setattr(decorators, "supabase_service", fake)
+
+    assert _call(app).status_code == 302
+    fake.confirmed = True
+    assert _call(app) == "ok"
+    assert fake.calls == 2
+
+
+def test_refreshes_in_background_near_expiry(app, monkeypatch):
+    fake = _FakeSupabase()
+    monkeypatch.setattr(decorators, "supabase_service", fake)
+    _call(app)
+    fake.called.clear()
+    # entra na janela de refresh sem expirar
+    for entry in decorators._VERIFY_CACHE.values():
+        entry.expires_at -= decorators.VERIFY_TTL_SECONDS * 0.9
+
+    assert _call(app) == "ok"
+    assert fake.called.wait(2)
+    assert fake.calls == 2
+    # o refresh valida o token da própria sessão
+    assert fake.jwts[-1] == "abc"
+
+
+def _enter_refresh_window(fake):
+    fake.called.clear()
+    for entry in decorators._VERIFY_CACHE.values():
+        entry.expires_at -= decorators.VERIFY_TTL_SECONDS * 0.9
+
+
+def _wait_refresh_done():
+    for _ in range(200):
+        with decorators._VERIFY_LOCK:
+            if not any(e.refreshing for e in decorators._VERIFY_CACHE.values()):
+                return
+        threading.Event().wait(0.01)
+
+
+def test_refresh_drops_a_revoked_session(app, monkeypatch):
+    fake = _FakeSupabase()
+    monkeypatch.setattr(decorators, "supabase_service", fake)
+    _call(app)
+    fake.revoked.add("abc")
+    _enter_refresh_window(fake)
+
+    assert _call(app) == "ok"
+    assert fake.called.wait(2)
+    _wait_refresh_done()
+
+    assert decorators._VERIFY_CACHE == {}
+    # sem cache, o pedido seguinte volta à verificação completa
+    _call(app)
+    assert fake.calls == 3
+
+
+def test_refresh_rejects_another_users_token(app, monkeypatch):
+    fake = _FakeSupabase()
+    monkeypatch.setattr(decorators, "supabase_service", fake)
+    _call(app)
+    monkeypatch.setattr(decorators, "current_user", SimpleNamespace(is_authenticated=True, id="u2"))
+    _enter_refresh_window(fake)
+
+    assert _call(app) == "ok"
+    assert fake.called.wait(2)
+    _wait_refresh_done()
+
+    assert decorators._VERIFY_CACHE == {}
+
+
+def test_logout_invalidates(app, monkeypatch):
+    fake = _FakeSupabase()
+    monkeypatch.setattr(decorators, "supabase_service", fake)
+    _call(app)
+
+    with app.test_request_context("/"):
+        from flask import session
+        session["supabase_session"] = {"access_token": "abc"}
+        invalidate_session_verification()
+
+    _call(app)
+    assert fake.calls == 2
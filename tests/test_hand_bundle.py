@@ -0,0 +1,113 @@
+import pytest
+
+from app.services.storage import StorageService
+from app.stats import hand_bundle
+from app.stats.hand_bundle import (
+    BUNDLE_NAME,
+    BundleFormatError,
+    HandBundle,
+    local_range_reader,
+    open_stored_bundle,
+    write_hand_bundle,
+)
+from app.utils.hand_fingerprint import fingerprint_hand
+
+
+def _hand(index):
+    return f"PokerStars Hand #{index}: Tournament #1\nSeat 1: hero ({index} in chips)\n*** SUMMARY ***\n"
+
+
+HANDS_BY_STAT = {
+    "RFI Early": [_hand(i) for i in range(40)],
+    "Flop CBet IP %": [_hand(i) for i in range(30, 60)] + ["   "],
+    "Empty stat": [],
+}
+FILENAMES = {"RFI Early": "RFI_EARLY.txt"}
+
+
+class _CountingReader:
+    def __init__(self, path):
+        self.read = local_range_reader(path)
+        self.calls = []
+
+    def __call__(self, start, length):
+        self.calls.append((start, length))
+        return self.read(start, length)
+
+
+def test_round_trip_matches_stat_files(tmp_path):
+    path = tmp_path / BUNDLE_NAME
+    info = write_hand_bundle(str(path), HANDS_BY_STAT, FILENAMES, block_size=512)
+
+    bundle = HandBundle.open_file(path)
+
+    # 70 mãos, 60 distintas: as 10 partilhadas só são guardadas uma vez
+    assert info["hands"] == 60 and info["stats"] == 2 and info["blocks"] > 1
+    assert bundle.stats == ["RFI Early", "Flop CBet IP %"]
+    assert bundle.stat_for_filename("RFI_EARLY.txt") == "RFI Early"
+    assert bundle.stat_for_filename("Flop_CBet_IP_%.txt") == "Flop CBet IP %"
+    for stat, hands in HANDS_BY_STAT.items():
+        if not stat.startswith("Empty"):
+            expected = "\n\n".join(h.strip() for h in hands if h.strip())
+            assert bundle.stat_text(stat) == expected
+    assert bundle.hand_ids("RFI Early")[3] == fingerprint_hand(_hand(3).strip())
+    assert bundle.metadata()["hands_per_stat"] == {"RFI Early": 40, "Flop CBet IP %": 30}
+
+
+def test_reads_only_the_blocks_it_needs(tmp_path):
+    path = tmp_path / BUNDLE_NAME
+    write_hand_bundle(str(path), HANDS_BY_STAT, block_size=512, compress=False)
+    reader = _CountingReader(path)
+    bundle = HandBundle.open(reader)
+
+    assert len(reader.calls) == 1  # header + índice numa leitura
+
+    sample = bundle.hands("RFI Early", limit=2)
+    assert [text for _, text in sample] == [_hand(0).strip(), _hand(1).strip()]
+    assert len(reader.calls) == 2
+
+    # blocos contíguos vêm numa só leitura e os já lidos ficam em cache
+    bundle.hands("RFI Early")
+    assert len(reader.calls) == 3
+    bundle.hands("RFI Early")
+    assert len(reader.calls) == 3
+
+
+def test_index_larger_than_probe_is_completed(tmp_path, monkeypatch):
+    path = tmp_path / BUNDLE_NAME
+    write_hand_bundle(str(path), HANDS_BY_STAT)
+    monkeypatch.setattr(hand_bundle, "HEAD_PROBE", 16)
+
+    assert HandBundle.open_file(path).hands_per_stat()["RFI Early"] == 40
+
+
+def test_rejects_foreign_or_truncated_data(tmp_path):
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a bundle at all")
+    with pytest.raises(BundleFormatError):
+        HandBundle.open_file(other)
+
+    path = tmp_path / BUNDLE_NAME
+    write_hand_bundle(str(path), HANDS_BY_STAT)
+    path.write_bytes(path.read_bytes()[:20])
+    with pytest.raises(BundleFormatError):
+        HandBundle.open_file(path)
+
+    assert HandBundle.open_file(tmp_path / "missing.bundle") is None
+
+
+def test_open_stored_bundle_through_local_storage(tmp_path, monkeypatch):
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    storage = StorageService(local_base_dir=str(tmp_path / "storage"))
+    local = tmp_path / BUNDLE_NAME
+    write_hand_bundle(str(local), HANDS_BY_STAT)
+    storage.upload_file(local.read_bytes(), "/results/tok/hands_by_stat/pko/hands.bundle", "application/octet-stream")
+
+    assert storage.download_range("/results/tok/hands_by_stat/pko/hands.bundle", 0, 4) == b"HBDL"
+    bundle = open_stored_bundle(storage, "/results/tok/hands_by_stat/pko/hands.bundle")
+    assert bundle.hands("RFI Early", limit=1)[0][1] == _hand(0).strip()
+
+    # sem objeto no storage, usa a cópia local
+    fallback = open_stored_bundle(storage, "/results/tok/missing/hands.bundle", local)
+    assert fallback.stats == ["RFI Early", "Flop CBet IP %"]
+    assert open_stored_bundle(storage, "/results/tok/missing/hands.bundle") is None
@@ -18,4 +18,36 @@ def test_excerpt_basic(tmp_path, monkeypatch):
         "raw_offsets": {"hand_start": 6, "hand_end": len(hh)-1}
     }
     ex = build_excerpt(hand, context_chars=10)
-    assert "HERO:Hero" in ex["snippet"] or "[HERO:Hero]" in ex["snippet"]
\ No newline at end of file
+    assert "HERO:Hero" in ex["snippet"] or "[HERO:Hero]" in ex["snippet"]
+
+def test_read_char_window_matches_full_decode(tmp_path, monkeypatch):
+    import app.hands.service as service
+    from app.hands.service import read_char_window
+
+    # checkpoints pequenos para forçar vários blocos
+    monkeypatch.setattr(service, "CHECKPOINT_BYTES", 64)
+    text = "".join(f"Mão {i}: João aposta €{i},50 — all-in\n" for i in range(200))
+    src = tmp_path/"utf8.txt"
+    src.write_text(text, encoding="utf-8")
+
+    for start, end in [(0, 30), (500, 900), (len(text) - 40, len(text) + 100)]:
+        assert read_char_window(str(src), start, end) == text[max(0, start):end]
+
+    latin = tmp_path/"cp1252.txt"
+    latin.write_bytes(("Jogador é campeão\n" * 50).encode("cp1252"))
+    full = latin.read_bytes().decode("cp1252")
+    assert read_char_window(str(latin), 100, 160) == full[100:160]
+
+
+def test_find_source_path_uses_name_map(tmp_path, monkeypatch):
+    import app.hands.service as service
+
+    monkeypatch.setattr(service, "SAFE_ROOTS", [str(tmp_path)])
+    (tmp_path/"a"/"PKO").mkdir(parents=True)
+    (tmp_path/"a"/"PKO"/"hh.txt").write_text("x")
+    assert service.find_source_path("deep/PKO/hh.txt") == str(tmp_path/"a"/"PKO"/"hh.txt")
+
+    # ficheiro novo numa pasta existente: mapa é refeito pelo mtime da pasta
+    (tmp_path/"a"/"PKO"/"new.txt").write_text("y")
+    assert service.find_source_path("new.txt") == str(tmp_path/"a"/"PKO"/"new.txt")
+    assert service.find_source_path("missing.txt") is None
@@ -17,4 +17,60 @@ def test_build_and_fetch_index(tmp_path):
     assert idx["meta"]["count"] == 2
 
     got = fetch_by_id(str(p), idx, "H2")
-    assert got["site"] == "gg"
\ No newline at end of file
+    assert got["site"] == "gg"
+
+def test_binary_index_fetch_and_fetch_many(tmp_path):
+    from app.hands.indexer import build_binary_index, open_binary_index
+
+    p = tmp_path/"hands.jsonl"
+    with open(p,"w",encoding="utf-8") as f:
+        for i in range(50):
+            f.write(json.dumps({"hand_id":f"H{i}","site":"ps","n":i})+"\n")
+        f.write("\n")  # linha vazia é ignorada
+
+    idx_path = tmp_path/"idx.bin"
+    res = build_binary_index(str(p), str(idx_path))
+    assert res["meta"]["count"] == 50
+
+    idx = open_binary_index(str(idx_path), str(p))
+    try:
+        assert len(idx) == 50
+        assert "H7" in idx and "nope" not in idx
+        assert idx.fetch("H42")["n"] == 42
+        assert idx.fetch("nope") == {}
+
+        many = idx.fetch_many(["H3","H40","nope","H3","H0"])
+        assert sorted(many) == ["H0","H3","H40"]
+        assert many["H40"]["n"] == 40
+        assert not idx.is_stale()
+    finally:
+        idx.close()
+
+    # JSONL alterado -> índice desatualizado é reconstruído
+    with open(p,"a",encoding="utf-8") as f:
+        f.write(json.dumps({"hand_id":"H50","site":"gg","n":50})+"\n")
+    idx = open_binary_index(str(idx_path), str(p))
+    try:
+        assert idx.fetch("H50")["site"] == "gg"
+    finally:
+        idx.close()
+
+def test_stale_index_is_swapped_without_closing_readers(tmp_path, monkeypatch):
+    from app.hands import api as hands_api
+
+    p = tmp_path/"hands.jsonl"
+    with open(p,"w",encoding="utf-8") as f:
+        f.write(json.dumps({"hand_id":"H1","site":"ps"})+"\n")
+    monkeypatch.setattr(hands_api, "HANDS_JSONL", str(p))
+    monkeypatch.setattr(hands_api, "INDEX_PATH", str(tmp_path/"idx.bin"))
+    monkeypatch.setattr(hands_api, "_INDEX_CACHE", None)
+
+    old = hands_api._ensure_index()
+    with open(p,"a",encoding="utf-8") as f:
+        f.write(json.dumps({"hand_id":"H2","site":"gg"})+"\n")
+    new = hands_api._ensure_index()
+
+    # um pedido que ainda tem o índice antigo continua a ler
+    assert new is not old
+    assert old.fetch("H1")["site"] == "ps"
+    assert new.fetch("H2")["site"] == "gg"
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from app.services import job_profiler
+from app.services.job_profiler import JobProfiler
+
+
+@pytest.fixture(autouse=True)
+def isolated_toggles(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_profiler, "TOGGLE_FILE", str(tmp_path / "toggles.json"))
+    monkeypatch.setattr(job_profiler, "ARCHIVE_ROOT", str(tmp_path / "archive"))
+    monkeypatch.delenv(job_profiler.PROFILE_ENV, raising=False)
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_enabled_by_env_or_admin_toggle(monkeypatch):
+    assert not job_profiler.is_profiling_enabled("abc")
+
+    monkeypatch.setenv(job_profiler.PROFILE_ENV, "xyz, abc")
+    assert job_profiler.is_profiling_enabled("abc")
+    monkeypatch.setenv(job_profiler.PROFILE_ENV, "all")
+    assert job_profiler.is_profiling_enabled("anything")
+    monkeypatch.delenv(job_profiler.PROFILE_ENV)
+
+    job_profiler.set_profiling("abc", True)
+    assert job_profiler.toggled_tokens() == ["abc"]
+    assert job_profiler.is_profiling_enabled("abc")
+    job_profiler.set_profiling("abc", False)
+    assert not job_profiler.is_profiling_enabled("abc")
+
+    job_profiler.set_profiling(job_profiler.ALL_JOBS, True)
+    assert job_profiler.is_profiling_enabled("def")
+
+
+def test_phases_write_collapsed_stacks_and_function_totals(tmp_path):
+    work_dir = str(tmp_path / "job1")
+    profiler = JobProfiler("job1", work_dir, enabled=True)
+
+    profiler.phase("extract")
+    _busy(200000)
+    profiler.phase("site_888.pt")
+    _busy(400000)
+    profiler.close()
+
+    out_dir = os.path.join(work_dir, "_logs", "profile")
+    summary = job_profiler.load_summary("job1")
+    assert list(summary["phases"]) == ["extract", "site_888.pt"]
+    assert sorted(os.listdir(job_profiler.find_profile_dir("job1"))) == sorted(os.listdir(out_dir))
+
+    phase = summary["phases"]["site_888.pt"]
+    assert phase["wall_seconds"] > 0
+    functions = json.load(open(os.path.join(out_dir, "site_888.pt.functions.json")))
+    assert any("_busy" in f["function"] or "<genexpr>" in f["function"] for f in functions)
+    for name in phase["files"]:
+        assert os.path.exists(os.path.join(out_dir, name))
+
+    with open(os.path.join(out_dir, "site_888.pt.collapsed")) as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+
+def test_profile_survives_work_dir_cleanup(tmp_path):
+    work_dir = tmp_path / "processing_job3" / "job3"
+    profiler = JobProfiler("job3", str(work_dir), enabled=True)
+    profiler.phase("extract")
+    profiler.close()
+
+    shutil.rmtree(tmp_path / "processing_job3")
+
+    assert list(job_profiler.load_summary("job3")["phases"]) == ["extract"]
+    assert job_profiler.find_profile_dir("job3") == str(tmp_path / "archive" / "job3")
+
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = JobProfiler("job2", str(tmp_path / "job2"))
+
+    profiler.phase("extract")
+    profiler.close()
+
+    assert not profiler.enabled
+    assert not (tmp_path / "job2").exists()
+    assert job_profiler.load_summary("job2") is None
@@ -0,0 +1,115 @@
+import pytest
+
+from app.services import pipeline_metrics
+from app.services.pipeline_metrics import MetricsRegistry, archive_size_class
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    pipeline_metrics.registry.reset()
+    yield
+    pipeline_metrics.registry.reset()
+
+
+def test_stages_are_recorded_per_site_and_group(tmp_path):
+    metrics = pipeline_metrics.start_job("tok1", archive_bytes=3 * 1024 * 1024)
+
+    with metrics.stage("extract") as extract:
+        extract.bytes_read = 100
+    site = pipeline_metrics.begin_stage("tok1", "site", site="gg")
+    with pipeline_metrics.stage("tok1", "classify", site="gg") as classify:
+        classify.hands_in, classify.hands_out = 120, 100
+    stats = pipeline_metrics.begin_stage("tok1", "stats", site="gg", group="pko")
+    sum(i for i in range(100000))
+    stats.hands_in = stats.hands_out = 100
+    pipeline_metrics.end_stage("tok1", stats)
+    pipeline_metrics.end_stage("tok1", site)
+
+    summary = pipeline_metrics.finish_job("tok1", "completed", str(tmp_path))
+
+    assert [(s["stage"], s.get("site"), s.get("group")) for s in summary["stages"]] == [
+        ("extract", None, None), ("classify", "gg", None), ("stats", "gg", "pko"), ("site", "gg", None),
+    ]
+    assert summary["hands_in"] == 120 and summary["hands_out"] == 100
+    assert summary["archive_size_class"] == "1_10mb"
+    assert all(s["peak_rss_mb"] > 0 for s in summary["stages"])
+    assert summary["stages"][2]["cpu_seconds"] > 0
+    assert pipeline_metrics.load_job_metrics(str(tmp_path)) == summary
+
+
+def test_open_stages_fail_with_the_job(tmp_path):
+    metrics = pipeline_metrics.start_job("tok2")
+    metrics.begin("publish")
+    with pytest.raises(RuntimeError):
+        with pipeline_metrics.stage("tok2", "aggregate"):
+            raise RuntimeError("boom")
+
+    summary = pipeline_metrics.finish_job("tok2", "failed")
+
+    assert {s["stage"]: s["status"] for s in summary["stages"]} == {"aggregate": "failed", "publish": "failed"}
+    assert pipeline_metrics.finish_job("tok2", "failed") is None
+
+
+def test_stages_without_a_job_are_ignored():
+    with pipeline_metrics.stage("nobody", "classify") as record:
+        record.hands_in = 5
+    pipeline_metrics.end_stage("nobody", pipeline_metrics.begin_stage("nobody", "stats"))
+
+    assert "nobody" not in pipeline_metrics.registry.render()
+
+
+def test_prometheus_text():
+    registry = MetricsRegistry()
+    stage = {"stage": "stats", "site": "gg", "group": "pko", "wall_seconds": 2.5, "cpu_seconds": 2.0,
+             "hands_in": 100, "hands_out": 100, "bytes_read": 10, "bytes_written": 20, "peak_rss_mb": 300}
+    registry.observe_job({"status": "completed", "wall_seconds": 40, "archive_size_class": "lt_1mb",
+                          "stages": [stage]})
+    registry.observe_job({"status": "completed", "wall_seconds": 4, "archive_size_class": "lt_1mb",
+                          "stages": [stage]})
+
+    text = registry.render()
+
+    assert 'pipeline_jobs_total{status="completed"} 2' in text
+    assert 'pipeline_job_duration_seconds_bucket{archive_size="lt_1mb",status="completed",le="5"} 1' in text
+    assert 'pipeline_job_duration_seconds_bucket{archive_size="lt_1mb",status="completed",le="60"} 2' in text
+    assert 'pipeline_job_duration_seconds_count{archive_size="lt_1mb",status="completed"} 2' in text
+    assert 'pipeline_stage_hands_in_total{group="pko",site="gg",stage="stats"} 200' in text
+    assert 'pipeline_stage_wall_seconds_total{group="pko",site="gg",stage="stats"} 5.0000' in text
+    assert "# TYPE pipeline_job_duration_seconds histogram" in text
+
+
+def test_archive_size_classes():
+    mb = 1024 * 1024
+    assert [archive_size_class(n * mb) for n in (0, 5, 50, 200, 900)] == [
+        "lt_1mb", "1_10mb", "10_100mb", "100_500mb", "gt_500mb"]
+
+
+def _summary(status, wall, peak):
+    return {"status": status, "wall_seconds": wall, "archive_size_class": "lt_1mb",
+            "stages": [{"stage": "stats", "site": "gg", "wall_seconds": wall, "cpu_seconds": 1.0,
+                        "hands_in": 10, "hands_out": 10, "peak_rss_mb": peak}]}
+
+
+def test_workers_sharing_a_directory_report_server_totals(tmp_path, monkeypatch):
+    first = MetricsRegistry(directory=str(tmp_path))
+    first.observe_job(_summary("completed", 4, 300))
+    # outro worker do gunicorn: mesmo diretório, outro processo
+    monkeypatch.setattr(pipeline_metrics.os, "getpid", lambda: 999999)
+    second = MetricsRegistry(directory=str(tmp_path))
+    second.observe_job(_summary("completed", 40, 500))
+    second.observe_job(_summary("failed", 4, 100))
+
+    for registry in (first, second):
+        text = registry.render()
+        assert 'pipeline_jobs_total{status="completed"} 2' in text
+        assert 'pipeline_jobs_total{status="failed"} 1' in text
+        assert 'pipeline_job_duration_seconds_count{archive_size="lt_1mb",status="completed"} 2' in text
+        assert 'pipeline_stage_hands_in_total{group="",site="gg",stage="stats"} 30' in text
+        assert 'pipeline_stage_peak_rss_megabytes{group="",site="gg",stage="stats"} 500' in text
+    assert 'pipeline_jobs_running{worker="999999"} 0' in second.render()
+
+
+def test_snapshot_survives_the_worker(tmp_path):
+    MetricsRegistry(directory=str(tmp_path)).observe_job(_summary("completed", 4, 300))
+    # worker reciclado: o novo não pode fazer o contador voltar para trás
+    assert 'pipeline_jobs_total{status="completed"} 1' in MetricsRegistry(directory=str(tmp_path)).render()
@@ -0,0 +1,91 @@
+"""
+Tests for the checkpointed stage runner behind run_full_pipeline.
+"""
+import json
+import zipfile
+
+import pytest
+
+import app.pipeline.runner as pipeline_runner
+from app.pipeline.stages import Stage, StageRunner, StageFailed
+
+
+HAND = "PokerStars Hand #1: Tournament #2, $1+$0.10 USD Hold'em No Limit\n" + "Seat 1: Hero (1500 in chips)\n" * 3
+
+
+def _make_zip(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("t1.txt", HAND + "\n\n\n" + HAND)
+    return str(path)
+
+
+def test_rerun_skips_unchanged_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = tmp_path / "config.yml"
+    config.write_text("weights: 1\n")
+    monkeypatch.setattr(pipeline_runner, "SCORE_CONFIG_PATH", str(config))
+    archive = _make_zip(tmp_path / "upload.zip")
+
+    ok, token, err = pipeline_runner.run_full_pipeline(archive, work_root=str(tmp_path / "work"))
+    assert ok, err
+
+    ok, _, _ = pipeline_runner.run_full_pipeline(archive, work_root=str(tmp_path / "work"), token=token)
+    summary = json.loads((tmp_path / "work" / token / "pipeline_summary.json").read_text())
+    assert summary["steps_skipped"] == ["extract", "classify", "derive", "partitions", "stats", "scoring"]
+
+    # Scoring config change re-runs scoring only
+    config.write_text("weights: 2\n")
+    ok, _, _ = pipeline_runner.run_full_pipeline(archive, work_root=str(tmp_path / "work"), token=token)
+    summary = json.loads((tmp_path / "work" / token / "pipeline_summary.json").read_text())
+    assert ok
+    assert summary["steps_skipped"] == ["extract", "classify", "derive", "partitions", "stats"]
+
+
+def test_runner_resumes_after_failure_and_runs_independent_stages(tmp_path):
+    calls = []
+    state = {"fail": True}
+
+    def produce(name):
+        def func(work_dir, results):
+            calls.append(name)
+            if name == "b" and state["fail"]:
+                raise RuntimeError("boom")
+            (tmp_path / f"{name}.out").write_text(name)
+            return {"name": name}
+        return func
+
+    def stages():
+        return [
+            Stage(name="root", func=produce("root"), outputs=["root.out"]),
+            Stage(name="a", func=produce("a"), deps=["root"], outputs=["a.out"]),
+            Stage(name="b", func=produce("b"), deps=["root"], outputs=["b.out"]),
+            Stage(name="final", func=produce("final"), deps=["a", "b"], outputs=["final.out"]),
+        ]
+
+    with pytest.raises(StageFailed) as exc:
+        StageRunner(str(tmp_path), stages()).run()
+    assert exc.value.error_info["step"] == "b"
+    assert "final" not in calls
+
+    state["fail"] = False
+    calls.clear()
+    runner = StageRunner(str(tmp_path), stages())
+    results = runner.run()
+    assert results["final"] == {"name": "final"}
+    assert sorted(calls) == ["b", "final"]
+    assert sorted(runner.skipped) == ["a", "root"]
+
+
+def test_new_run_records_its_owner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = _make_zip(tmp_path / "upload.zip")
+    work_root = str(tmp_path / "work")
+
+    _, token, _ = pipeline_runner.run_full_pipeline(archive, work_root=work_root, owner="42")
+    _, anonymous, _ = pipeline_runner.run_full_pipeline(archive, work_root=work_root)
+    # retomar não muda o dono
+    pipeline_runner.run_full_pipeline(archive, work_root=work_root, token=token, owner="7")
+
+    assert pipeline_runner.run_owner(token, work_root) == "42"
+    assert pipeline_runner.run_owner(anonymous, work_root) is None
+    assert pipeline_runner.run_owner("0123456789ab", work_root) is None
@@ -0,0 +1,59 @@
+import pytest
+
+from app.derive.stacks import get_positions_acting_after
+from app.stats.position_mapping import (
+    POSITION_TABLE,
+    assign_positions,
+    get_position_category,
+    get_position_map,
+    get_rfi_stat_for_position,
+    position_info,
+)
+from app.stats.postflop_calculator_v3 import PostflopCalculatorV3
+from app.stats.preflop_stats import PreflopStats
+
+HAND = """PokerStars Hand #1: Tournament #2, $10+$1 Hold'em No Limit - Level I (10/20) - 2024/01/15 12:34:56 ET
+Table '2 1' 9-max Seat #3 is the button
+Seat 1: alice (1500 in chips)
+Seat 2: bob (1500 in chips)
+Seat 3: carol (1500 in chips)
+Seat 5: dave (1500 in chips)
+Seat 6: erin (1500 in chips)
+Seat 8: frank (1500 in chips)
+*** HOLE CARDS ***
+"""
+
+
+def test_table_rows_follow_the_position_map():
+    for num_players in range(2, 10):
+        position_map = get_position_map(num_players)
+        for seat, info in enumerate(POSITION_TABLE[num_players]):
+            assert info.position == position_map[seat]
+            assert info.category == get_position_category(info.position)
+            assert info.rfi_stat == get_rfi_stat_for_position(info.position)
+    assert not get_position_map(10) and position_info(10, 0) is None
+
+
+def test_acts_after_is_preflop_order():
+    assert position_info(6, 3).acts_after == ("MP", "CO", "BTN", "SB", "BB")
+    assert position_info(9, 0).acts_after == ("SB", "BB")
+    assert position_info(2, 0).acts_after == ("BB",)
+
+
+def test_position_map_is_read_only():
+    with pytest.raises(TypeError):
+        get_position_map(6)[0] = "X"
+
+
+def test_calculators_agree():
+    expected = {"alice": "MP", "bob": "CO", "carol": "BTN", "dave": "SB", "erin": "BB", "frank": "UTG"}
+
+    assert PreflopStats()._extract_positions(HAND) == expected
+    assert PostflopCalculatorV3()._extract_positions(HAND) == expected
+    assert assign_positions(["a", "b"], 1) == {"a": "BB", "b": "BTN/SB"}
+
+
+def test_derive_acting_after_uses_precomputed_orders():
+    assert get_positions_acting_after("MP3", 9) == ["CO", "BTN", "SB", "BB"]
+    assert get_positions_acting_after("CO", 5) == ["BTN", "SB", "BB"]
+    assert get_positions_acting_after("UTG", 6) == []
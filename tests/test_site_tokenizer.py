@@ -0,0 +1,106 @@
+import re
+
+import pytest
+
+from app.parse.site_parsers import tokenizer
+from app.parse.site_parsers.base_parser import BaseParser
+from app.parse.site_parsers.pokerstars_parser import PokerStarsParser
+from app.parse.site_parsers.tokenizer import TokenTable, token_rule, tokenize
+from app.parse.site_parsers.wpn_parser import WPNParser
+
+STARS_HAND = """PokerStars Hand #256955611604: Tournament #3908028211, $9.80+$1.20 USD Hold'em No Limit - Level III (50/100) - 2025/07/16 20:00:00 ET
+Table '3908028211 12' 9-max Seat #1 is the button
+Seat 1: alice (5000 in chips)
+Seat 2: bob (4000 in chips)
+Seat 3: carol (3000 in chips, $5 bounty)
+Seat 4: dave (2000 in chips) out of hand (moved from another table into small blind)
+bob: posts small blind 50
+carol: posts big blind 100
+*** HOLE CARDS ***
+Dealt to alice [Ah Kd]
+alice: raises 200 to 300
+bob: folds
+carol: calls 200
+*** FLOP *** [Ks 2c 4h]
+carol: checks
+alice: bets 400
+carol: folds
+Uncalled bet (400) returned to alice
+alice collected 650 from pot
+*** SUMMARY ***
+Total pot 650 | Rake 0
+Board [Ks 2c 4h]
+Seat 1: alice (button) collected (650)"""
+
+
+def test_single_walk_feeds_every_extractor(monkeypatch):
+    calls = []
+    original = tokenizer.tokenize
+
+    def counting(hand_text, table):
+        calls.append(table)
+        return original(hand_text, table)
+
+    monkeypatch.setattr('app.parse.site_parsers.base_parser.tokenize', counting)
+
+    info = PokerStarsParser().extract_hand_info(STARS_HAND)
+
+    assert len(calls) == 1
+    assert [p['name'] for p in info['players']] == ['alice', 'bob', 'carol']
+    assert info['blinds'] == {'sb': 50.0, 'bb': 100.0}
+    assert info['board'] == {'flop': 'Ks 2c 4h'}
+    assert [a['action'] for a in info['actions']['preflop']] == ['raise', 'fold', 'call']
+    assert [a['action'] for a in info['actions']['flop']] == ['check', 'bet', 'fold']
+
+
+def test_collect_after_uncalled_bet_is_a_winner():
+    # o padrão antigo atravessava a linha "Uncalled bet" e perdia o vencedor
+    info = PokerStarsParser().extract_hand_info(STARS_HAND)
+
+    assert info['winners'] == ['alice']
+    assert info['pot_collected'] == {'alice': 650.0}
+    assert info['total_pot'] == 650.0
+
+
+def test_seat_without_stack_does_not_swallow_next_seat():
+    hand = "\n".join([
+        "Game Hand #2518516857 - Tournament #1 - Holdem (No Limit) - Level 13 (2250.00/4500.00)",
+        "Table '48' 8-max Seat #1 is the button",
+        "Seat 1: SadAndHorny (567484.00)",
+        "Seat 3: ubetrippin will be allowed to play after the button",
+        "Seat 4: Millennials (152962.00)",
+        "*** HOLE CARDS ***",
+    ])
+
+    players = WPNParser()._extract_players(hand)
+
+    assert [(p['seat'], p['name']) for p in players] == [(1, 'SadAndHorny'), (4, 'Millennials')]
+
+
+def test_new_site_is_just_a_table():
+    table = TokenTable(
+        street_markers=(('-- PREFLOP --', 'preflop'), ('-- FLOP --', 'flop')),
+        stop_markers=('-- END --',),
+        rules=(
+            token_rule('seat', r'^Seat (\d+): (\S+)', 'Seat'),
+            token_rule('pot', r'pot of (\d+)', 'POT', flags=re.IGNORECASE, once=True),
+        ),
+    )
+    hand = "Seat 1: a\nSeat 2: b\n-- PREFLOP --\na raises\n\nb calls\n-- FLOP --\nb checks\n-- END --\nPot of 10\npot of 99"
+
+    tokens = tokenize(hand, table)
+
+    assert tokens.street_lines == [('preflop', 'a raises'), ('preflop', 'b calls'), ('flop', 'b checks')]
+    assert [m.group(2) for m in tokens.matches('seat')] == ['a', 'b']
+    assert tokens.first('pot').group(1) == '10'
+    assert len(tokens.matches('pot')) == 1
+    assert tokens.events['seat'][0].street is None
+
+
+def test_parser_without_action_line_hook_cannot_be_created():
+    class HalfParser(BaseParser):
+        can_parse = is_tournament = split_hands = PokerStarsParser.can_parse
+        extract_hand_info = extract_hero_name = PokerStarsParser.extract_hero_name
+
+    with pytest.raises(TypeError, match='_parse_action_line'):
+        HalfParser()
@@ -0,0 +1,44 @@
+"""
+Tests for the cached month x group x stat cube behind the timeseries APIs.
+"""
+import json
+import os
+
+from app.stats.timeseries import get_stats_cube, get_timeseries, get_breakdown
+
+
+def _write_counts(path, counts):
+    with open(path, 'w') as f:
+        json.dump({"counts": counts}, f)
+
+
+def test_cube_is_cached_and_invalidated_on_change(tmp_path):
+    stats_dir = str(tmp_path)
+    _write_counts(tmp_path / "stat_counts.json", {
+        "2024-07": {"postflop_all": {
+            "POST_CBET_FLOP_IP": {"opportunities": 4, "attempts": 2, "percentage": 50.0},
+            "POST_CBET_TURN_OOP": {"opportunities": 2, "attempts": 1, "percentage": 50.0},
+        }}
+    })
+
+    cube = get_stats_cube(stats_dir)
+    assert get_stats_cube(stats_dir) is cube
+
+    ts = get_timeseries("POST_CBET_FLOP_IP", "postflop_all", stats_dir=stats_dir)
+    assert ts["aggregates"]["total_opportunities"] == 4
+
+    bd = get_breakdown("postflop_all", "POST_CBET", stats_dir=stats_dir)
+    assert bd["breakdown"]["by_street"]["FLOP"]["opportunities"] == 4
+    assert bd["breakdown"]["by_street"]["TURN"]["attempts"] == 1
+
+    # A new monthly file invalidates the cached cube
+    _write_counts(tmp_path / "stat_counts_2024-08.json", {
+        "2024-08": {"postflop_all": {
+            "POST_CBET_FLOP_IP": {"opportunities": 6, "attempts": 3, "percentage": 50.0},
+        }}
+    })
+    assert get_stats_cube(stats_dir) is not cube
+
+    ts = get_timeseries("POST_CBET_FLOP_IP", "postflop_all", stats_dir=stats_dir)
+    assert [p["month"] for p in ts["timeseries"]] == ["2024-07", "2024-08"]
+    assert ts["aggregates"]["total_opportunities"] == 10
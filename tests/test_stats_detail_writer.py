@@ -0,0 +1,96 @@
+import threading
+
+from app.services import stats_detail_writer as writer_module
+from app.services.stats_detail_writer import NATURAL_KEY, StatsDetailWriter, dedupe_rows
+
+
+class _FakeQuery:
+    def __init__(self, client, rows, on_conflict):
+        self.client = client
+        self.rows = rows
+        self.on_conflict = on_conflict
+
+    def execute(self):
+        with self.client.lock:
+            self.client.calls += 1
+            if self.client.failures_left > 0:
+                self.client.failures_left -= 1
+                raise TimeoutError("The read operation timed out")
+            self.client.conflicts.add(self.on_conflict)
+            for row in self.rows:
+                self.client.table_rows[tuple(row[col] for col in NATURAL_KEY)] = row
+        return self
+
+
+class _FakeTable:
+    def __init__(self, client):
+        self.client = client
+
+    def upsert(self, rows, on_conflict=None):
+        return _FakeQuery(self.client, rows, on_conflict)
+
+
+class _FakeClient:
+    def __init__(self, failures=0):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures_left = failures
+        self.conflicts = set()
+        self.table_rows = {}
+
+    def table(self, name):
+        assert name == "poker_stats_detail"
+        return _FakeTable(self)
+
+
+def _rows(count, month="2025-01"):
+    return [
+        {
+            "processing_id": 1,
+            "token": "abc123abc123",
+            "month": month,
+            "site": "pokerstars",
+            "table_format": "9max",
+            "stat_name": f"STAT_{i}",
+            "opportunities": i,
+            "attempts": 0,
+            "percentage": None,
+        }
+        for i in range(count)
+    ]
+
+
+def test_rest_writes_in_chunks_with_natural_key(monkeypatch):
+    monkeypatch.setattr(writer_module.time, "sleep", lambda _s: None)
+    client = _FakeClient(failures=1)
+    writer = StatsDetailWriter(client, chunk_size=100, max_in_flight=3, use_copy=False)
+
+    report = writer.write(_rows(250) + _rows(250, month=None))
+
+    assert report.method == "rest"
+    assert report.chunks == 5
+    assert report.rows == 500
+    assert report.failed_chunks == 0
+    assert client.calls == 6  # one chunk retried after a timeout
+    assert client.conflicts == {"token,month,site,table_format,stat_name"}
+    assert len(client.table_rows) == 500
+
+
+def test_rewriting_same_rows_is_idempotent():
+    client = _FakeClient()
+    writer = StatsDetailWriter(client, chunk_size=64, use_copy=False)
+
+    writer.write(_rows(100))
+    writer.write(_rows(100))
+
+    assert len(client.table_rows) == 100
+
+
+def test_dedupe_keeps_last_row_per_key():
+    first, second = _rows(1), _rows(1)
+    second[0]["opportunities"] = 42
+
+    rows = dedupe_rows(first + second)
+
+    assert len(rows) == 1
+    assert rows[0]["opportunities"] == 42
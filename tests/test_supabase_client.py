@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+supabase = pytest.importorskip("supabase")
+
+from app.services.supabase_client import SupabaseService
+
+
+def test_admin_client_is_never_seen_half_initialised(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    admin = object()
+
+    def slow_create_client(url, key):
+        time.sleep(0.2)
+        return admin
+
+    monkeypatch.setattr(supabase, "create_client", slow_create_client)
+    service = SupabaseService()
+    seen = []
+
+    def read():
+        seen.append(service.admin_client)
+
+    first = threading.Thread(target=read)
+    first.start()
+    time.sleep(0.05)  # a 1ª chamada ainda está dentro de create_client
+    read()
+    first.join()
+
+    assert seen == [admin, admin]
+
+
+def test_admin_client_failure_is_not_retried(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    calls = []
+
+    def failing_create_client(url, key):
+        calls.append(key)
+        raise RuntimeError("bad key")
+
+    monkeypatch.setattr(supabase, "create_client", failing_create_client)
+    service = SupabaseService()
+
+    assert service.admin_client is None
+    assert service.admin_client is None
+    assert calls == ["service-key"]
@@ -0,0 +1,104 @@
+import json
+import os
+
+from app.services.tournament_repository import TournamentRepository
+
+
+def test_store_assigns_unique_names_within_batch(tmp_path):
+    repo = TournamentRepository(tmp_path / "repo")
+
+    with repo.batch():
+        first, _ = repo.store_tournament("u1", "2025-01", "T100", "a\r\nb", "one.txt")
+        second, _ = repo.store_tournament("u1", "2025-01", "T100", "c", "two.txt")
+        third, _ = repo.store_tournament("u1", "2025-01", "T100", "d", "three.txt")
+
+    assert [p.name for p in (first, second, third)] == ["T100.txt", "T100_2.txt", "T100_3.txt"]
+    assert first.read_text() == "a\nb"
+
+    listed = TournamentRepository(tmp_path / "repo").list_tournaments("u1")
+    assert [t.tournament_id for t in listed] == ["T100", "T100_2", "T100_3"]
+    assert [t.source for t in listed] == ["one.txt", "two.txt", "three.txt"]
+
+
+def test_legacy_manifest_is_imported(tmp_path):
+    base = tmp_path / "repo"
+    month_dir = base / "u1" / "2024-12"
+    month_dir.mkdir(parents=True)
+    (month_dir / "T7.txt").write_text("hand")
+    (base / "u1" / "manifest.json").write_text(json.dumps({
+        "months": {"2024-12": {"T7": {"filename": "T7.txt", "source": "x.txt", "updated_at": "t"}}}
+    }))
+
+    repo = TournamentRepository(base)
+    stored, _ = repo.store_tournament("u1", "2024-12", "T7", "other", "y.txt")
+
+    assert stored.name == "T7_2.txt"
+    assert [t.tournament_id for t in repo.list_tournaments("u1")] == ["T7", "T7_2"]
+
+
+def test_export_hardlinks_files(tmp_path):
+    repo = TournamentRepository(tmp_path / "repo")
+    stored, _ = repo.store_tournament("u1", "2025-02", "T1", "hand", "a.txt")
+    repo.store_tournament("u1", "2025-03", "T2", "hand", "b.txt")
+
+    target = tmp_path / "dataset"
+    assert repo.export_dataset("u1", target) == 2
+
+    exported = target / "2025-02" / "T1.txt"
+    assert exported.read_text() == "hand"
+    assert os.stat(exported).st_ino == os.stat(stored).st_ino
+
+
+def test_concurrent_instances_do_not_lock_each_other_out(tmp_path, monkeypatch):
+    import threading
+
+    from app.services import tournament_repository
+
+    monkeypatch.setattr(tournament_repository, "BATCH_COMMIT_EVERY", 2)
+    first = TournamentRepository(tmp_path / "repo")
+    second = TournamentRepository(tmp_path / "repo")
+    errors = []
+    first.list_tournaments("u1")  # regista o utilizador fora do batch
+
+    def other_user():
+        try:
+            second.store_tournament("u2", "2025-01", "T1", "x", "x.txt")
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    with first.batch("u1"):
+        first.store_tournament("u1", "2025-01", "T1", "a", "a.txt")
+        writer = threading.Thread(target=other_user)
+        writer.start()
+        # o commit intermédio liberta o lock de escrita sem sair do batch
+        first.store_tournament("u1", "2025-01", "T2", "b", "b.txt")
+        writer.join(timeout=10)
+        assert not writer.is_alive()
+
+    assert errors == []
+    assert [t.tournament_id for t in second.list_tournaments("u1")] == ["T1", "T2"]
+    assert [t.tournament_id for t in first.list_tournaments("u2")] == ["T1"]
+
+
+def test_ingests_of_one_user_are_serialized(tmp_path):
+    import threading
+
+    repos = [TournamentRepository(tmp_path / "repo") for _ in range(2)]
+    inside = []
+
+    def ingest(repo, name):
+        with repo.batch("u1"):
+            inside.append(("in", name))
+            for index in range(20):
+                repo.store_tournament("u1", "2025-01", "T", str(index), f"{name}.txt")
+            inside.append(("out", name))
+
+    threads = [threading.Thread(target=ingest, args=(repo, f"job{n}")) for n, repo in enumerate(repos)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [kind for kind, _ in inside] == ["in", "out", "in", "out"]
+    stored = repos[0].list_tournaments("u1")
+    assert len(stored) == 40 and len({t.path.name for t in stored}) == 40
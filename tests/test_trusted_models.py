@@ -0,0 +1,159 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.derive.runner import _derive_hand
+from app.parse import schemas
+from app.parse.schemas import Action, Hand, HandView, Player, StreetInfo, hand_view
+from app.parse.site_pokerstars import PokerStarsParser
+
+HAND_TEXT = """PokerStars Hand #12345: Tournament #67890, $10+$1 Hold'em No Limit - Level I (10/20) - 2024/01/15 12:34:56 ET
+Table '67890 1' 9-max Seat #3 is the button
+Seat 1: Player1 (1500 in chips)
+Seat 2: Player2 (1500 in chips)
+Seat 3: TestHero (1500 in chips)
+Seat 4: Player4 (1500 in chips)
+Player4: posts small blind 10
+Player1: posts big blind 20
+*** HOLE CARDS ***
+Dealt to TestHero [As Kd]
+Player2: raises 40 to 60
+TestHero: calls 60
+Player4: folds
+Player1: folds
+*** FLOP *** [Qh Js Tc]
+Player2: bets 80
+TestHero: calls 80
+*** TURN *** [Qh Js Tc] [9d]
+Player2: checks
+TestHero: bets 200
+Player2: folds
+TestHero collected 310 from pot
+*** SUMMARY ***
+Total pot 310
+"""
+
+
+HAND = {
+    'site': 'pokerstars',
+    'file_id': 'f.txt',
+    'tournament_id': '67890',
+    'button_seat': 3,
+    'table_max': 9,
+    'hero': 'TestHero',
+    'blinds': {'sb': 10.0, 'bb': 20.0},
+    'players': [
+        {'seat': 1, 'name': 'Player1', 'stack_chips': 1500.0},
+        {'seat': 2, 'name': 'Player2', 'stack_chips': 1500.0},
+        {'seat': 3, 'name': 'TestHero', 'stack_chips': 1500.0, 'is_hero': True},
+        {'seat': 4, 'name': 'Player4', 'stack_chips': 1500.0},
+    ],
+    'players_dealt_in': ['Player4', 'Player1', 'TestHero'],
+    'streets': {
+        'preflop': {'actions': [
+            {'actor': 'Player4', 'type': 'POST_SB', 'amount': 10.0},
+            {'actor': 'Player1', 'type': 'POST_BB', 'amount': 20.0},
+            {'actor': 'Player2', 'type': 'RAISE', 'amount': 40.0, 'to_amount': 60.0},
+            {'actor': 'TestHero', 'type': 'CALL', 'amount': 60.0},
+            {'actor': 'Player4', 'type': 'FOLD'},
+            {'actor': 'Player1', 'type': 'FOLD'},
+        ]},
+        'flop': {'actions': [
+            {'actor': 'Player2', 'type': 'BET', 'amount': 80.0},
+            {'actor': 'TestHero', 'type': 'CALL', 'amount': 80.0},
+        ], 'board': ['Qh', 'Js', 'Tc']},
+        'turn': {'actions': []},
+        'river': {'actions': []},
+    },
+}
+
+
+def test_parsed_hands_serialize_like_validated_hands():
+    hands = PokerStarsParser().parse_tournament(HAND_TEXT, 'f.txt', {'global': ['TestHero']})
+
+    assert hands
+    for hand in hands:
+        dumped = hand.model_dump_json(exclude_none=True)
+        # revalidar o output dá o mesmo JSON: o construtor sem validação não perdeu nada
+        assert Hand(**json.loads(dumped)).model_dump_json(exclude_none=True) == dumped
+
+
+def test_trusted_defaults_are_not_shared():
+    first = Hand.trusted(site='gg', file_id='a', streets={})
+    second = Hand.trusted(site='gg', file_id='b', streets={})
+    first.blinds['sb'] = 10
+
+    assert second.blinds == {}
+    assert first.players is not second.players
+
+
+def test_trusted_matches_model_construct():
+    data = dict(actor='a', type='CALL', amount=1.0, unknown_key=1)
+    fast = Action.trusted(**data)
+    reference = Action.model_construct(**data)
+
+    assert fast == reference
+    assert fast.model_fields_set == reference.model_fields_set
+    assert fast.model_dump_json(exclude_none=True) == reference.model_dump_json(exclude_none=True)
+
+
+def test_debug_mode_validates(monkeypatch):
+    assert Action.trusted(actor='x', type='NOT_AN_ACTION').type == 'NOT_AN_ACTION'
+
+    monkeypatch.setattr(schemas, 'VALIDATE_MODELS', True)
+
+    with pytest.raises(ValidationError):
+        Action.trusted(actor='x', type='NOT_AN_ACTION')
+    with pytest.raises(ValidationError):
+        Player.trusted(seat='one', name='x')
+    assert isinstance(hand_view(HAND), Hand)
+
+
+def test_hand_view_derives_like_the_model(monkeypatch):
+    obj = json.loads(Hand(**HAND).model_dump_json(exclude_none=True))
+    view = hand_view(obj)
+
+    assert isinstance(view, HandView)
+    assert not hasattr(view, 'derived')
+    assert [p.name for p in view.players] == ['Player1', 'Player2', 'TestHero', 'Player4']
+    assert view.streets['flop'].actions[0].amount == 80.0
+
+    fast_obj = dict(obj)
+    fast = _derive_hand(fast_obj)
+    monkeypatch.setattr(schemas, 'VALIDATE_MODELS', True)
+    slow_obj = dict(obj)
+    slow = _derive_hand(slow_obj)
+
+    assert fast == slow
+    assert fast_obj['derived'] == slow_obj['derived']
+
+
+def test_hand_view_coerces_json_ints():
+    view = hand_view({
+        'site': 'gg', 'file_id': 'f',
+        'blinds': {'sb': 10, 'bb': 20},
+        'players': [{'seat': 1, 'name': 'a', 'stack_chips': 1000}],
+        'streets': {'preflop': {'actions': [{'actor': 'a', 'type': 'CALL', 'amount': 20}]}},
+    })
+
+    assert view.blinds == {'sb': 10.0, 'bb': 20.0}
+    assert isinstance(view.players[0].stack_chips, float)
+    assert isinstance(view.streets['preflop'].actions[0].amount, float)
+    assert view.streets['preflop'].board is None
+    assert isinstance(StreetInfo.trusted(), StreetInfo)
+
+
+def test_trusted_coerces_numbers_and_requires_fields():
+    player = Player.trusted(seat=1, name='a', stack_chips=3)
+    hand = Hand.trusted(site='gg', file_id='f', streets={}, blinds={'sb': 10, 'bb': 20.5})
+
+    assert isinstance(player.stack_chips, float)
+    assert player.model_dump_json() == Player(seat=1, name='a', stack_chips=3).model_dump_json()
+    assert hand.blinds == {'sb': 10.0, 'bb': 20.5} and isinstance(hand.blinds['sb'], float)
+    assert Player.trusted(seat=1, name='a').stack_chips is None
+
+    with pytest.raises(ValidationError, match='streets'):
+        Hand.trusted(site='gg', file_id='f')
+    with pytest.raises(ValidationError, match='streets'):
+        hand_view({'site': 'gg', 'file_id': 'f'})
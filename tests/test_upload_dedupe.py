@@ -0,0 +1,64 @@
+import datetime
+import hashlib
+import io
+
+import pytest
+
+from app.api import simple_upload
+from app.services.file_hash import FileHashService, FileTooLargeError
+
+
+def test_save_stream_with_hash_matches_full_read(tmp_path):
+    data = b"hand history " * 200_000
+    dest = tmp_path / "upload.zip"
+
+    file_hash, size = FileHashService.save_stream_with_hash(io.BytesIO(data), dest)
+
+    assert size == len(data)
+    assert dest.read_bytes() == data
+    assert file_hash == hashlib.sha256(data).hexdigest() == FileHashService.calculate_hash(dest)
+
+
+def test_save_stream_with_hash_enforces_limit(tmp_path):
+    with pytest.raises(FileTooLargeError):
+        FileHashService.save_stream_with_hash(io.BytesIO(b"x" * 100), tmp_path / "f", max_bytes=10)
+
+
+class _FakeUploadService:
+    def __init__(self, existing=None):
+        self.existing = existing
+        self.lookups = []
+
+    def find_processed_upload_by_hash(self, user_id, file_hash):
+        self.lookups.append((user_id, file_hash))
+        return self.existing
+
+
+def test_duplicate_returns_existing_token_without_history_lookup(monkeypatch):
+    def _no_history():
+        raise AssertionError("processing_history should not be queried")
+
+    monkeypatch.setattr(simple_upload, "SupabaseHistoryService", _no_history)
+    service = _FakeUploadService({
+        "token": "abc123abc123",
+        "processed_at": datetime.datetime(2025, 3, 1, 12, 0),
+        "hand_count": 4200,
+    })
+
+    result = simple_upload.find_duplicate_result(service, "user-1", "f" * 64)
+
+    assert service.lookups == [("user-1", "f" * 64)]
+    assert result["duplicate"] is True
+    assert result["token"] == "abc123abc123"
+    assert result["dashboard_url"] == "/dashboard/abc123abc123"
+    assert result["original_date"] == "2025-03-01T12:00:00"
+    assert result["total_hands"] == 4200
+
+
+def test_new_archive_is_not_a_duplicate(monkeypatch):
+    class _DisabledHistory:
+        enabled = False
+
+    monkeypatch.setattr(simple_upload, "SupabaseHistoryService", _DisabledHistory)
+
+    assert simple_upload.find_duplicate_result(_FakeUploadService(), "user-1", "0" * 64) is None
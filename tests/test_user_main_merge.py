@@ -0,0 +1,43 @@
+from app.services.user_main_dashboard_service import _merge_group_stats
+
+
+def _month(opps_key, pct_key, opps, pct, score):
+    return {
+        "groups": {
+            "postflop_all": {
+                "hands_count": 100,
+                "overall_score": score,
+                "stats": {"RFI": {opps_key: opps, "att": opps // 2, pct_key: pct, "score": score}},
+                "subgroups": {
+                    "Flop Cbet": {
+                        "score": score,
+                        "stats": {"CBET": {opps_key: opps, pct_key: pct, "score": score, "ideal": 60}},
+                    }
+                },
+            }
+        }
+    }
+
+
+def test_merge_resolves_aliases_and_weights_months():
+    month_payloads = [
+        ("2025-02", _month("opportunities", "percentage", 40, 50.0, 80.0)),
+        ("2025-01", _month("opps", "pct", 10, 20.0, 60.0)),
+        ("2024-12", {"groups": {}}),
+    ]
+    weights = {"2025-02": 0.75, "2025-01": 0.25, "2024-12": 0.0}
+
+    group = _merge_group_stats(month_payloads, weights)["postflop_all"]
+
+    rfi = group["stats"]["RFI"]
+    assert rfi["opportunities"] == 50
+    assert rfi["attempts"] == 25
+    assert rfi["frequencies_by_month"] == [50.0, 20.0, None]
+    assert rfi["score"] == 75.0
+
+    cbet = group["subgroups"]["Flop Cbet"]["stats"]["CBET"]
+    assert cbet["opps"] == cbet["opportunities"] == 50
+    assert cbet["pct"] == cbet["percentage"] == 42.5
+    assert cbet["ideal"] == 60
+    assert group["hands_count"] == 200
+    assert group["overall_score"] == 75.0
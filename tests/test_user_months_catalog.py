@@ -0,0 +1,140 @@
+from app.services.months_catalog_service import catalog_entries_from_output
+from app.services.user_months_service import UserMonthsService
+
+
+class _FakeStorage:
+    def __init__(self, results):
+        self.results = results
+        self.loads = []
+
+    def get_pipeline_result(self, token, month=None):
+        self.loads.append((token, month))
+        payload = self.results.get((token, month))
+        if payload is None:
+            raise FileNotFoundError(token)
+        return payload
+
+    def get_months_manifest(self, token):
+        return None
+
+
+class _FakeCatalog:
+    def __init__(self, token_months):
+        self.token_months = token_months
+        self.recorded = {}
+
+    def get_user_token_months(self, user_id):
+        return self.token_months
+
+    def record_token_months(self, user_id, token, entries):
+        self.recorded[token] = list(entries)
+        return True
+
+
+class _FakeUploads:
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def list_all_uploads(self, user_id):
+        return [{"token": t} for t in self.tokens]
+
+
+def test_catalogued_tokens_skip_storage():
+    storage = _FakeStorage({})
+    catalog = _FakeCatalog({"tok1": ["2025-08", "2025-09"], "tok2": ["2025-09"]})
+    service = UserMonthsService(_FakeUploads([]), storage, catalog)
+
+    assert service.get_user_months_map("u1") == {
+        "2025-08": ["tok1"],
+        "2025-09": ["tok1", "tok2"],
+    }
+    assert storage.loads == []
+
+
+def test_uncatalogued_token_is_scanned_and_backfilled():
+    storage = _FakeStorage({
+        ("tok1", None): {"hands_per_month": {"2025-08": 10, "2025-09": 4, "1970-01": 3}},
+        ("tok1", "2025-08"): {"valid_hands": 10},
+    })
+    catalog = _FakeCatalog({"tok1": []})
+    service = UserMonthsService(_FakeUploads([]), storage, catalog)
+
+    assert service.get_user_months_map("u1") == {"2025-08": ["tok1"]}
+    assert catalog.recorded["tok1"] == [
+        ("2025-08", 10, "/results/tok1/pipeline_result_2025-08.json"),
+    ]
+
+
+def test_catalog_failure_falls_back_to_upload_scan():
+    storage = _FakeStorage({
+        ("tok1", None): {"hands_per_month": {"2025-08": 10}},
+        ("tok1", "2025-08"): {"valid_hands": 10},
+    })
+    catalog = _FakeCatalog(None)
+    service = UserMonthsService(_FakeUploads(["tok1"]), storage, catalog)
+
+    assert service.get_user_months_map("u1") == {"2025-08": ["tok1"]}
+    assert catalog.recorded == {}
+
+
+def test_catalog_entries_from_output(tmp_path):
+    (tmp_path / "pipeline_result_2025-08.json").write_text("{}")
+    result = {"hands_per_month": {"2025-08": 7, "2025-09": 2, "2025-10": 0}}
+
+    assert catalog_entries_from_output("tok", result, tmp_path) == [
+        ("2025-08", 7, "/results/tok/pipeline_result_2025-08.json"),
+    ]
+
+
+def test_token_without_months_is_recorded_once():
+    storage = _FakeStorage({("tok1", None): {"hands_per_month": {}}})
+    catalog = _FakeCatalog({"tok1": []})
+    service = UserMonthsService(_FakeUploads([]), storage, catalog)
+
+    assert service.get_user_months_map("u1") == {}
+    assert catalog.recorded == {"tok1": []}
+
+
+class _FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.rows
+
+
+class _FakeConnection:
+    def __init__(self, rows=()):
+        self.cur = _FakeCursor(list(rows))
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        pass
+
+
+def test_no_months_marker_round_trip(monkeypatch):
+    from app.services import months_catalog_service
+    from app.services.months_catalog_service import NO_MONTHS, MonthsCatalogService
+
+    conn = _FakeConnection()
+    monkeypatch.setattr(months_catalog_service.DatabasePool, "get_connection", lambda: conn)
+    monkeypatch.setattr(months_catalog_service.DatabasePool, "return_connection", lambda c: None)
+
+    assert MonthsCatalogService().record_token_months("u1", "tok1", [])
+    inserted = [params for sql, params in conn.cur.executed if sql.startswith("INSERT")]
+    assert inserted == [("u1", "tok1", NO_MONTHS, 0, None)]
+
+    conn.cur.rows = [("tok1", NO_MONTHS), ("tok2", None), ("tok3", "2025-08")]
+    assert MonthsCatalogService().get_user_token_months("u1") == {"tok2": [], "tok3": ["2025-08"]}